@@ -65,6 +65,8 @@ class AuditTrailAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'object_id', 'model_name']
     readonly_fields = ['audit_id', 'user', 'action', 'model_name', 'object_id', 'changes', 'old_values', 'new_values', 'timestamp', 'ip_address']
     ordering = ['-timestamp']
+    # The table is large; skip the unfiltered COUNT(*) on every changelist page.
+    show_full_result_count = False
     
     def has_add_permission(self, request):
         return False
@@ -355,6 +355,61 @@ class SampleForm(forms.ModelForm):
             self.fields['tests_requested'].help_text = "⚠️ No test parameters available. Please contact admin to set up test parameters first."
             self.fields['tests_requested'].required = False
 
+class BulkSampleRegistrationForm(SampleForm):
+    """Details shared by every bottle of a batch, plus how many bottles there are."""
+
+    sample_count = forms.IntegerField(
+        label='Number of samples',
+        required=False,
+        min_value=1,
+        initial=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
+    )
+    sampling_locations = forms.CharField(
+        label='Sampling locations',
+        required=False,
+        help_text='Optional: one location per line registers one sample per line and overrides the count.',
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 6, 'placeholder': 'Ward 1 - Public tap\nWard 2 - School well'}),
+    )
+
+    class Meta(SampleForm.Meta):
+        fields = [name for name in SampleForm.Meta.fields if name != 'date_received_at_lab']
+
+    def clean_sampling_locations(self):
+        raw = self.cleaned_data.get('sampling_locations') or ''
+        return [line.strip()[:100] for line in raw.splitlines() if line.strip()]
+
+    def clean(self):
+        from .services.sample_registration import max_batch_size
+
+        cleaned_data = super().clean()
+        locations = cleaned_data.get('sampling_locations') or []
+        if locations:
+            cleaned_data['sample_count'] = len(locations)
+        count = cleaned_data.get('sample_count') or 0
+        if not count and 'sample_count' not in self.errors:
+            self.add_error('sample_count', 'Enter the number of samples or list their locations.')
+        elif count > max_batch_size():
+            self.add_error('sample_count', f'A batch can hold at most {max_batch_size()} samples.')
+        return cleaned_data
+
+
+class SampleRegistrationImportForm(forms.Form):
+    file = forms.FileField(
+        label='Samples file (CSV)',
+        help_text="One row per bottle with 'Customer code', 'Collection date' and 'Sample source' columns; "
+                  "optional 'Sampling location', 'Quantity', 'Collected by', 'Referred by' and 'Tests' "
+                  "(separated by ';').",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'}),
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.txt')):
+            raise ValidationError('Upload a CSV file.')
+        return upload
+
+
 class SampleReportMetadataForm(forms.ModelForm):
     """Allow lab or admin staff to populate report metadata used in PDFs."""
     _date_input_formats = getattr(settings, 'DATE_INPUT_FORMATS', None) or ('%Y-%m-%d', '%d/%m/%Y')
@@ -433,6 +488,81 @@ class TestResultEntryForm(forms.Form):
                 'data-max-limit': parameter.max_permissible_limit,
             })
 
+class ReportExportForm(forms.Form):
+    STATUS_CHOICES = [
+        ('', 'Approved and sent'),
+        ('REPORT_APPROVED', 'Report approved'),
+        ('REPORT_SENT', 'Report sent'),
+    ]
+    LAYOUT_CHOICES = [
+        ('branded', 'Branded letterhead'),
+        ('plain', 'Plain (pre-printed stationery)'),
+    ]
+
+    date_from = forms.DateField(
+        required=False,
+        label='Collected from',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}, format='%Y-%m-%d'),
+    )
+    date_to = forms.DateField(
+        required=False,
+        label='Collected to',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}, format='%Y-%m-%d'),
+    )
+    customer = CustomerChoiceField(
+        queryset=Customer.objects.order_by('name'),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    referred_by = forms.CharField(
+        required=False,
+        max_length=255,
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+    )
+    status = forms.ChoiceField(
+        choices=STATUS_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    layout = forms.ChoiceField(
+        choices=LAYOUT_CHOICES,
+        required=False,
+        initial='branded',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+
+    def __init__(self, *args, customers=None, **kwargs):
+        """``customers`` limits the customer choices (e.g. to the user's scope)."""
+        super().__init__(*args, **kwargs)
+        if customers is not None:
+            self.fields['customer'].queryset = customers.order_by('name')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('date_from')
+        end = cleaned_data.get('date_to')
+        if start and end and end < start:
+            self.add_error('date_to', ValidationError('End date cannot be before start date.'))
+        if not any(cleaned_data.get(key) for key in ('date_from', 'date_to', 'customer', 'referred_by')):
+            raise ValidationError('Choose a date range, customer or referrer to export.')
+        return cleaned_data
+
+
+class ResultImportForm(forms.Form):
+    file = forms.FileField(
+        label='Results file (CSV)',
+        help_text="A 'Sample ID' or 'Customer code' column, then one column per parameter, "
+                  "or 'Parameter' and 'Value' columns.",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'}),
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.txt')):
+            raise ValidationError('Upload a CSV file.')
+        return upload
+
+
 class TestParameterForm(forms.ModelForm):
     CATEGORY_SUGGESTIONS = [
         'Physical & Chemical',
@@ -0,0 +1,68 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import AuditArchiveSegment
+from core.services.audit_archive import AuditArchiveError, archive_audit, default_cutoff, use_partitions
+
+
+class Command(BaseCommand):
+    help = "Move audit trail rows older than the hot window into monthly archive segments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Keep this many days in the hot table (default AUDIT_HOT_DAYS).")
+        parser.add_argument('--before', default=None, help="Archive months that end before this date (YYYY-MM-DD).")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rows read per query when writing archive files.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be archived.")
+        parser.add_argument('--list', action='store_true', help="List existing archive segments and exit.")
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for segment in AuditArchiveSegment.objects.order_by('period_start'):
+                self.stdout.write(f"{segment.period_start:%Y-%m}  {segment.kind:9}  {segment.row_count:>9}  {segment.location}")
+            return
+
+        if options['days'] is not None and options['before']:
+            raise CommandError("Use either --days or --before, not both.")
+        if options['before']:
+            try:
+                cutoff = timezone.make_aware(datetime.strptime(options['before'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError("--before must be a date in YYYY-MM-DD format.")
+        elif options['days'] is not None:
+            if options['days'] < 1:
+                raise CommandError("--days must be at least 1.")
+            cutoff = timezone.now() - timedelta(days=options['days'])
+        else:
+            cutoff = default_cutoff()
+
+        started = time.monotonic()
+        target = 'PostgreSQL partitions' if use_partitions() else 'compressed files'
+
+        def report(segment):
+            self.stdout.write(f"  {segment.period_start:%Y-%m}: {segment.row_count} row(s) -> {segment.location}")
+
+        try:
+            result = archive_audit(
+                cutoff,
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+                on_segment=report,
+            )
+        except AuditArchiveError as exc:
+            raise CommandError(str(exc))
+
+        if options['dry_run']:
+            for segment in result.segments:
+                self.stdout.write(f"  {segment.period_start:%Y-%m}: {segment.row_count} row(s)")
+            self.stdout.write(self.style.WARNING(
+                f"Dry run: {result.rows} row(s) in {len(result.segments)} month(s) before "
+                f"{timezone.localtime(cutoff):%Y-%m-%d} would move to {target}."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result.rows} audit row(s) in {len(result.segments)} month(s) to {target} "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Customer, normalize_phone
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Customer.phone_digits from Customer.phone. Needed after phones are changed "
+        "outside Customer.save (raw SQL, queryset.update, loaddata)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Customers rewritten per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many customers would change.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        queryset = Customer.objects.only('customer_id', 'phone', 'phone_digits').order_by('customer_id')
+        scanned = changed = 0
+        last = None
+        while True:
+            chunk = queryset if last is None else queryset.filter(customer_id__gt=last)
+            customers = list(chunk[:batch_size])
+            if not customers:
+                break
+            last = customers[-1].customer_id
+            scanned += len(customers)
+            stale = []
+            for customer in customers:
+                digits = normalize_phone(customer.phone)
+                if customer.phone_digits != digits:
+                    customer.phone_digits = digits
+                    stale.append(customer)
+            if stale and not options['dry_run']:
+                with transaction.atomic():
+                    Customer.objects.bulk_update(stale, ['phone_digits'], batch_size=batch_size)
+            changed += len(stale)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"Dry run: {changed} of {scanned} customer(s) would get a new phone_digits value."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Updated phone_digits on {changed} of {scanned} customer(s)."))
@@ -0,0 +1,221 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.services.report_pdf import (
+    REPORT_ENGINES,
+    ReportLabHeader,
+    ReportOptions,
+    ReportResultRow,
+    ReportSignatory,
+    ReportSnapshot,
+    build_report_pdf,
+)
+
+CATEGORIES = ('Physical Parameters', 'Chemical Parameters', 'Microbiological Parameters')
+STATUSES = ('WITHIN_LIMITS', 'ABOVE_LIMIT', 'BELOW_LIMIT', 'NON_NUMERIC')
+
+
+def synthetic_snapshot(result_count: int, *, malayalam: bool) -> ReportSnapshot:
+    """Return a representative report snapshot with ``result_count`` results."""
+    now = timezone.now()
+    rows = tuple(
+        ReportResultRow(
+            name=f'Parameter {index:03d}',
+            unit='mg/L',
+            method='IS 3025 (Part 23)',
+            category_label=CATEGORIES[index % len(CATEGORIES)],
+            result_value=f'{(index * 7) % 500 / 10:.1f}',
+            limit_text='6.5 – 8.5 mg/L',
+            limit_status=STATUSES[index % len(STATUSES)],
+        )
+        for index in range(1, result_count + 1)
+    )
+    comments = '\n'.join(
+        f'- Observation {index}: the measured value is within the acceptable range.' for index in range(1, 5)
+    )
+    return ReportSnapshot(
+        display_id='WL-BENCH-0001',
+        report_number='RPT-2026-0001 (Rev-1)',
+        customer_name='Benchmark Panchayat Office',
+        customer_address='Ward 4, Main Road\nKochi, Ernakulam 682001',
+        sample_source='Well',
+        location='Kochi',
+        collected_on=now,
+        received_at_lab=now,
+        test_commenced_on=now.date(),
+        test_completed_on=now.date(),
+        results=rows,
+        comments=comments,
+        recommendations='- Boil water before drinking.\n- Clean the well annually.',
+        comments_ml='- കുടിവെള്ളം ഉപയോഗിക്കുന്നതിന് മുമ്പ് തിളപ്പിക്കുക.' if malayalam else '',
+        recommendations_ml='- കിണർ വർഷത്തിലൊരിക്കൽ വൃത്തിയാക്കുക.' if malayalam else '',
+        signatories=(
+            ReportSignatory(name='Chemistry Lead', role='Chief of Quality - Chemistry'),
+            ReportSignatory(name='Microbiology Lead', role='Chief of Quality - Microbiology'),
+            ReportSignatory(name='Scientific Officer', role='Chief Scientific Officer'),
+        ),
+        consultant=ReportSignatory(name='Consultant', role='Chief of Solutions - Water Quality'),
+        lab=ReportLabHeader(name='Benchmark Laboratory', address='Kochi', contact='Phone: 0484 000000'),
+    )
+
+
+def _case_key(size: int, layout: str, malayalam: bool, engine: str = 'reportlab') -> str:
+    key = f"{size}-{layout}-{'ml' if malayalam else 'en'}"
+    # ReportLab keys stay unsuffixed so baselines written before --engines still compare.
+    return key if engine == 'reportlab' else f"{key}-{engine}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark report PDF rendering (wall time, peak memory, PDF size) across result "
+        "counts, branded/plain layouts, with/without the Malayalam page and per report engine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,50,200', help="Comma-separated result counts (default: 10,50,200).")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed renders per case (default: 3).")
+        parser.add_argument(
+            '--engines',
+            default='reportlab',
+            help=f"Comma-separated report engines to compare ({', '.join(REPORT_ENGINES)}; default: reportlab).",
+        )
+        parser.add_argument('--json', dest='json_path', help="Write the results to this JSON file.")
+        parser.add_argument('--baseline', help="Compare against a JSON file written by an earlier --json run.")
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=25.0,
+            help="Fail when wall time or peak memory exceeds the baseline by more than this percent (default: 25).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(value) for value in options['sizes'].split(',') if value.strip()]
+        except ValueError as exc:
+            raise CommandError("--sizes must be a comma-separated list of integers.") from exc
+        repeat = max(1, options['repeat'])
+        engines = [value.strip() for value in options['engines'].split(',') if value.strip()]
+        unknown = sorted(set(engines) - set(REPORT_ENGINES))
+        if unknown or not engines:
+            raise CommandError(f"--engines must be a subset of: {', '.join(REPORT_ENGINES)}.")
+
+        try:
+            import weasyprint  # noqa: F401
+        except Exception:
+            self.stdout.write(self.style.WARNING(
+                "WeasyPrint is unavailable: Malayalam cases measure the English report only."
+            ))
+            if 'html' in engines:
+                # The html engine would silently fall back to ReportLab and measure it twice.
+                self.stdout.write(self.style.WARNING("Skipping the html engine, which needs WeasyPrint."))
+                engines = [engine for engine in engines if engine != 'html']
+                if not engines:
+                    return
+
+        results = {}
+        header = f"{'case':<23} {'median ms':>10} {'min ms':>9} {'peak KiB':>10} {'PDF KiB':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for size in sizes:
+            for layout in ('branded', 'plain'):
+                for malayalam in (False, True):
+                    for engine in engines:
+                        key = _case_key(size, layout, malayalam, engine)
+                        results[key] = self._run_case(size, layout, malayalam, repeat, engine)
+                        row = results[key]
+                        self.stdout.write(
+                            f"{key:<23} {row['wall_ms_median']:>10.1f} {row['wall_ms_min']:>9.1f} "
+                            f"{row['peak_kib']:>10.0f} {row['pdf_bytes'] / 1024:>9.1f}"
+                        )
+
+        if len(engines) > 1:
+            self._compare_engines(results, engines)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as fh:
+                json.dump({'repeat': repeat, 'cases': results}, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['json_path']}")
+
+        if options['baseline']:
+            self._compare(results, options['baseline'], options['max_regression'])
+
+    def _run_case(self, size, layout, malayalam, repeat, engine='reportlab'):
+        snapshot = synthetic_snapshot(size, malayalam=malayalam)
+        render_options = ReportOptions(
+            include_branding=layout == 'branded',
+            include_malayalam=malayalam,
+            engine=engine,
+        )
+
+        # Warm-up render so font/image loading is not charged to the first sample.
+        pdf_bytes = build_report_pdf(snapshot, render_options)
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            pdf_bytes = build_report_pdf(snapshot, render_options)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Memory is measured on a separate run: tracemalloc would distort the timings.
+        tracemalloc.start()
+        try:
+            build_report_pdf(snapshot, render_options)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'results': size,
+            'layout': layout,
+            'malayalam': malayalam,
+            'engine': engine,
+            'wall_ms_median': round(statistics.median(timings), 2),
+            'wall_ms_min': round(min(timings), 2),
+            'peak_kib': round(peak / 1024, 1),
+            'pdf_bytes': len(pdf_bytes),
+        }
+
+    def _compare_engines(self, results, engines):
+        reference = engines[0]
+        self.stdout.write('')
+        self.stdout.write(f"Median wall time and peak memory relative to the {reference} engine:")
+        for key, row in results.items():
+            if row['engine'] == reference:
+                continue
+            base = results.get(_case_key(row['results'], row['layout'], row['malayalam'], reference))
+            if not base or not base['wall_ms_median'] or not base['peak_kib']:
+                continue
+            self.stdout.write(
+                f"  {key:<23} time x{row['wall_ms_median'] / base['wall_ms_median']:.2f}  "
+                f"memory x{row['peak_kib'] / base['peak_kib']:.2f}"
+            )
+
+    def _compare(self, results, baseline_path, max_regression):
+        try:
+            with open(baseline_path, encoding='utf-8') as fh:
+                baseline = json.load(fh).get('cases', {})
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read baseline {baseline_path}: {exc}") from exc
+
+        limit = 1 + max_regression / 100
+        regressions = []
+        for key, current in results.items():
+            previous = baseline.get(key)
+            if not previous:
+                continue
+            for metric in ('wall_ms_median', 'peak_kib'):
+                if previous.get(metric) and current[metric] > previous[metric] * limit:
+                    regressions.append(
+                        f"{key} {metric}: {previous[metric]} -> {current[metric]}"
+                    )
+
+        if regressions:
+            raise CommandError(
+                f"Render regressions above {max_regression:g}%:\n" + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(f"No regressions above {max_regression:g}% against {baseline_path}."))
@@ -0,0 +1,108 @@
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Customer, NumberSequence, Sample
+
+BENCHMARK_SEQUENCE = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress the NumberSequence allocator from parallel workers and report throughput, "
+        "latency and collisions (there must be none)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Parallel threads (default: 8).")
+        parser.add_argument('--per-worker', type=int, default=200, help="Allocations per thread (default: 200).")
+        parser.add_argument('--block', type=int, default=1, help="Numbers reserved per allocation (default: 1).")
+        parser.add_argument(
+            '--samples',
+            action='store_true',
+            help="Register real samples (display_id allocation plus insert) instead of bare reservations. "
+                 "The samples and their benchmark customer are deleted afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        per_worker = options['per_worker']
+        block = options['block']
+        if workers < 1 or per_worker < 1 or block < 1:
+            raise CommandError("--workers, --per-worker and --block must be at least 1.")
+        if options['samples'] and block != 1:
+            raise CommandError("--block applies to bare reservations only.")
+
+        customer = None
+        if options['samples']:
+            customer = Customer.objects.create(
+                name='Sequence Benchmark', phone='0000000000', street_locality_landmark='Benchmark',
+                village_town_city='Benchmark', district='Ernakulam', pincode='682001',
+            )
+        year = timezone.now().year
+        issued = []
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+        start_barrier = threading.Barrier(workers)
+
+        def work():
+            mine, timings = [], []
+            try:
+                start_barrier.wait()
+                for _ in range(per_worker):
+                    started = time.perf_counter()
+                    if customer is not None:
+                        sample = Sample.objects.create(
+                            customer=customer, sample_source='OTHER', collection_datetime=timezone.now(),
+                        )
+                        mine.append(sample.display_id)
+                    else:
+                        with transaction.atomic():
+                            mine.extend(NumberSequence.reserve(BENCHMARK_SEQUENCE, block, year=year))
+                    timings.append((time.perf_counter() - started) * 1000)
+            except Exception as exc:  # reported below; one failing worker must not hide the others
+                with lock:
+                    failures.append(repr(exc))
+            finally:
+                connection.close()
+                with lock:
+                    issued.extend(mine)
+                    latencies.extend(timings)
+
+        threads = [threading.Thread(target=work, name=f'sequence-bench-{index}') for index in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        duplicates = {value: count for value, count in Counter(issued).items() if count > 1}
+        if customer is not None:
+            Sample.objects.filter(customer=customer).delete()
+            customer.delete()
+        else:
+            NumberSequence.objects.filter(name=BENCHMARK_SEQUENCE, year=year).delete()
+
+        operations = len(latencies)
+        self.stdout.write(f"backend            {connection.vendor}")
+        self.stdout.write(f"workers            {workers} x {per_worker} ({'samples' if customer else f'blocks of {block}'})")
+        self.stdout.write(f"numbers issued     {len(issued)}")
+        self.stdout.write(f"throughput         {operations / elapsed:.0f} allocations/s")
+        if latencies:
+            ordered = sorted(latencies)
+            self.stdout.write(f"latency median     {statistics.median(ordered):.2f} ms")
+            self.stdout.write(f"latency p99        {ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]:.2f} ms")
+        self.stdout.write(f"collisions         {len(duplicates)}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} worker(s) failed; first error: {failures[0]}")
+        if duplicates:
+            raise CommandError(f"Duplicate numbers issued: {sorted(duplicates)[:10]}")
+        self.stdout.write(self.style.SUCCESS("No collisions."))
@@ -0,0 +1,67 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import AuditTrail
+
+PAYLOAD_FIELDS = ('changes', 'old_values', 'new_values')
+
+
+def _payload_size(entry) -> int:
+    return sum(
+        len(json.dumps(getattr(entry, name) or {}, cls=DjangoJSONEncoder, separators=(',', ':')))
+        for name in PAYLOAD_FIELDS
+    )
+
+
+class Command(BaseCommand):
+    help = "Rewrite audit rows that still carry full old/new snapshots into the compact diff-only payload."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows rewritten per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows and bytes would change.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started = time.monotonic()
+        queryset = (
+            AuditTrail.objects.filter(~Q(old_values={}) | ~Q(new_values={}))
+            .only('audit_id', *PAYLOAD_FIELDS)
+            .order_by('audit_id')
+        )
+        rows = saved = 0
+        last = None
+        while True:
+            chunk = queryset if last is None else queryset.filter(audit_id__gt=last)
+            entries = list(chunk[:batch_size])
+            if not entries:
+                break
+            last = entries[-1].audit_id
+            for entry in entries:
+                before = _payload_size(entry)
+                entry.changes = AuditTrail.compact_changes(entry.old_values, entry.new_values)
+                entry.old_values = {}
+                entry.new_values = {}
+                saved += before - _payload_size(entry)
+            if not options['dry_run']:
+                with transaction.atomic():
+                    AuditTrail.objects.bulk_update(entries, PAYLOAD_FIELDS, batch_size=batch_size)
+            rows += len(entries)
+            self.stdout.write(f"  {rows} row(s) processed")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"Dry run: {rows} audit row(s) would be compacted, saving about {saved / 1024:.1f} KiB of JSON."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted {rows} audit row(s), saving about {saved / 1024:.1f} KiB of JSON "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,68 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Customer
+from core.services.render_pool import shutdown_pool
+from core.services.report_export import EXPORTABLE_STATUSES, exportable_samples, stream_reports_zip
+
+
+def _parse_date(value, option):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"{option} must be a date in YYYY-MM-DD format.") from exc
+
+
+class Command(BaseCommand):
+    help = "Write approved report PDFs matching the given filters into a ZIP archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the ZIP file to write.")
+        parser.add_argument('--from', dest='date_from', help="Earliest collection date (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='date_to', help="Latest collection date (YYYY-MM-DD).")
+        parser.add_argument('--customer', help="Customer code or primary key.")
+        parser.add_argument('--referred-by', dest='referred_by', help="Referrer name (case-insensitive).")
+        parser.add_argument('--status', choices=EXPORTABLE_STATUSES, help="Only export samples in this status.")
+        parser.add_argument('--plain', action='store_true', help="Use the plain layout instead of the branded one.")
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help="Render processes to use (defaults to REPORT_RENDER_WORKERS; 0 renders inline).",
+        )
+
+    def handle(self, *args, **options):
+        customer = None
+        if options['customer']:
+            lookup = options['customer'].strip()
+            customer = Customer.objects.filter(customer_code=lookup).first()
+            if customer is None and lookup.isdigit():
+                customer = Customer.objects.filter(pk=int(lookup)).first()
+            if customer is None:
+                raise CommandError(f"Customer '{lookup}' not found.")
+
+        samples = exportable_samples(
+            date_from=_parse_date(options['date_from'], '--from') if options['date_from'] else None,
+            date_to=_parse_date(options['date_to'], '--to') if options['date_to'] else None,
+            customer=customer,
+            referred_by=options['referred_by'],
+            status=options['status'],
+        )
+        total = samples.count()
+        if not total:
+            self.stdout.write(self.style.WARNING("No approved reports match these filters."))
+            return
+
+        self.stdout.write(f"Exporting {total} report(s) to {options['output']}...")
+        try:
+            with open(options['output'], 'wb') as fh:
+                for chunk in stream_reports_zip(
+                    samples,
+                    include_branding=not options['plain'],
+                    workers=options['workers'],
+                ):
+                    fh.write(chunk)
+        finally:
+            shutdown_pool()
+        self.stdout.write(self.style.SUCCESS(f"Export complete: {options['output']}"))
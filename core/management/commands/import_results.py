@@ -0,0 +1,54 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.result_import import ResultImportError, import_results, write_error_report
+
+
+class Command(BaseCommand):
+    help = "Import test results for many samples from an analyser or spreadsheet CSV export."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file to import.")
+        parser.add_argument('--user', required=True, help="Username recorded as technician and in the audit trail.")
+        parser.add_argument('--chunk-size', type=int, default=None, help="CSV rows written per transaction.")
+        parser.add_argument('--errors', default=None, help="Write rows that could not be imported to this CSV file.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['user'], is_active=True)
+        except User.DoesNotExist:
+            raise CommandError(f"Active user '{options['user']}' not found.")
+        if not (user.is_lab_tech() or user.is_admin()):
+            raise CommandError("Results can only be imported as a lab technician or admin.")
+
+        started = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8-sig', errors='replace', newline='') as fh:
+                summary = import_results(fh, user=user, chunk_size=options['chunk_size'])
+        except OSError as exc:
+            raise CommandError(f"Could not read {options['path']}: {exc}")
+        except ResultImportError as exc:
+            raise CommandError(str(exc))
+
+        if summary.ignored_columns:
+            self.stdout.write(self.style.WARNING(f"Ignored columns: {', '.join(summary.ignored_columns)}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {summary.rows} row(s): {summary.created} result(s) added, {summary.updated} updated, "
+            f"{summary.unchanged} unchanged across {len(summary.samples)} sample(s) "
+            f"({summary.completed_samples} completed) in {time.monotonic() - started:.1f}s."
+        ))
+        if not summary.error_count:
+            return
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8', newline='') as fh:
+                write_error_report(summary.errors, fh)
+            self.stdout.write(self.style.WARNING(
+                f"{summary.error_count} value(s) not imported; details written to {options['errors']}."
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(f"{summary.error_count} value(s) not imported:"))
+            for error in summary.errors:
+                self.stdout.write(f"  line {error.line} {error.sample} {error.parameter}: {error.message}")
@@ -0,0 +1,53 @@
+import os
+
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+
+from core.services.report_images import report_image_variant
+
+STATIC_IMAGES = (
+    ('report_templates/biofix_wl_template_page.png', 'background'),
+    ('report_templates/biofix_wl_watermark.png', 'watermark'),
+    ('images/biofix_logo.png', 'logo'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the size-capped report variants of the letterhead, watermark, lab logos "
+        "and user signatures (run after collectstatic)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--static-only',
+            action='store_true',
+            help="Only process the bundled static images (no database access, e.g. at image build time).",
+        )
+
+    def handle(self, *args, **options):
+        sources = [(finders.find(path), kind) for path, kind in STATIC_IMAGES]
+        if not options['static_only']:
+            from core.models import CustomUser, LabProfile
+
+            for user in CustomUser.objects.exclude(signature='').exclude(signature__isnull=True).iterator():
+                sources.append((user.signature_path, 'signature'))
+            for profile in LabProfile.objects.exclude(logo='').exclude(logo__isnull=True).iterator():
+                sources.append((profile.logo_path, 'logo'))
+
+        processed = 0
+        original_bytes = variant_bytes = 0
+        for source, kind in sources:
+            if not source or not os.path.exists(source):
+                continue
+            variant = report_image_variant(source, kind)
+            if not variant:
+                continue
+            processed += 1
+            original_bytes += os.path.getsize(source)
+            variant_bytes += os.path.getsize(variant)
+            self.stdout.write(f"{kind:<10} {source} -> {variant}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Optimised {processed} image(s): {original_bytes / 1024:.0f} KiB -> {variant_bytes / 1024:.0f} KiB."
+        ))
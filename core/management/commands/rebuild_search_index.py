@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.services import search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the customer and sample search index from scratch and drop entries whose record is gone. "
+        "Run after bulk edits made outside the application (raw SQL, loaddata)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Entries written per statement.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started = time.monotonic()
+        with transaction.atomic():
+            written = search_index.rebuild_index(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {written} record(s) with the {search_index.backend()} backend "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,63 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.models import TestParameter
+from core.services.limit_reevaluation import reevaluate_parameters, resume_interrupted_jobs
+
+
+class Command(BaseCommand):
+    help = "Re-classify stored result limit statuses against the current parameter limits and overrides."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--parameter',
+            action='append',
+            dest='parameters',
+            help="Parameter name or id (repeatable). Defaults to every parameter.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=None, help="Results loaded per batch.")
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Only re-run background jobs that stopped with their web worker.",
+        )
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            resumed = resume_interrupted_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Resumed {len(resumed)} interrupted re-evaluation job(s)."))
+            return
+
+        parameter_ids = None
+        if options['parameters']:
+            parameter_ids = []
+            for lookup in options['parameters']:
+                lookup = lookup.strip()
+                match = Q(name__iexact=lookup)
+                try:
+                    match |= Q(pk=uuid.UUID(lookup))
+                except ValueError:
+                    pass
+                parameter = TestParameter.objects.filter(match).first()
+                if parameter is None:
+                    raise CommandError(f"Parameter '{lookup}' not found.")
+                parameter_ids.append(parameter.pk)
+
+        started = time.monotonic()
+        last_report = [0.0]
+
+        def report(progress):
+            now = time.monotonic()
+            if progress.checked and progress.checked < progress.total and now - last_report[0] < 1:
+                return
+            last_report[0] = now
+            self.stdout.write(f"  {progress.checked}/{progress.total} results checked, {progress.changed} changed")
+
+        progress = reevaluate_parameters(parameter_ids, chunk_size=options['chunk_size'], on_chunk=report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-evaluated {progress.checked} result(s) across {progress.parameters} parameter(s): "
+            f"{progress.changed} status change(s) in {time.monotonic() - started:.1f}s."
+        ))
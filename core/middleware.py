@@ -0,0 +1,12 @@
+from .services.audit_buffer import buffered_audit
+
+
+class AuditBufferMiddleware:
+    """Collect the request's audit rows and write them in one insert (see services/audit_buffer.py)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_audit():
+            return self.get_response(request)
@@ -0,0 +1,162 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:26
+
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copies of ``normalize_text_value``, ``core.services.limit_status`` and the
+# override precedence of ``core.services.result_overrides`` as they were when this
+# migration was written, so later changes there cannot change this backfill.
+NUMERIC_VALUE_QUANTUM = Decimal('0.000001')
+NUMERIC_VALUE_BOUND = Decimal('1e12')
+VALID_STATUSES = {'WITHIN_LIMITS', 'ABOVE_LIMIT', 'BELOW_LIMIT', 'NON_NUMERIC', 'UNKNOWN'}
+SETTINGS_FALLBACK_KEYS = ('global', 'default', '*')
+
+
+def _normalize(value):
+    return (value or '').strip().casefold()
+
+
+def _parse_numeric(raw):
+    raw = (raw or '').strip()
+    if not raw:
+        return None
+    try:
+        value = Decimal(raw.lstrip('<>').replace(',', '').strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return value if value.is_finite() else None
+
+
+def _storable(value):
+    if value is None or abs(value) >= NUMERIC_VALUE_BOUND:
+        return None
+    try:
+        return value.quantize(NUMERIC_VALUE_QUANTUM)
+    except InvalidOperation:
+        return None
+
+
+def _valid_status(status):
+    status = (status or '').strip().upper()
+    return status if status in VALID_STATUSES else None
+
+
+def _compile_mapping(mapping):
+    compiled = {}
+    if isinstance(mapping, dict):
+        for raw_value, status in mapping.items():
+            if isinstance(status, str):
+                compiled.setdefault(_normalize(raw_value), _valid_status(status))
+    return compiled
+
+
+def _merge(target, compiled):
+    for key, status in compiled.items():
+        if status and key not in target:
+            target[key] = status
+
+
+def _settings_tables(config):
+    by_parameter, fallback = {}, {}
+    if not isinstance(config, dict):
+        return by_parameter, fallback
+    if isinstance(config.get('parameters'), dict):
+        for raw_param, mapping in config['parameters'].items():
+            _merge(by_parameter.setdefault(_normalize(raw_param), {}), _compile_mapping(mapping))
+    for raw_param, mapping in config.items():
+        if raw_param in ('parameters',) + SETTINGS_FALLBACK_KEYS or not isinstance(mapping, dict):
+            continue
+        _merge(by_parameter.setdefault(_normalize(raw_param), {}), _compile_mapping(mapping))
+    for fallback_key in SETTINGS_FALLBACK_KEYS:
+        _merge(fallback, _compile_mapping(config.get(fallback_key)))
+    _merge(fallback, _compile_mapping(config))
+    return by_parameter, fallback
+
+
+def _override(parameter, key, db_overrides, by_parameter, fallback):
+    if not key:
+        return None
+    db_status = db_overrides.get((parameter.pk, key)) or db_overrides.get((None, key))
+    if db_status:
+        return _valid_status(db_status)
+    if parameter.name:
+        status = by_parameter.get(_normalize(parameter.name), {}).get(key)
+        if status:
+            return status
+    return fallback.get(key)
+
+
+def _limit_status(result_value, parameter, overrides):
+    numeric_value = _parse_numeric(result_value)
+    if parameter is None:
+        return numeric_value, 'UNKNOWN'
+    override = _override(parameter, _normalize(result_value), *overrides)
+    if override:
+        return numeric_value, override
+    if parameter.max_limit_display:
+        return numeric_value, 'NON_NUMERIC'
+    if numeric_value is None:
+        return None, 'NON_NUMERIC'
+    if parameter.min_permissible_limit is not None and numeric_value < parameter.min_permissible_limit:
+        return numeric_value, 'BELOW_LIMIT'
+    if parameter.max_permissible_limit is not None and numeric_value > parameter.max_permissible_limit:
+        return numeric_value, 'ABOVE_LIMIT'
+    return numeric_value, 'WITHIN_LIMITS'
+
+
+def backfill_limit_columns(apps, schema_editor):
+    TestResult = apps.get_model('core', 'TestResult')
+    ResultStatusOverride = apps.get_model('core', 'ResultStatusOverride')
+
+    db_overrides = {
+        (parameter_id, value): status
+        for parameter_id, value, status in ResultStatusOverride.objects.filter(is_active=True).values_list(
+            'parameter_id', 'normalized_value', 'status',
+        )
+        if value
+    }
+    config = getattr(settings, 'WATERLAB_SETTINGS', {}).get('TEXT_RESULT_STATUS_OVERRIDES')
+    overrides = (db_overrides, *_settings_tables(config))
+
+    batch = []
+    for result in TestResult.objects.select_related('parameter').iterator(chunk_size=500):
+        numeric_value, result.limit_status = _limit_status(result.result_value, result.parameter, overrides)
+        result.numeric_value = _storable(numeric_value)
+        batch.append(result)
+        if len(batch) >= 500:
+            TestResult.objects.bulk_update(batch, ['numeric_value', 'limit_status'])
+            batch = []
+    if batch:
+        TestResult.objects.bulk_update(batch, ['numeric_value', 'limit_status'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_aisettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testresult',
+            name='limit_status',
+            field=models.CharField(blank=True, choices=[('WITHIN_LIMITS', 'Within limits'), ('ABOVE_LIMIT', 'Above maximum'), ('BELOW_LIMIT', 'Below minimum'), ('NON_NUMERIC', 'Non-numeric'), ('UNKNOWN', 'Unknown')], default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='testresult',
+            name='numeric_value',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=18, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['limit_status', 'test_date'], name='testresult_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['parameter', 'numeric_value'], name='testresult_param_value_idx'),
+        ),
+        migrations.RunPython(backfill_limit_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:48
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_testresult_limit_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditArchiveSegment',
+            fields=[
+                ('segment_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('partition', 'PostgreSQL partition'), ('file', 'Compressed JSONL file')], max_length=10)),
+                ('location', models.CharField(max_length=255)),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-period_start'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['-timestamp', '-audit_id'], name='audit_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['model_name', '-timestamp'], name='audit_model_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['object_id'], name='audit_object_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['object_repr'], name='audit_repr_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
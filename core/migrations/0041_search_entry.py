@@ -0,0 +1,97 @@
+from django.db import migrations, models
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS core_searchentry_tsv_idx ON core_searchentry "
+    "USING gin (to_tsvector('simple', document))",
+    "CREATE INDEX IF NOT EXISTS core_searchentry_trgm_idx ON core_searchentry USING gin (document gin_trgm_ops)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_searchentry_trgm_idx",
+    "DROP INDEX IF EXISTS core_searchentry_tsv_idx",
+]
+
+# External-content FTS5 table mirroring core_searchentry.document. The triggers
+# are dropped if SQLite ever rebuilds core_searchentry for a later AlterField,
+# so such a migration must re-create them.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_searchentry_fts USING fts5("
+    "document, content='core_searchentry', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_ai AFTER INSERT ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(rowid, document) VALUES (new.id, new.document); END",
+    "CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_ad AFTER DELETE ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, document) "
+    "VALUES ('delete', old.id, old.document); END",
+    "CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_au AFTER UPDATE ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, document) "
+    "VALUES ('delete', old.id, old.document); "
+    "INSERT INTO core_searchentry_fts(rowid, document) VALUES (new.id, new.document); END",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_au",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_ai",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        from django.db import OperationalError, transaction
+
+        try:
+            with transaction.atomic():
+                _run(schema_editor, SQLITE_FORWARD)
+        except OperationalError:
+            pass  # SQLite built without FTS5 (or trigram, before 3.34); searches fall back to LIKE.
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+
+
+def backfill_search_entries(apps, schema_editor):
+    from core.services.search_index import rebuild_index
+
+    rebuild_index(
+        customer_model=apps.get_model('core', 'Customer'),
+        sample_model=apps.get_model('core', 'Sample'),
+        entry_model=apps.get_model('core', 'SearchEntry'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0040_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customer', 'Customer'), ('sample', 'Sample')], max_length=10)),
+                ('object_id', models.UUIDField()),
+                ('document', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(backfill_search_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# ``LIKE 'prefix%'`` can only use a B-tree index built with the pattern
+# operator class under a non-C collation. Django adds such ``_like`` indexes
+# for ``customer_code`` and ``display_id`` (unique fields) but not for these.
+# Phone prefixes are served by ``customer_phone_digits_idx`` (migration 0043).
+# The expressions match the SQL Django emits for ``startswith`` and
+# ``istartswith`` (``col::text LIKE`` / ``UPPER(col::text) LIKE``).
+POSTGRES_FORWARD = [
+    "CREATE INDEX IF NOT EXISTS sample_report_number_prefix_idx ON core_sample "
+    "((report_number::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS customer_name_prefix_idx ON core_customer (UPPER(name::text) text_pattern_ops)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS customer_name_prefix_idx",
+    "DROP INDEX IF EXISTS sample_report_number_prefix_idx",
+]
+
+
+def _run(schema_editor, statements):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def create_prefix_indexes(apps, schema_editor):
+    _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    _run(schema_editor, POSTGRES_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0041_search_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+# Frozen copy of ``core.models.normalize_phone`` as of this migration.
+def normalize_phone(value):
+    digits = ''.join(char for char in (value or '') if char.isdigit())
+    if len(digits) == 12 and digits.startswith('91'):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+
+def backfill_phone_digits(apps, schema_editor):
+    Customer = apps.get_model('core', 'Customer')
+    batch = []
+    for customer in Customer.objects.only('customer_id', 'phone').iterator(chunk_size=1000):
+        customer.phone_digits = normalize_phone(customer.phone)
+        batch.append(customer)
+        if len(batch) >= 1000:
+            Customer.objects.bulk_update(batch, ['phone_digits'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['phone_digits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0042_typeahead_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_digits'], name='customer_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(backfill_phone_digits, migrations.RunPython.noop),
+    ]
@@ -42,28 +42,43 @@ class ConsultantRequiredMixin(RoleRequiredMixin):
     allowed_roles = ['admin', 'consultant']
 
 class AuditMixin:
-    """Mixin to automatically log changes to models"""
-    
+    """Mixin to automatically log changes to models.
+
+    Models with ``TrackedFieldsMixin`` are diffed against the values they were
+    loaded with, so an update needs no extra query and only changed fields are
+    serialised. Other models fall back to re-fetching the stored row.
+    """
+
     def form_valid(self, form):
         from .models import AuditTrail
-        
-        # Get old values if this is an update
+
+        instance = getattr(self, 'object', None)
+        action = 'UPDATE' if instance is not None and instance.pk else 'CREATE'
         old_values = {}
-        if hasattr(self, 'object') and self.object and self.object.pk:
-            # This is an update
-            old_instance = self.model.objects.get(pk=self.object.pk)
-            old_values = self._get_field_values(old_instance)
-            action = 'UPDATE'
-        else:
-            # This is a create
-            action = 'CREATE'
-        
+        initial_state = None
+        if action == 'UPDATE':
+            if hasattr(instance, 'initial_state'):
+                initial_state = instance.initial_state()
+            else:
+                old_values = self._get_field_values(self.model.objects.get(pk=instance.pk))
+
         # Save the form
         response = super().form_valid(form)
-        
-        # Get new values
-        new_values = self._get_field_values(self.object)
-        
+
+        if initial_state is not None:
+            # Compared after saving so values set in save() are logged too.
+            changed = [
+                field for field in self.object.changed_fields(initial_state)
+                if self._is_audited_field(field)
+            ]
+            old_values = {
+                field.name: self._audit_value(self._initial_field_value(field, initial_state[field.attname]))
+                for field in changed
+            }
+            new_values = {field.name: self._audit_value(getattr(self.object, field.name)) for field in changed}
+        else:
+            new_values = self._get_field_values(self.object)
+
         # Log the change
         AuditTrail.log_change(
             user=self.request.user,
@@ -73,18 +88,32 @@ class AuditMixin:
             new_values=new_values,
             request=self.request
         )
-        
+
         return response
-    
+
+    @staticmethod
+    def _is_audited_field(field):
+        # Skip relation IDs and passwords
+        return not field.name.endswith('_id') and field.name not in ['password']
+
+    @staticmethod
+    def _audit_value(value):
+        if hasattr(value, 'isoformat'):  # Handle datetime objects
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _initial_field_value(field, value):
+        """The loaded value as ``getattr`` would return it; a changed foreign key costs one lookup."""
+        if field.is_relation and value is not None:
+            related = field.remote_field.model._base_manager.filter(pk=value).first()
+            return related if related is not None else value
+        return value
+
     def _get_field_values(self, instance):
         """Get field values from model instance for audit logging"""
-        values = {}
-        for field in instance._meta.fields:
-            if not field.name.endswith('_id') and field.name not in ['password']:  # Skip relation IDs and passwords
-                value = getattr(instance, field.name)
-                if hasattr(value, 'isoformat'):  # Handle datetime objects
-                    value = value.isoformat()
-                elif hasattr(value, '__str__'):
-                    value = str(value)
-                values[field.name] = value
-        return values
+        return {
+            field.name: self._audit_value(getattr(instance, field.name))
+            for field in instance._meta.fields
+            if self._is_audited_field(field)
+        }
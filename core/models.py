@@ -1,11 +1,13 @@
 import logging
 import os
 import base64
+import copy
 import hashlib
 import secrets
 import uuid
 
-from decimal import Decimal, InvalidOperation
+from collections import namedtuple
+from decimal import Decimal
 from datetime import timedelta
 
 from django.conf import settings # Recommended way to import User model
@@ -13,9 +15,11 @@ from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import IntegrityError, models, transaction
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.db.models.fields.files import FieldFile
 from django.templatetags.static import static
 from django.utils import timezone
+from django.utils.functional import cached_property
 from cryptography.fernet import Fernet, InvalidToken
 
 # Validator for Kerala PIN Codes
@@ -54,13 +58,84 @@ def normalize_text_value(value: str) -> str:
     return (value or '').strip().casefold()
 
 
+def normalize_phone(value: str) -> str:
+    """Digits-only national form of a phone number, for exact lookups.
+
+    ``'+91 98470-12345'``, ``'919847012345'`` and ``'98470 12345'`` all become
+    ``'9847012345'``; a trunk ``0`` before an 11-digit landline is dropped too.
+    """
+    digits = ''.join(char for char in (value or '') if char.isdigit())
+    if len(digits) == 12 and digits.startswith('91'):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+
 def _ai_settings_cipher() -> Fernet:
     secret = str(getattr(settings, 'AI_SETTINGS_ENCRYPTION_SECRET', '') or settings.SECRET_KEY)
     key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode('utf-8')).digest())
     return Fernet(key)
 
 
-class CustomUser(AbstractUser):
+class TrackedFieldsMixin:
+    """Remember the column values an instance was loaded (or last saved) with.
+
+    Views can then diff an edited instance in memory, via ``initial_state`` and
+    ``changed_fields``, instead of re-fetching the stored row first.
+    """
+
+    @staticmethod
+    def _tracked_value(value):
+        if isinstance(value, FieldFile):
+            return value.name
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+
+    def _tracked_attnames(self, names):
+        names = set(names)
+        return {field.attname for field in self._meta.concrete_fields if field.name in names or field.attname in names}
+
+    def _remember_state(self, attnames=None):
+        state = getattr(self, '_initial_state', {})
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred or (attnames is not None and field.attname not in attnames):
+                continue
+            state[field.attname] = self._tracked_value(self.__dict__.get(field.attname))
+        self._initial_state = state
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._remember_state(None if update_fields is None else self._tracked_attnames(update_fields))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_state(None if fields is None else self._tracked_attnames(fields))
+
+    def initial_state(self) -> dict:
+        """Copy of the loaded or last saved column values, keyed by attname."""
+        return dict(getattr(self, '_initial_state', {}))
+
+    def changed_fields(self, state=None) -> list:
+        """Concrete fields whose current value differs from ``state`` (default: the snapshot)."""
+        state = self.initial_state() if state is None else state
+        return [
+            field for field in self._meta.concrete_fields
+            if field.attname in state
+            and self._tracked_value(self.__dict__.get(field.attname)) != state[field.attname]
+        ]
+
+
+class CustomUser(TrackedFieldsMixin, AbstractUser):
     ROLE_CHOICES = [
         ('admin', 'Administrator'),
         ('lab', 'Lab Technician'),
@@ -109,6 +184,15 @@ class CustomUser(AbstractUser):
     def is_solutions_manager(self):
         return self.role == 'solutions_manager'
 
+    def save(self, *args, **kwargs):
+        new_signature = bool(self.signature) and not getattr(self.signature, '_committed', True)
+        super().save(*args, **kwargs)
+        if new_signature:
+            from core.services.report_images import warm_report_image
+
+            # Build the report-sized variant at upload time rather than on the first report.
+            warm_report_image(self.signature_path, 'signature')
+
     @property
     def signature_url(self) -> str:
         if self.signature:
@@ -158,7 +242,7 @@ class KeralaLocation(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_location_type_display()})"
 
-class Customer(models.Model):
+class Customer(TrackedFieldsMixin, models.Model):
     KERALA_DISTRICTS = [
         ('Thiruvananthapuram', 'Thiruvananthapuram'),
         ('Kollam', 'Kollam'),
@@ -186,6 +270,8 @@ class Customer(models.Model):
     )
     name = models.CharField(max_length=255)
     phone = models.CharField(max_length=20)
+    # normalize_phone(phone), kept in sync by save(); phone lookups match this exactly.
+    phone_digits = models.CharField(max_length=20, blank=True, default='', editable=False)
     email = models.EmailField(unique=True, blank=True, null=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -221,6 +307,8 @@ class Customer(models.Model):
         indexes = [
             models.Index(fields=["name"], name="customer_name_idx"),
             models.Index(fields=["phone"], name="customer_phone_idx"),
+            # Pattern ops so the same index serves exact and typeahead prefix lookups on PostgreSQL.
+            models.Index(fields=["phone_digits"], name="customer_phone_digits_idx", opclasses=["varchar_pattern_ops"]),
             models.Index(fields=["district"], name="customer_district_idx"),
             models.Index(fields=["pincode"], name="customer_pincode_idx"),
             models.Index(fields=["created_by", "name"], name="customer_created_name_idx"),
@@ -231,6 +319,10 @@ class Customer(models.Model):
         if self.email is not None:
             cleaned_email = self.email.strip()
             self.email = cleaned_email or None
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_digits'}
 
         # Auto-populate the address field from detailed components
         address_parts = []
@@ -258,19 +350,31 @@ class Customer(models.Model):
             address_parts.append(f"Kerala - {pincode_clean}")
 
         self.address = ", ".join(address_parts)
+        adding = self._state.adding
+        changed = {field.name for field in self.changed_fields()}
         if self.customer_code:
-            return super().save(*args, **kwargs)
-
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            try:
-                with transaction.atomic():
-                    self.customer_code = self.generate_customer_code()
-                    return super().save(*args, **kwargs)
-            except IntegrityError:
-                self.customer_code = ''
-                if attempt == max_attempts - 1:
-                    raise
+            super().save(*args, **kwargs)
+        else:
+            max_attempts = 5
+            for attempt in range(max_attempts):
+                try:
+                    with transaction.atomic():
+                        self.customer_code = self.generate_customer_code()
+                        super().save(*args, **kwargs)
+                    break
+                except IntegrityError:
+                    self.customer_code = ''
+                    if attempt == max_attempts - 1:
+                        raise
+        self._update_search_entry(adding, changed)
+
+    def _update_search_entry(self, adding, changed):
+        from core.services import search_index
+
+        if adding or changed & set(search_index.CUSTOMER_FIELDS):
+            search_index.index_customers(
+                [self], include_samples=not adding and bool(changed & set(search_index.SAMPLE_CUSTOMER_FIELDS)),
+            )
 
     def __str__(self):
         return self.name
@@ -288,7 +392,7 @@ class Customer(models.Model):
         raise IntegrityError("Could not generate a unique customer code.")
 
 
-class LabProfile(models.Model):
+class LabProfile(TrackedFieldsMixin, models.Model):
     """Stores lab contact details displayed across reports and dashboards."""
     name = models.CharField(max_length=150, default='Biofix Laboratory')
     address_line1 = models.CharField(max_length=255, blank=True, default='')
@@ -340,6 +444,14 @@ class LabProfile(models.Model):
     def __str__(self):
         return self.name or "Lab profile"
 
+    def save(self, *args, **kwargs):
+        new_logo = bool(self.logo) and not getattr(self.logo, '_committed', True)
+        super().save(*args, **kwargs)
+        if new_logo:
+            from core.services.report_images import warm_report_image
+
+            warm_report_image(self.logo_path, 'logo')
+
     @classmethod
     def get_active(cls):
         """Return the active profile, falling back to configured defaults."""
@@ -499,7 +611,7 @@ class AISettings(models.Model):
         return bool(config.get('enabled') and config.get('api_key'))
 
 
-class Sample(models.Model):
+class Sample(TrackedFieldsMixin, models.Model):
     SAMPLE_SOURCE_CHOICES = [
         ('WELL', 'Well'),
         ('BOREWELL', 'Borewell'),
@@ -608,40 +720,28 @@ class Sample(models.Model):
             self.date_received_at_lab = self.collection_datetime
 
     def save(self, *args, **kwargs):
-        """Generate a year-scoped sequential display_id safely under concurrency."""
+        """Give new samples the next year-scoped display_id from ``NumberSequence``."""
         self._ensure_date_received_at_lab()
+        adding = self._state.adding
+        changed = {field.name for field in self.changed_fields()}
         if self.display_id:
-            return super().save(*args, **kwargs)
-
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            current_year = timezone.now().year
-            prefix = f"WL{current_year}-"
+            super().save(*args, **kwargs)
+        else:
+            # One transaction, so a failed insert hands its number back.
+            with transaction.atomic():
+                self.display_id = NumberSequence.next_number('sample')
+                try:
+                    super().save(*args, **kwargs)
+                except Exception:
+                    self.display_id = None
+                    raise
+        self._update_search_entry(adding, changed)
 
-            try:
-                with transaction.atomic():
-                    last_sample_this_year = (
-                        Sample.objects
-                        .filter(display_id__startswith=prefix)
-                        .select_for_update()
-                        .order_by('display_id')
-                        .last()
-                    )
+    def _update_search_entry(self, adding, changed):
+        from core.services import search_index
 
-                    sequence = 1
-                    if last_sample_this_year and last_sample_this_year.display_id:
-                        try:
-                            sequence = int(last_sample_this_year.display_id.split('-')[-1]) + 1
-                        except (IndexError, ValueError):
-                            sequence = 1
-
-                    self.display_id = f"{prefix}{sequence:04d}"
-                    return super().save(*args, **kwargs)
-            except IntegrityError:
-                # A concurrent insert likely grabbed the same sequence.
-                self.display_id = None
-                if attempt == max_attempts - 1:
-                    raise
+        if adding or changed & set(search_index.SAMPLE_FIELDS):
+            search_index.index_samples([self])
 
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -675,44 +775,37 @@ class Sample(models.Model):
         return new_status in valid_transitions.get(self.current_status, [])
     
     def generate_report_number(self) -> str:
-        """Generate a sequential report number per calendar year when missing.
+        """Assign the next report number of the calendar year when missing."""
+        if not self.report_number:
+            self.report_number = NumberSequence.next_number('report')
+        return self.report_number
 
-        Uses a short retry loop to reduce collisions during concurrent approvals.
-        """
-        if self.report_number:
-            return self.report_number
+    STATUS_AUDIT_FIELDS = (
+        'current_status', 'date_received_at_lab', 'test_commenced_on', 'test_completed_on', 'report_number',
+    )
+    REPORT_NUMBER_STATUSES = ('RESULTS_ENTERED', 'REVIEW_PENDING', 'REPORT_APPROVED', 'REPORT_SENT')
 
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            current_year = timezone.now().year
-            prefix = f"RPT{current_year}-"
+    def _status_audit_values(self):
+        return {name: getattr(self, name) for name in self.STATUS_AUDIT_FIELDS}
 
-            with transaction.atomic():
-                last_with_number = (
-                    Sample.objects.exclude(report_number__isnull=True)
-                    .exclude(report_number__exact='')
-                    .filter(report_number__startswith=prefix)
-                    .select_for_update()
-                    .order_by('report_number')
-                    .last()
-                )
+    def _apply_status(self, new_status, today):
+        """Set ``new_status`` and the dates that go with it (no save, no report number)."""
+        old_status = self.current_status
+        self.current_status = new_status
 
-                sequence = 1
-                if last_with_number and last_with_number.report_number:
-                    try:
-                        sequence = int(last_with_number.report_number.split('-')[-1]) + 1
-                    except (ValueError, IndexError):
-                        sequence = 1
-
-                candidate = f"{prefix}{sequence:04d}"
-                if not Sample.objects.filter(report_number=candidate).exists():
-                    self.report_number = candidate
-                    return candidate
-
-            # If we couldn't claim a unique candidate, loop and try again.
-            if attempt == max_attempts - 1:
-                self.report_number = candidate
-                return candidate
+        # Auto-update related timestamps
+        self._ensure_date_received_at_lab()
+
+        if new_status == 'TESTING_IN_PROGRESS':
+            if old_status == 'REVIEW_PENDING':
+                # Retesting starts afresh if consultant rejected the report
+                self.test_commenced_on = today
+                self.test_completed_on = None
+            elif not self.test_commenced_on:
+                self.test_commenced_on = today
+
+        if new_status in ('RESULTS_ENTERED', 'REVIEW_PENDING', 'REPORT_APPROVED', 'REPORT_SENT') and not self.test_completed_on:
+            self.test_completed_on = today
 
     def update_status(self, new_status, user=None):
         """Safely update sample status with validation"""
@@ -732,37 +825,9 @@ class Sample(models.Model):
         
         with transaction.atomic():
             # Track previous values for logging/comparison
-            old_status = self.current_status
-            old_date_received = self.date_received_at_lab
-            old_test_commenced = self.test_commenced_on
-            old_test_completed = self.test_completed_on
-            old_report_number = self.report_number
-
-            self.current_status = new_status
-            now = timezone.now()
-            today = now.date()
-
-            # Auto-update related timestamps
-            self._ensure_date_received_at_lab()
-
-            if new_status == 'TESTING_IN_PROGRESS':
-                if old_status == 'REVIEW_PENDING':
-                    # Retesting starts afresh if consultant rejected the report
-                    self.test_commenced_on = today
-                    self.test_completed_on = None
-                elif not self.test_commenced_on:
-                    self.test_commenced_on = today
-
-            if new_status == 'RESULTS_ENTERED' and not self.test_completed_on:
-                self.test_completed_on = today
-
-            if new_status == 'REVIEW_PENDING' and not self.test_completed_on:
-                self.test_completed_on = today
-
-            if new_status in ('REPORT_APPROVED', 'REPORT_SENT') and not self.test_completed_on:
-                self.test_completed_on = today
-
-            if new_status in ('RESULTS_ENTERED', 'REVIEW_PENDING', 'REPORT_APPROVED', 'REPORT_SENT'):
+            old_values = self._status_audit_values()
+            self._apply_status(new_status, timezone.now().date())
+            if new_status in self.REPORT_NUMBER_STATUSES:
                 self.generate_report_number()
 
             self.save()
@@ -773,21 +838,88 @@ class Sample(models.Model):
                     user=user,
                     action='UPDATE',
                     instance=self,
-                    old_values={
-                        'current_status': old_status,
-                        'date_received_at_lab': old_date_received,
-                        'test_commenced_on': old_test_commenced,
-                        'test_completed_on': old_test_completed,
-                        'report_number': old_report_number,
-                    },
-                    new_values={
-                        'current_status': new_status,
-                        'date_received_at_lab': self.date_received_at_lab,
-                        'test_commenced_on': self.test_commenced_on,
-                        'test_completed_on': self.test_completed_on,
-                        'report_number': self.report_number,
-                    },
+                    old_values=old_values,
+                    new_values=self._status_audit_values(),
                 )
+
+    @classmethod
+    def incomplete_sample_ids(cls, samples) -> set:
+        """Pks of ``samples`` that fail ``has_all_test_results``, in one query."""
+        counts = (
+            cls.objects.filter(pk__in=[sample.pk for sample in samples])
+            .annotate(
+                requested_count=Count('tests_requested', distinct=True),
+                results_count=Count('results', distinct=True),
+            )
+            .values_list('pk', 'requested_count', 'results_count')
+        )
+        complete = {pk for pk, requested, results in counts if requested > 0 and requested == results}
+        return {sample.pk for sample in samples} - complete
+
+    @classmethod
+    def allocate_report_numbers(cls, samples) -> None:
+        """Give every sample without a report number the next one, as one consecutive block."""
+        missing = [sample for sample in samples if not sample.report_number]
+        if not missing:
+            return
+        for sample, number in zip(missing, NumberSequence.next_numbers('report', len(missing))):
+            sample.report_number = number
+
+    @classmethod
+    def bulk_update_status(cls, samples, new_status, user=None, *, request=None, skip_incomplete=False) -> list:
+        """Move many samples to ``new_status`` with one UPDATE and one audit insert.
+
+        Applies the same rules and date changes as ``update_status``. Result
+        completeness is checked with one query for the whole batch. With
+        ``skip_incomplete`` the incomplete samples are left where they are
+        instead of failing the batch. Returns the samples that moved.
+        """
+        from django.core.exceptions import ValidationError
+
+        samples = list(samples)
+        if not samples:
+            return []
+        blocked = [str(sample) for sample in samples if not sample.can_transition_to(new_status)]
+        if blocked:
+            raise ValidationError(f"Cannot move {', '.join(blocked)} to {new_status}.")
+        if new_status in ('RESULTS_ENTERED', 'REVIEW_PENDING'):
+            incomplete = cls.incomplete_sample_ids(samples)
+            if incomplete and not skip_incomplete:
+                names = ', '.join(str(sample) for sample in samples if sample.pk in incomplete)
+                raise ValidationError(f"Missing test results for {names}.")
+            samples = [sample for sample in samples if sample.pk not in incomplete]
+            if not samples:
+                return []
+
+        today = timezone.now().date()
+        with transaction.atomic():
+            old_values = {}
+            numbered = []
+            for sample in samples:
+                old_values[sample.pk] = sample._status_audit_values()
+                sample._apply_status(new_status, today)
+            if new_status in cls.REPORT_NUMBER_STATUSES:
+                numbered = [sample for sample in samples if not sample.report_number]
+                cls.allocate_report_numbers(numbered)
+            cls.objects.bulk_update(samples, list(cls.STATUS_AUDIT_FIELDS))
+            if numbered:
+                from core.services.search_index import index_samples
+                index_samples(numbered)
+
+            if user:
+                from .models import AuditTrail
+                AuditTrail.log_changes([
+                    AuditTrail.build_entry(
+                        user,
+                        'UPDATE',
+                        sample,
+                        old_values=old_values[sample.pk],
+                        new_values=sample._status_audit_values(),
+                        request=request,
+                    )
+                    for sample in samples
+                ])
+        return samples
     
     def has_all_test_results(self):
         """Check if all requested tests have results"""
@@ -903,7 +1035,13 @@ class Sample(models.Model):
                     'last_reopened_by': self.last_reopened_by_id,
                 },
             )
-    
+
+            # Stored report PDFs belong to the superseded revision; drop them once
+            # the reopen is durable so a rolled-back reopen keeps serving them.
+            from core.services.report_artifacts import delete_report_artifacts
+            sample_pk = self.pk
+            transaction.on_commit(lambda: delete_report_artifacts(sample_pk))
+
     @property
     def is_completed(self):
         """Check if sample processing is completed"""
@@ -957,12 +1095,30 @@ class TestParameter(models.Model):
     )
 
 
+    LIMIT_FIELDS = ('name', 'min_permissible_limit', 'max_permissible_limit', 'max_limit_display')
+
     def __str__(self):
         return f"{self.name} ({self.unit})"
 
     class Meta:
         ordering = ['display_order', 'name']
 
+    def save(self, *args, **kwargs):
+        previous = None
+        if not self._state.adding:
+            previous = type(self).objects.filter(pk=self.pk).values(*self.LIMIT_FIELDS).first()
+        super().save(*args, **kwargs)
+        self.limit_reevaluation_job = None
+        if previous and any(previous[field] != getattr(self, field) for field in self.LIMIT_FIELDS):
+            # Stored result statuses were evaluated against the old limits; re-classify
+            # them once the new limits are committed (background job when large).
+            from core.services.limit_reevaluation import schedule_reevaluation
+
+            def _reevaluate(parameter=self):
+                parameter.limit_reevaluation_job = schedule_reevaluation([parameter.pk])
+
+            transaction.on_commit(_reevaluate)
+
     def clean(self):
         from django.core.exceptions import ValidationError
         # Ensure numeric limits are consistent when both are provided
@@ -1047,39 +1203,9 @@ class Invoice(models.Model):
         return self.invoice_number or f"Invoice for {self.sample}"
 
     def generate_invoice_number(self) -> str:
-        if self.invoice_number:
-            return self.invoice_number
-
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            current_year = timezone.now().year
-            prefix = f"INV{current_year}-"
-
-            with transaction.atomic():
-                last_with_number = (
-                    Invoice.objects.exclude(invoice_number__isnull=True)
-                    .exclude(invoice_number__exact='')
-                    .filter(invoice_number__startswith=prefix)
-                    .select_for_update()
-                    .order_by('invoice_number')
-                    .last()
-                )
-
-                sequence = 1
-                if last_with_number and last_with_number.invoice_number:
-                    try:
-                        sequence = int(last_with_number.invoice_number.split('-')[-1]) + 1
-                    except (ValueError, IndexError):
-                        sequence = 1
-
-                candidate = f"{prefix}{sequence:04d}"
-                if not Invoice.objects.filter(invoice_number=candidate).exists():
-                    self.invoice_number = candidate
-                    return candidate
-
-            if attempt == max_attempts - 1:
-                self.invoice_number = candidate
-                return candidate
+        if not self.invoice_number:
+            self.invoice_number = NumberSequence.next_number('invoice')
+        return self.invoice_number
 
     def _pricing_config(self) -> dict[str, Decimal]:
         settings_data = getattr(settings, 'WATERLAB_SETTINGS', {})
@@ -1264,7 +1390,34 @@ class ResultStatusOverride(models.Model):
 
     def save(self, *args, **kwargs):
         self.normalized_value = normalize_text_value(self.text_value)
+        previous = None
+        if not self._state.adding:
+            previous = type(self).objects.filter(pk=self.pk).values_list('parameter_id', 'normalized_value').first()
         super().save(*args, **kwargs)
+        self._invalidate_index()
+        self._refresh_results(self.parameter_id, self.normalized_value)
+        if previous and previous != (self.parameter_id, self.normalized_value):
+            self._refresh_results(*previous)
+
+    def delete(self, *args, **kwargs):
+        scope = (self.parameter_id, self.normalized_value)
+        result = super().delete(*args, **kwargs)
+        self._invalidate_index()
+        self._refresh_results(*scope)
+        return result
+
+    @staticmethod
+    def _invalidate_index():
+        # Drop the compiled index now and again once the change is durable, so a
+        # lookup made inside the transaction cannot pin the pre-commit rows.
+        from core.services.result_overrides import invalidate_status_override_index
+        invalidate_status_override_index()
+        transaction.on_commit(invalidate_status_override_index)
+
+    @staticmethod
+    def _refresh_results(parameter_id, normalized_value):
+        from core.services.limit_status import refresh_for_override
+        refresh_for_override(parameter_id, normalized_value)
 
     @classmethod
     def get_override(cls, parameter_id, normalized_value):
@@ -1304,6 +1457,9 @@ class TestResult(models.Model):
     observation = models.TextField(blank=True, null=True)
     test_date = models.DateTimeField(auto_now_add=True) # Or DateField if time is not critical
     technician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='test_results_entered')
+    # Maintained by save() (see core/services/limit_status.py) so exceedances can be queried in SQL.
+    numeric_value = models.DecimalField(max_digits=18, decimal_places=6, null=True, blank=True, editable=False)
+    limit_status = models.CharField(max_length=32, choices=RESULT_STATUS_CHOICES, blank=True, default='', editable=False)
 
     class Meta:
         unique_together = ('sample', 'parameter') # Ensure one result per parameter per sample
@@ -1312,6 +1468,8 @@ class TestResult(models.Model):
             models.Index(fields=["technician"], name="testresult_tech_idx"),
             models.Index(fields=["test_date", "technician"], name="testresult_date_tech_idx"),
             models.Index(fields=["sample", "test_date"], name="testresult_sample_date_idx"),
+            models.Index(fields=["limit_status", "test_date"], name="testresult_status_date_idx"),
+            models.Index(fields=["parameter", "numeric_value"], name="testresult_param_value_idx"),
         ]
 
     def __str__(self):
@@ -1320,80 +1478,24 @@ class TestResult(models.Model):
     STATUS_CHOICES = RESULT_STATUS_CHOICES
     VALID_LIMIT_STATUSES = VALID_RESULT_STATUSES
 
-    @classmethod
-    def _validated_limit_status(cls, status):
-        if not status:
-            return None
-        normalized_status = status.strip().upper()
-        if normalized_status in VALID_RESULT_STATUSES:
-            return normalized_status
-        logger.warning("Ignored invalid limit status override '%s'.", status)
-        return None
-
-    def _resolve_text_status_override(self):
-        """Return configured status override for textual results."""
-        result_key = normalize_text_value(self.result_value)
-        if not result_key:
-            return None
-
-        db_status = ResultStatusOverride.get_override(self.parameter_id, result_key)
-        if db_status:
-            return self._validated_limit_status(db_status)
-
-        overrides_config = getattr(settings, 'WATERLAB_SETTINGS', {}).get('TEXT_RESULT_STATUS_OVERRIDES')
-        if not overrides_config:
-            return None
-
-        def _find_override(mapping):
-            if not isinstance(mapping, dict):
-                return None
-            for raw_value, status in mapping.items():
-                if isinstance(status, str) and normalize_text_value(raw_value) == result_key:
-                    return self._validated_limit_status(status)
-            return None
-
-        if isinstance(overrides_config, dict):
-            parameter_name = normalize_text_value(getattr(self.parameter, 'name', None))
-
-            parameter_section = overrides_config.get('parameters')
-            if parameter_section and parameter_name:
-                if isinstance(parameter_section, dict):
-                    for raw_param, mapping in parameter_section.items():
-                        if normalize_text_value(raw_param) == parameter_name:
-                            override = _find_override(mapping)
-                            if override:
-                                return override
-
-            if parameter_name:
-                for raw_param, mapping in overrides_config.items():
-                    if raw_param in ('parameters', 'global', 'default', '*'):
-                        continue
-                    if isinstance(mapping, dict) and normalize_text_value(raw_param) == parameter_name:
-                        override = _find_override(mapping)
-                        if override:
-                            return override
-
-            for fallback_key in ('global', 'default', '*'):
-                override = _find_override(overrides_config.get(fallback_key))
-                if override:
-                    return override
-
-            override = _find_override(overrides_config)
-            if override:
-                return override
-
-        return None
-
     def _numeric_result_value(self):
         """Return Decimal value for numeric results, else None."""
-        raw = (self.result_value or '').strip()
-        if not raw:
-            return None
-        normalized = raw.lstrip('<>').replace(',', '').strip()
-        try:
-            return Decimal(normalized)
-        except (InvalidOperation, ValueError):
-            return None
+        from core.services.limit_status import parse_numeric_result
+        return parse_numeric_result(self.result_value)
+
+    def refresh_limit_fields(self):
+        """Recompute the stored ``numeric_value`` and ``limit_status`` from the current value."""
+        from core.services.limit_status import evaluate_limit_status, storable_numeric_value
+        parameter = self.parameter if self.parameter_id else None
+        numeric_value, self.limit_status = evaluate_limit_status(self.result_value, parameter)
+        self.numeric_value = storable_numeric_value(numeric_value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_limit_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'numeric_value', 'limit_status'}
+        super().save(*args, **kwargs)
     
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -1419,59 +1521,25 @@ class TestResult(models.Model):
     
     def is_within_limits(self):
         """Check if result is within permissible limits"""
-        if self.parameter_id is None: # Check FK ID directly
+        status = self.get_limit_status()
+        if status == 'UNKNOWN':
             return None
+        return status in {'WITHIN_LIMITS', 'NON_NUMERIC'}
 
-        override_status = self._resolve_text_status_override()
-        if override_status:
-            if override_status == 'UNKNOWN':
-                return None
-            return override_status in {'WITHIN_LIMITS', 'NON_NUMERIC'}
-            
-        if getattr(self.parameter, 'has_qualitative_max_limit', False):
-            return True
-
-        numeric_value = self._numeric_result_value()
-        if numeric_value is None:
-            return True
-
-        within_min = (
-            self.parameter.min_permissible_limit is None
-            or numeric_value >= self.parameter.min_permissible_limit
-        )
-        within_max = (
-            self.parameter.max_permissible_limit is None
-            or numeric_value <= self.parameter.max_permissible_limit
-        )
-        return within_min and within_max
-    
     def get_limit_status(self):
-        """Get status of result relative to limits"""
+        """Get status of result relative to limits (the stored column once saved)."""
         if self.parameter_id is None: # Check FK ID directly
             return "UNKNOWN"
+        if self.limit_status:
+            return self.limit_status
+        return self.compute_limit_status()
 
-        override_status = self._resolve_text_status_override()
-        if override_status:
-            return override_status
-            
-        if getattr(self.parameter, 'has_qualitative_max_limit', False):
-            return "NON_NUMERIC"
-
-        numeric_value = self._numeric_result_value()
-        if numeric_value is None:
-            return "NON_NUMERIC"
-
-        if (
-            self.parameter.min_permissible_limit is not None
-            and numeric_value < self.parameter.min_permissible_limit
-        ):
-            return "BELOW_LIMIT"
-        if (
-            self.parameter.max_permissible_limit is not None
-            and numeric_value > self.parameter.max_permissible_limit
-        ):
-            return "ABOVE_LIMIT"
-        return "WITHIN_LIMITS"
+    def compute_limit_status(self):
+        """Evaluate the current value against the parameter limits, ignoring the stored column."""
+        if self.parameter_id is None:
+            return "UNKNOWN"
+        from core.services.limit_status import evaluate_limit_status
+        return evaluate_limit_status(self.result_value, self.parameter)[1]
 
 class ConsultantReview(models.Model):
     REVIEW_STATUS_CHOICES = [
@@ -1540,6 +1608,9 @@ class ConsultantReview(models.Model):
                     target_sample_status,
                 )
 
+AuditPayload = namedtuple('AuditPayload', ['old_values', 'new_values', 'changes'])
+
+
 class AuditTrail(models.Model):
     ACTION_CHOICES = [
         ('CREATE', 'Created'),
@@ -1570,74 +1641,155 @@ class AuditTrail(models.Model):
             models.Index(fields=['model_name', 'object_id']),
             models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['action', 'timestamp']),
+            # Keyset pagination in the audit viewer (see views_audit.py).
+            models.Index(fields=['-timestamp', '-audit_id'], name='audit_keyset_idx'),
+            models.Index(fields=['model_name', '-timestamp'], name='audit_model_time_idx'),
+            # Prefix lookups (LIKE 'abc%') need pattern ops on PostgreSQL; ignored elsewhere.
+            models.Index(fields=['object_id'], name='audit_object_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['object_repr'], name='audit_repr_prefix_idx', opclasses=['varchar_pattern_ops']),
         ]
     
     def __str__(self):
         return f"{self.get_action_display()} {self.model_name} by {self.user.username if self.user else 'System'} at {self.timestamp}"
     
-    @classmethod
-    def log_change(cls, user, action, instance, old_values=None, new_values=None, request=None):
-        """
-        Helper method to log changes
-        """
+    @staticmethod
+    def _to_json_safe(value):
         from decimal import Decimal
         from uuid import UUID
         from datetime import date, datetime, time
         from django.db.models import Model, QuerySet
 
-        def _to_json_safe(value):
-            if value is None or isinstance(value, (str, int, float, bool)):
-                return value
-            if isinstance(value, Decimal):
-                try:
-                    return float(value)
-                except Exception:
-                    return str(value)
-            if isinstance(value, (datetime, date, time)):
-                return value.isoformat()
-            if isinstance(value, UUID):
-                return str(value)
-            if isinstance(value, dict):
-                return {str(k): _to_json_safe(v) for k, v in value.items()}
-            if isinstance(value, (list, tuple, set)):
-                return [_to_json_safe(v) for v in value]
-            if isinstance(value, QuerySet):
-                return [_to_json_safe(v) for v in list(value)]
-            if isinstance(value, Model):
-                # Prefer primary key string if available
-                try:
-                    return str(value.pk) if getattr(value, 'pk', None) is not None else str(value)
-                except Exception:
-                    return str(value)
-            # Fallback: best-effort string conversion
+        to_json_safe = AuditTrail._to_json_safe
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if isinstance(value, Decimal):
             try:
+                return float(value)
+            except Exception:
                 return str(value)
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        if isinstance(value, dict):
+            return {str(k): to_json_safe(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return [to_json_safe(v) for v in value]
+        if isinstance(value, QuerySet):
+            return [to_json_safe(v) for v in list(value)]
+        if isinstance(value, Model):
+            # Prefer primary key string if available
+            try:
+                return str(value.pk) if getattr(value, 'pk', None) is not None else str(value)
             except Exception:
-                return None
+                return str(value)
+        # Fallback: best-effort string conversion
+        try:
+            return str(value)
+        except Exception:
+            return None
 
-        changes = {}
+    @classmethod
+    def compact_changes(cls, old_values, new_values):
+        """The diff stored in compact mode: ``{field: {'old': ..., 'new': ...}}``.
+
+        Only changed fields are kept. When only one side was logged (a create
+        or a delete), each field keeps just that key.
+        """
+        old_values = cls._to_json_safe(old_values or {})
+        new_values = cls._to_json_safe(new_values or {})
         if old_values and new_values:
-            for field, new_value in new_values.items():
-                old_value = old_values.get(field)
-                if old_value != new_value:
-                    changes[field] = {
-                        'old': _to_json_safe(old_value),
-                        'new': _to_json_safe(new_value)
-                    }
-        
-        audit_log = cls.objects.create(
+            return {
+                field: {'old': old_values.get(field), 'new': new_value}
+                for field, new_value in new_values.items()
+                if old_values.get(field) != new_value
+            }
+        if new_values:
+            return {field: {'new': value} for field, value in new_values.items()}
+        return {field: {'old': value} for field, value in old_values.items()}
+
+    @classmethod
+    def build_entry(cls, user, action, instance, old_values=None, new_values=None, request=None):
+        """Return an unsaved audit row; see ``log_change`` and ``log_changes``.
+
+        With ``AUDIT_PAYLOAD_MODE = 'compact'`` (the default) only the diff is
+        stored; ``payload`` rebuilds the full view for readers.
+        """
+        if getattr(settings, 'AUDIT_PAYLOAD_MODE', 'compact') == 'compact':
+            changes = cls.compact_changes(old_values, new_values)
+            stored_old, stored_new = {}, {}
+        else:
+            changes = {}
+            if old_values and new_values:
+                for field, new_value in new_values.items():
+                    old_value = old_values.get(field)
+                    if old_value != new_value:
+                        changes[field] = {
+                            'old': cls._to_json_safe(old_value),
+                            'new': cls._to_json_safe(new_value)
+                        }
+            stored_old = cls._to_json_safe(old_values or {})
+            stored_new = cls._to_json_safe(new_values or {})
+
+        return cls(
             user=user,
             action=action,
             model_name=instance.__class__.__name__,
             object_id=str(instance.pk),
-            object_repr=str(instance),
+            object_repr=str(instance)[:200],
             changes=changes,
-            old_values=_to_json_safe(old_values or {}),
-            new_values=_to_json_safe(new_values or {}),
+            old_values=stored_old,
+            new_values=stored_new,
             ip_address=cls._get_client_ip(request) if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT', '') if request else ''
         )
+
+    @cached_property
+    def payload(self):
+        """``AuditPayload(old_values, new_values, changes)`` for compact and full rows alike.
+
+        ``changes`` keeps only fields with both sides, as full rows always did.
+        For compact updates, the old and new values cover the changed fields only.
+        """
+        old_values = dict(self.old_values or {})
+        new_values = dict(self.new_values or {})
+        changes = {}
+        for field, change in (self.changes or {}).items():
+            if not isinstance(change, dict):
+                continue
+            if 'old' in change:
+                old_values.setdefault(field, change['old'])
+            if 'new' in change:
+                new_values.setdefault(field, change['new'])
+            if 'old' in change and 'new' in change:
+                changes[field] = change
+        return AuditPayload(old_values, new_values, changes)
+
+    @classmethod
+    def log_change(cls, user, action, instance, old_values=None, new_values=None, request=None):
+        """
+        Helper method to log changes
+        """
+        from core.services.audit_buffer import buffer_entries, is_buffering
+
+        audit_log = cls.build_entry(user, action, instance, old_values, new_values, request)
+        if is_buffering():
+            # Written with the rest of the request once its transaction commits.
+            buffer_entries([audit_log])
+        else:
+            audit_log.save(force_insert=True)
         return audit_log
+
+    @classmethod
+    def log_changes(cls, entries):
+        """Insert many ``build_entry`` rows in one statement (or queue them; see ``log_change``)."""
+        from core.services.audit_buffer import buffer_entries, is_buffering
+
+        entries = list(entries)
+        if is_buffering():
+            buffer_entries(entries)
+            return entries
+        return cls.objects.bulk_create(entries)
     
     @staticmethod
     def _get_client_ip(request):
@@ -1649,4 +1801,149 @@ class AuditTrail(models.Model):
             ip = request.META.get('REMOTE_ADDR')
         return ip
 
+
+class AuditArchiveSegment(models.Model):
+    """One month of audit rows moved out of the hot table by ``manage.py archive_audit``."""
+
+    KIND_CHOICES = [
+        ('partition', 'PostgreSQL partition'),
+        ('file', 'Compressed JSONL file'),
+    ]
+
+    segment_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Partition table name, or file path relative to AUDIT_ARCHIVE_DIR.
+    location = models.CharField(max_length=255)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    row_count = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-period_start']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.period_start:%Y-%m} ({self.row_count} rows)"
+
+
+class NumberSequence(models.Model):
+    """Counter row per (sequence, year) behind display_id, report_number and invoice_number.
+
+    The next number used to come from the highest existing value, found by
+    locking and string-sorting the rows with that prefix. That sorts
+    ``WL2025-10000`` before ``WL2025-9999``, and it serialised every
+    registration on a scan. ``reserve`` increments one counter row instead.
+    The UPDATE holds that row's lock until the caller's transaction ends, so
+    numbers are never handed out twice, and a rolled-back caller gives its
+    numbers back. The counter is seeded from the values already issued the
+    first time a year is used.
+    """
+
+    # name -> (prefix, model name, field)
+    FORMATS = {
+        'sample': ('WL', 'Sample', 'display_id'),
+        'report': ('RPT', 'Sample', 'report_number'),
+        'invoice': ('INV', 'Invoice', 'invoice_number'),
+    }
+
+    name = models.CharField(max_length=20)
+    year = models.PositiveIntegerField()
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'year'], name='unique_number_sequence_year'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.year}: {self.last_value}"
+
+    @classmethod
+    def prefix(cls, name: str, year: int) -> str:
+        return f"{cls.FORMATS[name][0]}{year}-"
+
+    @classmethod
+    def issued_max(cls, name: str, year: int) -> int:
+        """Highest number already issued for ``name`` in ``year``, compared numerically."""
+        from django.db.models.functions import Length
+
+        if name not in cls.FORMATS:
+            return 0
+        _, model_name, field = cls.FORMATS[name]
+        prefix = cls.prefix(name, year)
+        values = (
+            cls._meta.apps.get_model(cls._meta.app_label, model_name).objects
+            .filter(**{f'{field}__startswith': prefix})
+            .order_by(Length(field).desc(), f'-{field}')
+            .values_list(field, flat=True)
+        )
+        for value in values.iterator():
+            try:
+                return int(value[len(prefix):])
+            except ValueError:
+                continue
+        return 0
+
+    @classmethod
+    def reserve(cls, name: str, count: int = 1, *, year: int | None = None) -> range:
+        """Claim ``count`` consecutive numbers of ``name`` for ``year`` (default: this year)."""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        year = year or timezone.now().year
+        counter = cls.objects.filter(name=name, year=year)
+        with transaction.atomic():
+            if not counter.update(last_value=models.F('last_value') + count):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(name=name, year=year, last_value=cls.issued_max(name, year))
+                except IntegrityError:
+                    pass  # Created by a concurrent caller; its row is used below.
+                counter.update(last_value=models.F('last_value') + count)
+            last = counter.values_list('last_value', flat=True).get()
+        return range(last - count + 1, last + 1)
+
+    @classmethod
+    def format(cls, name: str, value: int, year: int) -> str:
+        return f"{cls.prefix(name, year)}{value:04d}"
+
+    @classmethod
+    def next_numbers(cls, name: str, count: int = 1) -> list:
+        """``count`` formatted numbers, e.g. ``['WL2025-0042', 'WL2025-0043']``."""
+        year = timezone.now().year
+        return [cls.format(name, value, year) for value in cls.reserve(name, count, year=year)]
+
+    @classmethod
+    def next_number(cls, name: str) -> str:
+        return cls.next_numbers(name)[0]
+
+
+class SearchEntry(models.Model):
+    """Lower-cased search text for one customer or sample.
+
+    Customer and sample searches match this single column instead of OR-ing
+    ``icontains`` over a dozen columns of two tables. On PostgreSQL it carries
+    full-text and trigram GIN indexes; on SQLite an FTS5 table mirrors it.
+    See ``core.services.search_index``.
+    """
+
+    KIND_CHOICES = [
+        ('customer', 'Customer'),
+        ('sample', 'Sample'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    document = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_entry'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
 # Create your models here.
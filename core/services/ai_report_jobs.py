@@ -86,7 +86,7 @@ def _cleanup_old_jobs() -> None:
         pass
 
 
-def _run_job(job_id: str, sample_pk: str) -> None:
+def _run_job(job_id: str, sample_pk: str, lease=None) -> None:
     from core.models import Sample
     from core.services.ai_remarks import generate_ai_review_draft
 
@@ -112,10 +112,15 @@ def _run_job(job_id: str, sample_pk: str) -> None:
     finally:
         # The thread opened its own DB connection; release it.
         connections.close_all()
+        if lease is not None:
+            lease.release()
 
 
-def start_ai_job(sample) -> str:
-    """Start background AI draft generation and return the job id."""
+def start_ai_job(sample, *, lease=None) -> str:
+    """Start background AI draft generation and return the job id.
+
+    ``lease`` is an ``acquire_slot('ai')`` lease; it is held until the model call finishes.
+    """
     _cleanup_old_jobs()
     job_id = uuid.uuid4().hex
     _write_job(job_id, {
@@ -125,7 +130,7 @@ def start_ai_job(sample) -> str:
     })
     thread = threading.Thread(
         target=_run_job,
-        args=(job_id, str(sample.pk)),
+        args=(job_id, str(sample.pk), lease),
         name=f'ai-report-{job_id[:8]}',
         daemon=True,
     )
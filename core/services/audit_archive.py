@@ -0,0 +1,283 @@
+"""Archival of old ``AuditTrail`` rows out of the hot table.
+
+Every change in the lab adds audit rows, and nothing removed them. The viewer,
+the admin and every filter scan therefore kept getting slower. ``archive_audit``
+(and ``manage.py archive_audit``) keeps the last ``AUDIT_HOT_DAYS`` days in
+``core_audittrail`` and moves older rows out one calendar month at a time:
+
+* On PostgreSQL the month goes into a range partition of
+  ``core_audittrail_archive`` (``PARTITION BY RANGE (timestamp)``), in one
+  ``INSERT ... SELECT`` and ``DELETE`` transaction. Archived rows stay queryable
+  in SQL, and an old month can be detached or dropped without touching the hot
+  table. ``AuditTrail`` itself is not partitioned: PostgreSQL partitions need the
+  partition key in the primary key, and Django cannot migrate an existing
+  table to a composite key.
+* Elsewhere (SQLite, or ``AUDIT_ARCHIVE_BACKEND = 'file'``) the month is written
+  as gzip-compressed JSON lines under ``AUDIT_ARCHIVE_DIR``. The file is moved
+  into place atomically. Its rows are deleted only if the hot table still holds
+  exactly the rows that were written.
+
+Each archived month is recorded as an ``AuditArchiveSegment``;
+``read_archive_segment`` reads any segment back.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import AuditArchiveSegment, AuditTrail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOT_DAYS = 365
+DEFAULT_BATCH_SIZE = 5000
+_DELETE_BATCH_SIZE = 500
+PARTITION_PARENT = 'core_audittrail_archive'
+ARCHIVE_FIELDS = (
+    'audit_id', 'timestamp', 'user_id', 'user__username', 'action', 'model_name', 'object_id',
+    'object_repr', 'changes', 'old_values', 'new_values', 'ip_address', 'user_agent',
+)
+_TABLE_COLUMNS = (
+    'audit_id', 'user_id', 'action', 'model_name', 'object_id', 'object_repr',
+    'changes', 'old_values', 'new_values', 'timestamp', 'ip_address', 'user_agent',
+)
+
+
+class AuditArchiveError(Exception):
+    """A month could not be archived safely; the hot table was left untouched."""
+
+
+@dataclass
+class ArchiveResult:
+    rows: int = 0
+    segments: list = field(default_factory=list)
+
+
+def archive_dir() -> Path:
+    configured = getattr(settings, 'AUDIT_ARCHIVE_DIR', None)
+    return Path(configured) if configured else Path(settings.BASE_DIR) / 'audit_archive'
+
+
+def default_cutoff() -> datetime:
+    try:
+        days = max(1, int(getattr(settings, 'AUDIT_HOT_DAYS', DEFAULT_HOT_DAYS)))
+    except (TypeError, ValueError):
+        days = DEFAULT_HOT_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def use_partitions() -> bool:
+    backend = str(getattr(settings, 'AUDIT_ARCHIVE_BACKEND', 'auto') or 'auto').lower()
+    if backend == 'file':
+        return False
+    return connection.vendor == 'postgresql'
+
+
+def _month_bounds(moment: datetime) -> tuple[datetime, datetime]:
+    local = timezone.localtime(moment)
+    start = local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    following = (start + timedelta(days=32)).replace(day=1)
+    # Re-localise so DST changes inside the month do not shift the boundary.
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(start.replace(tzinfo=None), tz),
+        timezone.make_aware(following.replace(tzinfo=None), tz),
+    )
+
+
+def archive_audit(cutoff: datetime | None = None, *, batch_size: int | None = None, dry_run: bool = False, on_segment=None) -> ArchiveResult:
+    """Move audit rows older than ``cutoff`` out of the hot table, one month at a time.
+
+    Only whole months that end on or before ``cutoff`` are archived, so a
+    month is never split across two segments. With ``dry_run`` nothing is
+    written; the result counts what would move.
+    """
+    cutoff = cutoff or default_cutoff()
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    result = ArchiveResult()
+
+    # Months are visited in order; stop at the first one that is not complete yet.
+    last_end = None
+    while True:
+        queryset = AuditTrail.objects.all()
+        if last_end is not None:
+            queryset = queryset.filter(timestamp__gte=last_end)
+        oldest = queryset.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if oldest is None:
+            break
+        start, end = _month_bounds(oldest)
+        if end > cutoff:
+            break
+        last_end = end
+
+        if dry_run:
+            rows = AuditTrail.objects.filter(timestamp__gte=start, timestamp__lt=end).count()
+            result.rows += rows
+            result.segments.append(AuditArchiveSegment(
+                kind='partition' if use_partitions() else 'file',
+                period_start=start,
+                period_end=end,
+                row_count=rows,
+            ))
+            continue
+
+        if use_partitions():
+            segment = _archive_to_partition(start, end)
+        else:
+            segment = _archive_to_file(start, end, batch_size)
+        result.rows += segment.row_count
+        result.segments.append(segment)
+        if on_segment is not None:
+            on_segment(segment)
+    return result
+
+
+# --- file segments ----------------------------------------------------------
+
+
+def _range_rows(start: datetime, end: datetime, batch_size: int):
+    """Yield the month's rows as dicts, keyset-paginated on (timestamp, audit_id)."""
+    queryset = AuditTrail.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by('timestamp', 'audit_id')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(timestamp__gt=last[0]) | Q(timestamp=last[0], audit_id__gt=last[1]))
+        rows = list(chunk.values(*ARCHIVE_FIELDS)[:batch_size])
+        if not rows:
+            return
+        last = (rows[-1]['timestamp'], rows[-1]['audit_id'])
+        yield from rows
+
+
+def _archive_to_file(start: datetime, end: datetime, batch_size: int) -> AuditArchiveSegment:
+    directory = archive_dir() / f'{start:%Y}'
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f'audit-{start:%Y-%m}-{uuid.uuid4().hex[:8]}.jsonl.gz'
+    final_path = directory / name
+    tmp_path = directory / f'.{name}.tmp'
+
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as compressed:
+                for row in _range_rows(start, end, batch_size):
+                    row['username'] = row.pop('user__username')
+                    line = json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+                    compressed.write(line.encode('utf-8'))
+                    written += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+        digest = hashlib.sha256()
+        with open(tmp_path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+        os.replace(tmp_path, final_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    range_rows = AuditTrail.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    try:
+        with transaction.atomic():
+            if range_rows.count() != written:
+                raise AuditArchiveError(
+                    f"Audit rows for {start:%Y-%m} changed while archiving; nothing was deleted."
+                )
+            segment = AuditArchiveSegment.objects.create(
+                kind='file',
+                location=str(final_path.relative_to(archive_dir())),
+                period_start=start,
+                period_end=end,
+                row_count=written,
+                sha256=digest.hexdigest(),
+            )
+            while True:
+                pks = list(range_rows.values_list('pk', flat=True)[:_DELETE_BATCH_SIZE])
+                if not pks:
+                    break
+                AuditTrail.objects.filter(pk__in=pks).delete()
+    except Exception:
+        final_path.unlink(missing_ok=True)
+        raise
+    logger.info("Archived %s audit rows for %s to %s", written, f'{start:%Y-%m}', final_path)
+    return segment
+
+
+# --- PostgreSQL partitions --------------------------------------------------
+
+
+def _partition_name(start: datetime) -> str:
+    return f'{PARTITION_PARENT}_y{start:%Y}m{start:%m}'
+
+
+def _ensure_partition(cursor, start: datetime, end: datetime) -> str:
+    source = AuditTrail._meta.db_table
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {PARTITION_PARENT} '
+        f'(LIKE {source} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")'
+    )
+    name = _partition_name(start)
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARTITION_PARENT} FOR VALUES FROM (%s) TO (%s)',
+        [start, end],
+    )
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {name}_object_idx ON {name} (model_name, object_id)')
+    return name
+
+
+def _archive_to_partition(start: datetime, end: datetime) -> AuditArchiveSegment:
+    source = AuditTrail._meta.db_table
+    columns = ', '.join(f'"{column}"' for column in _TABLE_COLUMNS)
+    with transaction.atomic(), connection.cursor() as cursor:
+        name = _ensure_partition(cursor, start, end)
+        cursor.execute(
+            f'INSERT INTO {PARTITION_PARENT} ({columns}) '
+            f'SELECT {columns} FROM {source} WHERE "timestamp" >= %s AND "timestamp" < %s',
+            [start, end],
+        )
+        moved = cursor.rowcount
+        cursor.execute(f'DELETE FROM {source} WHERE "timestamp" >= %s AND "timestamp" < %s', [start, end])
+        if cursor.rowcount != moved:
+            raise AuditArchiveError(f"Audit rows for {start:%Y-%m} changed while archiving; rolled back.")
+        segment, _ = AuditArchiveSegment.objects.update_or_create(
+            kind='partition',
+            location=name,
+            defaults={'period_start': start, 'period_end': end},
+        )
+        # Re-running after new backdated rows adds to the same partition.
+        segment.row_count += moved
+        segment.save(update_fields=['row_count'])
+    logger.info("Archived %s audit rows for %s into %s", moved, f'{start:%Y-%m}', name)
+    return segment
+
+
+# --- reading ----------------------------------------------------------------
+
+
+def read_archive_segment(segment: AuditArchiveSegment):
+    """Yield the archived rows of ``segment`` as dicts (newest last)."""
+    if segment.kind == 'partition':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {", ".join(_TABLE_COLUMNS)} FROM {segment.location} ORDER BY "timestamp", audit_id'
+            )
+            for row in cursor:
+                yield dict(zip(_TABLE_COLUMNS, row))
+        return
+    with gzip.open(archive_dir() / segment.location, 'rt', encoding='utf-8') as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
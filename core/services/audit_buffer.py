@@ -0,0 +1,237 @@
+"""Request-scoped buffering of ``AuditTrail`` writes.
+
+``AuditTrail.log_change`` used to run one INSERT, with JSON serialisation,
+for every change. It is called in loops: from result entry, Hridhyam
+submissions, status updates and ``AuditMixin``. ``AuditBufferMiddleware`` now
+opens a buffer for each request. Inside it, ``log_change``/``log_changes`` queue
+their rows and the whole request is written with one ``bulk_create``.
+
+Audit rows must follow the data they describe. A row logged inside a
+transaction is queued with ``transaction.on_commit``. It is kept only if that
+transaction commits, and Django drops it when the transaction or savepoint
+rolls back. Rows logged outside a transaction describe changes that are already
+committed, so they are queued straight away. The buffer is flushed when the
+request ends, including when the view raised.
+
+A buffer opened inside an existing transaction (a test case, or a caller's own
+``atomic`` block) treats that transaction as the commit boundary. At scope end
+the surviving rows are taken back from the pending commit hooks and written
+inside it, so they still share its fate.
+
+``AUDIT_BUFFER_MODE``:
+
+* ``request`` (default): flush synchronously at the end of the request.
+* ``background``: hand committed rows to a daemon thread. It batches them across
+  requests (``AUDIT_BACKGROUND_BATCH_SIZE`` rows or
+  ``AUDIT_BACKGROUND_FLUSH_SECONDS``). This takes the insert off the response
+  path. Rows still queued when the process is killed are lost, so this mode
+  trades durability for latency. A normal exit drains the queue.
+* ``off``: write every row immediately, as before.
+
+Outside a request (shell, management commands, threads) rows are written
+immediately.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from core.models import AuditTrail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING = 500
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_SECONDS = 2.0
+_WRITE_BATCH_SIZE = 500
+
+_state = threading.local()
+
+
+def _mode() -> str:
+    return str(getattr(settings, 'AUDIT_BUFFER_MODE', 'request') or 'request').lower()
+
+
+def _setting_number(name: str, default, cast=int):
+    try:
+        return max(cast(0), cast(getattr(settings, name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_buffering() -> bool:
+    return getattr(_state, 'depth', 0) > 0
+
+
+class _StagedEntries:
+    """Commit hook that moves its rows into the buffer; recognisable at scope end."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __call__(self):
+        _stage(self.entries)
+
+
+def _write(entries) -> None:
+    AuditTrail.objects.bulk_create(entries, batch_size=_WRITE_BATCH_SIZE)
+
+
+def _stage(entries) -> None:
+    if not is_buffering():
+        # The transaction committed after the buffer closed (e.g. an outer
+        # transaction that spans the request); write now.
+        _write(entries)
+        return
+    _state.pending.extend(entries)
+    if len(_state.pending) >= _setting_number('AUDIT_BUFFER_MAX_PENDING', DEFAULT_MAX_PENDING):
+        flush()
+
+
+def buffer_entries(entries) -> None:
+    """Queue unsaved ``AuditTrail`` rows; they are written only if their transaction commits."""
+    entries = list(entries)
+    if not entries:
+        return
+    connection = transaction.get_connection()
+    if len(connection.atomic_blocks) > _state.base_depth:
+        transaction.on_commit(_StagedEntries(entries))
+    else:
+        _stage(entries)
+
+
+def _take_scope_hooks(connection) -> None:
+    """Run the buffer's commit hooks still waiting on an enclosing transaction."""
+    remaining = []
+    staged = []
+    for hook in connection.run_on_commit:
+        (staged if isinstance(hook[1], _StagedEntries) else remaining).append(hook)
+    connection.run_on_commit = remaining
+    for _, hook, _ in staged:
+        hook()
+
+
+def flush() -> int:
+    """Write (or hand off) the rows queued so far and return how many there were."""
+    pending = getattr(_state, 'pending', None) or []
+    _state.pending = []
+    if not pending:
+        return 0
+    in_transaction = transaction.get_connection().in_atomic_block
+    if _mode() == 'background' and not in_transaction:
+        _writer.submit(pending)
+        return len(pending)
+    try:
+        _write(pending)
+    except Exception:
+        logger.exception("Failed to write %s buffered audit entries", len(pending))
+        raise
+    return len(pending)
+
+
+@contextmanager
+def buffered_audit():
+    """Queue audit rows logged in this block and write them in one insert at the end."""
+    if _mode() == 'off':
+        yield
+        return
+    depth = getattr(_state, 'depth', 0)
+    if not depth:
+        _state.pending = []
+        _state.base_depth = len(transaction.get_connection().atomic_blocks)
+    _state.depth = depth + 1
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        if depth:
+            _state.depth = depth
+        else:
+            connection = transaction.get_connection()
+            try:
+                if connection.in_atomic_block and len(connection.atomic_blocks) == _state.base_depth:
+                    _take_scope_hooks(connection)
+                flush()
+            except Exception:
+                if not failed:
+                    raise
+                # Never mask the block's own exception with an audit write error.
+                logger.exception("Could not write buffered audit entries after the request failed")
+            finally:
+                _state.depth = 0
+                _state.pending = []
+
+
+# --- background mode ------------------------------------------------------
+
+
+class _BackgroundWriter:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, entries) -> None:
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self.thread.start()
+        self.queue.put(list(entries))
+
+    def _next_batch(self, batch_size: int, flush_seconds: float) -> list:
+        batch = list(self.queue.get())
+        self.queue.task_done()
+        deadline = time.monotonic() + flush_seconds
+        while len(batch) < batch_size:
+            try:
+                batch.extend(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                self.queue.task_done()
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch(
+                _setting_number('AUDIT_BACKGROUND_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+                _setting_number('AUDIT_BACKGROUND_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS, float),
+            )
+            try:
+                _write(batch)
+            except Exception:
+                logger.exception("Background audit writer dropped %s entries", len(batch))
+            finally:
+                connections.close_all()
+
+    def drain(self) -> int:
+        """Write everything still queued from the calling thread."""
+        batch = []
+        while True:
+            try:
+                batch.extend(self.queue.get_nowait())
+                self.queue.task_done()
+            except queue.Empty:
+                break
+        if batch:
+            _write(batch)
+        return len(batch)
+
+
+_writer = _BackgroundWriter()
+
+
+@atexit.register
+def _drain_on_exit() -> None:
+    try:
+        _writer.drain()
+    except Exception:
+        logger.exception("Could not write queued audit entries at exit")
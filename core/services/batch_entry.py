@@ -0,0 +1,138 @@
+"""Parameter-centric batch result entry.
+
+The lab works instrument by instrument: pH for every bottle on the bench, then
+turbidity for all of them. ``test_result_entry`` takes one sample per page load
+and transaction. The batch screen instead lists every in-lab sample that
+requests one parameter and saves all the values in a single submission.
+
+``save_batch_entry`` writes the submission in one transaction, in a constant
+number of queries. It locks the selected samples and their existing results,
+makes one bulk result write with one bulk audit insert, and makes the
+``SENT_TO_LAB`` -> ``TESTING_IN_PROGRESS`` and ``RESULTS_ENTERED`` transitions
+as bulk updates.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from core.models import Sample, TestResult
+from core.services.result_entry import ENTRY_FIELDS, ResultEntry, advance_sample_statuses, write_results
+
+logger = logging.getLogger(__name__)
+
+ENTRY_STATUSES = ('SENT_TO_LAB', 'TESTING_IN_PROGRESS', 'RESULTS_ENTERED')
+
+
+@dataclass
+class BatchEntrySummary:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    completed: list = field(default_factory=list)
+    # {sample pk: [messages]} for values that were not saved.
+    errors: dict = field(default_factory=dict)
+
+
+def _text(value) -> str:
+    # JSON clients may send numbers.
+    return '' if value is None else str(value).strip()
+
+
+def entry_statuses(user) -> list:
+    statuses = list(ENTRY_STATUSES)
+    if user.is_admin():
+        statuses.append('REVIEW_PENDING')
+    return statuses
+
+
+def batch_entry_samples(parameter, user):
+    """In-lab samples requesting ``parameter``, each with ``batch_result`` set (or ``None``)."""
+    samples = list(
+        Sample.objects.filter(
+            tests_requested=parameter,
+            current_status__in=entry_statuses(user),
+        )
+        .select_related('customer')
+        .prefetch_related(Prefetch(
+            'results',
+            queryset=TestResult.objects.filter(parameter=parameter),
+            to_attr='batch_results',
+        ))
+        .order_by('display_id')
+    )
+    for sample in samples:
+        sample.batch_result = sample.batch_results[0] if sample.batch_results else None
+    return samples
+
+
+def save_batch_entry(parameter, values: dict, *, user, request=None) -> BatchEntrySummary:
+    """Save ``{sample pk: {'result_value': ..., 'observation': ..., 'remarks': ...}}`` for ``parameter``.
+
+    Blank values are skipped, and fields missing from a row keep their stored
+    value. Samples that are no longer open for entry, or no longer request the
+    parameter, are reported in ``summary.errors``.
+    """
+    summary = BatchEntrySummary()
+    cleaned = {}
+    for sample_id, row in values.items():
+        if not isinstance(row, dict) or not _text(row.get('result_value')):
+            continue
+        try:
+            cleaned[str(uuid.UUID(str(sample_id)))] = row
+        except ValueError:
+            summary.errors[str(sample_id)] = ["Unknown sample."]
+    values = cleaned
+    if not values:
+        return summary
+
+    with transaction.atomic():
+        samples = {
+            str(sample.pk): sample
+            for sample in Sample.objects.select_for_update().filter(
+                pk__in=list(values),
+                tests_requested=parameter,
+                current_status__in=entry_statuses(user),
+            )
+        }
+        for sample_id in values:
+            if sample_id not in samples:
+                summary.errors[sample_id] = ["Sample is not open for result entry of this parameter."]
+        if not samples:
+            return summary
+
+        existing = {
+            (result.sample_id, result.parameter_id): result
+            for result in TestResult.objects.select_for_update().filter(
+                sample__in=list(samples.values()),
+                parameter=parameter,
+            )
+        }
+        rows = []
+        for sample_id, sample in samples.items():
+            row = values[sample_id]
+            current = existing.get((sample.pk, parameter.pk))
+            # Fields the client did not send keep their stored value.
+            entry_values = {
+                name: (_text(row[name]) or None) if name in row else getattr(current, name, None)
+                for name in ENTRY_FIELDS
+            }
+            rows.append((sample, ResultEntry(parameter=parameter, values=entry_values), sample_id))
+
+        written = write_results(rows, user=user, existing=existing, request=request, collect_errors=True)
+        for sample_id, _, messages in written.errors:
+            summary.errors[sample_id] = messages
+        summary.created = len(written.created)
+        summary.updated = len(written.updated)
+        summary.unchanged = written.unchanged
+
+        saved = {result.sample_id for result in written.created + written.updated}
+        summary.completed = advance_sample_statuses(
+            [sample for sample in samples.values() if sample.pk in saved],
+            user=user,
+            request=request,
+        )
+    return summary
@@ -0,0 +1,186 @@
+"""Cross-worker concurrency limits for expensive endpoints.
+
+PDF renders and AI drafts are far heavier than any other page. During a burst
+(e.g. everyone downloading reports at closing time) they can occupy every
+gunicorn thread, and cheap pages such as the login form start timing out.
+``concurrency_slot`` caps how many of them run at once across all workers.
+A caller that cannot get a slot within ``CONCURRENCY_QUEUE_WAIT`` seconds gets
+``ConcurrencyLimitExceeded`` straight away, and the view answers with a
+short "busy, retrying" page carrying ``Retry-After``.
+
+Slots are shared through one of two backends:
+
+* ``cache``: ``cache.add`` on one key per slot in the configured cache (Redis in
+  production). Each key expires after ``CONCURRENCY_LEASE_SECONDS``, so a
+  worker killed mid-render cannot leak a slot forever.
+* ``file``: an exclusive ``flock`` on one lock file per slot under
+  ``CONCURRENCY_LOCK_DIR``. The kernel drops the lock when the process dies.
+  This covers single-host deployments that use the per-process LocMem cache,
+  which cannot coordinate workers.
+
+``CONCURRENCY_BACKEND = 'auto'`` (the default) picks ``cache`` unless the cache
+is LocMem/Dummy. The limiter is off for a name whose limit is ``0``, as it is
+for every name under the test runner (``core.test_runner``).
+"""
+
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMITS = {'pdf': 4, 'ai': 2}
+DEFAULT_QUEUE_WAIT = 5
+DEFAULT_RETRY_AFTER = 10
+DEFAULT_LEASE_SECONDS = 300
+_POLL_INTERVAL = 0.2
+_LOCAL_CACHE_BACKENDS = ('LocMemCache', 'DummyCache')
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """All slots for ``name`` stayed busy for the whole queue wait."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Too many concurrent '{name}' requests.")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def _limit(name: str) -> int:
+    limits = {**DEFAULT_LIMITS, **(getattr(settings, 'CONCURRENCY_LIMITS', None) or {})}
+    try:
+        return max(0, int(limits.get(name, 0) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _setting_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(getattr(settings, name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def retry_after_seconds() -> int:
+    return max(1, _setting_int('CONCURRENCY_RETRY_AFTER', DEFAULT_RETRY_AFTER))
+
+
+def _backend() -> str:
+    configured = (getattr(settings, 'CONCURRENCY_BACKEND', 'auto') or 'auto').casefold()
+    if configured in ('cache', 'file'):
+        return configured
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.rsplit('.', 1)[-1] not in _LOCAL_CACHE_BACKENDS:
+        return 'cache'
+    return 'file' if fcntl is not None else 'none'
+
+
+class SlotLease:
+    """A held slot. ``release()`` is idempotent and may be called from another thread."""
+
+    def __init__(self, name: str, *, key: str | None = None, token: str | None = None, fd: int | None = None):
+        self.name = name
+        self._key = key
+        self._token = token
+        self._fd = fd
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+        elif self._key is not None:
+            try:
+                # Only drop the key if our lease has not expired and been re-taken.
+                if cache.get(self._key) == self._token:
+                    cache.delete(self._key)
+            except Exception:
+                logger.warning("Could not release concurrency slot %s", self._key, exc_info=True)
+
+
+def _try_cache_slot(name: str, limit: int) -> SlotLease | None:
+    lease_seconds = _setting_int('CONCURRENCY_LEASE_SECONDS', DEFAULT_LEASE_SECONDS) or DEFAULT_LEASE_SECONDS
+    token = uuid.uuid4().hex
+    for index in range(limit):
+        key = f'concurrency:{name}:{index}'
+        if cache.add(key, token, timeout=lease_seconds):
+            return SlotLease(name, key=key, token=token)
+    return None
+
+
+def _lock_dir() -> str:
+    base = getattr(settings, 'CONCURRENCY_LOCK_DIR', None)
+    if not base:
+        base = os.path.join(tempfile.gettempdir(), 'waterlab-concurrency')
+    return str(base)
+
+
+def _try_file_slot(name: str, limit: int) -> SlotLease | None:
+    directory = _lock_dir()
+    os.makedirs(directory, exist_ok=True)
+    for index in range(limit):
+        fd = os.open(os.path.join(directory, f'{name}.{index}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            continue
+        return SlotLease(name, fd=fd)
+    return None
+
+
+def acquire_slot(name: str, *, wait: float | None = None) -> SlotLease | None:
+    """Take a slot for ``name``, waiting up to ``wait`` seconds.
+
+    Returns ``None`` when limiting is disabled (nothing to release). Raises
+    ``ConcurrencyLimitExceeded`` when no slot frees up in time. If the backend
+    itself fails, the request is let through rather than refused.
+    """
+    limit = _limit(name)
+    if not limit:
+        return None
+    backend = _backend()
+    if backend == 'none':
+        return None
+    attempt = _try_cache_slot if backend == 'cache' else _try_file_slot
+    if wait is None:
+        wait = _setting_int('CONCURRENCY_QUEUE_WAIT', DEFAULT_QUEUE_WAIT)
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            lease = attempt(name, limit)
+        except Exception:
+            logger.exception("Concurrency limiter backend %s failed; not limiting '%s'", backend, name)
+            return None
+        if lease is not None:
+            return lease
+        if time.monotonic() >= deadline:
+            raise ConcurrencyLimitExceeded(name, retry_after_seconds())
+        time.sleep(_POLL_INTERVAL)
+
+
+@contextmanager
+def concurrency_slot(name: str, *, wait: float | None = None):
+    """Hold a ``name`` slot for the duration of the block (see ``acquire_slot``)."""
+    lease = acquire_slot(name, wait=wait)
+    try:
+        yield lease
+    finally:
+        if lease is not None:
+            lease.release()
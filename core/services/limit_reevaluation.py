@@ -0,0 +1,349 @@
+"""Batch re-evaluation of stored result statuses after a limit change.
+
+``TestResult.limit_status`` is evaluated once, at save time. Editing a
+parameter's limits (``TestParameterUpdateView``, the admin, or re-running
+``seed_standard_parameters``) therefore has to re-classify that parameter's
+historical results. Calling ``evaluate_limit_status`` row by row does not scale
+to a lab's whole history. Instead, results are read in keyset-paginated chunks
+as plain tuples:
+
+* text results are resolved with one dict lookup against the parameter's
+  override table;
+* numeric results are compared against the limits in one vectorised pass over
+  the stored ``numeric_value`` column, as exact int64 micro-units, using NumPy
+  when it is installed and a list comprehension otherwise. Results with more
+  than six decimals, which the column rounds, go through
+  ``evaluate_limit_status`` like the save path, so both agree;
+* only rows whose status changed are written back, as one ``UPDATE ... WHERE pk
+  IN (...)`` per status and chunk.
+
+``TestParameter.save`` schedules this once the change commits. Small
+parameters are handled inline. Larger ones run in a background thread whose
+progress is written to a JSON file under ``MEDIA_ROOT`` (shared by all
+workers, like the AI report jobs), together with the pid and host of the worker
+running it. gunicorn recycles workers (``--max-requests``), which kills such a
+thread mid-job; a job whose process is gone or whose file has not been updated
+for ``_STALE_SECONDS`` is reported as ``interrupted``, and
+``manage.py reevaluate_limits --resume`` runs it again (re-evaluation is
+idempotent). ``manage.py reevaluate_limits`` runs the same code from the shell.
+"""
+
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections
+
+from core.models import TestParameter, TestResult, normalize_text_value
+from core.services.limit_status import evaluate_limit_status, parse_numeric_result
+from core.services.result_overrides import override_table
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path gives identical results.
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_INLINE_MAX = 2000
+_UPDATE_BATCH_SIZE = 500  # stays under SQLite's bound-parameter limit
+_MICRO = 6  # numeric_value has six decimal places
+_JOB_TTL_SECONDS = 24 * 60 * 60
+# A running job writes its file after every chunk; this long without a write means its worker is gone.
+_STALE_SECONDS = 10 * 60
+_ACTIVE_STATUSES = ('pending', 'running')
+
+_WITHIN, _ABOVE, _BELOW = 0, 1, 2
+_STATUS_BY_CODE = {_WITHIN: 'WITHIN_LIMITS', _ABOVE: 'ABOVE_LIMIT', _BELOW: 'BELOW_LIMIT'}
+
+
+@dataclass
+class ReevaluationProgress:
+    total: int = 0
+    checked: int = 0
+    changed: int = 0
+    parameters: int = 0
+
+
+def _setting_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(getattr(settings, name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_micro(value: Decimal) -> int:
+    return int(value.scaleb(_MICRO).to_integral_value())
+
+
+def classify_numeric(values: list[int], min_limit: int | None, max_limit: int | None) -> list[int]:
+    """Classify micro-unit ``values`` against the limits; the minimum is checked first."""
+    if np is not None and values:
+        array = np.fromiter(values, dtype=np.int64, count=len(values))
+        codes = np.full(len(values), _WITHIN, dtype=np.int8)
+        if max_limit is not None:
+            codes[array > max_limit] = _ABOVE
+        if min_limit is not None:
+            codes[array < min_limit] = _BELOW
+        return codes.tolist()
+    return [
+        _BELOW if min_limit is not None and value < min_limit
+        else _ABOVE if max_limit is not None and value > max_limit
+        else _WITHIN
+        for value in values
+    ]
+
+
+def _classify_chunk(parameter, overrides: dict, rows) -> dict:
+    """Return ``{result_id: new status}`` for the rows of one chunk."""
+    statuses = {}
+    numeric_ids = []
+    numeric_values = []
+    for result_id, result_value, numeric_value in rows:
+        override = overrides.get(normalize_text_value(result_value))
+        if override:
+            statuses[result_id] = override
+        elif parameter.max_limit_display:
+            statuses[result_id] = 'NON_NUMERIC'
+        elif numeric_value is not None and parse_numeric_result(result_value) == numeric_value:
+            numeric_ids.append(result_id)
+            numeric_values.append(_to_micro(numeric_value))
+        else:
+            # Text, out-of-range or rounded values: the rare rows that need the full evaluator.
+            statuses[result_id] = evaluate_limit_status(result_value, parameter)[1]
+
+    min_limit = parameter.min_permissible_limit
+    max_limit = parameter.max_permissible_limit
+    codes = classify_numeric(
+        numeric_values,
+        _to_micro(Decimal(str(min_limit))) if min_limit is not None else None,
+        _to_micro(Decimal(str(max_limit))) if max_limit is not None else None,
+    )
+    for result_id, code in zip(numeric_ids, codes):
+        statuses[result_id] = _STATUS_BY_CODE[code]
+    return statuses
+
+
+def _write_changes(changes: dict) -> None:
+    by_status = {}
+    for result_id, status in changes.items():
+        by_status.setdefault(status, []).append(result_id)
+    for status, result_ids in by_status.items():
+        for start in range(0, len(result_ids), _UPDATE_BATCH_SIZE):
+            TestResult.objects.filter(
+                pk__in=result_ids[start:start + _UPDATE_BATCH_SIZE],
+            ).update(limit_status=status)
+
+
+def reevaluate_parameter(parameter, *, chunk_size: int | None = None, progress=None, on_chunk=None) -> ReevaluationProgress:
+    """Re-classify every stored result of ``parameter``."""
+    chunk_size = chunk_size or _setting_int('LIMIT_REEVALUATION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    progress = progress or ReevaluationProgress()
+    overrides = override_table(parameter.pk, parameter.name)
+    queryset = TestResult.objects.filter(parameter=parameter).order_by('result_id')
+
+    last_id = None
+    while True:
+        chunk = queryset.filter(result_id__gt=last_id) if last_id is not None else queryset
+        rows = list(chunk.values_list('result_id', 'result_value', 'numeric_value', 'limit_status')[:chunk_size])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        stored = {row[0]: row[3] for row in rows}
+        statuses = _classify_chunk(parameter, overrides, [row[:3] for row in rows])
+        changes = {result_id: status for result_id, status in statuses.items() if stored[result_id] != status}
+        _write_changes(changes)
+
+        progress.checked += len(rows)
+        progress.changed += len(changes)
+        if on_chunk is not None:
+            on_chunk(progress)
+    progress.parameters += 1
+    return progress
+
+
+def reevaluate_parameters(parameter_ids=None, *, chunk_size: int | None = None, on_chunk=None) -> ReevaluationProgress:
+    """Re-classify the results of ``parameter_ids`` (all parameters when ``None``)."""
+    parameters = TestParameter.objects.order_by('name')
+    if parameter_ids is not None:
+        parameters = parameters.filter(pk__in=list(parameter_ids))
+    parameters = list(parameters)
+
+    progress = ReevaluationProgress(
+        total=TestResult.objects.filter(parameter__in=parameters).count(),
+    )
+    if on_chunk is not None:
+        on_chunk(progress)
+    for parameter in parameters:
+        reevaluate_parameter(parameter, chunk_size=chunk_size, progress=progress, on_chunk=on_chunk)
+    return progress
+
+
+# --- background jobs ------------------------------------------------------
+
+
+def _jobs_dir() -> str:
+    base = getattr(settings, 'MEDIA_ROOT', None) or tempfile.gettempdir()
+    path = os.path.join(base, 'limit_reevaluation_jobs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _job_path(job_id: str):
+    safe = ''.join(ch for ch in (job_id or '') if ch.isalnum())
+    if not safe:
+        return None
+    return os.path.join(_jobs_dir(), f'{safe}.json')
+
+
+def _write_job(job_id: str, data: dict) -> None:
+    path = _job_path(job_id)
+    if not path:
+        return
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump({**data, 'pid': os.getpid(), 'host': socket.gethostname(), 'updated': time.time()}, fh)
+    os.replace(tmp, path)
+
+
+def _process_alive(pid) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, TypeError, ValueError):
+        # PermissionError: the process exists but belongs to another user.
+        return True
+    return True
+
+
+def _is_stale(job: dict) -> bool:
+    if job.get('status') not in _ACTIVE_STATUSES:
+        return False
+    if time.time() - float(job.get('updated') or 0) > _STALE_SECONDS:
+        return True
+    return job.get('host') == socket.gethostname() and not _process_alive(job.get('pid'))
+
+
+def load_reevaluation_job(job_id: str):
+    """Return the job's state, marking it ``interrupted`` if its worker is gone."""
+    path = _job_path(job_id)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as fh:
+            job = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if _is_stale(job):
+        logger.warning("Limit re-evaluation job %s stopped with its worker (pid %s)", job_id, job.get('pid'))
+        job = {
+            **job,
+            'status': 'interrupted',
+            'message': "The worker running this job stopped. Run `manage.py reevaluate_limits --resume`.",
+        }
+        _write_job(job_id, job)
+    return job
+
+
+def _cleanup_old_jobs() -> None:
+    try:
+        now = time.time()
+        directory = _jobs_dir()
+        for name in os.listdir(directory):
+            fp = os.path.join(directory, name)
+            try:
+                if not name.endswith('.json') or now - os.path.getmtime(fp) <= _JOB_TTL_SECONDS:
+                    continue
+                # Interrupted jobs stay until they are resumed.
+                if (load_reevaluation_job(name[:-5]) or {}).get('status') in ('done', 'error'):
+                    os.remove(fp)
+            except OSError:
+                pass
+    except OSError:
+        pass
+
+
+def _execute_job(job_id: str, parameter_ids: list[str]) -> None:
+    def report(progress):
+        _write_job(job_id, {'status': 'running', 'parameter_ids': parameter_ids, **asdict(progress)})
+
+    started = time.monotonic()
+    try:
+        progress = reevaluate_parameters(parameter_ids, on_chunk=report)
+        _write_job(job_id, {'status': 'done', 'parameter_ids': parameter_ids, **asdict(progress)})
+        logger.info(
+            "Limit re-evaluation %s: %s/%s results changed in %.1fs",
+            job_id, progress.changed, progress.checked, time.monotonic() - started,
+        )
+    except Exception as exc:
+        logger.exception("Limit re-evaluation job %s failed", job_id)
+        _write_job(job_id, {'status': 'error', 'parameter_ids': parameter_ids, 'message': str(exc)})
+
+
+def _run_job(job_id: str, parameter_ids: list[str]) -> None:
+    try:
+        _execute_job(job_id, parameter_ids)
+    finally:
+        connections.close_all()
+
+
+def resume_interrupted_jobs() -> list[str]:
+    """Run every interrupted job again in this process and return their ids."""
+    resumed = []
+    try:
+        names = sorted(os.listdir(_jobs_dir()))
+    except OSError:
+        return resumed
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        job_id = name[:-5]
+        job = load_reevaluation_job(job_id)
+        if not job or job.get('status') != 'interrupted':
+            continue
+        parameter_ids = job.get('parameter_ids') or []
+        logger.info("Resuming limit re-evaluation job %s", job_id)
+        _execute_job(job_id, parameter_ids)
+        resumed.append(job_id)
+    return resumed
+
+
+def start_reevaluation_job(parameter_ids) -> str:
+    """Re-evaluate ``parameter_ids`` in a background thread and return the job id."""
+    _cleanup_old_jobs()
+    job_id = uuid.uuid4().hex
+    parameter_ids = [str(pk) for pk in parameter_ids]
+    _write_job(job_id, {'status': 'pending', 'parameter_ids': parameter_ids})
+    thread = threading.Thread(
+        target=_run_job,
+        args=(job_id, parameter_ids),
+        name=f'limit-reevaluation-{job_id[:8]}',
+        daemon=True,
+    )
+    thread.start()
+    return job_id
+
+
+def schedule_reevaluation(parameter_ids) -> str | None:
+    """Re-evaluate after a limit change: inline when small, else in the background.
+
+    Returns the background job id, or ``None`` when the work was done inline.
+    """
+    parameter_ids = list(parameter_ids)
+    affected = TestResult.objects.filter(parameter_id__in=parameter_ids).count()
+    if not affected:
+        return None
+    if affected <= _setting_int('LIMIT_REEVALUATION_INLINE_MAX', DEFAULT_INLINE_MAX):
+        reevaluate_parameters(parameter_ids)
+        return None
+    return start_reevaluation_job(parameter_ids)
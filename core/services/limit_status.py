@@ -0,0 +1,121 @@
+"""Parsed numeric value and limit status persisted on ``TestResult``.
+
+Every read path used to re-parse ``result_value`` and re-evaluate it against the
+parameter limits. That made "which samples exceeded a limit this week"
+impossible to answer in SQL. ``TestResult.save`` now stores the parsed
+``numeric_value`` and the evaluated ``limit_status`` (both indexed), and lists,
+reports and the AI prompt read those columns.
+
+The stored status depends on the parameter limits and the text overrides, so it
+is re-evaluated whenever those change: ``ResultStatusOverride`` save/delete
+refreshes the matching rows here, and limit edits go through the batch
+re-evaluator in ``limit_reevaluation``. ``evaluate_limit_status`` works on plain
+attributes so migrations can call it with historical models.
+"""
+
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.db.models.functions import Lower, Trim
+
+from core.models import TestResult, normalize_text_value
+from core.services.result_overrides import resolve_status_override
+
+logger = logging.getLogger(__name__)
+
+OUT_OF_LIMIT_STATUSES = ('ABOVE_LIMIT', 'BELOW_LIMIT')
+NUMERIC_VALUE_QUANTUM = Decimal('0.000001')
+# numeric_value is DecimalField(max_digits=18, decimal_places=6).
+NUMERIC_VALUE_BOUND = Decimal('1e12')
+REFRESH_BATCH_SIZE = 500
+
+
+def parse_numeric_result(raw) -> Decimal | None:
+    """Return the Decimal behind results such as ``"1,250"`` or ``"<0.01"``, else ``None``."""
+    raw = (raw or '').strip()
+    if not raw:
+        return None
+    normalized = raw.lstrip('<>').replace(',', '').strip()
+    try:
+        value = Decimal(normalized)
+    except (InvalidOperation, ValueError):
+        return None
+    return value if value.is_finite() else None
+
+
+def storable_numeric_value(value: Decimal | None) -> Decimal | None:
+    """Round ``value`` to the column's precision; out-of-range values are not stored."""
+    if value is None or abs(value) >= NUMERIC_VALUE_BOUND:
+        return None
+    try:
+        return value.quantize(NUMERIC_VALUE_QUANTUM)
+    except InvalidOperation:
+        return None
+
+
+def evaluate_limit_status(result_value, parameter) -> tuple[Decimal | None, str]:
+    """Return ``(numeric value, limit status)`` for ``result_value`` against ``parameter``."""
+    numeric_value = parse_numeric_result(result_value)
+    if parameter is None:
+        return numeric_value, 'UNKNOWN'
+
+    override_status = resolve_status_override(
+        parameter.pk,
+        getattr(parameter, 'name', None),
+        normalize_text_value(result_value),
+    )
+    if override_status:
+        return numeric_value, override_status
+    if parameter.max_limit_display:
+        return numeric_value, 'NON_NUMERIC'
+    if numeric_value is None:
+        return None, 'NON_NUMERIC'
+    if parameter.min_permissible_limit is not None and numeric_value < parameter.min_permissible_limit:
+        return numeric_value, 'BELOW_LIMIT'
+    if parameter.max_permissible_limit is not None and numeric_value > parameter.max_permissible_limit:
+        return numeric_value, 'ABOVE_LIMIT'
+    return numeric_value, 'WITHIN_LIMITS'
+
+
+def refresh_limit_columns(queryset=None, *, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Re-evaluate the stored columns for ``queryset`` and return how many rows changed."""
+    if queryset is None:
+        queryset = TestResult.objects.all()
+    queryset = queryset.select_related('parameter').only(
+        'result_id', 'result_value', 'numeric_value', 'limit_status',
+        'parameter__parameter_id', 'parameter__name', 'parameter__min_permissible_limit',
+        'parameter__max_permissible_limit', 'parameter__max_limit_display',
+    )
+
+    changed = []
+    total = 0
+    for result in queryset.iterator(chunk_size=batch_size):
+        numeric_value, status = evaluate_limit_status(result.result_value, result.parameter)
+        numeric_value = storable_numeric_value(numeric_value)
+        if numeric_value == result.numeric_value and status == result.limit_status:
+            continue
+        result.numeric_value = numeric_value
+        result.limit_status = status
+        changed.append(result)
+        if len(changed) >= batch_size:
+            TestResult.objects.bulk_update(changed, ['numeric_value', 'limit_status'])
+            total += len(changed)
+            changed = []
+    if changed:
+        TestResult.objects.bulk_update(changed, ['numeric_value', 'limit_status'])
+        total += len(changed)
+    return total
+
+
+def refresh_for_override(parameter_id, normalized_value) -> int:
+    """Re-evaluate the text results an override (scoped or global) can match."""
+    if not normalized_value:
+        return 0
+    # SQL lower() is close enough to casefold() to narrow the candidates; each
+    # candidate is then evaluated in Python.
+    queryset = TestResult.objects.annotate(
+        _normalized_result=Lower(Trim('result_value')),
+    ).filter(_normalized_result=normalized_value.lower())
+    if parameter_id:
+        queryset = queryset.filter(parameter_id=parameter_id)
+    return refresh_limit_columns(queryset)
@@ -7,31 +7,173 @@ ReportLab output with pypdf.
 
 Every step degrades gracefully: if WeasyPrint or pypdf is unavailable (e.g. the
 native pango/cairo libraries are missing in a deployment), the Malayalam page is
-quietly skipped and the English-only report is returned unchanged.
+quietly skipped and the English-only report is returned unchanged. When
+``MALAYALAM_RENDERER_ENABLED`` is set the HTML is rendered by a warm, long-lived
+WeasyPrint process (``core.services.weasyprint_renderer``), falling back to an
+in-process render whenever that process cannot take the job.
+
+Rendered pages are cached on disk under ``MALAYALAM_PAGE_CACHE_DIR``, keyed by a
+hash of everything printed on the page (header fields, Malayalam text, branding
+flag) plus the page template. Repeat downloads and reissued revisions with
+unchanged remarks therefore skip WeasyPrint. Hits refresh the file's mtime and
+the least recently used pages are evicted once the directory grows beyond
+``MALAYALAM_PAGE_CACHE_MAX_MB``.
 """
 
+import functools
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import uuid
 from io import BytesIO
 from pathlib import Path
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
 
+from .report_images import report_image_variant
+from .weasyprint_renderer import render_html_to_pdf
+
 logger = logging.getLogger(__name__)
 
+PAGE_TEMPLATE = 'core/report_malayalam_page.html'
+
 
-def _file_uri(static_path: str, fallback_relative: str) -> str | None:
-    """Resolve a static asset to a ``file://`` URI for WeasyPrint."""
+def _file_uri(static_path: str, fallback_relative: str, variant: str | None = None) -> str | None:
+    """Resolve a static asset to a ``file://`` URI for WeasyPrint.
+
+    ``variant`` names a ``report_images`` kind to embed the optimised copy instead.
+    """
     resolved = finders.find(static_path)
     if not resolved:
         candidate = Path(settings.BASE_DIR) / fallback_relative
         resolved = str(candidate) if candidate.exists() else None
     if not resolved or not Path(resolved).exists():
         return None
+    if variant:
+        resolved = report_image_variant(resolved, variant) or resolved
     return Path(resolved).as_uri()
 
 
-def render_malayalam_remarks_pdf(*, sample, remarks_ml, recommendations_ml, branded=True):
+def _cache_dir() -> str:
+    base = getattr(settings, 'MALAYALAM_PAGE_CACHE_DIR', None)
+    if not base:
+        base = os.path.join(tempfile.gettempdir(), 'malayalam_pages')
+    return str(base)
+
+
+def _cache_max_bytes() -> int:
+    return max(0, int(getattr(settings, 'MALAYALAM_PAGE_CACHE_MAX_MB', 64) or 0)) * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _template_fingerprint() -> str:
+    """Hash of the page template, so a template change never serves stale pages."""
+    from django.template.loader import get_template
+
+    try:
+        origin = get_template(PAGE_TEMPLATE).origin.name
+        with open(origin, 'rb') as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    except Exception:
+        return ''
+
+
+def malayalam_page_cache_key(*, sample_code, report_number, customer_name, remarks_ml, recommendations_ml, branded) -> str:
+    payload = json.dumps(
+        [
+            _template_fingerprint(),
+            bool(branded),
+            sample_code or '',
+            report_number or '',
+            customer_name or '',
+            remarks_ml,
+            recommendations_ml,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(_cache_dir(), f'{key}.pdf')
+
+
+def _load_cached_page(key: str) -> bytes | None:
+    if not _cache_max_bytes():
+        return None
+    path = _cache_path(key)
+    try:
+        with open(path, 'rb') as fh:
+            pdf_bytes = fh.read()
+        # Bump the mtime so eviction treats this page as recently used.
+        os.utime(path)
+    except OSError:
+        return None
+    return pdf_bytes or None
+
+
+def _store_cached_page(key: str, pdf_bytes: bytes) -> None:
+    max_bytes = _cache_max_bytes()
+    if not max_bytes or not pdf_bytes or len(pdf_bytes) > max_bytes:
+        return
+    path = _cache_path(key)
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as fh:
+            fh.write(pdf_bytes)
+        os.replace(tmp, path)
+    except OSError:
+        logger.warning("Could not cache the Malayalam report page at %s", path, exc_info=True)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return
+    evict_malayalam_page_cache(max_bytes)
+
+
+def evict_malayalam_page_cache(max_bytes: int | None = None) -> int:
+    """Delete least recently used pages until the cache fits ``max_bytes``; return the count removed."""
+    if max_bytes is None:
+        max_bytes = _cache_max_bytes()
+    entries = []
+    total = 0
+    try:
+        with os.scandir(_cache_dir()) as it:
+            for entry in it:
+                if not entry.name.endswith('.pdf'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except OSError:
+        return 0
+
+    removed = 0
+    if total <= max_bytes:
+        return removed
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        if total <= max_bytes:
+            break
+    return removed
+
+
+def render_malayalam_remarks_pdf(*, sample_code, report_number, customer_name, remarks_ml, recommendations_ml, branded=True):
     """Render a single-page Malayalam remarks PDF, or ``None`` when not possible.
 
     Returns ``None`` when there is no Malayalam content to show or when WeasyPrint
@@ -42,15 +184,17 @@ def render_malayalam_remarks_pdf(*, sample, remarks_ml, recommendations_ml, bran
     if not remarks_ml and not recommendations_ml:
         return None
 
-    try:
-        from weasyprint import HTML
-    except Exception:
-        logger.warning(
-            "WeasyPrint is unavailable; skipping the Malayalam report page. "
-            "Install weasyprint and its native dependencies (pango, cairo) to enable it.",
-            exc_info=True,
-        )
-        return None
+    cache_key = malayalam_page_cache_key(
+        sample_code=sample_code,
+        report_number=report_number,
+        customer_name=customer_name,
+        remarks_ml=remarks_ml,
+        recommendations_ml=recommendations_ml,
+        branded=branded,
+    )
+    cached = _load_cached_page(cache_key)
+    if cached is not None:
+        return cached
 
     from django.template.loader import render_to_string
 
@@ -58,9 +202,9 @@ def render_malayalam_remarks_pdf(*, sample, remarks_ml, recommendations_ml, bran
 
     context = {
         'branded': branded,
-        'sample_code': sample.display_id or str(sample.sample_id),
-        'report_number': getattr(sample, 'report_number_with_revision', '') or '',
-        'customer_name': getattr(sample.customer, 'name', '') or '',
+        'sample_code': sample_code or '',
+        'report_number': report_number or '',
+        'customer_name': customer_name or '',
         'remarks_ml': remarks_ml,
         'recommendations_ml': recommendations_ml,
         'remarks_ml_items': bullet_items(remarks_ml),
@@ -74,20 +218,42 @@ def render_malayalam_remarks_pdf(*, sample, remarks_ml, recommendations_ml, bran
         'background_url': _file_uri(
             'report_templates/biofix_wl_template_page.png',
             'static/report_templates/biofix_wl_template_page.png',
+            variant='background',
         ) if branded else None,
         'watermark_url': _file_uri(
             'report_templates/biofix_wl_watermark.png',
             'static/report_templates/biofix_wl_watermark.png',
+            variant='watermark',
         ) if branded else None,
     }
 
     try:
-        html_string = render_to_string('core/report_malayalam_page.html', context)
-        return HTML(string=html_string, base_url=str(settings.BASE_DIR)).write_pdf()
+        html_string = render_to_string(PAGE_TEMPLATE, context)
+        # Prefer the warm renderer process; it returns None when it cannot take the job.
+        pdf_bytes = render_html_to_pdf(html_string, base_url=str(settings.BASE_DIR))
     except Exception:
         logger.exception("Failed to render the Malayalam report page with WeasyPrint.")
         return None
 
+    if pdf_bytes is None:
+        try:
+            from weasyprint import HTML
+        except Exception:
+            logger.warning(
+                "WeasyPrint is unavailable; skipping the Malayalam report page. "
+                "Install weasyprint and its native dependencies (pango, cairo) to enable it.",
+                exc_info=True,
+            )
+            return None
+        try:
+            pdf_bytes = HTML(string=html_string, base_url=str(settings.BASE_DIR)).write_pdf()
+        except Exception:
+            logger.exception("Failed to render the Malayalam report page with WeasyPrint.")
+            return None
+
+    _store_cached_page(cache_key, pdf_bytes)
+    return pdf_bytes
+
 
 def append_pdf_pages(base_pdf_bytes: bytes, extra_pdf_bytes: bytes) -> bytes:
     """Append ``extra_pdf_bytes`` pages after ``base_pdf_bytes``.
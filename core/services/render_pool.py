@@ -0,0 +1,344 @@
+"""Process pool for CPU-bound PDF rendering.
+
+ReportLab layout, the WeasyPrint Malayalam page and the pypdf merge are pure
+CPU work. Run inline, they pin a gunicorn worker for the whole render, so a few
+simultaneous downloads stall every other page of the LIMS. This module keeps a
+small pool of pre-started render processes per web worker. Views submit a
+named job (``'report'`` / ``'invoice'``) with the sample primary key and wait on
+the result while the CPU work happens on other cores; with threaded gunicorn
+workers the waiting thread holds the GIL only briefly, so the rest of the site
+stays responsive.
+
+The pool is optional. It is disabled when ``REPORT_RENDER_WORKERS`` is ``0``
+(the development and test default); if it cannot be started
+or a child crashes, rendering falls back to the caller's inline callable so a
+download never fails just because the pool is unavailable.
+
+Children are started with the ``spawn`` method: a forked child would inherit the
+parent's open database sockets. Each child runs ``django.setup()`` once and
+pre-imports the PDF stack, so individual jobs do not pay the import cost.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Job name -> dotted path of a ``callable(sample_pk, **options) -> bytes`` that
+# is resolved inside the child process.
+RENDER_JOBS = {
+    'report': 'core.services.render_pool.render_report_job',
+    'invoice': 'core.services.render_pool.render_invoice_job',
+}
+
+DEFAULT_RENDER_TIMEOUT = 90
+DEFAULT_MAX_TASKS_PER_CHILD = 200
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = None
+
+
+class PDFRenderError(Exception):
+    """Raised when a PDF could not be produced by the render pool."""
+
+
+class RenderPoolBusy(PDFRenderError):
+    """The pool queue is full; the caller should ask the user to retry."""
+
+
+class RenderTimeout(PDFRenderError):
+    """A render job exceeded ``REPORT_RENDER_TIMEOUT``."""
+
+
+def _pool_size(workers=None) -> int:
+    if workers is None:
+        workers = getattr(settings, 'REPORT_RENDER_WORKERS', 0)
+    try:
+        return max(0, int(workers or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _render_timeout() -> int:
+    try:
+        return max(1, int(getattr(settings, 'REPORT_RENDER_TIMEOUT', DEFAULT_RENDER_TIMEOUT)))
+    except (TypeError, ValueError):
+        return DEFAULT_RENDER_TIMEOUT
+
+
+def _max_pending(workers: int) -> int:
+    configured = getattr(settings, 'REPORT_RENDER_MAX_PENDING', None)
+    try:
+        if configured:
+            return max(1, int(configured))
+    except (TypeError, ValueError):
+        pass
+    return workers * 2
+
+
+def _worker_init(settings_module: str) -> None:
+    """Boot Django and warm the PDF libraries once per child process."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+
+    django.setup()
+
+    # Warm imports: these dominate the first render in a cold process.
+    import pypdf  # noqa: F401
+    import reportlab.platypus  # noqa: F401
+
+    import core.views_reports  # noqa: F401
+    from core.services.weasyprint_renderer import use_in_process_rendering
+
+    # This child is already a warm render process; a nested renderer would only add a hop.
+    use_in_process_rendering()
+
+    try:
+        import weasyprint  # noqa: F401
+    except Exception:
+        # Optional: the Malayalam page is skipped when WeasyPrint is missing.
+        pass
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError('PDF render exceeded its time limit')
+
+
+def _run_job(job: str, sample_pk, options: dict, timeout: int) -> bytes:
+    """Child-side wrapper: enforce the hard timeout and run the named job."""
+    from django.db import close_old_connections
+    from django.utils.module_loading import import_string
+
+    # The parent abandons the future after ``timeout``; the alarm makes sure the
+    # child gives up too instead of grinding on a render nobody is waiting for.
+    use_alarm = hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.alarm(timeout + 5)
+    close_old_connections()
+    try:
+        return import_string(RENDER_JOBS[job])(sample_pk, **options)
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+        close_old_connections()
+
+
+def render_report_job(sample_pk, *, include_branding=True, ai_override=None, engine=None) -> bytes:
+    from core.models import Sample
+    from core.views_reports import _render_sample_report_pdf
+
+    sample = Sample.objects.select_related(
+        'customer',
+        'reviewed_by',
+        'lab_manager',
+        'food_analyst',
+    ).prefetch_related('tests_requested').get(pk=sample_pk)
+    return _render_sample_report_pdf(
+        sample,
+        include_branding=include_branding,
+        ai_override=ai_override,
+        engine=engine,
+    )
+
+
+def render_invoice_job(sample_pk) -> bytes:
+    from core.models import Sample
+    from core.views_reports import _render_sample_invoice_pdf
+
+    sample = Sample.objects.select_related('customer', 'invoice').get(pk=sample_pk)
+    return _render_sample_invoice_pdf(sample, sample.invoice)
+
+
+def _get_pool(workers=None):
+    """The shared pool, started with ``workers`` processes (default ``REPORT_RENDER_WORKERS``).
+
+    ``workers`` only sizes a pool that is not running yet; ``0`` means render inline.
+    """
+    global _pool, _slots
+    workers = _pool_size(workers)
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_worker_init,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'waterlab.settings'),),
+                    max_tasks_per_child=getattr(
+                        settings, 'REPORT_RENDER_MAX_TASKS_PER_CHILD', DEFAULT_MAX_TASKS_PER_CHILD
+                    ) or None,
+                )
+                _slots = threading.BoundedSemaphore(_max_pending(workers))
+            except Exception:
+                logger.exception("Could not start the PDF render pool; rendering inline")
+                _pool = None
+        return _pool
+
+
+def _discard_pool(pool) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    try:
+        pool.shutdown(wait=False, cancel_futures=True)
+    except Exception:
+        pass
+
+
+def shutdown_pool() -> None:
+    """Stop the render processes, e.g. at the end of a management command."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def render_pdf(job: str, sample_pk, *, inline, **options) -> bytes:
+    """Render ``job`` for ``sample_pk`` in the pool and return the PDF bytes.
+
+    ``inline`` is a zero-argument callable producing the same bytes in-process;
+    it is used when the pool is disabled or broken. Raises ``RenderPoolBusy``
+    when too many renders are already queued and ``RenderTimeout`` when the job
+    does not finish within ``REPORT_RENDER_TIMEOUT`` seconds.
+    """
+    if job not in RENDER_JOBS:
+        raise ValueError(f"Unknown render job: {job}")
+
+    pool = _get_pool()
+    if pool is None:
+        return inline()
+
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise RenderPoolBusy("The PDF renderer is busy. Please try again in a moment.")
+    timeout = _render_timeout()
+    try:
+        try:
+            future = pool.submit(_run_job, job, sample_pk, options, timeout)
+        except (BrokenProcessPool, RuntimeError):
+            logger.warning("PDF render pool unavailable; rendering %s inline", job, exc_info=True)
+            _discard_pool(pool)
+            return inline()
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            logger.error("PDF render job %s for sample %s timed out after %ss", job, sample_pk, timeout)
+            raise RenderTimeout("Generating the PDF took too long. Please try again.") from exc
+        except BrokenProcessPool:
+            logger.exception("PDF render process crashed; rendering %s inline", job)
+            _discard_pool(pool)
+            return inline()
+    finally:
+        slots.release()
+
+
+def render_many(job: str, sample_pks, *, inline, cached=None, workers=None, **options):
+    """Render ``job`` for many samples, yielding ``(sample_pk, pdf_bytes)`` as each finishes.
+
+    ``sample_pks`` is consumed lazily and at most two keys per pool process are
+    in flight at once, so memory stays bounded however many keys are passed.
+    ``inline`` is a one-argument callable (``inline(sample_pk) -> bytes``) used
+    when the pool is disabled or breaks. ``cached``, if given, is tried first
+    (``cached(sample_pk) -> bytes | None``); keys it answers are yielded without
+    rendering. ``workers`` overrides ``REPORT_RENDER_WORKERS`` (see ``_get_pool``).
+    A failed render yields ``(sample_pk, None)`` rather than aborting the batch;
+    ``RenderTimeout`` is raised when no job completes within the timeout.
+    """
+    if job not in RENDER_JOBS:
+        raise ValueError(f"Unknown render job: {job}")
+
+    def _inline(pk):
+        try:
+            return inline(pk)
+        except Exception:
+            logger.exception("Inline %s render failed for sample %s", job, pk)
+            return None
+
+    def _stored(pk):
+        return cached(pk) if cached is not None else None
+
+    def _stored_or_inline(pk):
+        pdf_bytes = _stored(pk)
+        return pdf_bytes if pdf_bytes is not None else _inline(pk)
+
+    remaining = iter(sample_pks)
+    pool = _get_pool(workers)
+    if pool is None:
+        for pk in remaining:
+            yield pk, _stored_or_inline(pk)
+        return
+
+    timeout = _render_timeout()
+    window = max(1, _pool_size(workers) * 2)
+    pending = {}
+    ready = deque()
+    unsubmitted = []
+
+    def _fill():
+        for pk in remaining:
+            pdf_bytes = _stored(pk)
+            if pdf_bytes is not None:
+                ready.append((pk, pdf_bytes))
+            else:
+                try:
+                    future = pool.submit(_run_job, job, pk, options, timeout)
+                except BrokenProcessPool:
+                    unsubmitted.append(pk)
+                    raise
+                pending[future] = pk
+            if len(pending) + len(ready) >= window:
+                break
+
+    try:
+        _fill()
+        while pending or ready:
+            while ready:
+                yield ready.popleft()
+            if pending:
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    raise RenderTimeout("Generating the PDFs took too long. Please try again.")
+                for future in done:
+                    pk = pending[future]
+                    # Read the result before dropping the key: a crashed pool raises
+                    # here, and the key must stay pending for the inline fallback.
+                    try:
+                        pdf_bytes = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception:
+                        logger.exception("Pooled %s render failed for sample %s", job, pk)
+                        pdf_bytes = None
+                    del pending[future]
+                    yield pk, pdf_bytes
+            _fill()
+    except BrokenProcessPool:
+        logger.exception("PDF render process crashed; finishing the %s batch inline", job)
+        _discard_pool(pool)
+        while ready:
+            yield ready.popleft()
+        fallback = [*pending.values(), *unsubmitted]
+        pending.clear()
+        for pk in fallback:
+            yield pk, _inline(pk)
+        for pk in remaining:
+            yield pk, _stored_or_inline(pk)
+    finally:
+        for future in pending:
+            future.cancel()
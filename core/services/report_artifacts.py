@@ -0,0 +1,120 @@
+"""Persisted report PDFs, one file per sample revision/layout/remarks source.
+
+An approved report never changes for a given ``Sample.report_revision``: any
+correction goes through ``Sample.reopen_for_correction``, which bumps the
+revision and drops the stored files. Re-downloads can therefore be served from
+disk instead of rebuilding the ReportLab document, the WeasyPrint Malayalam page
+and the pypdf merge on every click.
+
+Artifacts live under ``REPORT_ARTIFACTS_ROOT`` (deliberately *outside*
+``MEDIA_ROOT``, which nginx serves publicly). When
+``REPORT_ARTIFACTS_ACCEL_PREFIX`` is set, responses carry an
+``X-Accel-Redirect`` header so nginx streams the file with sendfile and the
+gunicorn worker is released immediately; otherwise Django streams the file via
+``FileResponse`` (which gunicorn also hands to sendfile when it can).
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+logger = logging.getLogger(__name__)
+
+REPORT_LAYOUTS = ('branded', 'plain')
+REMARKS_SOURCES = ('review', 'ai')
+
+
+def _artifacts_root() -> str:
+    base = getattr(settings, 'REPORT_ARTIFACTS_ROOT', None)
+    if not base:
+        base = os.path.join(tempfile.gettempdir(), 'report_artifacts')
+    return str(base)
+
+
+def _sample_dir(sample_pk) -> str | None:
+    safe = ''.join(ch for ch in str(sample_pk or '') if ch.isalnum() or ch == '-')
+    if not safe:
+        return None
+    return os.path.join(_artifacts_root(), safe)
+
+
+def _revision(sample) -> int:
+    revision = getattr(sample, 'report_revision', None) or 1
+    return revision if revision > 0 else 1
+
+
+def report_artifact_path(sample, *, layout: str, remarks_source: str = 'review', engine: str = 'reportlab') -> str | None:
+    """Return the on-disk location for a report artifact (it may not exist yet)."""
+    if layout not in REPORT_LAYOUTS or remarks_source not in REMARKS_SOURCES or not engine.isalnum():
+        return None
+    directory = _sample_dir(sample.pk)
+    if not directory:
+        return None
+    # Artifacts from the default ReportLab engine keep their original names.
+    suffix = '' if engine == 'reportlab' else f'-{engine}'
+    return os.path.join(directory, f'rev{_revision(sample)}-{layout}-{remarks_source}{suffix}.pdf')
+
+
+def load_report_artifact(sample, *, layout: str, remarks_source: str = 'review', engine: str = 'reportlab') -> str | None:
+    """Return the path of a stored artifact, or ``None`` on a miss."""
+    path = report_artifact_path(sample, layout=layout, remarks_source=remarks_source, engine=engine)
+    if path and os.path.isfile(path):
+        return path
+    return None
+
+
+def save_report_artifact(
+    sample,
+    pdf_bytes: bytes,
+    *,
+    layout: str,
+    remarks_source: str = 'review',
+    engine: str = 'reportlab',
+) -> str | None:
+    """Persist ``pdf_bytes`` and return its path, or ``None`` if it could not be written.
+
+    Failing to store an artifact must never fail the download itself, so errors
+    are logged and swallowed.
+    """
+    path = report_artifact_path(sample, layout=layout, remarks_source=remarks_source, engine=engine)
+    if not path or not pdf_bytes:
+        return None
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as fh:
+            fh.write(pdf_bytes)
+        os.replace(tmp, path)  # atomic so concurrent readers never see a partial file
+    except OSError:
+        logger.warning("Could not persist report artifact for sample %s", sample.pk, exc_info=True)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return None
+    return path
+
+
+def delete_report_artifacts(sample_pk) -> None:
+    """Drop every stored artifact for a sample (all revisions and layouts)."""
+    directory = _sample_dir(sample_pk)
+    if directory and os.path.isdir(directory):
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def report_artifact_response(path: str, filename: str):
+    """Serve a stored artifact, delegating the byte transfer to nginx when configured."""
+    accel_prefix = getattr(settings, 'REPORT_ARTIFACTS_ACCEL_PREFIX', '') or ''
+    if accel_prefix:
+        relative = os.path.relpath(path, _artifacts_root()).replace(os.sep, '/')
+        response = HttpResponse(content_type='application/pdf')
+        response['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{relative}"
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        return response
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
@@ -0,0 +1,159 @@
+"""Single-pass bilingual report engine (``ReportOptions(engine='html')``).
+
+The default engine lays the English report out with ReportLab, renders the
+Malayalam page separately with WeasyPrint and merges the two PDFs with pypdf.
+This engine instead renders the whole report, Malayalam section included, from
+one HTML template in a single WeasyPrint pass. There is no second layout and no
+parse-and-rewrite merge, and Malayalam is shaped by pango like the rest of the
+text.
+
+It uses the warm renderer process (``core.services.weasyprint_renderer``) when
+available. ``build_report_pdf_html`` returns ``None`` when WeasyPrint is not
+usable, and ``build_report_pdf`` then falls back to the ReportLab engine.
+"""
+
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from .ai_remarks import bullet_items
+from .malayalam_report import _file_uri
+from .report_images import report_image_variant
+from .report_pdf import (
+    CONSULTANT_ROLE,
+    DEFAULT_RECOMMENDATIONS,
+    DEFAULT_REMARKS,
+    STATUS_STYLES,
+    ReportOptions,
+    ReportSnapshot,
+    group_result_sections,
+)
+from .weasyprint_renderer import render_html_to_pdf
+
+logger = logging.getLogger(__name__)
+
+REPORT_TEMPLATE = 'core/report_bilingual.html'
+
+
+def _fmt(value, pattern) -> str:
+    return value.strftime(pattern) if value else ''
+
+
+def _local_file_uri(path: str, kind: str) -> str | None:
+    path = (path or '').strip()
+    if not path or not Path(path).exists():
+        return None
+    return Path(report_image_variant(path, kind) or path).as_uri()
+
+
+def _signatory_context(signatory) -> dict:
+    return {
+        'name': signatory.name or 'Not assigned',
+        'role': signatory.role or '',
+        'signature_url': _local_file_uri(signatory.signature_path, 'signature'),
+    }
+
+
+def _remarks_context(text: str, fallback: str) -> dict:
+    items = bullet_items(text)
+    return {
+        'bullets': items if len(items) >= 2 else [],
+        'text': (text or '').strip() or fallback,
+    }
+
+
+def report_html_context(snapshot: ReportSnapshot, options: ReportOptions) -> dict:
+    sections = []
+    serial = 1
+    for section_key, heading, categories in group_result_sections(snapshot.results):
+        category_context = []
+        for category_heading, rows in categories:
+            row_context = []
+            for row in rows:
+                label, colour = STATUS_STYLES.get(row.limit_status, ('', '#0F172A'))
+                result_value = (row.result_value or '—').strip() or '—'
+                if section_key == 'microbiological' and result_value.lower() == 'present':
+                    colour = '#DC2626'
+                row_context.append({
+                    'serial': serial,
+                    'row': row,
+                    'result_value': result_value,
+                    'status_label': label,
+                    'colour': colour,
+                })
+                serial += 1
+            category_context.append({'heading': category_heading, 'rows': row_context})
+        sections.append({'key': section_key, 'heading': heading, 'categories': category_context})
+
+    branded = options.include_branding
+    malayalam = options.include_malayalam and bool(
+        (snapshot.comments_ml or '').strip() or (snapshot.recommendations_ml or '').strip()
+    )
+    return {
+        'branded': branded,
+        'snapshot': snapshot,
+        'collected_on': _fmt(snapshot.collected_on, '%d %b %Y %H:%M'),
+        'received_at_lab': _fmt(snapshot.received_at_lab, '%d %b %Y %H:%M'),
+        'test_commenced_on': _fmt(snapshot.test_commenced_on, '%d %b %Y'),
+        'test_completed_on': _fmt(snapshot.test_completed_on, '%d %b %Y'),
+        'sections': sections,
+        # Signatories follow the microbiological section, or get their own page.
+        'signatories_inline': any(section['key'] == 'microbiological' for section in sections),
+        'signatories': [_signatory_context(signatory) for signatory in snapshot.signatories],
+        'consultant': _signatory_context(snapshot.consultant) if snapshot.consultant else None,
+        'consultant_role': CONSULTANT_ROLE,
+        'lab_logo_url': _local_file_uri(snapshot.lab.logo_path, 'logo') if branded else None,
+        'remarks': _remarks_context(snapshot.comments, DEFAULT_REMARKS),
+        'recommendations': _remarks_context(snapshot.recommendations, DEFAULT_RECOMMENDATIONS),
+        'malayalam': malayalam,
+        'remarks_ml': (snapshot.comments_ml or '').strip(),
+        'recommendations_ml': (snapshot.recommendations_ml or '').strip(),
+        'remarks_ml_items': bullet_items(snapshot.comments_ml),
+        'recommendations_ml_items': bullet_items(snapshot.recommendations_ml),
+        'font_regular_url': _file_uri(
+            'fonts/NotoSansMalayalam-Regular.ttf', 'static/fonts/NotoSansMalayalam-Regular.ttf'
+        ),
+        'font_bold_url': _file_uri(
+            'fonts/NotoSansMalayalam-Bold.ttf', 'static/fonts/NotoSansMalayalam-Bold.ttf'
+        ),
+        'background_url': _file_uri(
+            'report_templates/biofix_wl_template_page.png',
+            'static/report_templates/biofix_wl_template_page.png',
+            variant='background',
+        ) if branded else None,
+        'watermark_url': _file_uri(
+            'report_templates/biofix_wl_watermark.png',
+            'static/report_templates/biofix_wl_watermark.png',
+            variant='watermark',
+        ) if branded else None,
+    }
+
+
+def build_report_html(snapshot: ReportSnapshot, options: ReportOptions = ReportOptions()) -> str:
+    return render_to_string(REPORT_TEMPLATE, report_html_context(snapshot, options))
+
+
+def build_report_pdf_html(snapshot: ReportSnapshot, options: ReportOptions = ReportOptions()) -> bytes | None:
+    """Render the full bilingual report in one WeasyPrint pass, or ``None`` if WeasyPrint is unusable."""
+    html_string = build_report_html(snapshot, options)
+    base_url = str(settings.BASE_DIR)
+    try:
+        pdf_bytes = render_html_to_pdf(html_string, base_url=base_url)
+    except Exception:
+        logger.exception("The WeasyPrint renderer failed to lay out the report.")
+        return None
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    try:
+        from weasyprint import HTML
+    except Exception:
+        logger.warning("WeasyPrint is unavailable; the single-pass report engine cannot run.", exc_info=True)
+        return None
+    try:
+        return HTML(string=html_string, base_url=base_url).write_pdf()
+    except Exception:
+        logger.exception("Failed to render the report with WeasyPrint.")
+        return None
@@ -0,0 +1,131 @@
+"""Size-capped, recompressed image variants for the PDF builders.
+
+Signatures, the lab logo and the branded letterhead/watermark are usually
+uploaded at scanner or print resolution. The letterhead alone is 2481x3508 RGB,
+and ReportLab decodes, zlib-compresses and ASCII85-encodes it into every
+branded PDF. The builders instead embed a derived variant capped at the
+resolution the report actually prints. The opaque letterhead is stored as JPEG,
+which ReportLab passes through as ``DCTDecode`` without decoding it. The other
+images are stored as optimised PNG so their transparency survives.
+
+Variants are written under ``REPORT_IMAGE_CACHE_DIR``. The name is derived from
+the source path, size and mtime, so replacing an upload yields a new variant
+and stale ones are never served. They are generated when an image is uploaded
+(``CustomUser``/``LabProfile`` save), by ``manage.py optimize_report_images``
+after ``collectstatic``, and lazily on first use otherwise. If a variant cannot
+be produced, callers get the original path back.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ImageVariantSpec:
+    max_size: tuple[int, int]
+    format: str
+
+
+# Caps are the printed size at ~150 dpi for full-page art and ~300 dpi for the
+# small images, which is beyond what office printers resolve.
+VARIANT_SPECS = {
+    'background': ImageVariantSpec(max_size=(1240, 1754), format='JPEG'),
+    'watermark': ImageVariantSpec(max_size=(700, 700), format='PNG'),
+    'logo': ImageVariantSpec(max_size=(560, 220), format='PNG'),
+    'signature': ImageVariantSpec(max_size=(600, 260), format='PNG'),
+}
+JPEG_QUALITY = 85
+
+_variants = {}
+_variants_lock = threading.Lock()
+
+
+def _variant_dir() -> str:
+    base = getattr(settings, 'REPORT_IMAGE_CACHE_DIR', None)
+    if not base:
+        base = os.path.join(tempfile.gettempdir(), 'report_images')
+    return str(base)
+
+
+def _variant_path(source_path: str, kind: str, stat: os.stat_result) -> str:
+    spec = VARIANT_SPECS[kind]
+    digest = hashlib.sha256(
+        f'{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}|{spec}'.encode('utf-8')
+    ).hexdigest()[:24]
+    extension = 'jpg' if spec.format == 'JPEG' else 'png'
+    return os.path.join(_variant_dir(), f'{kind}-{digest}.{extension}')
+
+
+def _write_variant(source_path: str, kind: str, target: str) -> None:
+    from PIL import Image
+
+    spec = VARIANT_SPECS[kind]
+    with Image.open(source_path) as image:
+        image.load()
+        if spec.format == 'JPEG':
+            if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+                # The letterhead is opaque artwork; flatten any alpha onto white.
+                rgba = image.convert('RGBA')
+                image = Image.new('RGB', rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel('A'))
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = image.convert('RGBA')
+        image.thumbnail(spec.max_size, Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f'{target}.{uuid.uuid4().hex}.tmp'
+        try:
+            if spec.format == 'JPEG':
+                image.save(tmp, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=False)
+            else:
+                image.save(tmp, 'PNG', optimize=True)
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def report_image_variant(source_path: str | None, kind: str) -> str | None:
+    """Return the optimised variant of ``source_path`` for ``kind``, creating it if needed.
+
+    Falls back to ``source_path`` when the variant cannot be produced, and
+    returns ``None`` only when there is no usable source file.
+    """
+    if not source_path:
+        return None
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return None
+    key = (source_path, kind, stat.st_size, stat.st_mtime_ns)
+    variant = _variants.get(key)
+    if variant is not None and os.path.exists(variant):
+        return variant
+
+    with _variants_lock:
+        target = _variant_path(source_path, kind, stat)
+        if not os.path.exists(target):
+            try:
+                _write_variant(source_path, kind, target)
+            except Exception:
+                logger.warning("Could not optimise %s image %s; using the original", kind, source_path, exc_info=True)
+                return source_path
+        _variants[key] = target
+    return target
+
+
+def warm_report_image(source_path: str | None, kind: str) -> None:
+    """Generate the variant now (e.g. right after an upload) so no report pays for it."""
+    if source_path and os.path.exists(source_path):
+        report_image_variant(source_path, kind)
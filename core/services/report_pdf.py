@@ -0,0 +1,680 @@
+"""Water quality report PDF builder.
+
+Building a report happens in two steps:
+
+* ``snapshot_from_sample`` reads everything the report shows (sample metadata,
+  ordered results with their limit status, remarks, signatories, lab header)
+  into a frozen ``ReportSnapshot``. This is the only step that touches the
+  database.
+* ``build_report_pdf`` lays the snapshot out with ReportLab, appends the
+  WeasyPrint Malayalam page when there is Malayalam content, and returns the
+  PDF bytes. It needs no request, no ORM access and no Django models, so it can
+  run in a render process or a benchmark just as well as in a view.
+
+``ReportOptions.engine`` selects the layout engine: ``'reportlab'`` (above) or
+``'html'``, which renders the whole bilingual report in one WeasyPrint pass
+(``core.services.report_html``) and falls back to ReportLab when WeasyPrint is
+unavailable.
+"""
+
+import datetime
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from html import escape
+from io import BytesIO
+
+from django.conf import settings
+
+from .ai_remarks import bullet_items, split_bilingual_remarks
+from .malayalam_report import append_pdf_pages, render_malayalam_remarks_pdf
+from .report_images import report_image_variant
+from .report_theme import draw_page_header, get_report_theme
+
+logger = logging.getLogger(__name__)
+
+SIGNATORY_ROLES = (
+    ('chem_manager', 'Chief of Quality - Chemistry'),
+    ('bio_manager', 'Chief of Quality - Microbiology'),
+    ('food_analyst', 'Chief Scientific Officer'),
+)
+CONSULTANT_ROLE = 'Chief of Solutions - Water Quality'
+
+DEFAULT_REMARKS = (
+    "The sample has been analysed in accordance with IS 10500:2012 guidelines. "
+    "Outcomes above include automated compliance status for each parameter."
+)
+DEFAULT_RECOMMENDATIONS = "No consultant recommendations recorded for this sample."
+
+SECTION_HEADINGS = {
+    'physical': 'Physical Parameters',
+    'chemical': 'Chemical Parameters',
+    'microbiological': 'Microbiological Parameters',
+    'other': 'Other Parameters',
+}
+
+# limit_status -> (label shown under the result, result colour)
+STATUS_STYLES = {
+    'WITHIN_LIMITS': ('Within limits', '#0F766E'),
+    'BELOW_LIMIT': ('Below minimum', '#B45309'),
+    'ABOVE_LIMIT': ('Above maximum', '#DC2626'),
+    'NON_NUMERIC': ('', '#0F172A'),
+    'UNKNOWN': ('', '#0F172A'),
+}
+
+# ``reportlab``: ReportLab English report + WeasyPrint Malayalam page merged with pypdf.
+# ``html``: the whole bilingual report laid out by WeasyPrint in a single pass.
+REPORT_ENGINES = ('reportlab', 'html')
+
+
+@dataclass(frozen=True)
+class ReportResultRow:
+    name: str
+    unit: str
+    method: str
+    category_label: str
+    result_value: str
+    limit_text: str
+    limit_status: str | None = None
+
+
+@dataclass(frozen=True)
+class ReportSignatory:
+    name: str
+    role: str
+    signature_path: str = ''
+
+
+@dataclass(frozen=True)
+class ReportLabHeader:
+    name: str
+    address: str = ''
+    contact: str = ''
+    logo_path: str = ''
+    # ``LabProfile.updated_at``; part of the compiled theme's cache key.
+    revision: str = ''
+
+
+@dataclass(frozen=True)
+class ReportSnapshot:
+    display_id: str
+    report_number: str
+    customer_name: str
+    customer_address: str
+    sample_source: str
+    location: str
+    collected_on: datetime.datetime | None = None
+    received_at_lab: datetime.datetime | None = None
+    test_commenced_on: datetime.date | None = None
+    test_completed_on: datetime.date | None = None
+    results: tuple[ReportResultRow, ...] = ()
+    comments: str = ''
+    recommendations: str = ''
+    comments_ml: str = ''
+    recommendations_ml: str = ''
+    signatories: tuple[ReportSignatory, ...] = ()
+    consultant: ReportSignatory | None = None
+    lab: ReportLabHeader = field(default_factory=lambda: ReportLabHeader(name='Biofix Laboratory'))
+
+
+@dataclass(frozen=True)
+class ReportOptions:
+    include_branding: bool = True
+    include_malayalam: bool = True
+    engine: str = 'reportlab'
+
+
+def default_report_engine() -> str:
+    engine = (getattr(settings, 'REPORT_ENGINE', '') or 'reportlab').strip().casefold()
+    return engine if engine in REPORT_ENGINES else 'reportlab'
+
+
+def _section_for_category(label: str) -> str:
+    lowered = label.casefold()
+    if 'physical' in lowered:
+        return 'physical'
+    if 'chemical' in lowered:
+        return 'chemical'
+    if any(token in lowered for token in ('micro', 'bacter', 'pathogen')):
+        return 'microbiological'
+    return 'other'
+
+
+def _labels_redundant(section_heading: str, category_label: str) -> bool:
+    """Treat headings that differ only by filler words as duplicates."""
+    def _canonical(value: str) -> str:
+        tokens = re.findall(r'[a-z0-9]+', value.casefold())
+        filtered = [
+            token for token in tokens
+            if token not in {'parameter', 'parameters', 'category', 'categories'}
+        ]
+        return ' '.join(filtered).strip()
+
+    canonical_heading = _canonical(section_heading)
+    canonical_category = _canonical(category_label)
+    return bool(canonical_heading and canonical_heading == canonical_category)
+
+
+def group_result_sections(results) -> list[tuple[str, str, list[tuple[str, list[ReportResultRow]]]]]:
+    """Group result rows into report sections, in first-seen order.
+
+    Returns ``(section_key, heading, [(category_heading, rows), ...])`` tuples;
+    ``category_heading`` is empty when it would merely repeat the section heading.
+    """
+    sections: OrderedDict[str, OrderedDict[str, list]] = OrderedDict()
+    for row in results:
+        display_label = row.category_label or 'Uncategorized'
+        categories = sections.setdefault(_section_for_category(display_label), OrderedDict())
+        categories.setdefault(display_label, []).append(row)
+
+    grouped = []
+    for section_key, categories in sections.items():
+        heading = SECTION_HEADINGS.get(section_key, SECTION_HEADINGS['other'])
+        grouped.append((
+            section_key,
+            heading,
+            [
+                ('' if _labels_redundant(heading, label.strip()) else label.strip(), rows)
+                for label, rows in categories.items()
+            ],
+        ))
+    return grouped
+
+
+def _format_limits(param) -> str:
+    if getattr(param, 'max_limit_display', None):
+        return param.max_limit_display
+    if param.min_permissible_limit is None and param.max_permissible_limit is None:
+        return '—'
+    if param.min_permissible_limit is None:
+        return f"≤ {param.max_permissible_limit} {param.unit or ''}".strip()
+    if param.max_permissible_limit is None:
+        return f"≥ {param.min_permissible_limit} {param.unit or ''}".strip()
+    return f"{param.min_permissible_limit} – {param.max_permissible_limit} {param.unit or ''}".strip()
+
+
+def _user_name(user) -> str:
+    if not user:
+        return 'Not assigned'
+    full = (user.get_full_name() or '').strip()
+    return full or user.username
+
+
+def _signatory(user, role: str) -> ReportSignatory:
+    return ReportSignatory(
+        name=_user_name(user),
+        role=role,
+        signature_path=(getattr(user, 'signature_path', '') or '') if user else '',
+    )
+
+
+def lab_header_from_profile(profile) -> ReportLabHeader:
+    lab_settings = getattr(settings, 'WATERLAB_SETTINGS', {})
+    lab_name = (profile.name or lab_settings.get('LAB_NAME') or 'Biofix Laboratory').strip()
+    lab_address = (profile.formatted_address or profile.address_line1 or lab_settings.get('LAB_ADDRESS') or '').strip()
+    lab_phone = (profile.phone or lab_settings.get('LAB_PHONE') or '').strip()
+    lab_email = (profile.email or lab_settings.get('LAB_EMAIL') or '').strip()
+    contact_line = profile.contact_line
+    if not contact_line:
+        contact_parts = []
+        if lab_phone:
+            contact_parts.append(f"Phone: {lab_phone}")
+        if lab_email:
+            contact_parts.append(f"Email: {lab_email}")
+        contact_line = '  |  '.join(contact_parts)
+    return ReportLabHeader(
+        name=lab_name or 'Biofix Laboratory',
+        address=lab_address,
+        contact=contact_line or '',
+        logo_path=profile.logo_path or '',
+        revision=profile.updated_at.isoformat() if getattr(profile, 'updated_at', None) else '',
+    )
+
+
+def snapshot_from_sample(sample, *, ai_override=None) -> ReportSnapshot:
+    """Collect everything the report needs from ``sample`` and its relations.
+
+    ``ai_override`` carries ``(comments, recommendations)`` from a finished AI
+    job; when ``None`` the saved consultant review is used.
+    """
+    from core.models import LabProfile
+    from core.views_common import _choose_signer_with_signature
+
+    customer = sample.customer
+    location = (
+        sample.sampling_location
+        or getattr(customer, 'village_town_city', '') or getattr(customer, 'street_locality_landmark', '')
+        or getattr(customer, 'district', '')
+        or 'N/A'
+    )
+
+    results = sample.results.select_related('parameter', 'parameter__category_obj').order_by(
+        'parameter__display_order',
+        'parameter__name',
+    )
+    rows = []
+    for result in results:
+        param = result.parameter
+        rows.append(ReportResultRow(
+            name=param.name or '',
+            unit=param.unit or '',
+            method=param.method or '',
+            category_label=(getattr(param, 'category_label', '') or '').strip() or 'Uncategorized',
+            result_value=result.result_value or '',
+            limit_text=_format_limits(param),
+            limit_status=result.get_limit_status(),
+        ))
+
+    review = getattr(sample, 'review', None)
+    comments_text = ''
+    recommendations_text = ''
+    if ai_override is not None:
+        # AI text produced by the background job (already English + Malayalam combined).
+        comments_text, recommendations_text = ai_override
+    elif review:
+        recommendations_text = (review.recommendations or '').strip()
+        comments_text = (review.comments or '').strip()
+
+    # The AI draft stores English and Malayalam together. Keep only English on the
+    # main (ReportLab) report and carry the Malayalam onto a separate WeasyPrint page,
+    # since ReportLab cannot shape Malayalam script.
+    comments_text, comments_ml = split_bilingual_remarks(comments_text)
+    recommendations_text, recommendations_ml = split_bilingual_remarks(recommendations_text)
+
+    profile = LabProfile.get_active()
+    signatories = sample.resolve_signatories(profile=profile)
+    consultant_user = _choose_signer_with_signature(
+        review.reviewer if review else None,
+        signatories.get('solutions_manager'),
+    )
+
+    return ReportSnapshot(
+        display_id=sample.display_id or '',
+        report_number=sample.report_number_with_revision,
+        customer_name=customer.name or '',
+        customer_address=customer.address or '',
+        sample_source=sample.get_sample_source_display() or '',
+        location=location,
+        collected_on=sample.collection_datetime,
+        received_at_lab=sample.date_received_at_lab,
+        test_commenced_on=sample.test_commenced_on,
+        test_completed_on=sample.test_completed_on,
+        results=tuple(rows),
+        comments=comments_text,
+        recommendations=recommendations_text,
+        comments_ml=comments_ml,
+        recommendations_ml=recommendations_ml,
+        signatories=tuple(_signatory(signatories.get(key), role) for key, role in SIGNATORY_ROLES),
+        consultant=_signatory(consultant_user, CONSULTANT_ROLE) if consultant_user else None,
+        lab=lab_header_from_profile(profile),
+    )
+
+
+def build_report_pdf(snapshot: ReportSnapshot, options: ReportOptions = ReportOptions()) -> bytes:
+    """Lay out ``snapshot`` as the water quality report and return the PDF bytes."""
+    if options.engine == 'html':
+        from .report_html import build_report_pdf_html
+
+        pdf_bytes = build_report_pdf_html(snapshot, options)
+        if pdf_bytes is not None:
+            return pdf_bytes
+        logger.warning("Single-pass HTML report engine unavailable; using the ReportLab engine.")
+
+    include_branding = options.include_branding
+    theme = get_report_theme(include_branding, snapshot.lab)
+
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import (
+        BaseDocTemplate,
+        Frame,
+        Image,
+        ListFlowable,
+        ListItem,
+        PageBreak,
+        PageTemplate,
+        Paragraph,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
+    buffer = BytesIO()
+    body_font_bold = theme.body_font_bold
+    footer_style = theme.footer_style
+
+    class ReportDocTemplate(BaseDocTemplate):
+        def __init__(self, filename, include_branding=True, **kwargs):
+            self.include_branding = include_branding
+            super().__init__(filename, **kwargs)
+            self.addPageTemplates([
+                PageTemplate(
+                    id='ReportPage',
+                    frames=[Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='main_frame')],
+                    onPage=self._maybe_header,
+                    onPageEnd=self._maybe_footer,
+                )
+            ])
+
+        def _maybe_header(self, canvas, doc):
+            if self.include_branding:
+                draw_page_header(canvas, doc, theme)
+
+        def _maybe_footer(self, canvas, doc):
+            if self.include_branding:
+                self.footer(canvas, doc)
+
+        def footer(self, canvas, doc):
+            canvas.saveState()
+            footer_text = f"Page {doc.page} | Report ID: {snapshot.display_id}"
+            p = Paragraph(footer_text, footer_style)
+            p.wrapOn(canvas, doc.width, doc.bottomMargin)
+            p.drawOn(canvas, doc.leftMargin, 4 * mm)
+            canvas.restoreState()
+
+    doc = ReportDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=18 * mm,
+        leftMargin=18 * mm,
+        topMargin=theme.top_margin_mm * mm,
+        bottomMargin=theme.bottom_margin_mm * mm,
+        include_branding=include_branding,
+    )
+
+    palette = theme.palette
+    surface = palette['surface']
+    primary = palette['primary']
+    text_color = palette['text']
+    grid_color = palette['grid']
+    row_alt_color = palette['row_alt']
+    styles = theme.styles
+
+    elements = []
+    elements.append(Paragraph("WATER QUALITY ANALYSIS REPORT", styles['ReportTitle']))
+
+    def _safe_text(value, default='N/A', preserve_breaks: bool = False) -> str:
+        """Escape user-provided text before injecting into Paragraph markup."""
+        text = ''
+        if value is not None:
+            text = str(value).strip()
+        if not text:
+            text = default
+        text = escape(text)
+        if preserve_breaks:
+            text = text.replace('\n', '<br/>')
+        return text
+
+    def _fmt(value, pattern):
+        return value.strftime(pattern) if value else ''
+
+    meta_rows = [
+        [Paragraph('<b>Sample Code</b>', styles['Label']), Paragraph(_safe_text(snapshot.display_id, 'N/A'), styles['Value']),
+         Paragraph('<b>Report Number</b>', styles['Label']), Paragraph(_safe_text(snapshot.report_number, 'N/A'), styles['Value'])],
+        [Paragraph('<b>Customer</b>', styles['Label']), Paragraph(_safe_text(snapshot.customer_name, 'N/A'), styles['Value']),
+         Paragraph('<b>Collected On</b>', styles['Label']), Paragraph(_safe_text(_fmt(snapshot.collected_on, '%d %b %Y %H:%M'), 'N/A'), styles['Value'])],
+        [Paragraph('<b>Sample Source</b>', styles['Label']), Paragraph(_safe_text(snapshot.sample_source, 'N/A'), styles['Value']),
+         Paragraph('<b>Location</b>', styles['Label']), Paragraph(_safe_text(snapshot.location, 'N/A'), styles['Value'])],
+        [Paragraph('<b>Received At Lab</b>', styles['Label']), Paragraph(_safe_text(_fmt(snapshot.received_at_lab, '%d %b %Y %H:%M'), 'N/A'), styles['Value']),
+         Paragraph('<b>Test Commenced</b>', styles['Label']), Paragraph(_safe_text(_fmt(snapshot.test_commenced_on, '%d %b %Y'), 'N/A'), styles['Value'])],
+        [Paragraph('<b>Test Completed</b>', styles['Label']), Paragraph(_safe_text(_fmt(snapshot.test_completed_on, '%d %b %Y'), 'N/A'), styles['Value']), '', ''],
+    ]
+    last_meta_row_index = len(meta_rows) - 1
+    meta_table = Table(meta_rows, colWidths=[32 * mm, 55 * mm, 32 * mm, doc.width - 119 * mm])
+    meta_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), surface),
+        ('BOX', (0, 0), (-1, -1), 0.75, grid_color),
+        ('INNERGRID', (0, 0), (-1, -1), 0.25, grid_color),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('SPAN', (1, last_meta_row_index), (3, last_meta_row_index)),
+    ]))
+    elements.append(meta_table)
+    elements.append(Spacer(1, 8))
+
+    address_table = Table([
+        [Paragraph('<b>Customer Address</b>', styles['Label'])],
+        [Paragraph(_safe_text(snapshot.customer_address, 'N/A', preserve_breaks=True), styles['Value'])],
+    ], colWidths=[doc.width])
+    address_table.setStyle(TableStyle([
+        ('BOX', (0, 0), (-1, -1), 0.75, grid_color),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('BACKGROUND', (0, 0), (-1, -1), surface),
+    ]))
+    elements.append(address_table)
+    elements.append(Spacer(1, 8))
+
+    elements.append(Paragraph("TEST REPORTS", styles['SectionTitle']))
+    elements.append(Spacer(1, 3))
+
+    available_width = doc.width
+    column_widths = [
+        available_width * 0.07,
+        available_width * 0.28,
+        available_width * 0.11,
+        available_width * 0.20,
+        available_width * 0.18,
+        available_width * 0.16,
+    ]
+
+    def _build_results_table(category_rows, start_index, section_key: str):
+        header = [
+            Paragraph('Sl. No', styles['TableHead']),
+            Paragraph('Parameter', styles['TableHead']),
+            Paragraph('Unit', styles['TableHead']),
+            Paragraph('Method', styles['TableHead']),
+            Paragraph('Results', styles['TableHead']),
+            Paragraph('Limit', styles['TableHead']),
+        ]
+        table_data = [header]
+
+        running_index = start_index
+        for row in category_rows:
+            label_text, label_color = STATUS_STYLES.get(row.limit_status, ('', '#0F172A'))
+            result_value = (row.result_value or '—').strip() or '—'
+            colour = label_color or '#0F172A'
+            if section_key == 'microbiological' and result_value.lower() == 'present':
+                colour = '#DC2626'
+            result_label = f'<font color="{colour}">{escape(result_value)}</font>'
+            if label_text:
+                result_label += f'<br/><font size="8" color="#6B7280">{escape(label_text)}</font>'
+
+            table_data.append([
+                Paragraph(str(running_index), styles['TableCell']),
+                Paragraph(_safe_text(row.name, '—'), styles['TableCell']),
+                Paragraph(_safe_text(row.unit, '—'), styles['TableCell']),
+                Paragraph(_safe_text(row.method, '—'), styles['TableCell']),
+                Paragraph(result_label, styles['TableCell']),
+                Paragraph(_safe_text(row.limit_text, '—'), styles['TableCell']),
+            ])
+            running_index += 1
+
+        table = Table(table_data, colWidths=column_widths, repeatRows=1)
+        header_padding = 5 if include_branding else 6
+        body_padding = 4 if include_branding else 6
+        table_style = [
+            ('FONTNAME', (0, 0), (-1, 0), body_font_bold),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('GRID', (0, 0), (-1, -1), 0.4, grid_color),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, 0), header_padding),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), header_padding),
+            ('TOPPADDING', (0, 1), (-1, -1), body_padding),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), body_padding),
+        ]
+        if include_branding:
+            table_style.extend([
+                ('BACKGROUND', (0, 0), (-1, 0), primary),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), (colors.white, row_alt_color)),
+            ])
+        else:
+            table_style.append(('LINEBELOW', (0, 0), (-1, 0), 0.5, grid_color))
+        table.setStyle(TableStyle(table_style))
+        return table, running_index
+
+    def _render_section(section_key: str, heading: str, categories, serial_counter: int):
+        elements.append(Paragraph(heading, styles['SectionTitle']))
+        elements.append(Spacer(1, 6))
+        for category_heading, category_rows in categories:
+            if category_heading:
+                elements.append(Paragraph(_safe_text(category_heading, ''), styles['CategoryHeading']))
+            table, serial_counter = _build_results_table(category_rows, serial_counter, section_key)
+            elements.append(table)
+            elements.append(Spacer(1, 10))
+        return serial_counter
+
+    def _signature_cell(signatory: ReportSignatory):
+        cell = []
+        signature_path = (signatory.signature_path or '').strip()
+        if signature_path:
+            try:
+                signature_img = Image(report_image_variant(signature_path, 'signature') or signature_path)
+                signature_img._restrictSize(48 * mm, 20 * mm)
+            except Exception:
+                logger.warning(
+                    "Unable to load signature image for %s",
+                    signatory.name,
+                    exc_info=settings.DEBUG,
+                )
+            else:
+                cell.append(signature_img)
+                cell.append(Spacer(1, 4))
+        safe_name = _safe_text(signatory.name, 'Not assigned')
+        safe_role = _safe_text(signatory.role, '')
+        cell.append(Paragraph(f"<b>{safe_name}</b><br/>{safe_role}", styles['Center']))
+        if len(cell) == 1:
+            return cell[0]
+        inner = Table([[el] for el in cell], colWidths=[52 * mm])
+        inner.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+        ]))
+        return inner
+
+    def _append_signatories_section():
+        """Render the authorised signatories row."""
+        elements.append(Paragraph("AUTHORISED SIGNATORIES", styles['SectionTitle']))
+        cells = [_signature_cell(signatory) for signatory in snapshot.signatories]
+        if not cells:
+            cells = ['', '', '']
+        while len(cells) < 3:
+            cells.append('')
+        sign_table = Table(
+            [cells[:3]],
+            colWidths=[(doc.width / 3.0) - 6] * 3,
+            rowHeights=[40 * mm],
+            hAlign='CENTER',
+        )
+        sign_table.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ]))
+        elements.append(sign_table)
+        elements.append(Spacer(1, 12))
+
+    def _append_consultant_signature_section():
+        """Render the consultant sign-off below remarks."""
+        if snapshot.consultant:
+            consultant_cell = _signature_cell(snapshot.consultant)
+            table = Table([[consultant_cell]], colWidths=[58 * mm])
+            table.hAlign = 'RIGHT'
+            table.setStyle(TableStyle([
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ]))
+            elements.append(table)
+            elements.append(Spacer(1, 18))
+        else:
+            elements.append(
+                Paragraph(
+                    f"{_safe_text(CONSULTANT_ROLE, CONSULTANT_ROLE)}: Not assigned",
+                    styles['Normal'],
+                )
+            )
+            elements.append(Spacer(1, 12))
+
+    serial_counter = 1
+    sign_section_inserted = False
+    for index, (section_key, heading, categories) in enumerate(group_result_sections(snapshot.results)):
+        if index > 0:
+            elements.append(PageBreak())
+        serial_counter = _render_section(section_key, heading, categories, serial_counter)
+        if not sign_section_inserted and section_key == 'microbiological':
+            _append_signatories_section()
+            sign_section_inserted = True
+
+    if not sign_section_inserted:
+        if elements and not isinstance(elements[-1], PageBreak):
+            elements.append(PageBreak())
+        _append_signatories_section()
+
+    elements.append(PageBreak())
+
+    def _remarks_flowables(text, fallback):
+        """Render remark text as a bullet list when it has multiple points."""
+        items = bullet_items(text)
+        if len(items) >= 2:
+            return [ListFlowable(
+                [ListItem(
+                    Paragraph(_safe_text(item, preserve_breaks=True), styles['Normal']),
+                    leftIndent=12,
+                    value=None,
+                ) for item in items],
+                bulletType='bullet',
+                bulletColor=text_color,
+                bulletFontSize=6,
+                leftIndent=14,
+                spaceBefore=1,
+            )]
+        if (text or '').strip():
+            return [Paragraph(_safe_text(text, preserve_breaks=True), styles['Normal'])]
+        return [Paragraph(fallback, styles['Normal'])]
+
+    elements.append(Paragraph("REMARKS", styles['SectionTitle']))
+    elements.extend(_remarks_flowables(snapshot.comments, DEFAULT_REMARKS))
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Consultant Recommendations", styles['SectionTitle']))
+    elements.extend(_remarks_flowables(snapshot.recommendations, DEFAULT_RECOMMENDATIONS))
+    elements.append(Spacer(1, 18))
+    _append_consultant_signature_section()
+
+    doc.build(elements)
+    pdf_bytes = buffer.getvalue()
+
+    if not options.include_malayalam:
+        return pdf_bytes
+
+    # Append a Malayalam-language remarks page (rendered with WeasyPrint for correct
+    # script shaping). Degrades gracefully to English-only if WeasyPrint is unavailable.
+    malayalam_pdf = render_malayalam_remarks_pdf(
+        sample_code=snapshot.display_id,
+        report_number=snapshot.report_number,
+        customer_name=snapshot.customer_name,
+        remarks_ml=snapshot.comments_ml,
+        recommendations_ml=snapshot.recommendations_ml,
+        branded=include_branding,
+    )
+    if malayalam_pdf:
+        pdf_bytes = append_pdf_pages(pdf_bytes, malayalam_pdf)
+
+    return pdf_bytes
@@ -0,0 +1,282 @@
+"""Compiled, per-process report theme (styles, palette, branding images, header).
+
+Everything on a report page that does not depend on the page's content -- the
+ReportLab stylesheet, palette, optimised background/watermark/logo images (see
+``core.services.report_images``), watermark geometry and the lab header lines --
+is resolved once per process and reused by every render. ``build_report_pdf`` draws the page header as a single
+form XObject per document, so page callbacks only issue drawing operators and a
+long report scales with its content rather than with per-page setup.
+
+Themes are keyed by the branding flag and the ``ReportLabHeader`` of the
+snapshot, which carries ``LabProfile.updated_at``. Saving the lab profile
+therefore produces a new key and the stale theme is dropped on the next render.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+from django.contrib.staticfiles import finders
+from reportlab.lib.utils import ImageReader
+
+from .report_images import report_image_variant
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_TEMPLATE = 'report_templates/biofix_wl_template_page.png'
+WATERMARK_IMAGE = 'report_templates/biofix_wl_watermark.png'
+WATERMARK_ALPHA = 0.22
+
+_themes = {}
+_themes_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ReportTheme:
+    include_branding: bool
+    body_font: str
+    body_font_bold: str
+    palette: dict
+    styles: object
+    footer_style: object
+    top_margin_mm: int
+    bottom_margin_mm: int
+    # Path of the JPEG letterhead variant: ReportLab embeds JPEG files without decoding them.
+    background: str | None = None
+    watermark: ImageReader | None = None
+    watermark_box: tuple | None = None
+    logo: ImageReader | None = None
+    header_lines: tuple = ()
+
+
+def _image_source(kind: str, static_path: str | None = None, file_path: str | None = None) -> str | None:
+    path = finders.find(static_path) if static_path else file_path
+    if not path or not os.path.exists(path):
+        return None
+    return report_image_variant(path, kind)
+
+
+def _load_image(kind: str, static_path: str | None = None, file_path: str | None = None) -> ImageReader | None:
+    path = _image_source(kind, static_path, file_path)
+    if not path:
+        return None
+    try:
+        reader = ImageReader(path)
+        # Decode now so concurrent renders share the pixel data instead of racing to build it.
+        reader.getRGBData()
+        if reader._dataA is not None:
+            reader._dataA.getRGBData()
+        return reader
+    except Exception:
+        logger.warning("Failed to load report image from %s", path)
+        return None
+
+
+def _watermark_box(watermark: ImageReader, page_size) -> tuple:
+    from reportlab.lib.units import mm
+
+    page_width, page_height = page_size
+    wm_width, wm_height = watermark.getSize()
+    target_width = page_width * 0.55
+    target_height = wm_height * (target_width / wm_width)
+    wm_x = (page_width - target_width) / 2
+    wm_y = (page_height - target_height) / 2 - 10 * mm
+    return wm_x, wm_y, target_width, target_height
+
+
+def _build_styles(palette: dict, include_branding: bool, body_font: str, body_font_bold: str):
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    text_color = palette['text']
+    header_text_color = colors.white if include_branding else text_color
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='Center', alignment=TA_CENTER, fontName=body_font))
+    styles.add(ParagraphStyle(name='Right', alignment=TA_RIGHT, fontName=body_font))
+    styles.add(ParagraphStyle(name='Left', alignment=TA_LEFT, fontName=body_font))
+    styles.add(ParagraphStyle(
+        name='ReportTitle',
+        parent=styles['h1'],
+        alignment=TA_CENTER,
+        spaceAfter=12,
+        fontSize=18,
+        fontName=body_font_bold,
+    ))
+    styles.add(ParagraphStyle(
+        name='SectionTitle',
+        parent=styles['h2'],
+        spaceAfter=10,
+        fontSize=12,
+        leading=14,
+        fontName=body_font_bold,
+    ))
+    styles.add(ParagraphStyle(name='Label', parent=styles['Normal'], fontName=body_font_bold, fontSize=9, textColor=palette['muted']))
+    styles.add(ParagraphStyle(name='Value', parent=styles['Normal'], fontName=body_font, fontSize=10, textColor=text_color))
+    styles.add(ParagraphStyle(name='TableHead', parent=styles['Normal'], fontName=body_font_bold, alignment=TA_CENTER, textColor=header_text_color, fontSize=9))
+    styles.add(ParagraphStyle(name='TableCell', parent=styles['Normal'], fontName=body_font, alignment=TA_LEFT, leading=12, fontSize=9))
+
+    styles.add(ParagraphStyle(
+        name='CategoryHeading',
+        parent=styles['Normal'],
+        fontName=body_font_bold,
+        fontSize=11,
+        textColor=text_color,
+        spaceBefore=10,
+        spaceAfter=6,
+    ))
+
+    styles['ReportTitle'].textColor = palette['primary']
+    styles['SectionTitle'].textColor = palette['primary']
+    styles['Normal'].textColor = text_color
+    styles['Normal'].fontName = body_font
+    return styles
+
+
+def compile_report_theme(include_branding: bool, lab) -> ReportTheme:
+    """Resolve every page-invariant piece of the report layout for ``lab``."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    # The main ReportLab report is rendered in English. The bundled
+    # ``NotoSansMalayalam`` font contains only Malayalam glyphs, digits and
+    # punctuation -- it has NO Latin letters -- so using it as the body font
+    # turns every English letter into a .notdef box. Any Malayalam content is
+    # rendered on the separate WeasyPrint page instead, so the main report uses
+    # Helvetica, which covers Latin correctly.
+    body_font, body_font_bold = 'Helvetica', 'Helvetica-Bold'
+
+    palette = {
+        'surface': colors.HexColor('#F8FAFC') if include_branding else colors.white,
+        'primary': colors.HexColor('#3BBCA3') if include_branding else colors.black,
+        'text': colors.HexColor('#0F172A') if include_branding else colors.black,
+        'muted': colors.HexColor('#6B7280') if include_branding else colors.HexColor('#1F2937'),
+        'grid': colors.HexColor('#E2E8F0') if include_branding else colors.HexColor('#9CA3AF'),
+        'row_alt': colors.HexColor('#ECFFFA') if include_branding else colors.white,
+    }
+
+    background = watermark = watermark_box = logo = None
+    header_lines = ()
+    if include_branding:
+        background = _image_source('background', BACKGROUND_TEMPLATE)
+        if background is not None:
+            watermark = _load_image('watermark', WATERMARK_IMAGE)
+            if watermark is not None:
+                watermark_box = _watermark_box(watermark, A4)
+        else:
+            # Without the letterhead artwork the header falls back to logo + lab details.
+            logo = _load_image('logo', file_path=lab.logo_path) if lab.logo_path else None
+            header_lines = tuple(
+                (text, font, size)
+                for text, font, size in (
+                    (lab.name or 'Biofix Laboratory', body_font_bold, 11),
+                    (lab.address, body_font, 9),
+                    (lab.contact, body_font, 9),
+                )
+                if (text or '').strip()
+            )
+
+    return ReportTheme(
+        include_branding=include_branding,
+        body_font=body_font,
+        body_font_bold=body_font_bold,
+        palette=palette,
+        styles=_build_styles(palette, include_branding, body_font, body_font_bold),
+        footer_style=getSampleStyleSheet()['Normal'],
+        top_margin_mm=54 if include_branding else 50,
+        bottom_margin_mm=34 if include_branding else 30,
+        background=background,
+        watermark=watermark,
+        watermark_box=watermark_box,
+        logo=logo,
+        header_lines=header_lines,
+    )
+
+
+def get_report_theme(include_branding: bool, lab) -> ReportTheme:
+    """Return the cached theme for this branding flag and lab header, compiling it on a miss."""
+    key = (bool(include_branding), lab)
+    theme = _themes.get(key)
+    if theme is not None:
+        return theme
+    with _themes_lock:
+        theme = _themes.get(key)
+        if theme is None:
+            theme = compile_report_theme(include_branding, lab)
+            # A new lab header (e.g. after a profile edit) supersedes the old theme.
+            for stale in [k for k in _themes if k[0] == key[0]]:
+                del _themes[stale]
+            _themes[key] = theme
+    return theme
+
+
+def clear_report_themes() -> None:
+    with _themes_lock:
+        _themes.clear()
+
+
+def draw_page_header(canvas, doc, theme: ReportTheme) -> None:
+    """Draw the page-invariant header, defining it as a form on the document's first page."""
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+
+    form_name = 'ReportPageHeader'
+    if not getattr(doc, '_header_form_defined', False):
+        page_width, page_height = doc.pagesize
+        canvas.beginForm(form_name)
+        canvas.saveState()
+        if theme.background is not None:
+            canvas.drawImage(
+                theme.background,
+                0,
+                0,
+                width=page_width,
+                height=page_height,
+                preserveAspectRatio=True,
+                mask='auto',
+            )
+            if theme.watermark is not None:
+                wm_x, wm_y, wm_width, wm_height = theme.watermark_box
+                canvas.saveState()
+                try:
+                    canvas.setFillAlpha(WATERMARK_ALPHA)
+                except AttributeError:
+                    pass
+                canvas.drawImage(
+                    theme.watermark,
+                    wm_x,
+                    wm_y,
+                    width=wm_width,
+                    height=wm_height,
+                    mask='auto',
+                    preserveAspectRatio=True,
+                )
+                canvas.restoreState()
+        else:
+            if theme.logo is not None:
+                canvas.drawImage(
+                    theme.logo,
+                    doc.leftMargin,
+                    page_height - 38 * mm,
+                    width=45 * mm,
+                    height=17 * mm,
+                    preserveAspectRatio=True,
+                    mask='auto',
+                )
+            draw_x = page_width - doc.rightMargin
+            cursor_y = page_height - 28 * mm
+            canvas.setFillColor(colors.HexColor('#0F172A'))
+            for text, font_name, font_size in theme.header_lines:
+                try:
+                    canvas.setFont(font_name, font_size)
+                except Exception:
+                    canvas.setFont('Helvetica', font_size)
+                canvas.drawRightString(draw_x, cursor_y, text.strip())
+                cursor_y -= 4 * mm
+        canvas.restoreState()
+        canvas.endForm()
+        doc._header_form_defined = True
+    canvas.doForm(form_name)
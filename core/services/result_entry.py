@@ -0,0 +1,182 @@
+"""Bulk write path for entering a sample's test results.
+
+Result entry used to run ``full_clean()``, ``save()`` and
+``AuditTrail.log_change`` for each parameter. A 40-parameter panel cost well
+over 100 queries while the sample's rows were locked. ``save_result_entries``
+validates every row in memory first. It then writes the whole panel with one
+``bulk_create`` for new results, one ``bulk_update`` for changed ones and one
+bulk insert of audit rows. The number of round-trips does not depend on the
+panel size. ``write_results`` is the multi-sample form used by the CSV import
+and the parameter batch entry screen, which then move their samples along with
+``advance_sample_statuses``.
+
+``bulk_create``/``bulk_update`` bypass ``TestResult.save``, so the stored
+``numeric_value``/``limit_status`` columns are filled in here with
+``refresh_limit_fields``.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+
+from core.models import AuditTrail, Sample, TestResult
+from core.services.result_overrides import pinned_status_overrides
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FIELDS = ('result_value', 'observation', 'remarks')
+# FK fields are checked by the caller (they come from already-loaded objects),
+# so validation never needs a query per row.
+_CLEAN_EXCLUDE = ('sample', 'parameter', 'technician')
+
+
+@dataclass
+class ResultEntry:
+    """One submitted row: ``values`` holds the entry fields, ``audit_values`` what gets logged."""
+
+    parameter: object
+    values: dict
+    audit_values: dict | None = None
+
+
+@dataclass
+class ResultWriteSummary:
+    created: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    unchanged: int = 0
+    # (row key, parameter name, messages) for rows skipped with collect_errors=True.
+    errors: list = field(default_factory=list)
+
+
+def _check_technician(user) -> None:
+    # Same rule as TestResult.clean, evaluated once for the whole batch.
+    if user is not None and not user.is_lab_tech() and not user.is_admin():
+        raise ValidationError("Only lab technicians and admins can enter test results.")
+
+
+def write_results(rows, *, user, existing: dict, request=None, collect_errors: bool = False) -> ResultWriteSummary:
+    """Create or update results for many samples in a constant number of queries.
+
+    ``rows`` yields ``(sample, ResultEntry, row key)``. ``existing`` maps
+    ``(sample pk, parameter pk)`` to the current ``TestResult`` rows; callers
+    should load it with ``select_for_update()`` inside the transaction. It is
+    updated with the rows created here.
+
+    Rows whose values do not change are left alone and are not audited. Invalid
+    rows raise ``ValidationError`` (listing every failing parameter) before
+    anything is written. With ``collect_errors`` they are reported in
+    ``summary.errors`` instead, and the valid rows are still saved.
+    """
+    _check_technician(user)
+
+    summary = ResultWriteSummary()
+    to_create = []
+    to_update = []
+    audit_rows = []
+
+    with pinned_status_overrides():
+        for sample, entry, row_key in rows:
+            parameter = entry.parameter
+            values = {name: entry.values.get(name) for name in ENTRY_FIELDS}
+            result = existing.get((sample.pk, parameter.pk))
+            if result is None:
+                result = TestResult(sample=sample, parameter=parameter, technician=user, **values)
+                old_values = None
+            else:
+                old_values = {name: getattr(result, name) for name in ENTRY_FIELDS}
+                if all((old_values[name] or '') == (values[name] or '') for name in ENTRY_FIELDS):
+                    summary.unchanged += 1
+                    continue
+                # Reuse the loaded objects so __str__ (audit repr) and limit
+                # evaluation need no per-row queries.
+                result.sample = sample
+                result.parameter = parameter
+                for name, value in values.items():
+                    setattr(result, name, value)
+
+            try:
+                result.clean_fields(exclude=_CLEAN_EXCLUDE)
+            except ValidationError as exc:
+                summary.errors.append((row_key, parameter.name, exc.messages))
+                continue
+            result.refresh_limit_fields()
+
+            if old_values is None:
+                # Guard against the same sample/parameter appearing twice in one batch.
+                existing[(sample.pk, parameter.pk)] = result
+                to_create.append((result, entry))
+            else:
+                to_update.append((result, entry, old_values))
+
+    if summary.errors and not collect_errors:
+        raise ValidationError({name: messages for _, name, messages in summary.errors})
+
+    if to_create:
+        TestResult.objects.bulk_create([result for result, _ in to_create])
+    if to_update:
+        TestResult.objects.bulk_update(
+            list({id(result): result for result, _, _ in to_update}.values()),
+            [*ENTRY_FIELDS, 'numeric_value', 'limit_status'],
+        )
+
+    for result, entry in to_create:
+        summary.created.append(result)
+        audit_rows.append(AuditTrail.build_entry(user, 'CREATE', result, request=request))
+    for result, entry, old_values in to_update:
+        summary.updated.append(result)
+        audit_rows.append(AuditTrail.build_entry(
+            user,
+            'UPDATE',
+            result,
+            old_values=old_values,
+            new_values=entry.audit_values if entry.audit_values is not None else entry.values,
+            request=request,
+        ))
+    if audit_rows:
+        AuditTrail.log_changes(audit_rows)
+    return summary
+
+
+def save_result_entries(sample, entries, *, user, request=None, existing=None) -> ResultWriteSummary:
+    """Create or update one sample's ``entries`` (see ``write_results``).
+
+    ``existing`` maps parameter id to the sample's current, locked ``TestResult`` rows.
+    """
+    if existing is None:
+        existing = {
+            result.parameter_id: result
+            for result in TestResult.objects.select_for_update().filter(sample=sample)
+        }
+    keyed = {(sample.pk, parameter_id): result for parameter_id, result in existing.items()}
+    summary = write_results(
+        ((sample, entry, entry.parameter.pk) for entry in entries),
+        user=user,
+        existing=keyed,
+        request=request,
+    )
+    for result in summary.created:
+        existing[result.parameter_id] = result
+    return summary
+
+
+def advance_sample_statuses(samples, *, user, request=None) -> list:
+    """Start testing on ``SENT_TO_LAB`` samples and complete those with every result.
+
+    Both transitions are bulk writes (see ``Sample.bulk_update_status``).
+    Returns the samples moved to ``RESULTS_ENTERED``.
+    """
+    samples = list(samples)
+    Sample.bulk_update_status(
+        [sample for sample in samples if sample.current_status == 'SENT_TO_LAB'],
+        'TESTING_IN_PROGRESS',
+        user,
+        request=request,
+    )
+    return Sample.bulk_update_status(
+        [sample for sample in samples if sample.current_status == 'TESTING_IN_PROGRESS'],
+        'RESULTS_ENTERED',
+        user,
+        request=request,
+        skip_incomplete=True,
+    )
@@ -0,0 +1,343 @@
+"""Streaming import of analyser/CSV result exports.
+
+pH, TDS and EC meters and the spectrophotometer export a CSV per run that
+covers many samples. ``import_results`` reads such a file row by row, never
+holding it in memory, and writes the results in chunks. Each chunk is one
+transaction: one query resolves its samples, one locks their existing
+results, and ``write_results`` does the bulk insert/update and bulk audit
+insert. Problems are collected per row instead of aborting the run.
+
+Two layouts are accepted:
+
+* wide: a sample column followed by one column per parameter
+  (``Sample ID, pH, TDS (mg/L), ...``);
+* long: ``Sample ID, Parameter, Value`` with optional ``Observation`` and
+  ``Remarks`` columns.
+
+Rows are matched to samples by ``display_id``, or by ``customer_code`` when the
+customer has exactly one sample open for result entry. Parameter headers are
+matched by name or alias, ignoring case, punctuation and a trailing
+``(unit)``. Extra aliases come from ``RESULT_IMPORT_PARAMETER_ALIASES``.
+"""
+
+import csv
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+
+from core.models import Sample, TestParameter, TestResult
+from core.services.result_entry import ResultEntry, advance_sample_statuses, write_results
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+ENTRY_STATUSES = ('SENT_TO_LAB', 'TESTING_IN_PROGRESS', 'RESULTS_ENTERED')
+
+SAMPLE_HEADERS = {'sample', 'sample id', 'sampleid', 'sample no', 'sample number', 'display id', 'lab id'}
+CUSTOMER_HEADERS = {'customer code', 'customer id', 'customer'}
+PARAMETER_HEADERS = {'parameter', 'test', 'analyte'}
+VALUE_HEADERS = {'value', 'result', 'reading'}
+OBSERVATION_HEADERS = {'observation', 'observations'}
+REMARKS_HEADERS = {'remarks', 'remark', 'comment', 'comments'}
+# Names analysers commonly print for the standard parameters (see services/parameters.py).
+DEFAULT_PARAMETER_ALIASES = {
+    'tds': 'Total Dissolved Solids',
+    'ph value': 'pH',
+    'hardness': 'Total Hardness',
+    'total hardness as caco3': 'Total Hardness',
+    'alkalinity': 'Total Alkalinity',
+    'chloride': 'Chlorides',
+    'frc': 'Residual Chlorine',
+    'free residual chlorine': 'Residual Chlorine',
+    'coliform': 'Total Coliform',
+    'ecoli': 'E. Coli',
+}
+
+_UNIT_SUFFIX = re.compile(r'[\(\[][^\)\]]*[\)\]]\s*$')
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+class ResultImportError(Exception):
+    """The file as a whole cannot be imported (e.g. no usable header)."""
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    sample: str
+    parameter: str
+    message: str
+
+
+@dataclass
+class ImportSummary:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    samples: set = field(default_factory=set)
+    completed_samples: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+    ignored_columns: list = field(default_factory=list)
+
+    def add_error(self, line, sample, parameter, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line, sample or '', parameter or '', message))
+
+
+@dataclass
+class _Cell:
+    line: int
+    sample_ref: str
+    customer_ref: str
+    parameter: TestParameter
+    values: dict
+
+
+def header_key(text) -> str:
+    """Normalise a column header or parameter name for matching."""
+    text = _UNIT_SUFFIX.sub('', (text or '').strip().casefold())
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def parameter_lookup() -> dict:
+    """``{header key: TestParameter}`` covering names, bracketed short names and aliases."""
+    parameters = list(TestParameter.objects.all())
+    by_name = {}
+    for parameter in parameters:
+        by_name.setdefault(header_key(parameter.name), parameter)
+    lookup = dict(by_name)
+    for parameter in parameters:
+        # "Total Dissolved Solids (TDS)" also answers to "TDS".
+        bracketed = re.search(r'\(([^)]+)\)\s*$', parameter.name or '')
+        if bracketed:
+            lookup.setdefault(header_key(bracketed.group(1)), parameter)
+    aliases = {**DEFAULT_PARAMETER_ALIASES, **(getattr(settings, 'RESULT_IMPORT_PARAMETER_ALIASES', None) or {})}
+    for alias, name in aliases.items():
+        parameter = by_name.get(header_key(name))
+        if parameter is not None:
+            lookup.setdefault(header_key(alias), parameter)
+    return lookup
+
+
+@dataclass
+class _Layout:
+    sample: int | None = None
+    customer: int | None = None
+    parameter: int | None = None
+    value: int | None = None
+    observation: int | None = None
+    remarks: int | None = None
+    parameter_columns: list = field(default_factory=list)
+
+    @property
+    def is_long(self) -> bool:
+        return self.parameter is not None and self.value is not None
+
+
+def _parse_header(header, parameters: dict, summary: ImportSummary) -> _Layout:
+    layout = _Layout()
+    roles = (
+        ('sample', SAMPLE_HEADERS),
+        ('customer', CUSTOMER_HEADERS),
+        ('parameter', PARAMETER_HEADERS),
+        ('value', VALUE_HEADERS),
+        ('observation', OBSERVATION_HEADERS),
+        ('remarks', REMARKS_HEADERS),
+    )
+    unmatched = []
+    for index, raw in enumerate(header):
+        key = header_key(raw)
+        if not key:
+            continue
+        for role, names in roles:
+            if key in names and getattr(layout, role) is None:
+                setattr(layout, role, index)
+                break
+        else:
+            unmatched.append((index, raw, key))
+
+    if layout.sample is None and layout.customer is None:
+        raise ResultImportError("The first row must name a sample column (e.g. 'Sample ID' or 'Customer code').")
+    for index, raw, key in unmatched:
+        parameter = parameters.get(key)
+        if parameter is not None and not layout.is_long:
+            layout.parameter_columns.append((index, parameter))
+        else:
+            summary.ignored_columns.append(raw.strip())
+    if not layout.is_long and not layout.parameter_columns:
+        raise ResultImportError(
+            "No parameter columns recognised. Use parameter names as column headers, "
+            "or 'Parameter' and 'Value' columns."
+        )
+    return layout
+
+
+def _cell(row, index):
+    if index is None or index >= len(row):
+        return ''
+    return (row[index] or '').strip()
+
+
+def _row_cells(row, line, layout: _Layout, parameters: dict, summary: ImportSummary):
+    sample_ref = _cell(row, layout.sample).upper()
+    customer_ref = _cell(row, layout.customer).upper()
+    if not sample_ref and not customer_ref:
+        summary.add_error(line, '', '', "No sample ID or customer code.")
+        return []
+
+    extras = {
+        'observation': _cell(row, layout.observation) or None,
+        'remarks': _cell(row, layout.remarks) or None,
+    }
+    if layout.is_long:
+        name = _cell(row, layout.parameter)
+        value = _cell(row, layout.value)
+        parameter = parameters.get(header_key(name))
+        if parameter is None:
+            summary.add_error(line, sample_ref or customer_ref, name, "Unknown parameter.")
+            return []
+        if not value:
+            return []
+        return [_Cell(line, sample_ref, customer_ref, parameter, {'result_value': value, **extras})]
+
+    cells = []
+    for index, parameter in layout.parameter_columns:
+        value = _cell(row, index)
+        if value:
+            cells.append(_Cell(line, sample_ref, customer_ref, parameter, {'result_value': value, **extras}))
+    return cells
+
+
+def _resolve_samples(cells, allowed_statuses):
+    """Return ``({display_id: sample}, {customer_code: sample or error})`` for one chunk."""
+    requested = Prefetch('tests_requested', queryset=TestParameter.objects.only('parameter_id'))
+    display_ids = {cell.sample_ref for cell in cells if cell.sample_ref}
+    codes = {cell.customer_ref for cell in cells if cell.customer_ref and not cell.sample_ref}
+
+    by_display_id = {}
+    if display_ids:
+        for sample in Sample.objects.filter(display_id__in=display_ids).select_related('customer').prefetch_related(requested):
+            by_display_id[sample.display_id.upper()] = sample
+
+    by_code = {}
+    if codes:
+        open_samples = defaultdict(list)
+        queryset = Sample.objects.filter(
+            customer__customer_code__in=codes,
+            current_status__in=allowed_statuses,
+        ).select_related('customer').prefetch_related(requested)
+        for sample in queryset:
+            open_samples[sample.customer.customer_code.upper()].append(sample)
+        for code in codes:
+            matches = open_samples.get(code, [])
+            if len(matches) == 1:
+                by_code[code] = matches[0]
+            elif matches:
+                by_code[code] = "Customer has several samples open for result entry; use the sample ID."
+            else:
+                by_code[code] = "No sample of this customer is open for result entry."
+    return by_display_id, by_code
+
+
+def _write_chunk(cells, *, user, request, allowed_statuses, summary: ImportSummary) -> None:
+    by_display_id, by_code = _resolve_samples(cells, allowed_statuses)
+
+    rows = []
+    for cell in cells:
+        reference = cell.sample_ref or cell.customer_ref
+        sample = by_display_id.get(cell.sample_ref) if cell.sample_ref else by_code.get(cell.customer_ref)
+        if isinstance(sample, str):
+            summary.add_error(cell.line, reference, cell.parameter.name, sample)
+            continue
+        if sample is None:
+            summary.add_error(cell.line, reference, cell.parameter.name, "Sample not found.")
+            continue
+        if sample.current_status not in allowed_statuses:
+            summary.add_error(
+                cell.line, reference, cell.parameter.name,
+                f"Sample is not open for result entry ({sample.get_current_status_display()}).",
+            )
+            continue
+        if cell.parameter.pk not in {parameter.pk for parameter in sample.tests_requested.all()}:
+            summary.add_error(cell.line, reference, cell.parameter.name, "Parameter was not requested for this sample.")
+            continue
+        rows.append((sample, ResultEntry(parameter=cell.parameter, values=cell.values), cell))
+    if not rows:
+        return
+
+    samples = list({sample.pk: sample for sample, _, _ in rows}.values())
+    existing = {
+        (result.sample_id, result.parameter_id): result
+        for result in TestResult.objects.select_for_update().filter(
+            sample__in=samples,
+            parameter__in={entry.parameter.pk for _, entry, _ in rows},
+        )
+    }
+    written = write_results(rows, user=user, existing=existing, request=request, collect_errors=True)
+    for cell, parameter_name, messages in written.errors:
+        summary.add_error(cell.line, cell.sample_ref or cell.customer_ref, parameter_name, ' '.join(messages))
+
+    summary.created += len(written.created)
+    summary.updated += len(written.updated)
+    summary.unchanged += written.unchanged
+    summary.samples.update(sample.pk for sample in samples)
+    summary.completed_samples += len(advance_sample_statuses(samples, user=user, request=request))
+
+
+def import_results(stream, *, user, request=None, chunk_size: int | None = None) -> ImportSummary:
+    """Import results from the text ``stream`` (a CSV file opened with ``newline=''``)."""
+    chunk_size = chunk_size or int(getattr(settings, 'RESULT_IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+    allowed_statuses = list(ENTRY_STATUSES)
+    if user.is_admin():
+        allowed_statuses.append('REVIEW_PENDING')
+
+    summary = ImportSummary()
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        raise ResultImportError("The file is empty.")
+    parameters = parameter_lookup()
+    layout = _parse_header(header, parameters, summary)
+
+    def flush(cells):
+        try:
+            with transaction.atomic():
+                _write_chunk(cells, user=user, request=request, allowed_statuses=allowed_statuses, summary=summary)
+        except Exception as exc:
+            logger.exception("Result import chunk ending at line %s failed", cells[-1].line)
+            for cell in cells:
+                summary.add_error(cell.line, cell.sample_ref or cell.customer_ref, cell.parameter.name, f"Not saved: {exc}")
+
+    cells = []
+    rows_in_chunk = 0
+    for line, row in enumerate(reader, start=2):
+        if not any((value or '').strip() for value in row):
+            continue
+        summary.rows += 1
+        rows_in_chunk += 1
+        cells.extend(_row_cells(row, line, layout, parameters, summary))
+        if rows_in_chunk >= chunk_size:
+            if cells:
+                flush(cells)
+            cells = []
+            rows_in_chunk = 0
+    if cells:
+        flush(cells)
+    return summary
+
+
+def write_error_report(errors, stream) -> None:
+    """Write ``ImportRowError`` rows as CSV to ``stream``."""
+    writer = csv.writer(stream)
+    writer.writerow(['Line', 'Sample', 'Parameter', 'Error'])
+    for error in errors:
+        writer.writerow([error.line, error.sample, error.parameter, error.message])
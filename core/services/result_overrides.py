@@ -0,0 +1,231 @@
+"""Compiled lookup index for textual result status overrides.
+
+``TestResult.get_limit_status``/``is_within_limits`` map text results such as
+"BDL" or "Absent" to a limit status. Two sources are consulted:
+``ResultStatusOverride`` rows, then ``WATERLAB_SETTINGS['TEXT_RESULT_STATUS_OVERRIDES']``.
+The old path queried the table once per result per call and re-normalised the
+nested settings dict each time. The sample page, the report PDF and the AI
+prompt all evaluate every result, so one report issued dozens of identical
+queries.
+
+``resolve_status_override`` instead reads from a per-process index in which both
+sources are compiled into plain dicts keyed by parameter and normalised value.
+The precedence is unchanged:
+
+1. DB override for the parameter, then the DB override for all parameters
+   (a matching DB row always wins, even with an invalid status).
+2. Settings ``parameters`` section, then top-level per-parameter mappings
+   (keyed by normalised parameter name).
+3. Settings ``global``/``default``/``*`` mappings, then top-level text keys.
+
+The DB part is rebuilt when its fingerprint (row count and latest
+``updated_at``) changes. The fingerprint is checked at most every
+``RESULT_OVERRIDE_INDEX_TTL`` seconds, which is how other workers notice
+saves, deletes and toggles. The saving process drops its copy immediately.
+Production runs on the per-process LocMem cache, so a cache-held version key
+could not reach the other workers. The settings part is recompiled when the
+settings object changes identity (e.g. ``override_settings``).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from core.models import VALID_RESULT_STATUSES, ResultStatusOverride, normalize_text_value
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 5
+_SETTINGS_FALLBACK_KEYS = ('global', 'default', '*')
+
+
+def validated_status(status):
+    """Return the upper-cased status if it is a known limit status, else ``None``."""
+    if not status:
+        return None
+    normalized_status = status.strip().upper()
+    if normalized_status in VALID_RESULT_STATUSES:
+        return normalized_status
+    logger.warning("Ignored invalid limit status override '%s'.", status)
+    return None
+
+
+def _compile_mapping(mapping) -> dict:
+    """``{normalised value: validated status}``; the first matching key of a mapping wins."""
+    compiled = {}
+    if not isinstance(mapping, dict):
+        return compiled
+    for raw_value, status in mapping.items():
+        if not isinstance(status, str):
+            continue
+        key = normalize_text_value(raw_value)
+        if key not in compiled:
+            compiled[key] = validated_status(status)
+    return compiled
+
+
+def _merge(target: dict, compiled: dict) -> None:
+    # An invalid status only stops the search within its own mapping; the next
+    # mapping in precedence order is still consulted.
+    for key, status in compiled.items():
+        if status and key not in target:
+            target[key] = status
+
+
+def compile_settings_overrides(config) -> tuple[dict, dict]:
+    """Compile the settings dict into ``(by parameter name, fallback)`` lookup tables."""
+    by_parameter = {}
+    fallback = {}
+    if not isinstance(config, dict):
+        return by_parameter, fallback
+
+    parameter_section = config.get('parameters')
+    if isinstance(parameter_section, dict):
+        for raw_param, mapping in parameter_section.items():
+            _merge(by_parameter.setdefault(normalize_text_value(raw_param), {}), _compile_mapping(mapping))
+    for raw_param, mapping in config.items():
+        if raw_param in ('parameters',) + _SETTINGS_FALLBACK_KEYS or not isinstance(mapping, dict):
+            continue
+        _merge(by_parameter.setdefault(normalize_text_value(raw_param), {}), _compile_mapping(mapping))
+
+    for fallback_key in _SETTINGS_FALLBACK_KEYS:
+        _merge(fallback, _compile_mapping(config.get(fallback_key)))
+    _merge(fallback, _compile_mapping(config))
+    return by_parameter, fallback
+
+
+class _OverrideIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.db = None
+        self.fingerprint = None
+        self.checked_at = 0.0
+        self.settings_source = None
+        self.settings_tables = ({}, {})
+
+    def clear(self):
+        with self.lock:
+            self.db = None
+            self.fingerprint = None
+            self.checked_at = 0.0
+
+
+_index = _OverrideIndex()
+_pinned = threading.local()
+
+
+def _ttl() -> float:
+    try:
+        return max(0.0, float(getattr(settings, 'RESULT_OVERRIDE_INDEX_TTL', DEFAULT_TTL)))
+    except (TypeError, ValueError):
+        return DEFAULT_TTL
+
+
+def _db_fingerprint():
+    summary = ResultStatusOverride.objects.aggregate(count=Count('pk'), latest=Max('updated_at'))
+    return summary['count'], summary['latest']
+
+
+def _load_db_overrides() -> dict:
+    rows = ResultStatusOverride.objects.filter(is_active=True).values_list(
+        'parameter_id', 'normalized_value', 'status'
+    )
+    return {(parameter_id, value): status for parameter_id, value, status in rows if value}
+
+
+def _db_overrides() -> dict:
+    now = time.monotonic()
+    db = _index.db
+    if db is not None and (getattr(_pinned, 'depth', 0) or now - _index.checked_at < _ttl()):
+        return db
+    with _index.lock:
+        if _index.db is not None and now - _index.checked_at < _ttl():
+            return _index.db
+        fingerprint = _db_fingerprint()
+        if _index.db is None or fingerprint != _index.fingerprint:
+            _index.db = _load_db_overrides()
+            _index.fingerprint = fingerprint
+        _index.checked_at = now
+        return _index.db
+
+
+def _settings_tables() -> tuple[dict, dict]:
+    config = getattr(settings, 'WATERLAB_SETTINGS', {}).get('TEXT_RESULT_STATUS_OVERRIDES')
+    if config is not _index.settings_source:
+        tables = compile_settings_overrides(config)
+        with _index.lock:
+            _index.settings_source = config
+            _index.settings_tables = tables
+        return tables
+    return _index.settings_tables
+
+
+@contextmanager
+def pinned_status_overrides():
+    """Check the index once, then serve every lookup in the block from it.
+
+    For batch writers that evaluate many results in one request, so the
+    freshness check costs one query per batch instead of one per TTL window.
+    """
+    _db_overrides()
+    _pinned.depth = getattr(_pinned, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _pinned.depth -= 1
+
+
+def invalidate_status_override_index() -> None:
+    """Drop this process's compiled DB overrides (other workers follow via the fingerprint)."""
+    _index.clear()
+
+
+def resolve_status_override(parameter_id, parameter_name, result_key):
+    """Return the override status for a normalised result value, or ``None``."""
+    if not result_key:
+        return None
+
+    db = _db_overrides()
+    if db:
+        db_status = None
+        if parameter_id:
+            db_status = db.get((parameter_id, result_key))
+        if not db_status:
+            db_status = db.get((None, result_key))
+        if db_status:
+            return validated_status(db_status)
+
+    by_parameter, fallback = _settings_tables()
+    if parameter_name:
+        status = by_parameter.get(normalize_text_value(parameter_name), {}).get(result_key)
+        if status:
+            return status
+    return fallback.get(result_key)
+
+
+def override_table(parameter_id, parameter_name) -> dict:
+    """All overrides that apply to one parameter, as ``{normalised value: status}``.
+
+    Used by batch re-evaluation to resolve a whole parameter's results with one
+    dict lookup per row. A ``None`` status marks an invalid DB override: like
+    ``resolve_status_override``, it blocks the settings entries for that value,
+    and the row falls through to the numeric limits.
+    """
+    table = {}
+    db = _db_overrides()
+    for scope in ((parameter_id, None) if parameter_id else (None,)):
+        for (override_parameter_id, value), status in db.items():
+            if override_parameter_id == scope and value not in table:
+                table[value] = validated_status(status)
+
+    by_parameter, fallback = _settings_tables()
+    if parameter_name:
+        for value, status in by_parameter.get(normalize_text_value(parameter_name), {}).items():
+            table.setdefault(value, status)
+    for value, status in fallback.items():
+        table.setdefault(value, status)
+    return table
@@ -0,0 +1,311 @@
+"""Bulk sample registration for drives and institutional customers.
+
+Government drives and institutions bring 50-200 bottles at once. Registering
+them one by one through ``SampleCreateView`` costs a ``display_id``
+allocation, an INSERT, the ``tests_requested`` rows and an audit insert per
+bottle. ``register_samples`` takes the whole batch in one transaction:
+
+* one ``NumberSequence`` reservation for a contiguous ``display_id`` range;
+* one ``bulk_create`` for the samples and one for their ``tests_requested``
+  through-rows;
+* one bulk audit insert;
+* one search index upsert.
+
+The batch comes either from the bulk form (shared details and a bottle count
+or a list of sampling locations) or from a CSV with one row per bottle
+(``parse_registration_csv``). A CSV with any bad row registers nothing; the
+problems are returned per line.
+"""
+
+import csv
+import datetime
+import logging
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import capfirst
+from django.utils.dateparse import parse_datetime
+
+from core.models import AuditTrail, Customer, NumberSequence, Sample
+from core.services.result_import import header_key, parameter_lookup
+from core.services.search_index import index_samples
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 500
+_WRITE_BATCH_SIZE = 500
+
+CUSTOMER_HEADERS = {'customer code', 'customer id', 'customer'}
+COLLECTED_AT_HEADERS = {'collection datetime', 'collection date', 'collected on', 'collection time', 'date'}
+SOURCE_HEADERS = {'sample source', 'source'}
+LOCATION_HEADERS = {'sampling location', 'location', 'identifier'}
+QUANTITY_HEADERS = {'quantity received', 'quantity'}
+COLLECTED_BY_HEADERS = {'collected by'}
+REFERRED_BY_HEADERS = {'referred by', 'reference'}
+TESTS_HEADERS = {'tests requested', 'tests', 'parameters'}
+_TEST_SEPARATORS = (';', '|')
+
+
+class RegistrationError(Exception):
+    """The file as a whole cannot be used (e.g. no customer column)."""
+
+
+@dataclass
+class RegistrationRowError:
+    line: int
+    message: str
+
+
+@dataclass
+class RegistrationBatch:
+    """Unsaved samples with the parameters each one requests."""
+
+    samples: list = field(default_factory=list)
+    tests: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+    def add(self, sample, parameters) -> None:
+        self.samples.append(sample)
+        self.tests.append(list(parameters))
+
+
+def max_batch_size() -> int:
+    try:
+        return max(1, int(getattr(settings, 'BULK_REGISTRATION_MAX_SAMPLES', MAX_BATCH_SIZE)))
+    except (TypeError, ValueError):
+        return MAX_BATCH_SIZE
+
+
+def validation_messages(sample) -> list:
+    """What ``Sample.full_clean`` rejects in ``sample``, as readable messages.
+
+    ``display_id`` is allocated on save and ``customer`` is checked by the
+    caller. New samples have fresh UUIDs and no report number, so the unique
+    and constraint lookups are skipped.
+    """
+    try:
+        sample.full_clean(exclude=['display_id', 'customer'], validate_unique=False, validate_constraints=False)
+    except ValidationError as exc:
+        messages = []
+        for name, errors in exc.message_dict.items():
+            label = '' if name == NON_FIELD_ERRORS else f"{capfirst(Sample._meta.get_field(name).verbose_name)}: "
+            messages.extend(f"{label}{error}" for error in errors)
+        return messages
+    return []
+
+
+def _audit_values(sample, parameters) -> dict:
+    return {
+        'display_id': sample.display_id,
+        'customer': str(sample.customer),
+        'collection_datetime': sample.collection_datetime,
+        'sample_source': sample.sample_source,
+        'sampling_location': sample.sampling_location,
+        'quantity_received': sample.quantity_received,
+        'collected_by': sample.collected_by,
+        'referred_by': sample.referred_by,
+        'current_status': sample.current_status,
+        'tests_requested': [parameter.name for parameter in parameters],
+    }
+
+
+def register_samples(batch: RegistrationBatch, *, user, request=None) -> list:
+    """Save ``batch`` in one transaction and return its samples, in ``display_id`` order."""
+    samples = batch.samples
+    if not samples:
+        return []
+    if len(samples) > max_batch_size():
+        raise RegistrationError(f"A batch can hold at most {max_batch_size()} samples.")
+    for sample in samples:
+        problems = validation_messages(sample)
+        if problems:
+            raise RegistrationError(' '.join(problems))
+
+    through = Sample.tests_requested.through
+    with transaction.atomic():
+        for sample, display_id in zip(samples, NumberSequence.next_numbers('sample', len(samples))):
+            sample.display_id = display_id
+            if sample.created_by_id is None and user is not None and user.is_authenticated:
+                sample.created_by = user
+            sample._ensure_date_received_at_lab()
+        Sample.objects.bulk_create(samples, batch_size=_WRITE_BATCH_SIZE)
+        through.objects.bulk_create(
+            [
+                through(sample_id=sample.pk, testparameter_id=parameter.pk)
+                for sample, parameters in zip(samples, batch.tests)
+                for parameter in {parameter.pk: parameter for parameter in parameters}.values()
+            ],
+            batch_size=_WRITE_BATCH_SIZE,
+        )
+        AuditTrail.log_changes(
+            AuditTrail.build_entry(
+                user, 'CREATE', sample, new_values=_audit_values(sample, parameters), request=request,
+            )
+            for sample, parameters in zip(samples, batch.tests)
+        )
+        index_samples(samples)
+    for sample in samples:
+        sample._remember_state()
+    logger.debug("Registered %s samples (%s to %s)", len(samples), samples[0].display_id, samples[-1].display_id)
+    return samples
+
+
+def batch_from_form(cleaned_data) -> RegistrationBatch:
+    """One sample per sampling location (or ``sample_count`` identical ones) from the bulk form."""
+    batch = RegistrationBatch()
+    locations = cleaned_data.get('sampling_locations') or []
+    if not locations:
+        locations = [cleaned_data.get('sampling_location') or None] * cleaned_data['sample_count']
+    for location in locations:
+        batch.add(
+            Sample(
+                customer=cleaned_data['customer'],
+                collection_datetime=cleaned_data['collection_datetime'],
+                sample_source=cleaned_data['sample_source'],
+                sampling_location=location,
+                quantity_received=cleaned_data.get('quantity_received') or None,
+                collected_by=cleaned_data['collected_by'],
+                referred_by=cleaned_data.get('referred_by') or None,
+            ),
+            cleaned_data.get('tests_requested') or [],
+        )
+    return batch
+
+
+# --- CSV ----------------------------------------------------------------------
+
+
+def _choice_lookup(choices) -> dict:
+    lookup = {}
+    for code, label in choices:
+        lookup[header_key(code)] = code
+        lookup[header_key(label)] = code
+    return lookup
+
+
+def _parse_collected_at(raw):
+    raw = (raw or '').strip()
+    if not raw:
+        return None
+    try:
+        moment = parse_datetime(raw)
+    except ValueError:
+        moment = None
+    if moment is None:
+        formats = getattr(settings, 'DATETIME_INPUT_FORMATS', None) or ('%d/%m/%Y %H:%M', '%d/%m/%Y')
+        for fmt in formats:
+            try:
+                moment = datetime.datetime.strptime(raw, fmt)
+                break
+            except ValueError:
+                continue
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _columns(header) -> dict:
+    groups = {
+        'customer': CUSTOMER_HEADERS,
+        'collected_at': COLLECTED_AT_HEADERS,
+        'source': SOURCE_HEADERS,
+        'location': LOCATION_HEADERS,
+        'quantity': QUANTITY_HEADERS,
+        'collected_by': COLLECTED_BY_HEADERS,
+        'referred_by': REFERRED_BY_HEADERS,
+        'tests': TESTS_HEADERS,
+    }
+    columns = {}
+    for index, title in enumerate(header):
+        key = header_key(title)
+        for name, aliases in groups.items():
+            if key in aliases and name not in columns:
+                columns[name] = index
+    missing = [label for name, label in (
+        ('customer', 'Customer code'), ('collected_at', 'Collection date'), ('source', 'Sample source'),
+    ) if name not in columns]
+    if missing:
+        raise RegistrationError(f"The file has no {', '.join(missing)} column.")
+    return columns
+
+
+def parse_registration_csv(stream, *, customers=None) -> RegistrationBatch:
+    """Read one sample per CSV row; any row problem is reported in ``batch.errors``.
+
+    ``customers`` limits which customers rows may name (default: all).
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        raise RegistrationError("The file is empty.")
+    columns = _columns(header)
+
+    rows = []
+    for line, row in enumerate(reader, start=2):
+        if any(cell.strip() for cell in row):
+            rows.append((line, row))
+    if len(rows) > max_batch_size():
+        raise RegistrationError(f"The file has {len(rows)} samples; a batch can hold at most {max_batch_size()}.")
+
+    def cell(row, name):
+        index = columns.get(name)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    codes = {cell(row, 'customer').upper() for _, row in rows} - {''}
+    customers = customers if customers is not None else Customer.objects.all()
+    by_code = {customer.customer_code: customer for customer in customers.filter(customer_code__in=codes)}
+    sources = _choice_lookup(Sample.SAMPLE_SOURCE_CHOICES)
+    collectors = _choice_lookup(Sample.COLLECTED_BY_CHOICES)
+    parameters = parameter_lookup() if 'tests' in columns else {}
+
+    batch = RegistrationBatch()
+    for line, row in rows:
+        problems = []
+        code = cell(row, 'customer').upper()
+        customer = by_code.get(code)
+        if customer is None:
+            problems.append(f"Unknown customer code '{code}'." if code else "Customer code is missing.")
+        collected_at = _parse_collected_at(cell(row, 'collected_at'))
+        if collected_at is None:
+            problems.append("Collection date is missing or not a date (use DD/MM/YYYY HH:MM).")
+        source = sources.get(header_key(cell(row, 'source')))
+        if source is None:
+            problems.append(f"Unknown sample source '{cell(row, 'source')}'.")
+        collected_by = collectors.get(header_key(cell(row, 'collected_by')) or 'customer')
+        if collected_by is None:
+            problems.append(f"Unknown 'collected by' value '{cell(row, 'collected_by')}'.")
+
+        requested = []
+        raw_tests = cell(row, 'tests')
+        for separator in _TEST_SEPARATORS:
+            raw_tests = raw_tests.replace(separator, ',')
+        for name in (part.strip() for part in raw_tests.split(',')):
+            if not name:
+                continue
+            parameter = parameters.get(header_key(name))
+            if parameter is None:
+                problems.append(f"Unknown test '{name}'.")
+            else:
+                requested.append(parameter)
+
+        sample = Sample(
+            customer=customer,
+            collection_datetime=collected_at,
+            sample_source=source,
+            sampling_location=cell(row, 'location') or None,
+            quantity_received=cell(row, 'quantity') or None,
+            collected_by=collected_by,
+            referred_by=cell(row, 'referred_by') or None,
+        )
+        if not problems:
+            problems = validation_messages(sample)
+        if problems:
+            batch.errors.extend(RegistrationRowError(line, message) for message in problems)
+            continue
+        batch.add(sample, requested)
+    if not batch.samples and not batch.errors:
+        raise RegistrationError("The file has no sample rows.")
+    return batch
@@ -0,0 +1,308 @@
+"""Search index for customers and samples.
+
+The customer list, the sample list and the header search used to OR together
+up to eleven ``icontains`` predicates across ``Customer`` and ``Sample``.
+Each one is a leading-wildcard ``LIKE`` that no B-tree index can serve, so
+every search scanned both tables. Now every customer and sample has one
+``SearchEntry`` row. It holds a lower-cased document of the fields people
+search by: codes, names, phone (also as digits only), email, address, report
+number, source and location. The query keeps its old meaning, one
+case-insensitive substring, and is matched against that row:
+
+* PostgreSQL: GIN indexes on ``to_tsvector('simple', document)`` and on
+  ``document gin_trgm_ops``. A row matches the word-phrase tsquery (last word
+  as a prefix) or ``LIKE '%query%'``, which the trigram index serves.
+  Results are ranked by ``ts_rank`` plus trigram ``similarity``.
+* SQLite: an external-content FTS5 table with the ``trigram`` tokenizer,
+  kept in sync by triggers, so queries of three or more characters use the
+  index. Results are ranked by bm25.
+* Anything else, or shorter queries: ``LIKE`` over the single document
+  column. Results are ranked shortest document first.
+
+Queries that are a whole phone number skip the index and match
+``Customer.phone_digits`` exactly (see ``phone_query``).
+
+Rows are refreshed from ``Customer.save`` and ``Sample.save``, and by the bulk
+paths that bypass ``save``. ``manage.py rebuild_search_index`` rebuilds
+everything and drops rows whose object is gone.
+"""
+
+import logging
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+
+from core.models import Customer, Sample, SearchEntry, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'core_searchentry_fts'
+MIN_TRIGRAM_LENGTH = 3
+_WRITE_BATCH_SIZE = 500
+_WORD = re.compile(r'\w+')
+_PHONE_QUERY = re.compile(r'^[\d\s\-+().]+$')
+PHONE_QUERY_MIN_DIGITS = 10
+_fts_available = {}
+
+CUSTOMER_FIELDS = (
+    'customer_code', 'name', 'phone', 'email', 'house_name_door_no', 'street_locality_landmark',
+    'village_town_city', 'panchayat_municipality', 'taluk', 'district', 'pincode',
+)
+# Customer fields whose change must refresh the customer's sample documents.
+SAMPLE_CUSTOMER_FIELDS = ('customer_code', 'name', 'phone', 'email')
+SAMPLE_FIELDS = ('display_id', 'report_number', 'sample_source', 'sampling_location', 'referred_by', 'customer')
+SOURCE_LABELS = dict(Sample.SAMPLE_SOURCE_CHOICES)
+
+
+def _digits(value) -> str:
+    return re.sub(r'\D', '', value or '')
+
+
+def _document(parts) -> str:
+    return ' '.join(str(part).strip().lower() for part in parts if part and str(part).strip())
+
+
+def _customer_parts(customer) -> list:
+    return [customer.customer_code, customer.name, customer.phone, _digits(customer.phone), customer.email]
+
+
+def customer_document(customer) -> str:
+    return _document(_customer_parts(customer) + [getattr(customer, name) for name in CUSTOMER_FIELDS[4:]])
+
+
+def sample_document(sample, customer) -> str:
+    return _document([
+        sample.display_id,
+        sample.report_number,
+        sample.sample_source,
+        SOURCE_LABELS.get(sample.sample_source),
+        sample.sampling_location,
+        sample.referred_by,
+    ] + (_customer_parts(customer) if customer is not None else []))
+
+
+# --- writing ------------------------------------------------------------------
+
+
+def _upsert(model, entries) -> None:
+    if entries:
+        model.objects.bulk_create(
+            entries,
+            batch_size=_WRITE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['document', 'updated_at'],
+        )
+
+
+def index_customers(customers, *, include_samples=False) -> None:
+    customers = list(customers)
+    _upsert(SearchEntry, [
+        SearchEntry(kind='customer', object_id=customer.pk, document=customer_document(customer))
+        for customer in customers
+    ])
+    if include_samples and customers:
+        by_pk = {customer.pk: customer for customer in customers}
+        samples = Sample.objects.filter(customer__in=customers).only(
+            'sample_id', 'customer_id', *[name for name in SAMPLE_FIELDS if name != 'customer'],
+        )
+        index_samples(samples, customers=by_pk)
+
+
+def index_samples(samples, *, customers=None) -> None:
+    """Refresh the documents of ``samples``; ``customers`` is an optional ``{pk: Customer}``."""
+    samples = list(samples)
+    if not samples:
+        return
+    customers = dict(customers or {})
+    for sample in samples:
+        if sample.customer_id not in customers and Sample.customer.is_cached(sample):
+            customers[sample.customer_id] = sample.customer
+    missing = {sample.customer_id for sample in samples} - set(customers)
+    if missing:
+        customers.update(Customer.objects.in_bulk(missing))
+    _upsert(SearchEntry, [
+        SearchEntry(
+            kind='sample',
+            object_id=sample.pk,
+            document=sample_document(sample, customers.get(sample.customer_id)),
+        )
+        for sample in samples
+    ])
+
+
+def rebuild_index(*, batch_size=_WRITE_BATCH_SIZE, customer_model=Customer, sample_model=Sample, entry_model=SearchEntry) -> int:
+    """Re-create every entry and drop entries whose object is gone; returns the rows written."""
+    written = 0
+    customers = {}
+    batch = []
+    for customer in customer_model.objects.order_by('pk').iterator(chunk_size=batch_size):
+        customers[customer.pk] = customer
+        batch.append(entry_model(kind='customer', object_id=customer.pk, document=customer_document(customer)))
+        if len(batch) >= batch_size:
+            _upsert(entry_model, batch)
+            written += len(batch)
+            batch = []
+    for sample in sample_model.objects.order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(entry_model(
+            kind='sample', object_id=sample.pk, document=sample_document(sample, customers.get(sample.customer_id)),
+        ))
+        if len(batch) >= batch_size:
+            _upsert(entry_model, batch)
+            written += len(batch)
+            batch = []
+    _upsert(entry_model, batch)
+    written += len(batch)
+    entry_model.objects.filter(kind='customer').exclude(object_id__in=customer_model.objects.values('pk')).delete()
+    entry_model.objects.filter(kind='sample').exclude(object_id__in=sample_model.objects.values('pk')).delete()
+    return written
+
+
+# --- reading ------------------------------------------------------------------
+
+
+def backend() -> str:
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        name = connection.settings_dict['NAME']
+        if name not in _fts_available:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _fts_available[name] = cursor.fetchone() is not None
+        if _fts_available[name]:
+            return 'fts5'
+    return 'like'
+
+
+def _phrase(query: str) -> str:
+    """The query as the views always matched it: one case-insensitive substring."""
+    return ' '.join((query or '').lower().split())
+
+
+def _like(phrase: str) -> str:
+    escaped = phrase.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _fts_match(phrase: str) -> str:
+    return '"{}"'.format(phrase.replace('"', '""'))
+
+
+def _prefix_tsquery(phrase: str) -> str:
+    """Consecutive words, the last one as a prefix: ``'wl2025 00'`` -> ``'wl2025 <-> 00:*'``."""
+    words = _WORD.findall(phrase)
+    return ' <-> '.join(words) + ':*' if words else ''
+
+
+def _postgres_condition(phrase: str):
+    """SQL (without ``kind``) matching ``phrase`` against the document, and its params."""
+    tsquery = _prefix_tsquery(phrase)
+    if not tsquery:
+        return "document LIKE %s", [_like(phrase)]
+    return (
+        "(to_tsvector('simple', document) @@ to_tsquery('simple', %s) OR document LIKE %s)",
+        [tsquery, _like(phrase)],
+    )
+
+
+def phone_query(query: str) -> str:
+    """Normalized digits when ``query`` is a whole phone number, else ``''``.
+
+    Such queries are answered by an exact ``phone_digits`` match instead of
+    the index, whatever spacing, dashes or ``+91`` the number was typed with.
+    """
+    query = (query or '').strip()
+    if not _PHONE_QUERY.match(query):
+        return ''
+    digits = normalize_phone(query)
+    return digits if len(digits) >= PHONE_QUERY_MIN_DIGITS else ''
+
+
+def matching_entries(kind: str, query: str):
+    """``SearchEntry`` rows of ``kind`` whose document contains ``query``."""
+    phrase = _phrase(query)
+    entries = SearchEntry.objects.filter(kind=kind)
+    if not phrase:
+        return entries.none()
+    engine = backend()
+    if engine == 'postgresql':
+        condition, params = _postgres_condition(phrase)
+        return entries.filter(id__in=RawSQL(f'SELECT id FROM core_searchentry WHERE {condition}', params))
+    if engine == 'fts5' and len(phrase) >= MIN_TRIGRAM_LENGTH:
+        return entries.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_match(phrase)]),
+        )
+    return entries.filter(document__contains=phrase)
+
+
+def matching_ids(kind: str, query: str):
+    """Subquery of matching object ids, for ``queryset.filter(pk__in=...)``."""
+    return matching_entries(kind, query).values('object_id')
+
+
+def filter_customers(queryset, query: str):
+    """``queryset`` narrowed to customers matching ``query``."""
+    phone = phone_query(query)
+    if phone:
+        return queryset.filter(phone_digits=phone)
+    return queryset.filter(pk__in=matching_ids('customer', query))
+
+
+def filter_samples(queryset, query: str):
+    """``queryset`` narrowed to samples matching ``query``."""
+    phone = phone_query(query)
+    if phone:
+        return queryset.filter(customer__phone_digits=phone)
+    return queryset.filter(pk__in=matching_ids('sample', query))
+
+
+def _within_sql(within):
+    """``(sql, params)`` selecting the primary keys of ``within``, or ``None`` when it has no filters."""
+    if within is None or not within.query.has_filters():
+        return None
+    return within.order_by().values('pk').query.sql_with_params()
+
+
+def ranked_ids(kind: str, query: str, limit: int = 50, *, within=None) -> list:
+    """Best ``limit`` matching object ids, best first.
+
+    ``within`` is an optional queryset of the ``kind`` model (e.g. a user-scoped
+    one); only its objects are ranked, so the limit applies after scoping.
+    """
+    phrase = _phrase(query)
+    if not phrase or (within is not None and within.query.is_empty()):
+        return []
+    scope = _within_sql(within)
+    scope_sql, scope_params = (f" AND {{column}} IN ({scope[0]})", list(scope[1])) if scope else ('', [])
+    engine = backend()
+    if engine == 'postgresql':
+        condition, params = _postgres_condition(phrase)
+        tsquery = _prefix_tsquery(phrase)
+        text_rank = "ts_rank(to_tsvector('simple', document), to_tsquery('simple', %s))" if tsquery else '0'
+        sql = (
+            f"SELECT object_id FROM core_searchentry WHERE kind = %s AND {condition}"
+            f"{scope_sql.format(column='object_id')} "
+            f"ORDER BY {text_rank} + similarity(document, %s) DESC, length(document) LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [kind] + params + scope_params + ([tsquery] if tsquery else []) + [phrase, limit])
+            return [row[0] for row in cursor.fetchall()]
+    if engine == 'fts5' and len(phrase) >= MIN_TRIGRAM_LENGTH:
+        sql = (
+            f"SELECT e.object_id FROM {FTS_TABLE} f JOIN core_searchentry e ON e.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.kind = %s{scope_sql.format(column='e.object_id')} "
+            f"ORDER BY f.rank, length(e.document) LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [_fts_match(phrase), kind] + scope_params + [limit])
+            object_ids = [row[0] for row in cursor.fetchall()]
+        field = SearchEntry._meta.get_field('object_id')
+        return [field.to_python(value) for value in object_ids]
+    entries = matching_entries(kind, query)
+    if scope:
+        entries = entries.filter(object_id__in=within.order_by().values('pk'))
+    entries = entries.annotate(size=Length('document')).order_by('size')
+    return list(entries.values_list('object_id', flat=True)[:limit])
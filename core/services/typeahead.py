@@ -0,0 +1,164 @@
+"""Keystroke-level suggestions for the header search box.
+
+Every keystroke used to mean a full render of ``core/global_search.html``.
+``suggest`` answers with a few small dicts instead. Each dict holds only what
+the dropdown shows: kind, label, a detail line and the URL. The lookups are
+plain prefix matches that an index can serve:
+
+* ``C-...`` customer codes, ``WL...`` sample IDs and ``RPT...`` report numbers
+  are matched upper-cased with ``startswith``;
+* three or more digits (spaces, dashes and ``+`` ignored, a ``+91`` or trunk
+  ``0`` dropped) are matched against the start of ``Customer.phone_digits``,
+  or exactly once they form a whole number;
+* anything with a letter is matched with ``istartswith`` on the customer name.
+
+Each applicable field gets its own small ``LIMIT``-ed query instead of one
+query OR-ing every column. On PostgreSQL the ``LIKE 'prefix%'`` these
+produce is served by ``varchar_pattern_ops`` indexes: Django's own ``_like``
+indexes for the unique codes, ``customer_phone_digits_idx``, and migration
+0042 for report number and ``UPPER(name)``. The same prefix is typed by many
+people and many times (backspace, retype), so answers are cached for
+``TYPEAHEAD_CACHE_SECONDS``.
+"""
+
+import hashlib
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.models import NumberSequence, Sample
+from core.services import search_index
+
+logger = logging.getLogger(__name__)
+
+MIN_QUERY_LENGTH = 2
+MIN_PHONE_DIGITS = 3
+MAX_QUERY_LENGTH = 50
+LIMIT = 5
+DEFAULT_CACHE_SECONDS = 15
+CACHE_PREFIX = 'typeahead:'
+CUSTOMER_CODE_PREFIX = 'C-'
+SAMPLE_PREFIX = NumberSequence.FORMATS['sample'][0]
+REPORT_PREFIX = NumberSequence.FORMATS['report'][0]
+STATUS_LABELS = dict(Sample.SAMPLE_STATUS_CHOICES)
+_PHONE_SEPARATORS = re.compile(r'[\s\-+()]')
+
+
+def cache_seconds() -> int:
+    try:
+        return max(0, int(getattr(settings, 'TYPEAHEAD_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)))
+    except (TypeError, ValueError):
+        return DEFAULT_CACHE_SECONDS
+
+
+def normalise(query: str) -> str:
+    return ' '.join((query or '').split())[:MAX_QUERY_LENGTH]
+
+
+def _customer_item(row) -> dict:
+    return {
+        'kind': 'customer',
+        'label': row['name'],
+        'detail': f"{row['customer_code']} · {row['phone']}",
+        'url': reverse('core:customer_detail', args=[row['customer_id']]),
+    }
+
+
+def _sample_item(row) -> dict:
+    detail = [row['customer__name'], STATUS_LABELS.get(row['current_status'], row['current_status'])]
+    if row['report_number']:
+        detail.insert(0, row['report_number'])
+    return {
+        'kind': 'sample',
+        'label': row['display_id'],
+        'detail': ' · '.join(detail),
+        'url': reverse('core:sample_detail', args=[row['sample_id']]),
+    }
+
+
+def _phone_prefix(query: str) -> str:
+    """The start of a phone number in the national form ``phone_digits`` stores, or ``''``.
+
+    ``+91 98470`` becomes ``98470`` and ``0484 23`` becomes ``48423``.
+    """
+    digits = _PHONE_SEPARATORS.sub('', query)
+    if not digits.isdigit():
+        return ''
+    if digits.startswith('91') and (query.startswith('+') or len(digits) > 10):
+        digits = digits[2:]
+    elif digits.startswith('0'):
+        digits = digits[1:]
+    return digits
+
+
+def _lookups(query: str):
+    """``(kind, lookup, value)`` prefix filters that apply to ``query``, most specific first."""
+    upper = query.upper()
+    digits = _phone_prefix(query)
+    if upper.startswith(SAMPLE_PREFIX):
+        yield 'sample', 'display_id__startswith', upper
+    if upper.startswith(REPORT_PREFIX):
+        yield 'sample', 'report_number__startswith', upper
+    if upper.startswith(CUSTOMER_CODE_PREFIX):
+        yield 'customer', 'customer_code__startswith', upper
+    if len(digits) >= MIN_PHONE_DIGITS:
+        # A whole number matches exactly; anything shorter (e.g. ``+91`` and part of a number) is a prefix.
+        if search_index.phone_query(query) == digits:
+            yield 'customer', 'phone_digits', digits
+        else:
+            yield 'customer', 'phone_digits__startswith', digits
+    if any(char.isalpha() for char in query):
+        yield 'customer', 'name__istartswith', query
+
+
+def _search(query: str, customers, samples) -> list:
+    querysets = {
+        'customer': (
+            customers.order_by().values('customer_id', 'customer_code', 'name', 'phone'),
+            'customer_id',
+            _customer_item,
+        ),
+        'sample': (
+            samples.order_by().values(
+                'sample_id', 'display_id', 'report_number', 'current_status', 'customer__name',
+            ),
+            'sample_id',
+            _sample_item,
+        ),
+    }
+    items = []
+    seen = set()
+    for kind, lookup, value in _lookups(query):
+        queryset, key, build = querysets[kind]
+        field = lookup.split('__')[0]
+        for row in queryset.filter(**{lookup: value}).order_by(field)[:LIMIT]:
+            if (kind, row[key]) not in seen:
+                seen.add((kind, row[key]))
+                items.append(build(row))
+        if len(items) >= LIMIT * 2:
+            break
+    return items[:LIMIT * 2]
+
+
+def suggest(query: str, *, customers, samples, scope: str = 'all') -> list:
+    """Dropdown items for ``query`` from the (already user-scoped) ``customers`` and ``samples``.
+
+    ``scope`` must differ between users who see different records; it is part
+    of the cache key.
+    """
+    query = normalise(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    ttl = cache_seconds()
+    key = f"{CACHE_PREFIX}{scope}:{hashlib.md5(query.lower().encode('utf-8')).hexdigest()}"
+    if ttl:
+        items = cache.get(key)
+        if items is not None:
+            return items
+    items = _search(query, customers, samples)
+    if ttl:
+        cache.set(key, items, ttl)
+    return items
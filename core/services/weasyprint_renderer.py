@@ -0,0 +1,222 @@
+"""Long-lived WeasyPrint process for the Malayalam report page.
+
+Importing WeasyPrint and letting pango/fontconfig discover the Noto Malayalam
+fonts costs seconds, which an inline render pays in the request worker on every
+cold process. This module starts one renderer process per web process on first
+use, keeps WeasyPrint imported and its fonts loaded, and sends it HTML render
+jobs over a ``multiprocessing`` pipe.
+
+The renderer is an optimisation, never a dependency. ``render_html_to_pdf``
+returns ``None`` whenever the process cannot serve a job: disabled, busy,
+failed to start, crashed, or timed out. Callers then fall back to rendering
+in-process, so the existing graceful-degradation contract of the Malayalam page
+is unchanged. A crashed or unresponsive process is restarted on the next job. A
+process that cannot start at all (for example, WeasyPrint is not installed) is
+retried only after ``RESTART_BACKOFF`` seconds.
+
+Render pool children (``core.services.render_pool``) already keep WeasyPrint
+warm, so they call ``use_in_process_rendering()`` and render directly.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TIMEOUT = 60
+HEALTH_CHECK_INTERVAL = 30
+HEALTH_CHECK_TIMEOUT = 5
+RESTART_BACKOFF = 60
+# Warm renders take about a second, so a short wait for the pipe beats a cold in-process render.
+QUEUE_WAIT = 10
+DEFAULT_RENDER_TIMEOUT = 90
+
+_renderer = None
+_renderer_lock = threading.Lock()
+_retry_after = 0.0
+_in_process_only = False
+
+
+def _serve(conn) -> None:
+    """Renderer process main loop: answer ``ping``/``render``/``stop`` messages."""
+    # Ctrl+C in a dev server reaches the whole process group; the parent decides when we stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        from weasyprint import HTML
+
+        # Warm-up render: loads pango/cairo and builds the fontconfig cache.
+        HTML(string='<p lang="ml">മലയാളം</p>').write_pdf()
+    except Exception as exc:
+        conn.send(('unavailable', repr(exc)))
+        conn.close()
+        return
+
+    conn.send(('ready', None))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        kind = message[0]
+        if kind == 'ping':
+            conn.send(('pong', None))
+        elif kind == 'render':
+            _, html, base_url = message
+            try:
+                conn.send(('ok', HTML(string=html, base_url=base_url).write_pdf()))
+            except Exception as exc:
+                conn.send(('error', repr(exc)))
+        elif kind == 'stop':
+            conn.close()
+            return
+
+
+class _Renderer:
+    def __init__(self):
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(child_conn,),
+            name='weasyprint-renderer',
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.owner_pid = os.getpid()
+        self.last_used = time.monotonic()
+
+    def receive(self, timeout: float):
+        if not self.conn.poll(timeout):
+            raise TimeoutError('WeasyPrint renderer did not answer in time')
+        return self.conn.recv()
+
+    def request(self, message, timeout: float):
+        self.conn.send(message)
+        reply = self.receive(timeout)
+        self.last_used = time.monotonic()
+        return reply
+
+    def is_healthy(self) -> bool:
+        if not self.process.is_alive():
+            return False
+        if time.monotonic() - self.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            return self.request(('ping',), HEALTH_CHECK_TIMEOUT)[0] == 'pong'
+        except (EOFError, OSError, TimeoutError):
+            return False
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+def _enabled() -> bool:
+    if _in_process_only:
+        return False
+    return bool(getattr(settings, 'MALAYALAM_RENDERER_ENABLED', False))
+
+
+def _render_timeout() -> int:
+    try:
+        return max(1, int(getattr(settings, 'REPORT_RENDER_TIMEOUT', DEFAULT_RENDER_TIMEOUT)))
+    except (TypeError, ValueError):
+        return DEFAULT_RENDER_TIMEOUT
+
+
+def use_in_process_rendering() -> None:
+    """Never start a renderer process from this process (e.g. inside a render pool child)."""
+    global _in_process_only
+    _in_process_only = True
+
+
+def _stop_renderer() -> None:
+    global _renderer
+    renderer, _renderer = _renderer, None
+    if renderer is not None and renderer.owner_pid == os.getpid():
+        renderer.stop()
+
+
+def _ensure_renderer():
+    """Return a healthy renderer, (re)starting it if needed; ``None`` if it cannot run."""
+    global _renderer, _retry_after
+    if _renderer is not None and _renderer.owner_pid != os.getpid():
+        # Inherited across a fork: the process and pipe belong to the parent.
+        _renderer = None
+    if _renderer is not None and not _renderer.is_healthy():
+        logger.warning("WeasyPrint renderer process is unresponsive; restarting it")
+        _stop_renderer()
+    if _renderer is not None:
+        return _renderer
+
+    if time.monotonic() < _retry_after:
+        return None
+    renderer = None
+    try:
+        renderer = _Renderer()
+        status, detail = renderer.receive(STARTUP_TIMEOUT)
+    except Exception:
+        logger.exception("Could not start the WeasyPrint renderer process")
+        status, detail = 'failed', None
+    if status != 'ready':
+        if status == 'unavailable':
+            logger.warning("WeasyPrint renderer unavailable: %s", detail)
+        if renderer is not None:
+            renderer.stop()
+        _retry_after = time.monotonic() + RESTART_BACKOFF
+        return None
+    _renderer = renderer
+    return renderer
+
+
+def render_html_to_pdf(html: str, base_url: str | None = None) -> bytes | None:
+    """Render ``html`` in the warm renderer process.
+
+    Returns ``None`` when the renderer cannot be used, so the caller should render
+    in-process instead. Raises ``RuntimeError`` when the renderer ran the job and
+    WeasyPrint itself failed.
+    """
+    if not _enabled():
+        return None
+    # One job at a time per pipe; a thread that cannot get the renderer renders in-process.
+    if not _renderer_lock.acquire(timeout=QUEUE_WAIT):
+        return None
+    timeout = _render_timeout()
+    try:
+        renderer = _ensure_renderer()
+        if renderer is None:
+            return None
+        try:
+            status, payload = renderer.request(('render', html, base_url), timeout)
+        except TimeoutError:
+            logger.error("WeasyPrint renderer timed out after %ss; restarting it", timeout)
+            _stop_renderer()
+            return None
+        except (EOFError, OSError):
+            logger.warning("WeasyPrint renderer process crashed; it will be restarted", exc_info=True)
+            _stop_renderer()
+            return None
+        if status == 'ok':
+            return payload
+        raise RuntimeError(f"WeasyPrint renderer failed: {payload}")
+    finally:
+        _renderer_lock.release()
+
+
+def shutdown_renderer() -> None:
+    with _renderer_lock:
+        _stop_renderer()
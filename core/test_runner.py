@@ -0,0 +1,35 @@
+"""Test runner that switches off the background machinery of the services.
+
+The render pool, the Malayalam renderer process, the concurrency limiter, the
+result override cache, background limit re-evaluation and the background audit
+writer are all driven by settings. ``TEST_SETTINGS`` turns them off for the
+whole test run, whatever the environment configures; a test that exercises one
+of them enables it again with ``override_settings``.
+"""
+
+import sys
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+TEST_SETTINGS = {
+    'REPORT_RENDER_WORKERS': 0,
+    'MALAYALAM_RENDERER_ENABLED': False,
+    'CONCURRENCY_LIMITS': {'pdf': 0, 'ai': 0},
+    # Test transactions roll back without delete signals; always re-check.
+    'RESULT_OVERRIDE_INDEX_TTL': 0,
+    # Re-evaluate every limit edit inline so tests can assert on the results.
+    'LIMIT_REEVALUATION_INLINE_MAX': sys.maxsize,
+    'AUDIT_BUFFER_MODE': 'request',
+}
+
+
+class WaterLabTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
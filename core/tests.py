@@ -1,4 +1,5 @@
 import json
+import os
 import uuid
 from unittest.mock import patch
 
@@ -14,12 +15,15 @@ from .models import (
     ConsultantReview,
     ResultStatusOverride,
     LabProfile,
+    AuditTrail,
+    NumberSequence,
 )
 from .services.ai_remarks import generate_ai_review_draft
 from django.utils import timezone
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db.utils import IntegrityError
 from datetime import timedelta
+from decimal import Decimal
 
 class CustomerModelTests(TestCase):
     def setUp(self):
@@ -43,6 +47,24 @@ class CustomerModelTests(TestCase):
         self.assertRegex(customer.customer_code, r"^C-[23456789ABCDEFGHJKLMNPQRSTUVWXYZ]{6}$")
         self.assertTrue(Customer.objects.filter(email=self.customer_data["email"]).exists())
 
+    def test_phone_digits_normalized_on_save_and_backfilled_by_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        customer = Customer.objects.create(**{**self.customer_data, "phone": "+91 98470-12345"})
+        self.assertEqual(customer.phone_digits, "9847012345")
+        customer.phone = "0484 2345678"
+        customer.save(update_fields=["phone"])
+        customer.refresh_from_db()
+        self.assertEqual(customer.phone_digits, "4842345678")
+
+        Customer.objects.filter(pk=customer.pk).update(phone="98470 12345")
+        out = StringIO()
+        call_command("backfill_phone_digits", stdout=out)
+        customer.refresh_from_db()
+        self.assertEqual(customer.phone_digits, "9847012345")
+        self.assertIn("Updated phone_digits on 1 of 1 customer(s).", out.getvalue())
+
     def test_customer_code_generation_is_random_format_and_unique(self):
         """Customers receive short privacy-safe random codes."""
         first = Customer.objects.create(**self.customer_data)
@@ -295,6 +317,8 @@ class SampleModelTests(TestCase):
         # Test: First sample of a year should be WL<year>-0001
         # To ensure this, we delete all samples for the current year if any exist from other tests
         Sample.objects.filter(display_id__startswith=f"WL{current_year}-").delete()
+        # Deleted samples keep their numbers; dropping the counter simulates a fresh year.
+        NumberSequence.objects.filter(name='sample', year=current_year).delete()
         first_sample_this_year = Sample.objects.create(**self.sample_data)
         self.assertEqual(first_sample_this_year.display_id, f"WL{current_year}-0001")
 
@@ -517,6 +541,29 @@ class SampleModelTests(TestCase):
         with self.assertRaises(IntegrityError):
             sample2.save()
 
+    def test_number_sequence_seeds_numerically_and_reserves_ranges(self):
+        year = timezone.now().year
+        for number in ('9999', '10000'):
+            Sample.objects.create(**self.sample_data, display_id=f"WL{year}-{number}")
+        NumberSequence.objects.filter(name='sample', year=year).delete()
+
+        self.assertEqual(Sample.objects.create(**self.sample_data).display_id, f"WL{year}-10001")
+        self.assertEqual(NumberSequence.reserve('sample', 3), range(10002, 10005))
+
+        from django.db import transaction
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            NumberSequence.next_numbers('sample', 2)
+            raise RuntimeError
+        self.assertEqual(NumberSequence.next_number('sample'), f"WL{year}-10005")
+
+    def test_report_numbers_are_consecutive_across_bulk_and_single_allocation(self):
+        samples = [Sample.objects.create(**self.sample_data) for _ in range(3)]
+        Sample.allocate_report_numbers(samples[:2])
+        samples[2].generate_report_number()
+        numbers = [sample.report_number for sample in samples]
+        self.assertEqual(len(set(numbers)), 3)
+        self.assertEqual([int(number.split('-')[-1]) for number in numbers], [1, 2, 3])
+
     def test_resolve_signatories_uses_lab_profile_defaults(self):
         default_food = CustomUser.objects.create_user(username="default_food", role="lab")
         default_bio = CustomUser.objects.create_user(username="default_bio", role="lab")
@@ -677,8 +724,8 @@ class SampleModelTests(TestCase):
         self.assertEqual(latest_log.action, 'UPDATE')
         self.assertEqual(latest_log.model_name, 'Sample')
         self.assertEqual(latest_log.object_id, str(sample.pk))
-        self.assertEqual(latest_log.old_values['current_status'], 'RECEIVED_FRONT_DESK')
-        self.assertEqual(latest_log.new_values['current_status'], 'SENT_TO_LAB')
+        self.assertEqual(latest_log.payload.old_values['current_status'], 'RECEIVED_FRONT_DESK')
+        self.assertEqual(latest_log.payload.new_values['current_status'], 'SENT_TO_LAB')
 
     def test_reopen_for_correction_updates_status_revision_and_audit(self):
         from .models import AuditTrail
@@ -965,6 +1012,131 @@ class TestResultModelTests(TestCase):
         self.assertEqual(result.get_limit_status(), "BELOW_LIMIT")
         self.assertFalse(result.is_within_limits())
 
+    def test_status_overrides_are_served_from_compiled_index(self):
+        """Repeated evaluations hit the in-process index; saves and deletes refresh it."""
+        override = ResultStatusOverride.objects.create(text_value="Nil", status="WITHIN_LIMITS")
+        result = TestResult.objects.create(
+            sample=self.sample,
+            parameter=self.parameter_text,
+            result_value=" NIL ",
+            technician=self.lab_tech,
+        )
+        with patch('core.services.result_overrides._ttl', return_value=300):
+            self.assertEqual(result.compute_limit_status(), "WITHIN_LIMITS")
+            with self.assertNumQueries(0):
+                for _ in range(5):
+                    result.compute_limit_status()
+
+            override.status = "ABOVE_LIMIT"
+            override.save()
+            self.assertEqual(result.compute_limit_status(), "ABOVE_LIMIT")
+            override.delete()
+            self.assertEqual(result.compute_limit_status(), "NON_NUMERIC")
+
+    def test_limit_columns_are_stored_and_follow_limit_changes(self):
+        param = TestParameter.objects.create(name=f"Iron {uuid.uuid4().hex[:4]}", unit="mg/L", max_permissible_limit=1.0)
+        result = TestResult.objects.create(
+            sample=self.sample,
+            parameter=param,
+            result_value="<1,200.5",
+            technician=self.lab_tech,
+        )
+        result.refresh_from_db()
+        self.assertEqual(result.numeric_value, Decimal('1200.5'))
+        self.assertEqual(result.limit_status, "ABOVE_LIMIT")
+        self.assertEqual(
+            list(TestResult.objects.filter(limit_status__in=["ABOVE_LIMIT", "BELOW_LIMIT"])),
+            [result],
+        )
+
+        param.max_permissible_limit = Decimal('5000')
+        with self.captureOnCommitCallbacks(execute=True):
+            param.save()
+        result.refresh_from_db()
+        self.assertEqual(result.limit_status, "WITHIN_LIMITS")
+
+        ResultStatusOverride.objects.create(parameter=param, text_value="<1,200.5", status="UNKNOWN")
+        result.refresh_from_db()
+        self.assertEqual(result.limit_status, "UNKNOWN")
+        self.assertIsNone(result.is_within_limits())
+
+    def test_batch_reevaluation_reclassifies_in_chunks(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        from .services import limit_reevaluation
+
+        param = TestParameter.objects.create(name=f"Nitrate {uuid.uuid4().hex[:4]}", unit="mg/L", min_permissible_limit=1, max_permissible_limit=45)
+        values = ["0.5", "12", "44.999", "45.0001", "10.0000004", "BDL", "Clear"]
+        for value in values:
+            sample = Sample.objects.create(customer=self.customer, collection_datetime=timezone.now(), sample_source='TAP', collected_by="Staff")
+            TestResult.objects.create(sample=sample, parameter=param, result_value=value, technician=self.lab_tech)
+        ResultStatusOverride.objects.create(text_value="BDL", status="WITHIN_LIMITS")
+        # Bypass TestParameter.save so the stored statuses go stale.
+        TestParameter.objects.filter(pk=param.pk).update(min_permissible_limit=None, max_permissible_limit=10)
+
+        with patch.object(limit_reevaluation, 'np', None):
+            progress = limit_reevaluation.reevaluate_parameters([param.pk], chunk_size=4)
+        self.assertEqual((progress.checked, progress.changed), (7, 4))
+        statuses = dict(TestResult.objects.filter(parameter=param).values_list('result_value', 'limit_status'))
+        self.assertEqual(statuses, {
+            "0.5": "WITHIN_LIMITS",
+            "12": "ABOVE_LIMIT",
+            "44.999": "ABOVE_LIMIT",
+            "45.0001": "ABOVE_LIMIT",
+            # Stored as 10.000000, but the save path compares the full value.
+            "10.0000004": "ABOVE_LIMIT",
+            "BDL": "WITHIN_LIMITS",
+            "Clear": "NON_NUMERIC",
+        })
+
+        out = StringIO()
+        call_command('reevaluate_limits', parameter=[param.name], stdout=out)
+        self.assertIn("0 status change(s)", out.getvalue())
+
+    def test_interrupted_background_reevaluation_is_resumed(self):
+        import tempfile
+        from django.core.management import call_command
+        from io import StringIO
+
+        from .services import limit_reevaluation
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        param = TestParameter.objects.create(name=f"Iron {uuid.uuid4().hex[:4]}", unit="mg/L", max_permissible_limit=1)
+        sample = Sample.objects.create(customer=self.customer, collection_datetime=timezone.now(), sample_source='TAP', collected_by="Staff")
+        result = TestResult.objects.create(sample=sample, parameter=param, result_value="0.5", technician=self.lab_tech)
+        TestParameter.objects.filter(pk=param.pk).update(max_permissible_limit=Decimal('0.3'))
+
+        with override_settings(MEDIA_ROOT=media.name):
+            job_id = 'a' * 32
+            limit_reevaluation._write_job(job_id, {'status': 'running', 'parameter_ids': [str(param.pk)]})
+            self.assertEqual(limit_reevaluation.load_reevaluation_job(job_id)['status'], 'running')
+
+            # The worker that owned the thread was recycled.
+            with patch.object(limit_reevaluation, '_process_alive', return_value=False):
+                self.assertEqual(limit_reevaluation.load_reevaluation_job(job_id)['status'], 'interrupted')
+            out = StringIO()
+            call_command('reevaluate_limits', resume=True, stdout=out)
+
+            self.assertIn("Resumed 1 interrupted", out.getvalue())
+            self.assertEqual(limit_reevaluation.load_reevaluation_job(job_id)['status'], 'done')
+        result.refresh_from_db()
+        self.assertEqual(result.limit_status, 'ABOVE_LIMIT')
+
+    def test_settings_overrides_compile_with_existing_precedence(self):
+        from .services.result_overrides import compile_settings_overrides
+
+        by_parameter, fallback = compile_settings_overrides({
+            'parameters': {' Colour ': {'Clear': 'within_limits', 'Turbid': 'bogus'}},
+            'colour': {'turbid': 'ABOVE_LIMIT', 'clear': 'BELOW_LIMIT'},
+            'global': {'BDL': 'WITHIN_LIMITS'},
+            'bdl': 'UNKNOWN',
+            'ND': 'WITHIN_LIMITS',
+        })
+        self.assertEqual(by_parameter['colour'], {'clear': 'WITHIN_LIMITS', 'turbid': 'ABOVE_LIMIT'})
+        self.assertEqual(fallback, {'bdl': 'WITHIN_LIMITS', 'nd': 'WITHIN_LIMITS'})
+
 
     def test_is_within_limits_min_only_param(self):
         """Test is_within_limits for a parameter with only min_permissible_limit."""
@@ -1545,6 +1717,610 @@ class SampleReopenForCorrectionViewTests(TestCase):
         self.assertEqual(self.sample.report_revision, 1)
 
 
+class ReportArtifactTests(TestCase):
+    def setUp(self):
+        import tempfile
+        self._artifact_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._artifact_dir.cleanup)
+        settings_override = override_settings(
+            REPORT_ARTIFACTS_ROOT=self._artifact_dir.name,
+            REPORT_ARTIFACTS_ACCEL_PREFIX='',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.customer = Customer.objects.create(
+            name="Artifact Customer",
+            phone="9898989898",
+            email=f"artifact_{uuid.uuid4().hex[:6]}@example.com",
+            street_locality_landmark="Artifact Street",
+            village_town_city="Artifactville",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        self.sample = Sample.objects.create(
+            customer=self.customer,
+            collection_datetime=timezone.now() - timedelta(days=1),
+            sample_source='WELL',
+            collected_by='CUSTOMER',
+            current_status='REPORT_APPROVED',
+            report_revision=1,
+        )
+        self.admin_user = CustomUser.objects.create_user(
+            username=f"artifact_admin_{uuid.uuid4().hex[:6]}",
+            password="password",
+            role="admin",
+        )
+        self.url = reverse('core:download_sample_report', args=[self.sample.sample_id])
+
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 stored')
+    def test_second_download_is_served_from_artifact(self, render_mock):
+        self.client.force_login(self.admin_user)
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(b''.join(second.streaming_content), b'%PDF-1.4 stored')
+        self.assertEqual(render_mock.call_count, 1)
+
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 stored')
+    def test_accel_prefix_hands_download_to_nginx(self, render_mock):
+        self.client.force_login(self.admin_user)
+        with override_settings(REPORT_ARTIFACTS_ACCEL_PREFIX='/protected/report-artifacts/'):
+            response = self.client.get(self.url, {'layout': 'plain'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            f'/protected/report-artifacts/{self.sample.pk}/rev1-plain-review.pdf',
+        )
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(response.content, b'')
+
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 stored')
+    def test_reopen_drops_stored_artifacts(self, render_mock):
+        from .services.report_artifacts import load_report_artifact
+
+        self.client.force_login(self.admin_user)
+        self.client.get(self.url)
+        self.assertIsNotNone(load_report_artifact(self.sample, layout='branded'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sample.reopen_for_correction(self.admin_user, 'Correcting a transcription error.')
+
+        self.sample.refresh_from_db()
+        self.assertEqual(self.sample.report_revision, 2)
+        self.assertFalse(os.path.isdir(os.path.join(self._artifact_dir.name, str(self.sample.pk))))
+
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 stored')
+    def test_engine_parameter_selects_engine_and_artifact(self, render_mock):
+        from .services.report_artifacts import load_report_artifact
+
+        self.client.force_login(self.admin_user)
+        self.client.get(self.url, {'engine': 'html'})
+        self.client.get(self.url)
+
+        self.assertEqual(
+            [call.kwargs['engine'] for call in render_mock.call_args_list],
+            ['html', 'reportlab'],
+        )
+        self.assertTrue(load_report_artifact(self.sample, layout='branded', engine='html').endswith('-html.pdf'))
+
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 stored')
+    def test_busy_render_returns_retry_page_but_stored_artifact_is_served(self, render_mock):
+        from .services.concurrency import ConcurrencyLimitExceeded
+
+        self.client.force_login(self.admin_user)
+        with patch('core.services.concurrency.acquire_slot', side_effect=ConcurrencyLimitExceeded('pdf', 7)):
+            busy = self.client.get(self.url)
+        self.assertEqual(busy.status_code, 503)
+        self.assertEqual(busy['Retry-After'], '7')
+        self.assertContains(busy, 'content="7;url=', status_code=503)
+        render_mock.assert_not_called()
+
+        self.client.get(self.url)
+        with patch('core.services.concurrency.acquire_slot', side_effect=ConcurrencyLimitExceeded('pdf', 7)):
+            stored = self.client.get(self.url)
+        self.assertEqual(stored.status_code, 200)
+
+
+class ConcurrencyLimiterTests(SimpleTestCase):
+    def setUp(self):
+        import tempfile
+
+        self._lock_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._lock_dir.cleanup)
+        settings_override = override_settings(
+            CONCURRENCY_BACKEND='file',
+            CONCURRENCY_LOCK_DIR=self._lock_dir.name,
+            CONCURRENCY_LIMITS={'pdf': 2},
+            CONCURRENCY_RETRY_AFTER=3,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_file_slots_are_exhausted_and_freed(self):
+        from .services.concurrency import ConcurrencyLimitExceeded, acquire_slot, concurrency_slot
+
+        first = acquire_slot('pdf', wait=0)
+        second = acquire_slot('pdf', wait=0)
+        with self.assertRaises(ConcurrencyLimitExceeded) as ctx:
+            acquire_slot('pdf', wait=0)
+        self.assertEqual(ctx.exception.retry_after, 3)
+
+        first.release()
+        first.release()
+        with concurrency_slot('pdf', wait=0) as lease:
+            self.assertIsNotNone(lease)
+        second.release()
+        self.assertIsNone(acquire_slot('unknown', wait=0))
+
+
+class ReportPdfBuilderTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            name="Builder Customer",
+            phone="9812345670",
+            email=f"builder_{uuid.uuid4().hex[:6]}@example.com",
+            street_locality_landmark="Builder Street",
+            village_town_city="Builderville",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        self.sample = Sample.objects.create(
+            customer=self.customer,
+            collection_datetime=timezone.now() - timedelta(days=1),
+            sample_source='WELL',
+            collected_by='CUSTOMER',
+            current_status='REPORT_APPROVED',
+        )
+        self.parameter = TestParameter.objects.create(
+            name=f"Iron {uuid.uuid4().hex[:6]}",
+            unit="mg/L",
+            min_permissible_limit=0,
+            max_permissible_limit=0.3,
+        )
+        self.technician = CustomUser.objects.create_user(
+            username=f"builder_lab_{uuid.uuid4().hex[:6]}",
+            password="password",
+            role="lab",
+        )
+        TestResult.objects.create(
+            sample=self.sample,
+            parameter=self.parameter,
+            result_value="0.9",
+            technician=self.technician,
+        )
+
+    def test_snapshot_captures_results_and_limit_status(self):
+        from .services.report_pdf import snapshot_from_sample
+
+        snapshot = snapshot_from_sample(self.sample)
+
+        self.assertEqual(snapshot.display_id, self.sample.display_id)
+        self.assertEqual(snapshot.customer_name, "Builder Customer")
+        self.assertEqual(len(snapshot.results), 1)
+        self.assertEqual(snapshot.results[0].name, self.parameter.name)
+        self.assertEqual(snapshot.results[0].limit_status, 'ABOVE_LIMIT')
+        self.assertEqual(len(snapshot.signatories), 3)
+
+    def test_build_report_pdf_needs_no_database(self):
+        from .management.commands.benchmark_report_render import synthetic_snapshot
+        from .services.report_pdf import ReportOptions, build_report_pdf
+
+        snapshot = synthetic_snapshot(10, malayalam=False)
+        with self.assertNumQueries(0):
+            pdf_bytes = build_report_pdf(snapshot, ReportOptions(include_branding=False))
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+
+    def test_report_theme_is_reused_until_lab_header_changes(self):
+        from .services.report_pdf import ReportLabHeader
+        from .services.report_theme import clear_report_themes, get_report_theme
+
+        clear_report_themes()
+        self.addCleanup(clear_report_themes)
+        lab = ReportLabHeader(name="Lab", address="Kochi", contact="", revision="1")
+
+        theme = get_report_theme(False, lab)
+        self.assertIs(get_report_theme(False, lab), theme)
+
+        edited = ReportLabHeader(name="Lab", address="Kochi", contact="", revision="2")
+        self.assertIsNot(get_report_theme(False, edited), theme)
+        self.assertIsNot(get_report_theme(False, lab), theme)
+
+    def test_branded_pages_share_one_header_form(self):
+        from io import BytesIO
+
+        from pypdf import PdfReader
+
+        from .management.commands.benchmark_report_render import synthetic_snapshot
+        from .services.report_pdf import ReportOptions, build_report_pdf
+
+        pdf_bytes = build_report_pdf(synthetic_snapshot(60, malayalam=False), ReportOptions(include_branding=True))
+        pages = PdfReader(BytesIO(pdf_bytes)).pages
+        self.assertGreater(len(pages), 1)
+        forms = {
+            page['/Resources']['/XObject'].raw_get('/FormXob.ReportPageHeader').idnum
+            for page in pages
+        }
+        self.assertEqual(len(forms), 1)
+
+    def test_html_engine_lays_out_the_whole_bilingual_report(self):
+        from .management.commands.benchmark_report_render import synthetic_snapshot
+        from .services.report_html import build_report_html
+        from .services.report_pdf import ReportOptions
+
+        html = build_report_html(synthetic_snapshot(12, malayalam=True), ReportOptions(engine='html'))
+
+        self.assertIn('Parameter 012', html)
+        self.assertIn('AUTHORISED SIGNATORIES', html)
+        self.assertIn('Chief of Solutions - Water Quality', html)
+        self.assertIn('കിണർ വർഷത്തിലൊരിക്കൽ വൃത്തിയാക്കുക.', html)
+
+    def test_html_engine_falls_back_to_reportlab_without_weasyprint(self):
+        from .management.commands.benchmark_report_render import synthetic_snapshot
+        from .services.report_pdf import ReportOptions, build_report_pdf
+
+        snapshot = synthetic_snapshot(5, malayalam=False)
+        with patch('core.services.report_html.build_report_pdf_html', return_value=b'%PDF single-pass'):
+            self.assertEqual(build_report_pdf(snapshot, ReportOptions(engine='html')), b'%PDF single-pass')
+        with patch('core.services.report_html.build_report_pdf_html', return_value=None):
+            pdf_bytes = build_report_pdf(snapshot, ReportOptions(include_branding=False, engine='html'))
+        self.assertTrue(pdf_bytes.startswith(b'%PDF-'))
+
+
+class BulkReportExportTests(TestCase):
+    def setUp(self):
+        import tempfile
+        self._artifact_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._artifact_dir.cleanup)
+        settings_override = override_settings(REPORT_ARTIFACTS_ROOT=self._artifact_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.customer = Customer.objects.create(
+            name="Panchayat Office",
+            phone="9876501234",
+            email=f"export_{uuid.uuid4().hex[:6]}@example.com",
+            street_locality_landmark="Export Street",
+            village_town_city="Exportville",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        self.samples = [
+            Sample.objects.create(
+                customer=self.customer,
+                collection_datetime=timezone.now() - timedelta(days=2),
+                sample_source='WELL',
+                collected_by='CUSTOMER',
+                current_status=status,
+                referred_by='District Office',
+            )
+            for status in ('REPORT_APPROVED', 'REPORT_SENT', 'REVIEW_PENDING')
+        ]
+        self.user = CustomUser.objects.create_user(
+            username=f"export_lab_{uuid.uuid4().hex[:6]}",
+            password="password",
+            role="lab",
+        )
+
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 export')
+    def test_export_streams_zip_of_approved_reports(self, render_mock):
+        import io
+        import zipfile
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:bulk_report_export'), {'referred_by': 'district office'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        names = archive.namelist()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(name.startswith('WaterQualityReport_panchayat_office_') for name in names))
+        self.assertEqual(archive.read(names[0]), b'%PDF-1.4 export')
+        self.assertEqual(render_mock.call_count, 2)
+        # Exporting never advances the workflow the way a single download does.
+        self.samples[0].refresh_from_db()
+        self.assertEqual(self.samples[0].current_status, 'REPORT_APPROVED')
+
+    @override_settings(ENFORCE_USER_SCOPING=True)
+    @patch('core.views_reports._render_sample_report_pdf', return_value=b'%PDF-1.4 export')
+    def test_export_is_limited_to_the_front_desk_scope(self, render_mock):
+        import io
+        import zipfile
+
+        front_desk = CustomUser.objects.create_user(username=f"export_fd_{uuid.uuid4().hex[:6]}", role="frontdesk")
+        own = Sample.objects.create(
+            customer=self.customer,
+            collection_datetime=timezone.now() - timedelta(days=1),
+            sample_source='TAP',
+            collected_by='CUSTOMER',
+            current_status='REPORT_APPROVED',
+            referred_by='District Office',
+            created_by=front_desk,
+        )
+        self.client.force_login(front_desk)
+        url = reverse('core:bulk_report_export')
+
+        response = self.client.get(url)
+        self.assertNotIn(self.customer, response.context['form'].fields['customer'].queryset)
+        response = self.client.get(url, {'referred_by': 'district office'})
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 1)
+        self.assertEqual(render_mock.call_args.args[0], own)
+
+    def test_export_requires_a_filter(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:bulk_report_export'), {'layout': 'plain'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'core/report_export.html')
+        self.assertFalse(response.context['form'].is_valid())
+
+    @patch('core.views_reports._render_sample_report_pdf', side_effect=[b'%PDF-1.4 ok', RuntimeError('boom')])
+    def test_export_command_lists_failed_reports(self, render_mock):
+        import zipfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        output = os.path.join(self._artifact_dir.name, 'export.zip')
+        call_command('export_reports', output, '--customer', self.customer.customer_code, stdout=StringIO())
+
+        with zipfile.ZipFile(output) as archive:
+            names = archive.namelist()
+            self.assertEqual(len(names), 2)
+            self.assertIn('export_errors.txt', names)
+
+
+class RenderPoolTests(SimpleTestCase):
+    def test_disabled_pool_renders_inline(self):
+        from .services.render_pool import render_pdf
+
+        self.assertEqual(render_pdf('report', 'abc', inline=lambda: b'%PDF inline'), b'%PDF inline')
+
+    def test_full_queue_raises_busy(self):
+        import threading
+        from unittest.mock import MagicMock
+        from .services import render_pool
+
+        pool = MagicMock()
+        with patch.object(render_pool, '_get_pool', return_value=pool), \
+                patch.object(render_pool, '_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            with self.assertRaises(render_pool.RenderPoolBusy):
+                render_pool.render_pdf('report', 'abc', inline=lambda: b'%PDF inline')
+        pool.submit.assert_not_called()
+
+    def test_broken_pool_falls_back_to_inline(self):
+        import threading
+        from concurrent.futures.process import BrokenProcessPool
+        from unittest.mock import MagicMock
+        from .services import render_pool
+
+        pool = MagicMock()
+        pool.submit.side_effect = BrokenProcessPool('child died')
+        with patch.object(render_pool, '_get_pool', return_value=pool), \
+                patch.object(render_pool, '_slots', threading.BoundedSemaphore(1)):
+            pdf_bytes = render_pool.render_pdf('invoice', 'abc', inline=lambda: b'%PDF inline')
+        self.assertEqual(pdf_bytes, b'%PDF inline')
+
+    def test_pool_breaking_mid_batch_yields_every_key_once(self):
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+        from unittest.mock import MagicMock
+        from .services import render_pool
+
+        def submit(fn, job, pk, options, timeout):
+            future = Future()
+            if pk in ('a', 'c'):
+                future.set_result(f'pool-{pk}'.encode())
+            elif pk == 'b':
+                future.set_exception(BrokenProcessPool('child died'))
+            return future  # 'd' never finishes
+
+        pool = MagicMock()
+        pool.submit.side_effect = submit
+        with patch.object(render_pool, '_get_pool', return_value=pool), \
+                patch.object(render_pool, '_pool_size', return_value=2):
+            results = list(render_pool.render_many(
+                'report', iter('abcdef'), inline=lambda pk: f'inline-{pk}'.encode(),
+            ))
+
+        self.assertEqual(sorted(pk for pk, _ in results), list('abcdef'))
+        self.assertIn(('b', b'inline-b'), results)
+        self.assertIn(('d', b'inline-d'), results)
+
+    @override_settings(REPORT_RENDER_WORKERS=3)
+    def test_pool_size_follows_the_setting_not_the_command_line(self):
+        from .services import render_pool
+
+        # sys.argv holds "test" here; only the setting decides.
+        self.assertEqual(render_pool._pool_size(), 3)
+        self.assertEqual(render_pool._pool_size(0), 0)
+
+    @override_settings(REPORT_RENDER_WORKERS=4)
+    def test_render_many_with_zero_workers_renders_inline(self):
+        from .services import render_pool
+
+        with patch.object(render_pool, 'ProcessPoolExecutor') as executor:
+            results = list(render_pool.render_many('report', [1, 2], inline=lambda pk: b'%PDF inline', workers=0))
+
+        executor.assert_not_called()
+        self.assertEqual(results, [(1, b'%PDF inline'), (2, b'%PDF inline')])
+
+    def test_render_many_reads_keys_one_window_at_a_time(self):
+        from concurrent.futures import Future
+        from unittest.mock import MagicMock
+        from .services import render_pool
+
+        consumed = []
+
+        def keys():
+            for pk in range(100):
+                consumed.append(pk)
+                yield pk
+
+        def submit(fn, job, pk, options, timeout):
+            future = Future()
+            future.set_result(b'%PDF pooled')
+            return future
+
+        pool = MagicMock()
+        pool.submit.side_effect = submit
+        with patch.object(render_pool, '_get_pool', return_value=pool), \
+                patch.object(render_pool, '_pool_size', return_value=1):
+            results = render_pool.render_many(
+                'report', keys(), inline=lambda pk: b'%PDF inline',
+                cached=lambda pk: b'%PDF stored' if pk % 2 else None,
+            )
+            first = next(results)
+            self.assertLessEqual(len(consumed), 2)
+            rest = list(results)
+
+        self.assertIn(first[0], (0, 1))
+        by_pk = dict([first, *rest])
+        self.assertEqual(len(by_pk), 100)
+        self.assertEqual(by_pk[1], b'%PDF stored')
+        self.assertEqual(by_pk[2], b'%PDF pooled')
+        self.assertEqual(pool.submit.call_count, 50)
+
+
+class MalayalamPageCacheTests(SimpleTestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings_override = override_settings(MALAYALAM_PAGE_CACHE_DIR=self.cache_dir, MALAYALAM_PAGE_CACHE_MAX_MB=1)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _render(self, remarks='- കുടിവെള്ളം തിളപ്പിക്കുക.'):
+        from .services.malayalam_report import render_malayalam_remarks_pdf
+
+        return render_malayalam_remarks_pdf(
+            sample_code='WL-1',
+            report_number='RPT-1',
+            customer_name='Customer',
+            remarks_ml=remarks,
+            recommendations_ml='',
+        )
+
+    def test_repeat_render_is_served_from_cache(self):
+        import sys
+        from unittest.mock import MagicMock
+
+        weasyprint = MagicMock()
+        weasyprint.HTML.return_value.write_pdf.return_value = b'%PDF malayalam'
+        with patch.dict(sys.modules, {'weasyprint': weasyprint}):
+            self.assertEqual(self._render(), b'%PDF malayalam')
+            self.assertEqual(self._render(), b'%PDF malayalam')
+            self._render(remarks='- കിണർ വൃത്തിയാക്കുക.')
+        self.assertEqual(weasyprint.HTML.call_count, 2)
+
+    def test_eviction_removes_least_recently_used_pages(self):
+        from .services.malayalam_report import evict_malayalam_page_cache
+
+        for index, name in enumerate(('old', 'mid', 'new')):
+            path = os.path.join(self.cache_dir, f'{name}.pdf')
+            with open(path, 'wb') as fh:
+                fh.write(b'x' * 400)
+            os.utime(path, (1000 + index, 1000 + index))
+
+        self.assertEqual(evict_malayalam_page_cache(900), 1)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['mid.pdf', 'new.pdf'])
+
+
+class WeasyPrintRendererTests(SimpleTestCase):
+    def test_crashed_renderer_is_dropped_and_caller_falls_back(self):
+        from unittest.mock import MagicMock
+        from .services import weasyprint_renderer
+
+        renderer = MagicMock()
+        renderer.request.side_effect = EOFError
+        with patch.object(weasyprint_renderer, '_enabled', return_value=True), \
+                patch.object(weasyprint_renderer, '_renderer', renderer), \
+                patch.object(weasyprint_renderer, '_ensure_renderer', return_value=renderer):
+            self.assertIsNone(weasyprint_renderer.render_html_to_pdf('<p>x</p>'))
+            self.assertIsNone(weasyprint_renderer._renderer)
+
+    def test_malayalam_page_uses_renderer_output(self):
+        from .services.malayalam_report import render_malayalam_remarks_pdf
+
+        with override_settings(MALAYALAM_PAGE_CACHE_MAX_MB=0), \
+                patch('core.services.malayalam_report.render_html_to_pdf', return_value=b'%PDF warm') as render:
+            pdf_bytes = render_malayalam_remarks_pdf(
+                sample_code='WL-1',
+                report_number='RPT-1',
+                customer_name='Customer',
+                remarks_ml='- കുടിവെള്ളം തിളപ്പിക്കുക.',
+                recommendations_ml='',
+            )
+        self.assertEqual(pdf_bytes, b'%PDF warm')
+        self.assertIn('WL-1', render.call_args.args[0])
+
+
+class ReportImageVariantTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        settings_override = override_settings(
+            REPORT_IMAGE_CACHE_DIR=os.path.join(self.tmp, 'variants'),
+            MEDIA_ROOT=os.path.join(self.tmp, 'media'),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _png(self, size, mode='RGBA'):
+        from io import BytesIO
+
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new(mode, size, (10, 120, 90, 255) if mode == 'RGBA' else (10, 120, 90)).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_background_variant_is_capped_jpeg_and_follows_source_changes(self):
+        from PIL import Image
+
+        from .services.report_images import report_image_variant
+
+        source = os.path.join(self.tmp, 'letterhead.png')
+        with open(source, 'wb') as fh:
+            fh.write(self._png((2481, 3508), mode='RGB'))
+
+        variant = report_image_variant(source, 'background')
+        with Image.open(variant) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertLessEqual(image.size[1], 1754)
+        self.assertEqual(report_image_variant(source, 'background'), variant)
+
+        with open(source, 'wb') as fh:
+            fh.write(self._png((1000, 1414), mode='RGB'))
+        os.utime(source, ns=(1, 1))
+        self.assertNotEqual(report_image_variant(source, 'background'), variant)
+
+    def test_signature_upload_builds_variant(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        user = CustomUser.objects.create_user(
+            username=f"signer_{uuid.uuid4().hex[:6]}",
+            password="password",
+            role="chem_manager",
+        )
+        user.signature = SimpleUploadedFile('sig.png', self._png((1800, 700)), content_type='image/png')
+        user.save()
+
+        variants = os.listdir(os.path.join(self.tmp, 'variants'))
+        self.assertEqual(len(variants), 1)
+        self.assertTrue(variants[0].startswith('signature-'))
+
+
 class TestResultEntryViewTests(TestCase):
     def setUp(self):
         self.customer = Customer.objects.create(
@@ -1594,6 +2370,350 @@ class TestResultEntryViewTests(TestCase):
         self.assertIsNotNone(self.sample.test_completed_on)
         self.assertTrue(TestResult.objects.filter(sample=self.sample, parameter=self.parameter).exists())
 
+    def _panel(self, size):
+        sample = Sample.objects.create(
+            customer=self.customer,
+            collection_datetime=timezone.now() - timedelta(days=1),
+            sample_source='WELL',
+            collected_by='CUSTOMER'
+        )
+        parameters = [
+            TestParameter.objects.create(name=f"Panel {uuid.uuid4().hex[:8]}", unit="mg/L", max_permissible_limit=10)
+            for _ in range(size)
+        ]
+        sample.tests_requested.add(*parameters)
+        sample.update_status('SENT_TO_LAB', self.lab_user)
+        return sample, parameters
+
+    def _post_panel(self, sample, values):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        payload = {'submit_action': 'save'}
+        for parameter, value in values.items():
+            payload[f'param_{parameter.parameter_id}-result_value'] = value
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('core:test_result_entry', args=[sample.sample_id]), data=payload)
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_panel_saves_in_constant_queries_with_bulk_audit(self):
+        self.client.force_login(self.lab_user)
+        small_sample, small_params = self._panel(3)
+        large_sample, large_params = self._panel(15)
+        # Warm per-process state (session, compiled override index) first.
+        self._post_panel(self.sample, {self.parameter: '1'})
+
+        small_queries = self._post_panel(small_sample, {param: '4' for param in small_params})
+        large_queries = self._post_panel(large_sample, {param: '12' for param in large_params})
+        self.assertEqual(small_queries, large_queries)
+
+        self.assertEqual(
+            set(TestResult.objects.filter(sample=large_sample).values_list('limit_status', flat=True)),
+            {'ABOVE_LIMIT'},
+        )
+        self.assertEqual(
+            AuditTrail.objects.filter(model_name='TestResult', action='CREATE').count(),
+            19,
+        )
+
+        large_sample.refresh_from_db()
+        values = {param: '12' for param in large_params}
+        values[large_params[0]] = '3'
+        self._post_panel(large_sample, values)
+        updates = AuditTrail.objects.filter(model_name='TestResult', action='UPDATE')
+        self.assertEqual(updates.count(), 1)
+        self.assertEqual(updates.get().changes['result_value'], {'old': '12', 'new': '3'})
+        self.assertEqual(
+            TestResult.objects.get(sample=large_sample, parameter=large_params[0]).limit_status,
+            'WITHIN_LIMITS',
+        )
+
+
+
+class ResultImportTests(TestCase):
+    def setUp(self):
+        self.lab_user = CustomUser.objects.create_user(username="import_lab", password="password", role="lab")
+        self.iron = TestParameter.objects.create(name="Import Iron", unit="mg/L", max_permissible_limit=Decimal('0.3'))
+        self.nitrate = TestParameter.objects.create(name="Import Nitrate (NO3)", unit="mg/L", max_permissible_limit=45)
+
+    def _sample(self, name, *, sent=True):
+        customer = Customer.objects.create(
+            name=name,
+            phone="9000000000",
+            street_locality_landmark="Import Street",
+            village_town_city="Importville",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        sample = Sample.objects.create(
+            customer=customer,
+            collection_datetime=timezone.now() - timedelta(days=1),
+            sample_source='WELL',
+            collected_by='CUSTOMER',
+        )
+        sample.tests_requested.add(self.iron, self.nitrate)
+        if sent:
+            sample.update_status('SENT_TO_LAB', self.lab_user)
+        return sample
+
+    def test_upload_matches_samples_and_reports_row_errors(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        by_id = self._sample("Import By Id")
+        by_code = self._sample("Import By Code")
+        not_sent = self._sample("Import Not Sent", sent=False)
+        content = "\n".join([
+            "Sample ID,Customer code,Import Iron (mg/L),NO3,Colour",
+            f"{by_id.display_id.lower()},,0.1,50,clear",
+            f",{by_code.customer.customer_code},0.2,,",
+            "WL-MISSING,,0.1,1,",
+            f"{not_sent.display_id},,0.1,1,",
+            f"{by_id.display_id},,abc{'x' * 300},,",
+        ])
+        upload = SimpleUploadedFile("run.csv", content.encode('utf-8-sig'), content_type='text/csv')
+
+        self.client.force_login(self.lab_user)
+        response = self.client.post(reverse('core:result_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        summary = response.context['summary']
+
+        self.assertEqual((summary.rows, summary.created, summary.completed_samples), (5, 3, 1))
+        self.assertEqual(summary.ignored_columns, ['Colour'])
+        self.assertEqual([error.line for error in summary.errors], [4, 4, 5, 5, 6])
+        self.assertIn("not found", summary.errors[0].message)
+        self.assertIn("not open", summary.errors[2].message)
+
+        by_id.refresh_from_db()
+        by_code.refresh_from_db()
+        self.assertEqual(by_id.current_status, 'RESULTS_ENTERED')
+        self.assertEqual(by_code.current_status, 'TESTING_IN_PROGRESS')
+        self.assertEqual(TestResult.objects.get(sample=by_id, parameter=self.nitrate).limit_status, 'ABOVE_LIMIT')
+        self.assertEqual(
+            AuditTrail.objects.filter(model_name='TestResult', action='CREATE', user=self.lab_user).count(),
+            3,
+        )
+
+    def test_command_imports_long_format_in_chunks(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        sample = self._sample("Import Long")
+        TestResult.objects.create(sample=sample, parameter=self.iron, result_value='0.5', technician=self.lab_user)
+        path = os.path.join(self._tmp_dir(), 'long.csv')
+        errors_path = os.path.join(self._tmp_dir(), 'errors.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as fh:
+            fh.write("Sample No,Parameter,Result,Remarks\n")
+            fh.write(f"{sample.display_id},Import Iron,0.2,Rechecked\n")
+            fh.write(f"{sample.display_id},Import Nitrate,10,\n")
+            fh.write(f"{sample.display_id},Lead,0.01,\n")
+
+        call_command('import_results', path, user='import_lab', chunk_size=1, errors=errors_path, stdout=StringIO())
+
+        iron = TestResult.objects.get(sample=sample, parameter=self.iron)
+        self.assertEqual((iron.result_value, iron.remarks, iron.limit_status), ('0.2', 'Rechecked', 'WITHIN_LIMITS'))
+        self.assertTrue(TestResult.objects.filter(sample=sample, parameter=self.nitrate).exists())
+        self.assertEqual(AuditTrail.objects.filter(model_name='TestResult', action='UPDATE').count(), 1)
+        sample.refresh_from_db()
+        self.assertEqual(sample.current_status, 'RESULTS_ENTERED')
+        with open(errors_path, encoding='utf-8') as fh:
+            self.assertEqual(fh.read().splitlines()[1], '4,%s,Lead,Unknown parameter.' % sample.display_id)
+
+    def _tmp_dir(self):
+        import tempfile
+
+        if not hasattr(self, '_tmp'):
+            self._tmp = tempfile.TemporaryDirectory()
+            self.addCleanup(self._tmp.cleanup)
+        return self._tmp.name
+
+
+class ParameterBatchEntryTests(TestCase):
+    def setUp(self):
+        self.lab_user = CustomUser.objects.create_user(username="batch_lab", password="password", role="lab")
+        self.customer = Customer.objects.create(
+            name="Batch Customer",
+            phone="9111111111",
+            street_locality_landmark="Batch Street",
+            village_town_city="Batchville",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        self.ph = TestParameter.objects.create(name="Batch pH", unit="pH", min_permissible_limit=Decimal('6.5'), max_permissible_limit=Decimal('8.5'))
+        self.turbidity = TestParameter.objects.create(name="Batch Turbidity", unit="NTU", max_permissible_limit=1)
+        self.client.force_login(self.lab_user)
+
+    def _samples(self, count, *parameters, status='SENT_TO_LAB'):
+        samples = []
+        for _ in range(count):
+            sample = Sample.objects.create(
+                customer=self.customer,
+                collection_datetime=timezone.now() - timedelta(days=1),
+                sample_source='WELL',
+                collected_by='CUSTOMER',
+            )
+            sample.tests_requested.add(*(parameters or (self.ph,)))
+            if status:
+                sample.update_status(status, self.lab_user)
+            samples.append(sample)
+        return samples
+
+    def test_screen_saves_all_samples_and_completes_them_in_bulk(self):
+        complete = self._samples(2)
+        partial = self._samples(1, self.ph, self.turbidity)[0]
+        not_in_lab = self._samples(1, status=None)[0]
+
+        url = reverse('core:parameter_batch_entry')
+        response = self.client.get(url, {'parameter': self.ph.pk})
+        self.assertEqual([sample.pk for sample in response.context['samples']], [s.pk for s in complete + [partial]])
+
+        payload = {'parameter': str(self.ph.pk)}
+        for sample, value in zip(complete + [partial], ('7.1', '9.2', '7.0')):
+            payload[f'result_{sample.pk}'] = value
+        payload[f'observation_{complete[0].pk}'] = 'Clear'
+        response = self.client.post(url, payload)
+        self.assertEqual(response.status_code, 302)
+
+        for sample in complete:
+            sample.refresh_from_db()
+            self.assertEqual(sample.current_status, 'RESULTS_ENTERED')
+            self.assertIsNotNone(sample.test_completed_on)
+        self.assertEqual(len({sample.report_number for sample in complete}), 2)
+        partial.refresh_from_db()
+        self.assertEqual(partial.current_status, 'TESTING_IN_PROGRESS')
+        self.assertFalse(TestResult.objects.filter(sample=not_in_lab).exists())
+        self.assertEqual(TestResult.objects.get(sample=complete[1], parameter=self.ph).limit_status, 'ABOVE_LIMIT')
+        self.assertEqual(TestResult.objects.get(sample=complete[0], parameter=self.ph).observation, 'Clear')
+        self.assertEqual(
+            AuditTrail.objects.filter(model_name='Sample', object_id=str(complete[0].pk), action='UPDATE')
+            .order_by('timestamp').last().changes['current_status'],
+            {'old': 'TESTING_IN_PROGRESS', 'new': 'RESULTS_ENTERED'},
+        )
+
+    def test_json_endpoint_writes_in_constant_queries_and_reports_errors(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('core:parameter_batch_entry_api', args=[self.turbidity.pk])
+
+        def post(results):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, json.dumps({'results': results}), content_type='application/json')
+            return response, len(queries)
+
+        warm = self._samples(1, self.turbidity)
+        post([{'sample_id': str(warm[0].pk), 'result_value': 0.5}])
+        small = self._samples(2, self.turbidity)
+        large = self._samples(8, self.turbidity)
+        _, small_queries = post([{'sample_id': str(s.pk), 'result_value': 0.5} for s in small])
+        _, large_queries = post([{'sample_id': str(s.pk), 'result_value': 2} for s in large])
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(Sample.objects.filter(pk__in=[s.pk for s in large], current_status='RESULTS_ENTERED').count(), 8)
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['samples'][-1]['limit_status'], 'ABOVE_LIMIT')
+
+        pending = self._samples(1, self.turbidity)[0]
+        response, _ = post({
+            str(pending.pk): {'result_value': 'x' * 300},
+            str(uuid.uuid4()): {'result_value': '1'},
+            'not-a-uuid': {'result_value': '1'},
+        })
+        body = response.json()
+        self.assertFalse(body['ok'])
+        self.assertEqual((body['created'], len(body['errors'])), (0, 3))
+        self.assertIn(str(pending.pk), body['errors'])
+
+class BulkSampleRegistrationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="bulk_desk", password="password", role="frontdesk")
+        self.customer = Customer.objects.create(
+            name="Panchayat Drive", phone="9000000001", street_locality_landmark="Ward 1",
+            village_town_city="Kochi", district="Ernakulam", pincode="682001",
+        )
+        self.ph = TestParameter.objects.create(name="Bulk pH", unit="")
+        self.iron = TestParameter.objects.create(name="Bulk Iron", unit="mg/L")
+        self.client.force_login(self.user)
+
+    def test_form_registers_batch_in_constant_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def post(locations):
+            return self.client.post(reverse('core:sample_bulk_add'), {
+                'mode': 'form',
+                'customer': self.customer.pk,
+                'collection_datetime': timezone.localtime().strftime('%d/%m/%Y %H:%M'),
+                'sample_source': 'TAP',
+                'collected_by': 'GOVERNMENT_DEPT',
+                'tests_requested': [self.ph.pk, self.iron.pk],
+                'sampling_locations': '\n'.join(locations),
+            })
+
+        post(['Warm-up'])  # seeds this year's counter
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(post(['Ward 1', 'Ward 2']).status_code, 302)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(post([f'Ward {index}' for index in range(30)]).status_code, 302)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+        samples = list(Sample.objects.filter(customer=self.customer).order_by('display_id'))
+        self.assertEqual(len(samples), 33)
+        numbers = [int(sample.display_id.split('-')[-1]) for sample in samples]
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 33)))
+        self.assertEqual(samples[3].sampling_location, 'Ward 0')
+        self.assertEqual(set(samples[-1].tests_requested.all()), {self.ph, self.iron})
+        self.assertEqual(samples[0].created_by, self.user)
+        self.assertEqual(AuditTrail.objects.filter(model_name='Sample', action='CREATE').count(), 33)
+
+    def test_csv_with_a_bad_row_registers_nothing(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        code = self.customer.customer_code
+        content = "\n".join([
+            "Customer code,Collection date,Source,Location,Tests",
+            f"{code},01/06/2025 09:30,Tap,School,Bulk pH; Bulk Iron",
+            f"{code.lower()},2025-06-01 10:00,WELL,Temple,Bulk pH",
+            "NOPE,01/06/2025,Lake,,Unknown test",
+        ])
+
+        def upload(text):
+            return self.client.post(reverse('core:sample_bulk_add'), {
+                'mode': 'csv',
+                'file': SimpleUploadedFile("drive.csv", text.encode('utf-8-sig'), content_type='text/csv'),
+            })
+
+        response = upload(content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([error.line for error in response.context['row_errors']], [4, 4, 4])
+        self.assertFalse(Sample.objects.exists())
+
+        response = upload(content.rsplit("\n", 1)[0])
+        self.assertEqual(response.status_code, 302)
+        school, temple = Sample.objects.order_by('display_id')
+        self.assertEqual((school.sampling_location, school.sample_source), ('School', 'TAP'))
+        self.assertEqual(set(school.tests_requested.all()), {self.ph, self.iron})
+        self.assertEqual(list(temple.tests_requested.all()), [self.ph])
+
+    def test_csv_rows_are_validated_like_single_samples(self):
+        from io import StringIO
+
+        from .services.sample_registration import parse_registration_csv
+
+        code = self.customer.customer_code
+        future = (timezone.localtime() + timedelta(days=2)).strftime('%d/%m/%Y %H:%M')
+        batch = parse_registration_csv(StringIO("\n".join([
+            "Customer code,Collection date,Source,Quantity",
+            f"{code},01/06/2025 09:30,Tap,1 litre",
+            f"{code},{future},Tap,1 litre",
+            f"{code},01/06/2025 09:30,Tap,{'x' * 51}",
+        ])))
+
+        self.assertEqual(len(batch.samples), 1)
+        self.assertEqual([error.line for error in batch.errors], [3, 4])
+        self.assertIn("cannot be in the future", batch.errors[0].message)
+        self.assertTrue(batch.errors[1].message.startswith("Quantity Received:"))
+
 
 class SampleListViewTests(TestCase):
     def setUp(self):
@@ -1658,6 +2778,16 @@ class SampleListViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "?page=2&amp;status=RECEIVED_FRONT_DESK")
 
+    def test_outside_limits_filter_uses_stored_status(self):
+        parameter = TestParameter.objects.create(name="List pH", unit="pH", min_permissible_limit=6.5, max_permissible_limit=8.5)
+        TestResult.objects.create(sample=self.samples[1], parameter=parameter, result_value="9.1")
+        TestResult.objects.create(sample=self.samples[2], parameter=parameter, result_value="7.0")
+        TestResult.objects.create(sample=self.samples[20], parameter=parameter, result_value="5.2")
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get(reverse('core:sample_list'), {'limits': 'out', 'collected': 'week'})
+        self.assertEqual([sample.pk for sample in response.context['samples']], [self.samples[1].pk])
+
 
 class GlobalSearchViewTests(TestCase):
     def setUp(self):
@@ -1706,6 +2836,136 @@ class GlobalSearchViewTests(TestCase):
         self.assertContains(response, self.customer.customer_code)
         self.assertContains(response, self.sample.display_id)
 
+    def test_search_index_follows_customer_edits_into_sample_search(self):
+        self.client.force_login(self.admin_user)
+        self.customer.name = "Renamed Riverside Trust"
+        self.customer.phone = "+91 77665 54433"
+        self.customer.save()
+
+        for query in ('riverside', '7766554433'):
+            response = self.client.get(reverse('core:sample_list'), {'q': query})
+            self.assertEqual([sample.pk for sample in response.context['samples']], [self.sample.pk])
+        response = self.client.get(reverse('core:customer_list'), {'q': 'Global Search Customer'})
+        self.assertEqual(len(response.context['customers']), 0)
+
+        self.sample.sampling_location = "Hilltop Tank"
+        self.sample.save()
+        response = self.client.get(reverse('core:sample_list'), {'q': 'hilltop'})
+        self.assertEqual([sample.pk for sample in response.context['samples']], [self.sample.pk])
+
+    def test_global_search_ranks_closer_matches_first(self):
+        other = Customer.objects.create(
+            name="Lanewood Apartments Association",
+            phone="8899001133",
+            street_locality_landmark="Search Lane",
+            village_town_city="Findtown",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get(reverse('core:global_search'), {'q': 'lanewood'})
+        self.assertEqual(response.context['customers'], [other])
+
+        response = self.client.get(reverse('core:global_search'), {'q': 'globalsearch@example'})
+        self.assertEqual(response.context['customers'], [self.customer])
+        self.assertEqual(response.context['samples'], [self.sample])
+
+    @override_settings(ENFORCE_USER_SCOPING=True)
+    def test_global_search_ranks_within_the_front_desk_scope(self):
+        front_desk = CustomUser.objects.create_user(username="global_search_fd", password="password", role="frontdesk")
+        own_customer = Customer.objects.create(
+            name="Front Desk Own Customer With A Longer Name",
+            phone="8899001144",
+            house_name_door_no="Thekkekara House, opposite the old panchayat office",
+            street_locality_landmark="Search Lane",
+            village_town_city="Findtown",
+            district="Ernakulam",
+            pincode="682001",
+            created_by=front_desk,
+        )
+        own_sample = Sample.objects.create(
+            customer=own_customer,
+            collection_datetime=timezone.now() - timedelta(days=1),
+            sample_source='WELL',
+            collected_by='CUSTOMER',
+            sampling_location="Search Lane Well behind the temple compound wall",
+            current_status='RECEIVED_FRONT_DESK',
+            created_by=front_desk,
+        )
+        self.client.force_login(front_desk)
+
+        # Only one global candidate: the admin's shorter records rank first.
+        with patch('core.views_common.GLOBAL_SEARCH_CANDIDATES', 1):
+            response = self.client.get(reverse('core:global_search'), {'q': 'search lane'})
+            short_response = self.client.get(reverse('core:global_search'), {'q': 'fi'})
+
+        self.assertEqual(response.context['customers'], [own_customer])
+        self.assertEqual(response.context['samples'], [own_sample])
+        self.assertEqual(short_response.context['customers'], [own_customer])
+
+    def test_search_suggest_returns_prefix_matches_as_dropdown_items(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client.force_login(self.admin_user)
+        url = reverse('core:search_suggest')
+
+        response = self.client.get(url, {'q': 'global sea'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{
+            'kind': 'customer',
+            'label': self.customer.name,
+            'detail': f"{self.customer.customer_code} · {self.customer.phone}",
+            'url': reverse('core:customer_detail', args=[self.customer.pk]),
+        }])
+
+        results = self.client.get(url, {'q': self.sample.display_id.lower()}).json()['results']
+        self.assertEqual([(item['kind'], item['label']) for item in results], [('sample', self.sample.display_id)])
+        results = self.client.get(url, {'q': '889 900'}).json()['results']
+        self.assertEqual([item['label'] for item in results], [self.customer.name])
+        for typed in ('+91 88990', '91889900112', '0889 900'):
+            results = self.client.get(url, {'q': typed}).json()['results']
+            self.assertEqual([item['label'] for item in results], [self.customer.name], typed)
+        self.assertEqual(self.client.get(url, {'q': 'g'}).json()['results'], [])
+
+    def test_search_suggest_reuses_cached_answer_for_hot_prefix(self):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cache.clear()
+        self.client.force_login(self.admin_user)
+        url = reverse('core:search_suggest')
+        first = self.client.get(url, {'q': 'Global'}).json()
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(url, {'q': '  global  '}).json()
+        self.assertEqual(second, first)
+        self.assertFalse([query for query in ctx.captured_queries if 'core_customer' in query['sql']])
+
+    def test_phone_queries_match_normalized_phone_exactly(self):
+        other = Customer.objects.create(
+            name="Almost Same Number",
+            phone="88990011229",
+            village_town_city="Findtown",
+            district="Ernakulam",
+            pincode="682001",
+        )
+        self.client.force_login(self.admin_user)
+        query = '+91 88990-01122'
+
+        response = self.client.get(reverse('core:customer_list'), {'q': query})
+        self.assertEqual(list(response.context['customers']), [self.customer])
+        response = self.client.get(reverse('core:sample_list'), {'q': query})
+        self.assertEqual(list(response.context['samples']), [self.sample])
+        response = self.client.get(reverse('core:global_search'), {'q': query})
+        self.assertEqual(list(response.context['customers']), [self.customer])
+        self.assertEqual(list(response.context['samples']), [self.sample])
+
+        response = self.client.get(reverse('core:customer_list'), {'q': '8899001'})
+        self.assertEqual({customer.pk for customer in response.context['customers']}, {self.customer.pk, other.pk})
+
     def test_empty_global_search_does_not_dump_records(self):
         self.client.force_login(self.admin_user)
         response = self.client.get(reverse('core:global_search'))
@@ -1850,7 +3110,7 @@ class AuditTrailModelTests(TestCase):
         self.assertEqual(log_entry.model_name, 'Customer')
         self.assertEqual(log_entry.object_id, str(self.customer_for_audit.pk))
         self.assertEqual(log_entry.object_repr, str(self.customer_for_audit))
-        self.assertEqual(log_entry.new_values['name'], self.customer_for_audit.name)
+        self.assertEqual(log_entry.payload.new_values['name'], self.customer_for_audit.name)
         self.assertTrue(AuditTrail.objects.filter(pk=log_entry.pk).exists())
         self.assertEqual(str(log_entry), f"Created Customer by {self.user.username} at {log_entry.timestamp}")
 
@@ -1872,3 +3132,209 @@ class AuditTrailModelTests(TestCase):
         self.assertEqual(log_entry.action, 'UPDATE')
         self.assertEqual(log_entry.changes['name']['old'], old_name)
         self.assertEqual(log_entry.changes['name']['new'], "Updated Audit Customer")
+
+    def test_buffered_audit_writes_committed_entries_once_and_drops_rolled_back(self):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+        from .services.audit_buffer import buffered_audit
+
+        before = AuditTrail.objects.count()
+        with CaptureQueriesContext(connection) as queries:
+            with buffered_audit():
+                AuditTrail.log_change(user=self.user, action='VIEW', instance=self.customer_for_audit)
+                with transaction.atomic():
+                    AuditTrail.log_change(user=self.user, action='UPDATE', instance=self.customer_for_audit)
+                    try:
+                        with transaction.atomic():
+                            AuditTrail.log_change(user=self.user, action='DELETE', instance=self.customer_for_audit)
+                            raise RuntimeError("roll back the inner savepoint")
+                    except RuntimeError:
+                        pass
+                try:
+                    with transaction.atomic():
+                        AuditTrail.log_changes([
+                            AuditTrail.build_entry(self.user, 'CREATE', self.customer_for_audit),
+                        ])
+                        raise RuntimeError("roll back the whole block")
+                except RuntimeError:
+                    pass
+                self.assertEqual(AuditTrail.objects.count(), before)
+
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "core_audittrail"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(AuditTrail.objects.filter(user=self.user).values_list('action', flat=True)),
+            ['UPDATE', 'VIEW'],
+        )
+
+    def test_failed_audit_flush_does_not_mask_the_request_error(self):
+        from .services import audit_buffer
+
+        with patch.object(audit_buffer, '_write', side_effect=RuntimeError("audit insert failed")):
+            with self.assertRaisesMessage(ValueError, "view failed"):
+                with audit_buffer.buffered_audit():
+                    AuditTrail.log_change(user=self.user, action='VIEW', instance=self.customer_for_audit)
+                    raise ValueError("view failed")
+            with self.assertRaisesMessage(RuntimeError, "audit insert failed"):
+                with audit_buffer.buffered_audit():
+                    AuditTrail.log_change(user=self.user, action='VIEW', instance=self.customer_for_audit)
+
+    def test_background_audit_writer_batches_across_submissions(self):
+        from .services import audit_buffer
+
+        writer = audit_buffer._BackgroundWriter()
+        for action in ('CREATE', 'UPDATE', 'VIEW'):
+            writer.queue.put([AuditTrail.build_entry(self.user, action, self.customer_for_audit)])
+        batch = writer._next_batch(batch_size=10, flush_seconds=0)
+        self.assertEqual([entry.action for entry in batch], ['CREATE', 'UPDATE', 'VIEW'])
+
+        writer.queue.put([AuditTrail.build_entry(self.user, 'DELETE', self.customer_for_audit)])
+        self.assertEqual(writer.drain(), 1)
+        self.assertTrue(AuditTrail.objects.filter(action='DELETE', user=self.user).exists())
+
+    def _old_entries(self, *moments):
+        entries = []
+        for moment in moments:
+            entry = AuditTrail.build_entry(self.user, 'UPDATE', self.customer_for_audit, {'name': 'a'}, {'name': 'b'})
+            entry.timestamp = moment
+            entries.append(entry)
+        AuditTrail.objects.bulk_create(entries)
+        return entries
+
+    def test_archive_audit_moves_whole_old_months_to_compressed_segments(self):
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import AuditArchiveSegment
+        from .services.audit_archive import read_archive_segment
+
+        now = timezone.now()
+        old = self._old_entries(now - timedelta(days=400), now - timedelta(days=399), now - timedelta(days=370))
+        recent = self._old_entries(now - timedelta(days=2))[0]
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(AUDIT_ARCHIVE_DIR=directory):
+            call_command('archive_audit', days=30, dry_run=True, stdout=StringIO())
+            self.assertEqual(AuditTrail.objects.count(), 4)
+
+            call_command('archive_audit', days=30, batch_size=1, stdout=StringIO())
+            self.assertEqual(list(AuditTrail.objects.values_list('pk', flat=True)), [recent.pk])
+            segments = list(AuditArchiveSegment.objects.order_by('period_start'))
+            self.assertEqual(sum(segment.row_count for segment in segments), 3)
+            self.assertTrue(all(segment.kind == 'file' and len(segment.sha256) == 64 for segment in segments))
+            archived = [row for segment in segments for row in read_archive_segment(segment)]
+            self.assertEqual(sorted(row['audit_id'] for row in archived), sorted(str(entry.pk) for entry in old))
+            self.assertEqual(archived[0]['changes'], {'name': {'old': 'a', 'new': 'b'}})
+            self.assertEqual(archived[0]['username'], self.user.username)
+
+            call_command('archive_audit', days=30, stdout=StringIO())
+            self.assertEqual(AuditArchiveSegment.objects.count(), len(segments))
+
+    def test_audit_viewer_uses_keyset_pages_and_prefix_lookup(self):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cache.clear()
+        now = timezone.now()
+        entries = self._old_entries(*(now - timedelta(minutes=index) for index in range(120)))
+        self.client.force_login(self.user)
+        url = reverse('core:audit_trail')
+
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(url).context['page_obj']
+        self.assertFalse(any('COUNT(' in q['sql'] and 'core_audittrail' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual([entry.pk for entry in first.object_list], [entry.pk for entry in entries[:50]])
+        self.assertTrue(first.has_next)
+        self.assertFalse(first.has_previous)
+
+        second = self.client.get(url, {'older': first.next_cursor}).context['page_obj']
+        self.assertEqual([entry.pk for entry in second.object_list], [entry.pk for entry in entries[50:100]])
+        back = self.client.get(url, {'newer': second.previous_cursor}).context['page_obj']
+        self.assertEqual([entry.pk for entry in back.object_list], [entry.pk for entry in entries[:50]])
+        self.assertFalse(back.has_previous)
+        last = self.client.get(url, {'older': second.next_cursor}).context['page_obj']
+        self.assertEqual(len(last.object_list), 20)
+        self.assertFalse(last.has_next)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'object_id': str(self.customer_for_audit.pk)[:8]})
+        self.assertEqual(len(response.context['page_obj'].object_list), 50)
+        self.assertFalse(any('DISTINCT' in q['sql'] for q in queries.captured_queries))
+        response = self.client.get(url, {'object_id': 'no-such-object'})
+        self.assertEqual(response.context['page_obj'].object_list, [])
+
+    def test_compact_payload_stores_only_the_diff(self):
+        entry = AuditTrail.log_change(
+            self.user, 'UPDATE', self.customer_for_audit,
+            old_values={'name': 'Old', 'email': 'same@example.com'},
+            new_values={'name': 'New', 'email': 'same@example.com'},
+        )
+        entry = AuditTrail.objects.get(pk=entry.pk)
+        self.assertEqual(entry.changes, {'name': {'old': 'Old', 'new': 'New'}})
+        self.assertEqual((entry.old_values, entry.new_values), ({}, {}))
+        self.assertEqual(entry.payload.old_values, {'name': 'Old'})
+        self.assertEqual(entry.payload.changes, entry.changes)
+
+        created = AuditTrail.log_change(self.user, 'CREATE', self.customer_for_audit, new_values={'name': 'New'})
+        self.assertEqual(created.changes, {'name': {'new': 'New'}})
+        self.assertEqual(created.payload.new_values, {'name': 'New'})
+        self.assertEqual(created.payload.changes, {})
+
+    def test_compact_audit_command_rewrites_full_rows(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        with override_settings(AUDIT_PAYLOAD_MODE='full'):
+            full = AuditTrail.log_change(
+                self.user, 'UPDATE', self.customer_for_audit,
+                old_values={'name': 'Old', 'email': 'same@example.com'},
+                new_values={'name': 'New', 'email': 'same@example.com'},
+            )
+            deleted = AuditTrail.log_change(self.user, 'DELETE', self.customer_for_audit, old_values={'name': 'Old'})
+        self.assertEqual(full.new_values['email'], 'same@example.com')
+
+        call_command('compact_audit', dry_run=True, stdout=StringIO())
+        self.assertEqual(AuditTrail.objects.get(pk=full.pk).old_values['name'], 'Old')
+
+        call_command('compact_audit', batch_size=1, stdout=StringIO())
+        full = AuditTrail.objects.get(pk=full.pk)
+        self.assertEqual((full.old_values, full.new_values), ({}, {}))
+        self.assertEqual(full.payload.changes, {'name': {'old': 'Old', 'new': 'New'}})
+        self.assertEqual(AuditTrail.objects.get(pk=deleted.pk).payload.old_values, {'name': 'Old'})
+
+    def test_tracked_fields_diff_against_loaded_state(self):
+        customer = Customer.objects.get(pk=self.customer_for_audit.pk)
+        self.assertEqual(customer.changed_fields(), [])
+        customer.name = "Renamed"
+        self.assertEqual([field.name for field in customer.changed_fields()], ['name'])
+        customer.save()
+        self.assertEqual(customer.changed_fields(), [])
+
+        customer.email = "changed@example.com"
+        customer.refresh_from_db(fields=['name'])
+        self.assertEqual([field.name for field in customer.changed_fields()], ['email'])
+
+    def test_audit_mixin_logs_only_changed_fields_without_refetching(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import LabProfile
+
+        profile = LabProfile.objects.get()
+        profile.name = "Old Lab"
+        profile.save()
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('core:lab_profile'), {
+                'name': "New Lab", 'phone': profile.phone, 'email': profile.email,
+                'address_line1': profile.address_line1, 'city': profile.city,
+                'state': profile.state, 'postal_code': profile.postal_code,
+            })
+        self.assertEqual(response.status_code, 302)
+        profile_selects = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "core_labprofile"' in q['sql']
+        ]
+        self.assertEqual(len(profile_selects), 1)
+        entry = AuditTrail.objects.filter(model_name='LabProfile', action='UPDATE').get()
+        self.assertEqual(set(entry.changes), {'name', 'updated_at'})
+        self.assertEqual(entry.changes['name'], {'old': 'Old Lab', 'new': 'New Lab'})
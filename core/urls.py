@@ -10,9 +10,13 @@ from .views import (
     CustomerCreateView,
     CustomerUpdateView,
     SampleCreateView,
+    bulk_sample_registration,
     SampleUpdateView,
     SampleReportMetadataUpdateView,
     test_result_entry,
+    result_import_view,
+    parameter_batch_entry,
+    parameter_batch_entry_api,
     consultant_review,
     AdminDashboardView,
     LabDashboardView,
@@ -28,6 +32,7 @@ from .views import (
     form_test,
     fix_admin_role_web,
     global_search,
+    search_suggest,
     sample_reopen_for_correction,
     sample_status_update,
     setup_test_parameters,
@@ -37,10 +42,12 @@ from .views import (
     TestResultDetailView,
     download_sample_report_view,
     download_sample_invoice_view,
+    bulk_report_export_view,
     hridhyam_campaign,
     hridhyam_print,
     TestParameterUpdateView,
     delete_test_parameter,
+    test_parameter_reevaluation_status,
     TestCategoryUpdateView,
     delete_test_category,
     AdminUserListView,
@@ -82,6 +89,7 @@ urlpatterns = [
     path('password-change/', CustomPasswordChangeView.as_view(), name='password_change'),
     path('password-change/done/', password_change_done, name='password_change_done'),
     path('search/', global_search, name='global_search'),
+    path('search/suggest/', search_suggest, name='search_suggest'),
     
     # Customer URLs
     path('customers/', CustomerListView.as_view(), name='customer_list'),
@@ -92,6 +100,7 @@ urlpatterns = [
     # Sample URLs
     path('samples/', SampleListView.as_view(), name='sample_list'),
     path('samples/add/', SampleCreateView.as_view(), name='sample_add'),
+    path('samples/add/bulk/', bulk_sample_registration, name='sample_bulk_add'),
     path('samples/<uuid:pk>/', SampleDetailView.as_view(), name='sample_detail'),
     path('samples/<uuid:pk>/edit/', SampleUpdateView.as_view(), name='sample_edit'),
     path('samples/<uuid:pk>/metadata/', SampleReportMetadataUpdateView.as_view(), name='sample_report_metadata'),
@@ -112,14 +121,19 @@ urlpatterns = [
     # Test Results List (New)
     path('results/', TestResultListView.as_view(), name='test_result_list'),
     path('results/<uuid:pk>/', TestResultDetailView.as_view(), name='test_result_detail'),
+    path('results/import/', result_import_view, name='result_import'),
+    path('results/batch/', parameter_batch_entry, name='parameter_batch_entry'),
+    path('results/batch/<uuid:parameter_id>/', parameter_batch_entry_api, name='parameter_batch_entry_api'),
     path('samples/<uuid:pk>/download-report/', download_sample_report_view, name='download_sample_report'),
     path('samples/<uuid:pk>/download-invoice/', download_sample_invoice_view, name='download_sample_invoice'),
+    path('reports/export/', bulk_report_export_view, name='bulk_report_export'),
     path('hridhyam/', hridhyam_campaign, name='hridhyam_campaign'),
     path('hridhyam/<uuid:sample_id>/print/', hridhyam_print, name='hridhyam_print'),
     
     # Test Parameter Management (Admin)
     path('setup-test-parameters/<uuid:pk>/edit/', TestParameterUpdateView.as_view(), name='test_parameter_edit'),
     path('setup-test-parameters/<uuid:pk>/delete/', delete_test_parameter, name='test_parameter_delete'),
+    path('setup-test-parameters/reevaluation/<str:job_id>/', test_parameter_reevaluation_status, name='test_parameter_reevaluation_status'),
     # Category Management (Admin)
     path('setup-test-categories/<int:pk>/edit/', TestCategoryUpdateView.as_view(), name='test_category_edit'),
     path('setup-test-categories/<int:pk>/delete/', delete_test_category, name='test_category_delete'),
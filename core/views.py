@@ -18,6 +18,7 @@ from .views_common import (
     form_test,
     fix_admin_role_web,
     global_search,
+    search_suggest,
     simple_home,
     simple_dashboard,
     CustomLoginView,
@@ -43,6 +44,9 @@ from .views_results import (
     TestResultListView,
     TestResultDetailView,
     test_result_entry,
+    result_import_view,
+    parameter_batch_entry,
+    parameter_batch_entry_api,
 )
 from .views_hridhyam import (
     hridhyam_campaign,
@@ -58,13 +62,18 @@ from .views_samples import (
     SampleListView,
     SampleDetailView,
     SampleCreateView,
+    bulk_sample_registration,
     SampleUpdateView,
     SampleReportMetadataUpdateView,
     consultant_review,
     sample_reopen_for_correction,
     sample_status_update,
 )
-from .views_reports import download_sample_invoice_view, download_sample_report_view
+from .views_reports import (
+    bulk_report_export_view,
+    download_sample_invoice_view,
+    download_sample_report_view,
+)
 from .views_parameters import (
     setup_test_parameters,
     reorder_test_parameters,
@@ -73,6 +82,7 @@ from .views_parameters import (
     TestCategoryUpdateView,
     delete_test_category,
     delete_test_parameter,
+    test_parameter_reevaluation_status,
     kerala_locations_json,
 )
 
@@ -89,6 +99,7 @@ __all__ = [
     'form_test',
     'fix_admin_role_web',
     'global_search',
+    'search_suggest',
     'simple_home',
     'simple_dashboard',
     'CustomLoginView',
@@ -108,6 +119,9 @@ __all__ = [
     'TestResultListView',
     'TestResultDetailView',
     'test_result_entry',
+    'result_import_view',
+    'parameter_batch_entry',
+    'parameter_batch_entry_api',
     'hridhyam_campaign',
     'hridhyam_print',
     'CustomerListView',
@@ -117,6 +131,7 @@ __all__ = [
     'SampleListView',
     'SampleDetailView',
     'SampleCreateView',
+    'bulk_sample_registration',
     'SampleUpdateView',
     'SampleReportMetadataUpdateView',
     'consultant_review',
@@ -124,6 +139,7 @@ __all__ = [
     'sample_status_update',
     'download_sample_report_view',
     'download_sample_invoice_view',
+    'bulk_report_export_view',
     'setup_test_parameters',
     'reorder_test_parameters',
     'TestParameterUpdateView',
@@ -131,5 +147,6 @@ __all__ = [
     'TestCategoryUpdateView',
     'delete_test_category',
     'delete_test_parameter',
+    'test_parameter_reevaluation_status',
     'kerala_locations_json',
 ]
@@ -1,21 +1,85 @@
+import uuid
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.utils.dateparse import parse_datetime
 from django.views.generic import ListView
 
 from .mixins import AdminRequiredMixin
-from .models import AuditTrail, CustomUser
+from .models import AuditArchiveSegment, AuditTrail, CustomUser
+
+FILTER_CHOICES_CACHE_KEY = 'audit_trail:filter_choices'
+
+
+@dataclass
+class AuditPage:
+    """One keyset page; cursors point at the first and last rows shown."""
+
+    object_list: list = field(default_factory=list)
+    has_next: bool = False
+    has_previous: bool = False
+
+    @property
+    def next_cursor(self):
+        return _encode_cursor(self.object_list[-1]) if self.object_list else ''
+
+    @property
+    def previous_cursor(self):
+        return _encode_cursor(self.object_list[0]) if self.object_list else ''
+
+
+def _encode_cursor(entry) -> str:
+    return f'{entry.timestamp.isoformat()}_{entry.audit_id.hex}'
+
+
+def _decode_cursor(raw):
+    timestamp, _, audit_id = (raw or '').rpartition('_')
+    try:
+        moment = parse_datetime(timestamp)
+        return (moment, uuid.UUID(audit_id)) if moment else None
+    except ValueError:
+        return None
+
+
+def _filter_choices():
+    """Model names, users and archive summary for the filter bar, cached briefly.
+
+    The DISTINCT scans over the audit table were the slowest part of the page.
+    """
+    choices = cache.get(FILTER_CHOICES_CACHE_KEY)
+    if choices is None:
+        choices = {
+            'model_choices': list(
+                AuditTrail.objects.values_list('model_name', flat=True).order_by('model_name').distinct()
+            ),
+            'users': list(
+                CustomUser.objects.filter(Exists(AuditTrail.objects.filter(user=OuterRef('pk'))))
+                .order_by('first_name', 'username')
+            ),
+            'archive': AuditArchiveSegment.objects.aggregate(
+                segments=Count('pk'), rows=Sum('row_count'), archived_until=Max('period_end'),
+            ),
+        }
+        cache.set(FILTER_CHOICES_CACHE_KEY, choices, getattr(settings, 'AUDIT_FILTER_CHOICES_TTL', 300))
+    return choices
 
 
 class AuditTrailView(AdminRequiredMixin, ListView):
+    """Audit log with keyset pagination: no OFFSET and no COUNT over the whole table."""
+
     model = AuditTrail
     template_name = 'core/audit_trail.html'
     context_object_name = 'audit_trails'
-    paginate_by = 50
+    page_size = 50
 
     def get_queryset(self):
-        qs = AuditTrail.objects.select_related('user').order_by('-timestamp')
+        qs = AuditTrail.objects.select_related('user')
         model = self.request.GET.get('model')
         action = self.request.GET.get('action')
         user_id = self.request.GET.get('user')
-        object_id = self.request.GET.get('object_id')
+        object_id = (self.request.GET.get('object_id') or '').strip()
 
         if model:
             qs = qs.filter(model_name=model)
@@ -24,9 +88,38 @@ class AuditTrailView(AdminRequiredMixin, ListView):
         if user_id:
             qs = qs.filter(user_id=user_id)
         if object_id:
-            qs = qs.filter(object_id__icontains=object_id.strip())
+            try:
+                qs = qs.filter(object_id=str(uuid.UUID(object_id)))
+            except ValueError:
+                # Prefix matches can use the pattern-ops indexes; icontains scanned the table.
+                qs = qs.filter(
+                    Q(object_id__startswith=object_id)
+                    | Q(object_repr__startswith=object_id)
+                    | Q(object_repr__startswith=object_id.upper())
+                )
         return qs
 
+    def get_page(self, queryset):
+        newer = _decode_cursor(self.request.GET.get('newer'))
+        older = _decode_cursor(self.request.GET.get('older'))
+        size = self.page_size
+        if newer:
+            moment, audit_id = newer
+            rows = list(
+                queryset.filter(Q(timestamp__gt=moment) | Q(timestamp=moment, audit_id__gt=audit_id))
+                .order_by('timestamp', 'audit_id')[:size + 1]
+            )
+            has_previous = len(rows) > size
+            rows = rows[:size]
+            rows.reverse()
+            return AuditPage(rows, has_next=True, has_previous=has_previous)
+
+        if older:
+            moment, audit_id = older
+            queryset = queryset.filter(Q(timestamp__lt=moment) | Q(timestamp=moment, audit_id__lt=audit_id))
+        rows = list(queryset.order_by('-timestamp', '-audit_id')[:size + 1])
+        return AuditPage(rows[:size], has_next=len(rows) > size, has_previous=bool(older))
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         request = self.request
@@ -37,32 +130,23 @@ class AuditTrailView(AdminRequiredMixin, ListView):
             'object_id': request.GET.get('object_id', ''),
         }
 
-        model_choices = (
-            AuditTrail.objects.values_list('model_name', flat=True)
-            .order_by('model_name')
-            .distinct()
-        )
-        action_choices = [choice[0] for choice in AuditTrail.ACTION_CHOICES]
-        users = (
-            CustomUser.objects.filter(audit_logs__isnull=False)
-            .distinct()
-            .order_by('first_name', 'username')
-        )
-
-        querystring_without_page = ''
+        querystring_without_cursor = ''
         if request.GET:
             qs = request.GET.copy()
-            qs.pop('page', None)
+            for key in ('page', 'newer', 'older'):
+                qs.pop(key, None)
             filtered = qs.urlencode()
             if filtered:
-                querystring_without_page = '&' + filtered
+                querystring_without_cursor = '&' + filtered
 
+        choices = _filter_choices()
         context.update({
-            'model_choices': model_choices,
-            'action_choices': action_choices,
-            'users': users,
+            'page_obj': self.get_page(self.object_list),
+            'model_choices': choices['model_choices'],
+            'action_choices': [choice[0] for choice in AuditTrail.ACTION_CHOICES],
+            'users': choices['users'],
+            'archive_summary': choices['archive'],
             'filters': filters,
-            'querystring_without_page': querystring_without_page,
+            'querystring_without_cursor': querystring_without_cursor,
         })
         return context
-
@@ -8,16 +8,20 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, PasswordChangeView
 from django.contrib.staticfiles import finders
-from django.db.models import Count, Q
-from django.http import FileResponse, HttpResponse, HttpResponseNotFound
+from django.db.models import Count
+from django.http import FileResponse, HttpResponse, HttpResponseNotFound, JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 
 from .forms import CustomPasswordChangeForm
 from .models import Customer, Sample
+from .services import search_index, typeahead
 
 logger = logging.getLogger(__name__)
 
+# Best-ranked matches fetched per kind before user scoping trims them.
+GLOBAL_SEARCH_CANDIDATES = 100
+
 # Roles allowed to view customer/sample/report data.
 # Keep in sync with CustomUser.ROLE_CHOICES.
 _SENSITIVE_ROLES = {
@@ -98,6 +102,11 @@ def service_worker(request):
     return response
 
 
+def _in_rank_order(queryset, ranked_ids) -> list:
+    position = {pk: index for index, pk in enumerate(ranked_ids)}
+    return sorted(queryset.filter(pk__in=ranked_ids), key=lambda record: position[record.pk])
+
+
 @login_required
 def global_search(request):
     """Search high-volume operational records from the header."""
@@ -109,36 +118,28 @@ def global_search(request):
     customers = Customer.objects.none()
     samples = Sample.objects.none()
 
-    if query:
-        customers = apply_user_scope(
-            Customer.objects.annotate(sample_count=Count('samples')).filter(
-                Q(customer_code__icontains=query)
-                | Q(name__icontains=query)
-                | Q(email__icontains=query)
-                | Q(phone__icontains=query)
-                | Q(house_name_door_no__icontains=query)
-                | Q(street_locality_landmark__icontains=query)
-                | Q(village_town_city__icontains=query)
-                | Q(panchayat_municipality__icontains=query)
-                | Q(taluk__icontains=query)
-                | Q(district__icontains=query)
-                | Q(pincode__icontains=query)
-            ).order_by('name'),
-            request.user,
+    if query and search_index.phone_query(query):
+        customers = search_index.filter_customers(
+            apply_user_scope(Customer.objects.annotate(sample_count=Count('samples')), request.user), query,
+        ).order_by('name')[:8]
+        samples = search_index.filter_samples(
+            apply_user_scope(Sample.objects.select_related('customer'), request.user), query,
+        ).order_by('-collection_datetime', '-display_id')[:10]
+    elif query:
+        # Rank within the user's scope, so the candidate limit cannot crowd out their own records.
+        customers = _in_rank_order(
+            apply_user_scope(Customer.objects.annotate(sample_count=Count('samples')), request.user),
+            search_index.ranked_ids(
+                'customer', query, GLOBAL_SEARCH_CANDIDATES,
+                within=apply_user_scope(Customer.objects.all(), request.user),
+            ),
         )[:8]
-        samples = apply_user_scope(
-            Sample.objects.select_related('customer').filter(
-                Q(display_id__icontains=query)
-                | Q(report_number__icontains=query)
-                | Q(customer__customer_code__icontains=query)
-                | Q(customer__name__icontains=query)
-                | Q(customer__phone__icontains=query)
-                | Q(customer__email__icontains=query)
-                | Q(sample_source__icontains=query)
-                | Q(sampling_location__icontains=query)
-                | Q(referred_by__icontains=query)
-            ).order_by('-collection_datetime', '-display_id'),
-            request.user,
+        samples = _in_rank_order(
+            apply_user_scope(Sample.objects.select_related('customer'), request.user),
+            search_index.ranked_ids(
+                'sample', query, GLOBAL_SEARCH_CANDIDATES,
+                within=apply_user_scope(Sample.objects.all(), request.user),
+            ),
         )[:10]
 
     return render(
@@ -154,6 +155,24 @@ def global_search(request):
     )
 
 
+@login_required
+def search_suggest(request):
+    """JSON suggestions for the header search box (see ``core.services.typeahead``)."""
+    if not _user_can_view_sensitive_records(request.user):
+        return JsonResponse({'results': []}, status=403)
+
+    scoped = getattr(settings, 'ENFORCE_USER_SCOPING', False)
+    results = typeahead.suggest(
+        request.GET.get('q', ''),
+        customers=apply_user_scope(Customer.objects.all(), request.user),
+        samples=apply_user_scope(Sample.objects.all(), request.user),
+        scope=f'user-{request.user.pk}' if scoped else 'all',
+    )
+    response = JsonResponse({'results': results})
+    response['Cache-Control'] = f'private, max-age={typeahead.cache_seconds()}'
+    return response
+
+
 def debug_admin(request):
     """Debug endpoint to check admin user - REMOVE IN PRODUCTION."""
     if not settings.DEBUG:
@@ -1,11 +1,12 @@
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 
 from .forms import CustomerForm
 from .mixins import AuditMixin, FrontDeskRequiredMixin, RoleRequiredMixin
 from .models import Customer, Sample
+from .services import search_index
 from .views_common import _SENSITIVE_ROLES, apply_user_scope
 
 
@@ -23,19 +24,7 @@ class CustomerListView(RoleRequiredMixin, ListView):
         queryset = Customer.objects.annotate(sample_count=Count('samples')).order_by('name')
         query = self.get_search_query()
         if query:
-            queryset = queryset.filter(
-                Q(customer_code__icontains=query)
-                | Q(name__icontains=query)
-                | Q(email__icontains=query)
-                | Q(phone__icontains=query)
-                | Q(house_name_door_no__icontains=query)
-                | Q(street_locality_landmark__icontains=query)
-                | Q(village_town_city__icontains=query)
-                | Q(panchayat_municipality__icontains=query)
-                | Q(taluk__icontains=query)
-                | Q(district__icontains=query)
-                | Q(pincode__icontains=query)
-            )
+            queryset = search_index.filter_customers(queryset, query)
         return apply_user_scope(queryset, self.request.user)
 
     def get_query_string(self):
@@ -10,7 +10,7 @@ from django.urls import reverse
 from django.utils import timezone
 
 from .decorators import role_required
-from .models import AuditTrail, Customer, Sample, TestCategory, TestParameter, TestResult
+from .models import AuditTrail, Customer, Sample, TestCategory, TestParameter, TestResult, normalize_phone
 from .views_common import apply_user_scope
 
 
@@ -212,7 +212,7 @@ def _save_hridhyam_submission(form: HridhyamCampaignForm, user, request) -> Samp
 
     with transaction.atomic():
         customer = Customer.objects.filter(
-            phone=cleaned['contact'],
+            phone_digits=normalize_phone(cleaned['contact']),
             name__iexact=cleaned['name'],
         ).first()
         created_customer = False
@@ -17,6 +17,7 @@ from .decorators import admin_required
 from .forms import TestParameterForm
 from .mixins import AdminRequiredMixin
 from .models import AuditTrail, TestCategory, TestParameter
+from .services.limit_reevaluation import load_reevaluation_job
 from .views_common import _format_error_message
 
 logger = logging.getLogger(__name__)
@@ -262,6 +263,13 @@ class TestParameterUpdateView(AdminRequiredMixin, UpdateView):
                 _format_error_message("Error updating test parameter.", exc),
             )
             return self.form_invalid(form)
+        # Set by TestParameter.save once the commit has scheduled a large re-evaluation.
+        if getattr(parameter, 'limit_reevaluation_job', None):
+            messages.info(
+                self.request,
+                "Stored results for this parameter are being re-evaluated against the new limits "
+                f"in the background (job {parameter.limit_reevaluation_job[:8]}).",
+            )
         return super().form_valid(form)
 
     def get_context_data(self, **kwargs):
@@ -372,6 +380,16 @@ def kerala_locations_json(request):
     return JsonResponse(data)
 
 
+@login_required
+@admin_required
+def test_parameter_reevaluation_status(request, job_id):
+    """Progress of a background limit re-evaluation (see services/limit_reevaluation.py)."""
+    job = load_reevaluation_job(job_id)
+    if job is None:
+        return JsonResponse({'status': 'missing'}, status=404)
+    return JsonResponse(job)
+
+
 @login_required
 @admin_required
 @require_POST
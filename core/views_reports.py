@@ -1,29 +1,42 @@
 import logging
 import os
-import re
-from collections import OrderedDict
 from decimal import Decimal
 from html import escape
 from io import BytesIO
 
 from django.contrib import messages
-from django.contrib.staticfiles import finders
-from django.http import FileResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 
 from reportlab.lib.utils import ImageReader
 
-from .models import Invoice, LabProfile, Sample
-from .services.ai_remarks import bullet_items, split_bilingual_remarks
+from .forms import ReportExportForm
+from .models import Customer, Invoice, LabProfile, Sample
 from .services.ai_report_jobs import delete_ai_job, load_ai_job, start_ai_job
-from .services.malayalam_report import append_pdf_pages, render_malayalam_remarks_pdf
+from .services.concurrency import ConcurrencyLimitExceeded, acquire_slot, concurrency_slot
+from .services.render_pool import PDFRenderError, render_pdf
+from .services.report_images import report_image_variant
+from .services.report_export import exportable_samples, stream_reports_zip
+from .services.report_pdf import (
+    REPORT_ENGINES,
+    ReportOptions,
+    build_report_pdf,
+    default_report_engine,
+    snapshot_from_sample,
+)
+from .services.report_artifacts import (
+    load_report_artifact,
+    report_artifact_response,
+    save_report_artifact,
+)
 from .views_common import (
-    _choose_signer_with_signature,
     _format_error_message,
     _user_can_view_sensitive_records,
+    apply_user_scope,
 )
 
 logger = logging.getLogger(__name__)
@@ -41,6 +54,20 @@ def _render_ai_preparing(request, sample, job_id: str):
     })
 
 
+def _busy_response(request, exc: ConcurrencyLimitExceeded, *, what: str, back_url: str):
+    """Fast 503 page that tells the browser to retry the same URL after ``Retry-After``."""
+    body = render_to_string('core/busy.html', {
+        'title': 'The lab server is busy',
+        'what': what,
+        'retry_after': exc.retry_after,
+        'retry_url': request.get_full_path(),
+        'back_url': back_url,
+    })
+    response = HttpResponse(body, status=503)
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
 def _customer_filename_fragment(sample: Sample) -> str:
     customer_name = getattr(sample.customer, 'name', '') if sample.customer_id else ''
     slug = slugify(customer_name or '')
@@ -49,6 +76,25 @@ def _customer_filename_fragment(sample: Sample) -> str:
     return slug.replace('-', '_')[:60]
 
 
+def _report_filename(sample: Sample, *, include_branding=True, ai_requested=False) -> str:
+    suffix = '_plain' if not include_branding else ''
+    if ai_requested:
+        suffix += '_ai'
+    return f'WaterQualityReport_{_customer_filename_fragment(sample)}_{sample.display_id}{suffix}.pdf'
+
+
+def _render_sample_report_pdf(sample, *, include_branding=True, ai_override=None, engine=None) -> bytes:
+    """Build the complete report PDF for ``sample`` and return its bytes.
+
+    ``ai_override`` carries ``(comments, recommendations)`` from a finished AI
+    job; when ``None`` the saved consultant review is used. ``engine`` is one of
+    ``REPORT_ENGINES`` and defaults to ``settings.REPORT_ENGINE``.
+    """
+    snapshot = snapshot_from_sample(sample, ai_override=ai_override)
+    options = ReportOptions(include_branding=include_branding, engine=engine or default_report_engine())
+    return build_report_pdf(snapshot, options)
+
+
 def download_sample_report_view(request, pk):
     sample = get_object_or_404(
         Sample.objects.select_related(
@@ -67,21 +113,9 @@ def download_sample_report_view(request, pk):
     layout = (request.GET.get('layout') or 'branded').casefold()
     include_branding = layout != 'plain'
     ai_requested = (request.GET.get('remarks') or '').casefold() == 'ai'
-    background_template = None
-    watermark_image = None
-    if include_branding:
-        template_path = finders.find('report_templates/biofix_wl_template_page.png')
-        if template_path and os.path.exists(template_path):
-            try:
-                background_template = ImageReader(template_path)
-            except Exception:
-                logger.warning("Failed to load branded report template image from %s", template_path)
-        watermark_path = finders.find('report_templates/biofix_wl_watermark.png')
-        if watermark_path and os.path.exists(watermark_path):
-            try:
-                watermark_image = ImageReader(watermark_path)
-            except Exception:
-                logger.warning("Failed to load watermark image from %s", watermark_path)
+    engine = (request.GET.get('engine') or '').casefold()
+    if engine not in REPORT_ENGINES:
+        engine = default_report_engine()
 
     if sample.current_status not in ['REPORT_APPROVED', 'REPORT_SENT']:
         messages.error(request, "Report is not yet approved or available for download.")
@@ -120,679 +154,63 @@ def download_sample_report_view(request, pk):
             # The AI report always drafts fresh remarks via the model (in the background),
             # independent of the consultant's saved review.
             try:
-                return _render_ai_preparing(request, sample, start_ai_job(sample))
+                lease = acquire_slot('ai')
+            except ConcurrencyLimitExceeded as exc:
+                return _busy_response(
+                    request,
+                    exc,
+                    what='AI reports',
+                    back_url=reverse('core:sample_detail', kwargs={'pk': sample.pk}),
+                )
+            try:
+                return _render_ai_preparing(request, sample, start_ai_job(sample, lease=lease))
             except Exception:
+                if lease is not None:
+                    lease.release()
                 logger.exception("Failed to start AI report job for sample %s", sample.sample_id)
                 messages.error(request, "Could not start AI report generation. Please try again.")
                 return redirect('core:sample_detail', pk=sample.pk)
 
-    from django.conf import settings
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.platypus import (
-        BaseDocTemplate,
-        CondPageBreak,
-        Frame,
-        Image,
-        KeepTogether,
-        ListFlowable,
-        ListItem,
-        PageBreak,
-        PageTemplate,
-        Paragraph,
-        Spacer,
-        Table,
-        TableStyle,
-    )
-    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-
-    buffer = BytesIO()
-
-    def _register_body_fonts() -> tuple[str, str]:
-        """Return the body fonts for the main report.
-
-        The main ReportLab report is rendered in English. The bundled
-        ``NotoSansMalayalam`` font contains only Malayalam glyphs, digits and
-        punctuation -- it has NO Latin letters -- so using it as the body font
-        turns every English letter into a .notdef box. Any Malayalam content is
-        rendered on the separate WeasyPrint page instead, so the main report uses
-        Helvetica, which covers Latin correctly.
-        """
-        return 'Helvetica', 'Helvetica-Bold'
-
-    class ReportDocTemplate(BaseDocTemplate):
-        def __init__(self, filename, include_branding=True, background_image=None, watermark_image=None, **kwargs):
-            self.include_branding = include_branding
-            self.background_image = background_image
-            self.watermark_image = watermark_image
-            super().__init__(filename, **kwargs)
-            self.addPageTemplates([
-                PageTemplate(
-                    id='ReportPage',
-                    frames=[Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='main_frame')],
-                    onPage=self._maybe_header,
-                    onPageEnd=self._maybe_footer,
-                )
-            ])
-
-        def _maybe_header(self, canvas, doc):
-            if self.include_branding:
-                self.header(canvas, doc)
-
-        def _maybe_footer(self, canvas, doc):
-            if self.include_branding:
-                self.footer(canvas, doc)
-
-        def header(self, canvas, doc):
-            canvas.saveState()
-            page_width, page_height = doc.pagesize
-            if self.background_image:
-                canvas.drawImage(
-                    self.background_image,
-                    0,
-                    0,
-                    width=page_width,
-                    height=page_height,
-                    preserveAspectRatio=True,
-                    mask='auto',
-                )
-                if self.watermark_image:
-                    wm_width, wm_height = self.watermark_image.getSize()
-                    target_width = page_width * 0.55
-                    scale = target_width / wm_width
-                    target_height = wm_height * scale
-                    wm_x = (page_width - target_width) / 2
-                    wm_y = (page_height - target_height) / 2 - 10 * mm
-                    canvas.saveState()
-                    try:
-                        canvas.setFillAlpha(0.22)
-                    except AttributeError:
-                        pass
-                    canvas.drawImage(
-                        self.watermark_image,
-                        wm_x,
-                        wm_y,
-                        width=target_width,
-                        height=target_height,
-                        mask='auto',
-                        preserveAspectRatio=True,
-                    )
-                    canvas.restoreState()
-            else:
-                lab_settings = getattr(settings, 'WATERLAB_SETTINGS', {})
-                profile = LabProfile.get_active()
-                logo_path = profile.logo_path
-                lab_name = (profile.name or lab_settings.get('LAB_NAME') or 'Biofix Laboratory').strip()
-                lab_address = (profile.formatted_address or profile.address_line1 or lab_settings.get('LAB_ADDRESS') or '').strip()
-                lab_phone = (profile.phone or lab_settings.get('LAB_PHONE') or '').strip()
-                lab_email = (profile.email or lab_settings.get('LAB_EMAIL') or '').strip()
-                lab_contact = profile.contact_line
-
-                if logo_path and os.path.exists(logo_path):
-                    logo = ImageReader(logo_path)
-                    canvas.drawImage(
-                        logo,
-                        doc.leftMargin,
-                        page_height - 38 * mm,
-                        width=45 * mm,
-                        height=17 * mm,
-                        preserveAspectRatio=True,
-                        mask='auto',
-                    )
-
-                draw_x = page_width - doc.rightMargin
-                cursor_y = page_height - 28 * mm
-
-                def _draw_line(value: str, font_name: str = None, font_size: int = 9):
-                    nonlocal cursor_y
-                    text = (value or '').strip()
-                    if not text:
-                        return
-                    chosen_font = font_name or body_font
-                    try:
-                        canvas.setFont(chosen_font, font_size)
-                    except Exception:
-                        canvas.setFont('Helvetica', font_size)
-                    canvas.drawRightString(draw_x, cursor_y, text)
-                    cursor_y -= 4 * mm
-
-                canvas.setFillColor(colors.HexColor('#0F172A'))
-                _draw_line(lab_name or 'Biofix Laboratory', font_name=body_font_bold, font_size=11)
-                _draw_line(lab_address)
-
-                contact_line = lab_contact
-                if not contact_line:
-                    contact_parts = []
-                    if lab_phone:
-                        contact_parts.append(f"Phone: {lab_phone}")
-                    if lab_email:
-                        contact_parts.append(f"Email: {lab_email}")
-                    contact_line = '  |  '.join(contact_parts)
-                _draw_line(contact_line)
-
-            canvas.restoreState()
-
-        def footer(self, canvas, doc):
-            canvas.saveState()
-            styles = getSampleStyleSheet()
-
-            footer_text = f"Page {doc.page} | Report ID: {sample.display_id}"
-            p = Paragraph(footer_text, styles['Normal'])
-            p.wrapOn(canvas, doc.width, doc.bottomMargin)
-            p.drawOn(canvas, doc.leftMargin, 4 * mm)
-
-            canvas.restoreState()
-
-    top_margin_mm = 54 if include_branding else 50
-    bottom_margin_mm = 34 if include_branding else 30
-
-    doc = ReportDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=18 * mm,
-        leftMargin=18 * mm,
-        topMargin=top_margin_mm * mm,
-        bottomMargin=bottom_margin_mm * mm,
-        include_branding=include_branding,
-        background_image=background_template,
-        watermark_image=watermark_image,
-    )
-
-    palette = {
-        'surface': colors.HexColor('#F8FAFC') if include_branding else colors.white,
-        'primary': colors.HexColor('#3BBCA3') if include_branding else colors.black,
-        'text': colors.HexColor('#0F172A') if include_branding else colors.black,
-        'muted': colors.HexColor('#6B7280') if include_branding else colors.HexColor('#1F2937'),
-        'grid': colors.HexColor('#E2E8F0') if include_branding else colors.HexColor('#9CA3AF'),
-        'row_alt': colors.HexColor('#ECFFFA') if include_branding else colors.white,
-    }
-
-    surface = palette['surface']
-    primary = palette['primary']
-    text_color = palette['text']
-    muted_color = palette['muted']
-    grid_color = palette['grid']
-    row_alt_color = palette['row_alt']
-    header_text_color = colors.white if include_branding else text_color
-
-    body_font, body_font_bold = _register_body_fonts()
-
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='Center', alignment=TA_CENTER, fontName=body_font))
-    styles.add(ParagraphStyle(name='Right', alignment=TA_RIGHT, fontName=body_font))
-    styles.add(ParagraphStyle(name='Left', alignment=TA_LEFT, fontName=body_font))
-    styles.add(ParagraphStyle(
-        name='ReportTitle',
-        parent=styles['h1'],
-        alignment=TA_CENTER,
-        spaceAfter=12,
-        fontSize=18,
-        fontName=body_font_bold,
-    ))
-    styles.add(ParagraphStyle(
-        name='SectionTitle',
-        parent=styles['h2'],
-        spaceAfter=10,
-        fontSize=12,
-        leading=14,
-        fontName=body_font_bold,
-    ))
-    styles.add(ParagraphStyle(name='Label', parent=styles['Normal'], fontName=body_font_bold, fontSize=9, textColor=muted_color))
-    styles.add(ParagraphStyle(name='Value', parent=styles['Normal'], fontName=body_font, fontSize=10, textColor=text_color))
-    styles.add(ParagraphStyle(name='TableHead', parent=styles['Normal'], fontName=body_font_bold, alignment=TA_CENTER, textColor=header_text_color, fontSize=9))
-    styles.add(ParagraphStyle(name='TableCell', parent=styles['Normal'], fontName=body_font, alignment=TA_LEFT, leading=12, fontSize=9))
-
-    styles.add(ParagraphStyle(
-        name='CategoryHeading',
-        parent=styles['Normal'],
-        fontName=body_font_bold,
-        fontSize=11,
-        textColor=text_color,
-        spaceBefore=10,
-        spaceAfter=6,
-    ))
-
-    styles['ReportTitle'].textColor = primary
-    styles['SectionTitle'].textColor = primary
-    styles['Normal'].textColor = text_color
-    styles['Normal'].fontName = body_font
-
-    elements = []
-    elements.append(Paragraph("WATER QUALITY ANALYSIS REPORT", styles['ReportTitle']))
-
-    def _user_display(user_obj) -> str:
-        if not user_obj:
-            return 'N/A'
-        full_name = (user_obj.get_full_name() or '').strip()
-        return full_name or user_obj.username
-
-    def _safe_text(value, default='N/A', preserve_breaks: bool = False) -> str:
-        """Escape user-provided text before injecting into Paragraph markup."""
-        text = ''
-        if value is not None:
-            text = str(value).strip()
-        if not text:
-            text = default
-        text = escape(text)
-        if preserve_breaks:
-            text = text.replace('\n', '<br/>')
-        return text
-
-    customer = sample.customer
-    location_display = (
-        sample.sampling_location
-        or getattr(customer, 'village_town_city', '') or getattr(customer, 'street_locality_landmark', '')
-        or getattr(customer, 'district', '')
-        or 'N/A'
-    )
-
-    meta_rows = [
-        [Paragraph('<b>Sample Code</b>', styles['Label']), Paragraph(_safe_text(sample.display_id, 'N/A'), styles['Value']),
-         Paragraph('<b>Report Number</b>', styles['Label']), Paragraph(_safe_text(sample.report_number_with_revision, 'N/A'), styles['Value'])],
-        [Paragraph('<b>Customer</b>', styles['Label']), Paragraph(_safe_text(sample.customer.name, 'N/A'), styles['Value']),
-         Paragraph('<b>Collected On</b>', styles['Label']), Paragraph(_safe_text(sample.collection_datetime.strftime('%d %b %Y %H:%M') if sample.collection_datetime else '', 'N/A'), styles['Value'])],
-        [Paragraph('<b>Sample Source</b>', styles['Label']), Paragraph(_safe_text(sample.get_sample_source_display(), 'N/A'), styles['Value']),
-         Paragraph('<b>Location</b>', styles['Label']), Paragraph(_safe_text(location_display, 'N/A'), styles['Value'])],
-        [Paragraph('<b>Received At Lab</b>', styles['Label']), Paragraph(_safe_text(sample.date_received_at_lab.strftime('%d %b %Y %H:%M') if sample.date_received_at_lab else '', 'N/A'), styles['Value']),
-         Paragraph('<b>Test Commenced</b>', styles['Label']), Paragraph(_safe_text(sample.test_commenced_on.strftime('%d %b %Y') if sample.test_commenced_on else '', 'N/A'), styles['Value'])],
-        [Paragraph('<b>Test Completed</b>', styles['Label']), Paragraph(_safe_text(sample.test_completed_on.strftime('%d %b %Y') if sample.test_completed_on else '', 'N/A'), styles['Value']), '', ''],
-    ]
-    last_meta_row_index = len(meta_rows) - 1
-    meta_table = Table(meta_rows, colWidths=[32 * mm, 55 * mm, 32 * mm, doc.width - 119 * mm])
-    meta_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), surface),
-        ('BOX', (0, 0), (-1, -1), 0.75, grid_color),
-        ('INNERGRID', (0, 0), (-1, -1), 0.25, grid_color),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('SPAN', (1, last_meta_row_index), (3, last_meta_row_index)),
-    ]))
-    elements.append(meta_table)
-    elements.append(Spacer(1, 8))
-
-    address_table = Table([
-        [Paragraph('<b>Customer Address</b>', styles['Label'])],
-        [Paragraph(_safe_text(sample.customer.address, 'N/A', preserve_breaks=True), styles['Value'])],
-    ], colWidths=[doc.width])
-    address_table.setStyle(TableStyle([
-        ('BOX', (0, 0), (-1, -1), 0.75, grid_color),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 0), (-1, -1), surface),
-    ]))
-    elements.append(address_table)
-    elements.append(Spacer(1, 8))
-
-    elements.append(Paragraph("TEST REPORTS", styles['SectionTitle']))
-    elements.append(Spacer(1, 3))
-
-    results_queryset = sample.results.select_related('parameter', 'parameter__category_obj').order_by(
-        'parameter__display_order',
-        'parameter__name',
-    )
-    results = list(results_queryset)
+    filename = _report_filename(sample, include_branding=include_branding, ai_requested=ai_requested)
 
-    section_headings = {
-        'physical': 'Physical Parameters',
-        'chemical': 'Chemical Parameters',
-        'microbiological': 'Microbiological Parameters',
-        'other': 'Other Parameters',
-    }
-
-    section_templates: dict[str, dict] = {}
-    section_order: list[str] = []
-
-    def _section_for_category(label: str) -> str:
-        lowered = label.casefold()
-        if 'physical' in lowered:
-            return 'physical'
-        if 'chemical' in lowered:
-            return 'chemical'
-        if any(token in lowered for token in ('micro', 'bacter', 'pathogen')):
-            return 'microbiological'
-        return 'other'
-
-    for result in results:
-        display_label = (getattr(result.parameter, 'category_label', '') or '').strip() or 'Uncategorized'
-        section_key = _section_for_category(display_label)
-        section_bucket = section_templates.setdefault(section_key, {'categories': OrderedDict()})
-        categories = section_bucket['categories']
-        if section_key not in section_order:
-            section_order.append(section_key)
-        if display_label not in categories:
-            categories[display_label] = []
-        categories[display_label].append(result)
-
-    available_width = doc.width
-    column_widths = [
-        available_width * 0.07,
-        available_width * 0.28,
-        available_width * 0.11,
-        available_width * 0.20,
-        available_width * 0.18,
-        available_width * 0.16,
-    ]
-
-    status_styles = {
-        'WITHIN_LIMITS': ('Within limits', '#0F766E'),
-        'BELOW_LIMIT': ('Below minimum', '#B45309'),
-        'ABOVE_LIMIT': ('Above maximum', '#DC2626'),
-        'NON_NUMERIC': ('', '#0F172A'),
-        'UNKNOWN': ('', '#0F172A'),
-    }
-
-    def _build_results_table(category_results, start_index, section_key: str):
-        header = [
-            Paragraph('Sl. No', styles['TableHead']),
-            Paragraph('Parameter', styles['TableHead']),
-            Paragraph('Unit', styles['TableHead']),
-            Paragraph('Method', styles['TableHead']),
-            Paragraph('Results', styles['TableHead']),
-            Paragraph('Limit', styles['TableHead']),
-        ]
-        table_data = [header]
-
-        def format_limits(param):
-            if getattr(param, 'max_limit_display', None):
-                return param.max_limit_display
-            if param.min_permissible_limit is None and param.max_permissible_limit is None:
-                return '—'
-            if param.min_permissible_limit is None:
-                return f"≤ {param.max_permissible_limit} {param.unit or ''}".strip()
-            if param.max_permissible_limit is None:
-                return f"≥ {param.min_permissible_limit} {param.unit or ''}".strip()
-            return f"{param.min_permissible_limit} – {param.max_permissible_limit} {param.unit or ''}".strip()
-
-        running_index = start_index
-        for result in category_results:
-            param = result.parameter
-            limits_text = format_limits(param)
-            status = getattr(result, 'get_limit_status', lambda: None)()
-            label_text, label_color = status_styles.get(status, ('', '#0F172A'))
-            result_value = (result.result_value or '—').strip() or '—'
-            colour = label_color or '#0F172A'
-            if section_key == 'microbiological' and result_value.lower() == 'present':
-                colour = '#DC2626'
-            result_label = f'<font color="{colour}">{escape(result_value)}</font>'
-            if label_text:
-                result_label += f'<br/><font size="8" color="#6B7280">{escape(label_text)}</font>'
-
-            table_data.append([
-                Paragraph(str(running_index), styles['TableCell']),
-                Paragraph(_safe_text(param.name, '—'), styles['TableCell']),
-                Paragraph(_safe_text(param.unit, '—'), styles['TableCell']),
-                Paragraph(_safe_text(param.method, '—'), styles['TableCell']),
-                Paragraph(result_label, styles['TableCell']),
-                Paragraph(_safe_text(limits_text, '—'), styles['TableCell']),
-            ])
-            running_index += 1
-
-        table = Table(table_data, colWidths=column_widths, repeatRows=1)
-        header_padding = 5 if include_branding else 6
-        body_padding = 4 if include_branding else 6
-        table_style = [
-            ('FONTNAME', (0, 0), (-1, 0), body_font_bold),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('GRID', (0, 0), (-1, -1), 0.4, grid_color),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, 0), header_padding),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), header_padding),
-            ('TOPPADDING', (0, 1), (-1, -1), body_padding),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), body_padding),
-        ]
-        if include_branding:
-            table_style.extend([
-                ('BACKGROUND', (0, 0), (-1, 0), primary),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), (colors.white, row_alt_color)),
-            ])
-        else:
-            table_style.append(('LINEBELOW', (0, 0), (-1, 0), 0.5, grid_color))
-        table.setStyle(TableStyle(table_style))
-        return table, running_index
-
-    def _labels_redundant(section_heading: str, category_label: str) -> bool:
-        """Treat headings that differ only by filler words as duplicates."""
-        def _canonical(value: str) -> str:
-            tokens = re.findall(r'[a-z0-9]+', value.casefold())
-            filtered = [
-                token for token in tokens
-                if token not in {'parameter', 'parameters', 'category', 'categories'}
-            ]
-            return ' '.join(filtered).strip()
-
-        canonical_heading = _canonical(section_heading)
-        canonical_category = _canonical(category_label)
-        return bool(canonical_heading and canonical_heading == canonical_category)
-
-    def _render_section(section_key: str, heading: str, serial_counter: int):
-        section = section_templates.get(section_key, {'categories': OrderedDict()})
-        elements.append(Paragraph(heading, styles['SectionTitle']))
-        elements.append(Spacer(1, 6))
-        if section['categories']:
-            for category_label, category_results in section['categories'].items():
-                label_text = (category_label or '').strip()
-                if label_text and not _labels_redundant(heading, label_text):
-                    elements.append(Paragraph(_safe_text(label_text, ''), styles['CategoryHeading']))
-                table, serial_counter = _build_results_table(category_results, serial_counter, section_key)
-                elements.append(table)
-                elements.append(Spacer(1, 10))
-        else:
-            elements.append(Paragraph("No parameters recorded for this category.", styles['Normal']))
-            elements.append(Spacer(1, 10))
-        return serial_counter
-
-    review = getattr(sample, 'review', None)
-    comments_text = ''
-    recommendations_text = ''
-
-    if ai_override is not None:
-        # AI text produced by the background job (already English + Malayalam combined).
-        comments_text, recommendations_text = ai_override
-    elif review:
-        recommendations_text = (review.recommendations or '').strip()
-        comments_text = (review.comments or '').strip()
-
-    # The AI draft stores English and Malayalam together. Keep only English on the
-    # main (ReportLab) report and carry the Malayalam onto a separate WeasyPrint page,
-    # since ReportLab cannot shape Malayalam script.
-    comments_text, comments_text_ml = split_bilingual_remarks(comments_text)
-    recommendations_text, recommendations_text_ml = split_bilingual_remarks(recommendations_text)
-
-    signatories = sample.resolve_signatories()
-
-    def _signatory_name(user):
-        if not user:
-            return 'Not assigned'
-        full = (user.get_full_name() or '').strip()
-        return full or user.username
-
-    def _signatory_payload(user, role):
-        return {
-            'name': _signatory_name(user),
-            'role': role,
-            'signature_path': getattr(user, 'signature_path', '') if user else '',
-        }
-
-    def _signature_cell(data):
-        elements = []
-        signature_path = (data.get('signature_path') or '').strip()
-        if signature_path:
-            try:
-                signature_img = Image(signature_path)
-                signature_img._restrictSize(48 * mm, 20 * mm)
-            except Exception as exc:
-                logger.warning(
-                    "Unable to load signature image for %s",
-                    data.get('name'),
-                    exc_info=settings.DEBUG,
-                )
-            else:
-                elements.append(signature_img)
-                elements.append(Spacer(1, 4))
-        safe_name = _safe_text(data.get('name'), 'Not assigned')
-        safe_role = _safe_text(data.get('role'), '')
-        elements.append(Paragraph(f"<b>{safe_name}</b><br/>{safe_role}", styles['Center']))
-        if len(elements) == 1:
-            return elements[0]
-        inner = Table([[el] for el in elements], colWidths=[52 * mm])
-        inner.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ]))
-        return inner
-
-    def _append_signatories_section(introduce_break: bool = False):
-        """Render authorised signatories, optionally forcing a new page."""
-        if introduce_break:
-            elements.append(PageBreak())
-        elements.append(Paragraph("AUTHORISED SIGNATORIES", styles['SectionTitle']))
-        payloads = [
-            _signatory_payload(signatories.get('chem_manager'), 'Chief of Quality - Chemistry'),
-            _signatory_payload(signatories.get('bio_manager'), 'Chief of Quality - Microbiology'),
-            _signatory_payload(signatories.get('food_analyst'), 'Chief Scientific Officer'),
-        ]
-        active_payloads = [p for p in payloads if any(p.values())]
-
-        cells = [_signature_cell(slot) for slot in active_payloads]
-        if not cells:
-            cells = ['', '', '']
-        while len(cells) < 3:
-            cells.append('')
-        sign_table = Table(
-            [cells[:3]],
-            colWidths=[(doc.width / 3.0) - 6] * 3,
-            rowHeights=[40 * mm],
-            hAlign='CENTER',
-        )
-        sign_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-        ]))
-        elements.append(sign_table)
-        elements.append(Spacer(1, 12))
-
-    def _append_consultant_signature_section():
-        """Render the consultant sign-off below remarks."""
-        reviewer = review.reviewer if review else None
-        fallback_consultant = signatories.get('solutions_manager')
-        consultant_user = _choose_signer_with_signature(reviewer, fallback_consultant)
-        role_label = 'Chief of Solutions - Water Quality'
-        if consultant_user:
-            consultant_slot = _signatory_payload(consultant_user, role_label)
-            consultant_cell = _signature_cell(consultant_slot)
-            table = Table([[consultant_cell]], colWidths=[58 * mm])
-            table.hAlign = 'RIGHT'
-            table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            elements.append(table)
-            elements.append(Spacer(1, 18))
-        else:
-            elements.append(
-                Paragraph(
-                    f"{_safe_text(role_label, role_label)}: Not assigned",
-                    styles['Normal'],
+    # The official report is immutable for a given revision, so it is rendered once
+    # and served from disk afterwards. AI drafts are one-off and never persisted.
+    artifact_layout = 'branded' if include_branding else 'plain'
+    artifact_path = None
+    if not ai_requested:
+        artifact_path = load_report_artifact(sample, layout=artifact_layout, engine=engine)
+    if artifact_path is None:
+        try:
+            with concurrency_slot('pdf'):
+                pdf_bytes = render_pdf(
+                    'report',
+                    sample.pk,
+                    inline=lambda: _render_sample_report_pdf(
+                        sample,
+                        include_branding=include_branding,
+                        ai_override=ai_override,
+                        engine=engine,
+                    ),
+                    include_branding=include_branding,
+                    ai_override=ai_override,
+                    engine=engine,
                 )
+        except ConcurrencyLimitExceeded as exc:
+            return _busy_response(
+                request,
+                exc,
+                what='reports',
+                back_url=reverse('core:sample_detail', kwargs={'pk': sample.pk}),
             )
-            elements.append(Spacer(1, 12))
-
-    serial_counter = 1
-    sign_section_inserted = False
-    for index, section_key in enumerate(section_order):
-        if index > 0:
-            elements.append(PageBreak())
-        heading = section_headings.get(section_key, section_headings['other'])
-        serial_counter = _render_section(section_key, heading, serial_counter)
-        if not sign_section_inserted and section_key == 'microbiological':
-            _append_signatories_section(introduce_break=False)
-            sign_section_inserted = True
-
-    if not sign_section_inserted:
-        if elements and not isinstance(elements[-1], PageBreak):
-            elements.append(PageBreak())
-        _append_signatories_section(introduce_break=False)
-
-    elements.append(PageBreak())
-
-    def _remarks_flowables(text, fallback):
-        """Render remark text as a bullet list when it has multiple points."""
-        items = bullet_items(text)
-        if len(items) >= 2:
-            return [ListFlowable(
-                [ListItem(
-                    Paragraph(_safe_text(item, preserve_breaks=True), styles['Normal']),
-                    leftIndent=12,
-                    value=None,
-                ) for item in items],
-                bulletType='bullet',
-                bulletColor=text_color,
-                bulletFontSize=6,
-                leftIndent=14,
-                spaceBefore=1,
-            )]
-        if (text or '').strip():
-            return [Paragraph(_safe_text(text, preserve_breaks=True), styles['Normal'])]
-        return [Paragraph(fallback, styles['Normal'])]
-
-    elements.append(Paragraph("REMARKS", styles['SectionTitle']))
-    elements.extend(_remarks_flowables(
-        comments_text,
-        "The sample has been analysed in accordance with IS 10500:2012 guidelines. Outcomes above include automated compliance status for each parameter.",
-    ))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph("Consultant Recommendations", styles['SectionTitle']))
-    elements.extend(_remarks_flowables(
-        recommendations_text,
-        "No consultant recommendations recorded for this sample.",
-    ))
-    elements.append(Spacer(1, 18))
-    _append_consultant_signature_section()
-
-    doc.build(elements)
-
-    buffer.seek(0)
-    pdf_bytes = buffer.getvalue()
-
-    # Append a Malayalam-language remarks page (rendered with WeasyPrint for correct
-    # script shaping). Degrades gracefully to English-only if WeasyPrint is unavailable.
-    malayalam_pdf = render_malayalam_remarks_pdf(
-        sample=sample,
-        remarks_ml=comments_text_ml,
-        recommendations_ml=recommendations_text_ml,
-        branded=include_branding,
-    )
-    if malayalam_pdf:
-        pdf_bytes = append_pdf_pages(pdf_bytes, malayalam_pdf)
-
-    filename_suffix = '_plain' if not include_branding else ''
-    if ai_requested:
-        filename_suffix += '_ai'
-    customer_fragment = _customer_filename_fragment(sample)
-    response = FileResponse(
-        BytesIO(pdf_bytes),
-        as_attachment=True,
-        filename=f'WaterQualityReport_{customer_fragment}_{sample.display_id}{filename_suffix}.pdf',
-    )
+        except PDFRenderError as exc:
+            messages.error(request, str(exc))
+            return redirect('core:sample_detail', pk=sample.pk)
+        if not ai_requested:
+            artifact_path = save_report_artifact(sample, pdf_bytes, layout=artifact_layout, engine=engine)
+        if artifact_path is None:
+            response = FileResponse(BytesIO(pdf_bytes), as_attachment=True, filename=filename)
+    if artifact_path is not None:
+        response = report_artifact_response(artifact_path, filename)
 
     # The AI-drafted report is a supplementary download, so it must not advance the
     # workflow. Only the official report download marks the sample as sent.
@@ -819,36 +237,8 @@ def download_sample_report_view(request, pk):
     return response
 
 
-def download_sample_invoice_view(request, pk):
-    sample = get_object_or_404(
-        Sample.objects.select_related('customer').prefetch_related('tests_requested'),
-        pk=pk,
-    )
-
-    if not _user_can_view_sensitive_records(request.user):
-        messages.error(request, "You do not have permission to download this invoice.")
-        return redirect('core:dashboard')
-
-    if sample.current_status not in ['REPORT_APPROVED', 'REPORT_SENT']:
-        messages.error(request, "Invoice can only be generated after the report is approved.")
-        return redirect('core:sample_detail', pk=sample.pk)
-
-    try:
-        invoice = Invoice.create_for_sample(sample)
-        force_rebuild = invoice.line_items.filter(parameter__isnull=False).exists()
-        invoice.ensure_line_items(force=force_rebuild)
-        invoice.recalculate_totals(save=True)
-        if invoice.status == 'DRAFT':
-            invoice.status = 'ISSUED'
-            invoice.save(update_fields=['status'])
-    except Exception as exc:
-        logger.exception("Failed to prepare invoice for sample %s", sample.sample_id)
-        messages.error(
-            request,
-            _format_error_message("Unable to generate invoice right now.", exc),
-        )
-        return redirect('core:sample_detail', pk=sample.pk)
-
+def _render_sample_invoice_pdf(sample, invoice) -> bytes:
+    """Build the invoice PDF for ``sample``/``invoice`` and return its bytes."""
     from django.conf import settings
     from reportlab.lib import colors
     from reportlab.lib.enums import TA_RIGHT
@@ -998,7 +388,7 @@ def download_sample_invoice_view(request, pk):
         lab_contact = '  |  '.join(contact_parts)
 
     header_left_parts = []
-    logo_path = profile.logo_path
+    logo_path = report_image_variant(profile.logo_path, 'logo')
     if logo_path and os.path.exists(logo_path):
         try:
             logo_reader = ImageReader(logo_path)
@@ -1229,12 +619,93 @@ def download_sample_invoice_view(request, pk):
         elements.append(Paragraph(escape(invoice.notes), styles['Normal']))
 
     doc.build(elements)
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def download_sample_invoice_view(request, pk):
+    sample = get_object_or_404(
+        Sample.objects.select_related('customer').prefetch_related('tests_requested'),
+        pk=pk,
+    )
+
+    if not _user_can_view_sensitive_records(request.user):
+        messages.error(request, "You do not have permission to download this invoice.")
+        return redirect('core:dashboard')
+
+    if sample.current_status not in ['REPORT_APPROVED', 'REPORT_SENT']:
+        messages.error(request, "Invoice can only be generated after the report is approved.")
+        return redirect('core:sample_detail', pk=sample.pk)
+
+    try:
+        invoice = Invoice.create_for_sample(sample)
+        force_rebuild = invoice.line_items.filter(parameter__isnull=False).exists()
+        invoice.ensure_line_items(force=force_rebuild)
+        invoice.recalculate_totals(save=True)
+        if invoice.status == 'DRAFT':
+            invoice.status = 'ISSUED'
+            invoice.save(update_fields=['status'])
+    except Exception as exc:
+        logger.exception("Failed to prepare invoice for sample %s", sample.sample_id)
+        messages.error(
+            request,
+            _format_error_message("Unable to generate invoice right now.", exc),
+        )
+        return redirect('core:sample_detail', pk=sample.pk)
+
+    try:
+        with concurrency_slot('pdf'):
+            pdf_bytes = render_pdf(
+                'invoice',
+                sample.pk,
+                inline=lambda: _render_sample_invoice_pdf(sample, invoice),
+            )
+    except ConcurrencyLimitExceeded as exc:
+        return _busy_response(
+            request,
+            exc,
+            what='reports and invoices',
+            back_url=reverse('core:sample_detail', kwargs={'pk': sample.pk}),
+        )
+    except PDFRenderError as exc:
+        messages.error(request, str(exc))
+        return redirect('core:sample_detail', pk=sample.pk)
 
     customer_fragment = _customer_filename_fragment(sample)
     response = FileResponse(
-        buffer,
+        BytesIO(pdf_bytes),
         as_attachment=True,
         filename=f"Invoice_{customer_fragment}_{invoice.invoice_number or sample.display_id}.pdf",
     )
     return response
+
+
+def bulk_report_export_view(request):
+    """Stream a ZIP of approved reports selected by date range, customer, referrer or status."""
+    if not _user_can_view_sensitive_records(request.user):
+        messages.error(request, "You do not have permission to export reports.")
+        return redirect('core:dashboard')
+
+    form = ReportExportForm(request.GET or None, customers=apply_user_scope(Customer.objects.all(), request.user))
+    if request.GET and form.is_valid():
+        data = form.cleaned_data
+        samples = apply_user_scope(exportable_samples(
+            date_from=data.get('date_from'),
+            date_to=data.get('date_to'),
+            customer=data.get('customer'),
+            referred_by=data.get('referred_by'),
+            status=data.get('status'),
+        ), request.user)
+        if samples.exists():
+            include_branding = data.get('layout') != 'plain'
+            stamp = timezone.localtime().strftime('%Y%m%d_%H%M')
+            response = StreamingHttpResponse(
+                stream_reports_zip(samples, include_branding=include_branding),
+                content_type='application/zip',
+            )
+            response['Content-Disposition'] = f'attachment; filename="WaterQualityReports_{stamp}.zip"'
+            # Keep nginx from buffering the archive so bytes reach the browser as they are produced.
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        messages.warning(request, "No approved reports match these filters.")
+
+    return render(request, 'core/report_export.html', {'form': form})
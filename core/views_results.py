@@ -1,3 +1,5 @@
+import io
+import json
 import logging
 from datetime import timedelta
 
@@ -5,14 +7,19 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
 from django.db.models import Count, Max, Prefetch, Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
 from django.views.generic import DetailView, ListView
 from django.core.exceptions import ValidationError
 
 from .decorators import lab_required
-from .forms import TestResultEntryForm
-from .models import AuditTrail, Sample, TestParameter, TestResult
+from .forms import ResultImportForm, TestResultEntryForm
+from .models import Sample, TestParameter, TestResult
+from .services.batch_entry import batch_entry_samples, entry_statuses, save_batch_entry
+from .services.result_entry import ResultEntry, save_result_entries
+from .services.result_import import ResultImportError, import_results
 from .views_common import _format_error_message
 
 logger = logging.getLogger(__name__)
@@ -194,10 +201,6 @@ def test_result_entry(request, sample_id):
                 if sample.current_status == 'SENT_TO_LAB':
                     sample.update_status('TESTING_IN_PROGRESS', request.user)
 
-                results_entered_count = 0
-                results_updated_count = 0
-                all_forms_valid = True
-                form_errors = {}
                 existing_results = {
                     result.parameter_id: result
                     for result in TestResult.objects.select_for_update().filter(
@@ -206,66 +209,44 @@ def test_result_entry(request, sample_id):
                     )
                 }
 
+                # Validate every form before writing anything, then save the
+                # whole panel in a constant number of queries.
+                entries = []
+                invalid_parameters = []
                 for test_param_model in requested_tests:
                     form_prefix = f'param_{test_param_model.parameter_id}'
                     form = TestResultEntryForm(request.POST, prefix=form_prefix)
-
-                    if form.is_valid():
-                        result_value = form.cleaned_data['result_value']
-                        observation = form.cleaned_data['observation']
-                        remarks = form.cleaned_data.get('remarks')
-
-                        if result_value and result_value.strip():
-                            test_result = existing_results.get(test_param_model.parameter_id)
-                            if test_result is None:
-                                test_result = TestResult(
-                                    sample=sample,
-                                    parameter=test_param_model,
-                                    result_value=result_value.strip(),
-                                    observation=observation,
-                                    remarks=remarks,
-                                    technician=request.user,
-                                )
-                                test_result.full_clean()
-                                test_result.save()
-                                existing_results[test_param_model.parameter_id] = test_result
-                                AuditTrail.log_change(
-                                    user=request.user,
-                                    action='CREATE',
-                                    instance=test_result,
-                                    request=request,
-                                )
-                                results_entered_count += 1
-                            else:
-                                old_values = {
-                                    'result_value': test_result.result_value,
-                                    'observation': test_result.observation,
-                                    'remarks': test_result.remarks,
-                                }
-                                test_result.result_value = result_value.strip()
-                                test_result.observation = observation
-                                test_result.remarks = remarks
-                                test_result.full_clean()
-                                test_result.save()
-                                AuditTrail.log_change(
-                                    user=request.user,
-                                    action='UPDATE',
-                                    instance=test_result,
-                                    old_values=old_values,
-                                    new_values=form.cleaned_data,
-                                    request=request,
-                                )
-                                results_updated_count += 1
-                    else:
-                        all_forms_valid = False
-                        form_errors[test_param_model.parameter_id] = form.errors
-
-                if not all_forms_valid:
+                    if not form.is_valid():
+                        invalid_parameters.append(test_param_model.name)
+                        continue
+                    result_value = form.cleaned_data['result_value']
+                    if result_value and result_value.strip():
+                        entries.append(ResultEntry(
+                            parameter=test_param_model,
+                            values={
+                                'result_value': result_value.strip(),
+                                'observation': form.cleaned_data['observation'],
+                                'remarks': form.cleaned_data.get('remarks'),
+                            },
+                            audit_values=form.cleaned_data,
+                        ))
+
+                if invalid_parameters:
                     messages.error(request, "There were errors in your submission. Please correct them and try again.")
                     raise ValidationError(
-                        f"Form validation failed for {test_param_model.name}. Please check your input."
+                        f"Form validation failed for {', '.join(invalid_parameters)}. Please check your input."
                     )
 
+                write_summary = save_result_entries(
+                    sample,
+                    entries,
+                    user=request.user,
+                    request=request,
+                    existing=existing_results,
+                )
+                results_entered_count = len(write_summary.created)
+                results_updated_count = len(write_summary.updated)
+
                 if original_status_was_review_pending:
                     messages.info(
                         request,
@@ -273,7 +254,10 @@ def test_result_entry(request, sample_id):
                     )
                 else:
                     total_tests = len(requested_tests)
-                    completed_tests = TestResult.objects.filter(sample=sample).count()
+                    completed_tests = TestResult.objects.filter(
+                        sample=sample,
+                        parameter__in=requested_tests,
+                    ).count()
 
                     if completed_tests >= total_tests and total_tests > 0:
                         status_now = sample.current_status
@@ -366,3 +350,168 @@ def test_result_entry(request, sample_id):
     }
 
     return render(request, 'core/test_result_entry.html', context)
+
+
+@lab_required
+def result_import_view(request):
+    """Import analyser/CSV results for many samples; problems are listed per row."""
+    summary = None
+    form = ResultImportForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        upload = form.cleaned_data['file']
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            summary = import_results(stream, user=request.user, request=request)
+        except ResultImportError as exc:
+            form.add_error('file', str(exc))
+        else:
+            saved = len(summary.samples)
+            if summary.created or summary.updated:
+                messages.success(
+                    request,
+                    f'{summary.created} results added and {summary.updated} updated across {saved} samples.',
+                )
+            if summary.error_count:
+                messages.warning(request, f'{summary.error_count} values could not be imported; see the list below.')
+            elif not (summary.created or summary.updated):
+                messages.info(request, 'No new or changed results were found in the file.')
+
+    return render(request, 'core/result_import.html', {'form': form, 'summary': summary})
+
+
+def _batch_parameter_choices(user):
+    """Parameters with the number of open samples requesting each, busiest first."""
+    return (
+        TestParameter.objects.annotate(
+            open_samples=Count('samples', filter=Q(samples__current_status__in=entry_statuses(user)), distinct=True),
+        )
+        .filter(open_samples__gt=0)
+        .order_by('display_order', 'name')
+    )
+
+
+def _batch_summary_messages(request, summary):
+    if summary.created:
+        messages.success(request, f'{summary.created} new test results entered.')
+    if summary.updated:
+        messages.info(request, f'{summary.updated} test results updated.')
+    if summary.completed:
+        messages.success(
+            request,
+            f'{len(summary.completed)} samples moved to "Results Entered": '
+            + ', '.join(str(sample) for sample in summary.completed),
+        )
+    if summary.errors:
+        messages.warning(request, f'{len(summary.errors)} values were not saved; see the highlighted rows.')
+
+
+@lab_required
+def parameter_batch_entry(request):
+    """Enter one parameter for every in-lab sample that requests it."""
+    parameter = None
+    parameter_id = request.GET.get('parameter') or request.POST.get('parameter')
+    if parameter_id:
+        try:
+            parameter = TestParameter.objects.get(pk=parameter_id)
+        except (TestParameter.DoesNotExist, ValidationError):
+            messages.error(request, 'Unknown test parameter.')
+            return redirect('core:parameter_batch_entry')
+
+    errors = {}
+    if request.method == 'POST' and parameter is not None:
+        values = {}
+        for key, value in request.POST.items():
+            if key.startswith('result_'):
+                sample_id = key[len('result_'):]
+                values[sample_id] = {
+                    'result_value': value,
+                    'observation': request.POST.get(f'observation_{sample_id}', ''),
+                }
+        try:
+            summary = save_batch_entry(parameter, values, user=request.user, request=request)
+        except Exception as exc:
+            logger.exception("Failed to save batch results for parameter %s", parameter.pk)
+            messages.error(request, _format_error_message('Error saving test results.', exc))
+            return redirect(f"{reverse('core:parameter_batch_entry')}?parameter={parameter.pk}")
+        _batch_summary_messages(request, summary)
+        if not summary.errors:
+            return redirect(f"{reverse('core:parameter_batch_entry')}?parameter={parameter.pk}")
+        errors = summary.errors
+
+    samples = batch_entry_samples(parameter, request.user) if parameter is not None else []
+    for sample in samples:
+        sample.batch_errors = errors.get(str(sample.pk), [])
+        if sample.batch_errors:
+            # Keep what the technician typed so it can be corrected.
+            sample.batch_value = request.POST.get(f'result_{sample.pk}', '')
+            sample.batch_observation = request.POST.get(f'observation_{sample.pk}', '')
+        else:
+            sample.batch_value = sample.batch_result.result_value if sample.batch_result else ''
+            sample.batch_observation = (sample.batch_result.observation or '') if sample.batch_result else ''
+
+    context = {
+        'parameter': parameter,
+        'parameters': _batch_parameter_choices(request.user),
+        'samples': samples,
+    }
+    return render(request, 'core/parameter_batch_entry.html', context)
+
+
+@lab_required
+def parameter_batch_entry_api(request, parameter_id):
+    """JSON form of the batch screen.
+
+    GET lists the open samples and their current values. POST takes
+    ``{"results": {"<sample_id>": {"result_value": ..., "observation": ...}}}``
+    (or a list of objects with ``sample_id``) and saves them in one write.
+    """
+    parameter = get_object_or_404(TestParameter, pk=parameter_id)
+
+    if request.method == 'POST':
+        try:
+            payload = json.loads(request.body.decode('utf-8')) if request.body else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return JsonResponse({'ok': False, 'error': 'Invalid JSON.'}, status=400)
+        results = payload.get('results') if isinstance(payload, dict) else None
+        if isinstance(results, list):
+            results = {
+                str(row.get('sample_id')): row
+                for row in results
+                if isinstance(row, dict) and row.get('sample_id')
+            }
+        if not isinstance(results, dict) or not results:
+            return JsonResponse({'ok': False, 'error': 'No results provided.'}, status=400)
+        try:
+            summary = save_batch_entry(parameter, results, user=request.user, request=request)
+        except ValidationError as exc:
+            return JsonResponse({'ok': False, 'error': ' '.join(exc.messages)}, status=400)
+        return JsonResponse({
+            'ok': not summary.errors,
+            'created': summary.created,
+            'updated': summary.updated,
+            'unchanged': summary.unchanged,
+            'completed': [str(sample.pk) for sample in summary.completed],
+            'errors': summary.errors,
+        })
+
+    return JsonResponse({
+        'parameter': {
+            'id': str(parameter.pk),
+            'name': parameter.name,
+            'unit': parameter.unit,
+            'min_limit': str(parameter.min_permissible_limit) if parameter.min_permissible_limit is not None else None,
+            'max_limit': str(parameter.max_permissible_limit) if parameter.max_permissible_limit is not None else None,
+        },
+        'samples': [
+            {
+                'sample_id': str(sample.pk),
+                'display_id': sample.display_id,
+                'customer': sample.customer.name,
+                'status': sample.current_status,
+                'result_value': sample.batch_result.result_value if sample.batch_result else None,
+                'observation': sample.batch_result.observation if sample.batch_result else None,
+                'limit_status': sample.batch_result.limit_status if sample.batch_result else None,
+            }
+            for sample in batch_entry_samples(parameter, request.user)
+        ],
+    })
@@ -1,3 +1,4 @@
+import io
 import logging
 from collections import OrderedDict
 from datetime import timedelta
@@ -5,14 +6,19 @@ from datetime import timedelta
 from django.contrib import messages
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 
-from .decorators import consultant_required
-from .forms import SampleForm, SampleReportMetadataForm
+from .decorators import consultant_required, frontdesk_required
+from .forms import (
+    BulkSampleRegistrationForm,
+    SampleForm,
+    SampleRegistrationImportForm,
+    SampleReportMetadataForm,
+)
 from .mixins import (
     AuditMixin,
     FrontDeskRequiredMixin,
@@ -20,7 +26,15 @@ from .mixins import (
     RoleRequiredMixin,
 )
 from .models import AuditTrail, ConsultantReview, Customer, Invoice, LabProfile, Sample, TestResult
+from .services import search_index
 from .services.ai_remarks import AIRemarkError, generate_ai_review_draft, is_ai_review_configured
+from .services.limit_status import OUT_OF_LIMIT_STATUSES
+from .services.sample_registration import (
+    RegistrationError,
+    batch_from_form,
+    parse_registration_csv,
+    register_samples,
+)
 from .views_common import _SENSITIVE_ROLES, _format_error_message, apply_user_scope
 
 logger = logging.getLogger(__name__)
@@ -69,6 +83,10 @@ class SampleListView(RoleRequiredMixin, ListView):
             return collected
         return ''
 
+    def get_limits_filter(self):
+        limits = (self.request.GET.get('limits') or '').lower().strip()
+        return limits if limits == 'out' else ''
+
     def get_queryset(self):
         qs = (
             Sample.objects.select_related('customer')
@@ -78,16 +96,7 @@ class SampleListView(RoleRequiredMixin, ListView):
 
         query = self.get_search_query()
         if query:
-            qs = qs.filter(
-                Q(display_id__icontains=query)
-                | Q(customer__customer_code__icontains=query)
-                | Q(customer__name__icontains=query)
-                | Q(customer__phone__icontains=query)
-                | Q(customer__email__icontains=query)
-                | Q(sample_source__icontains=query)
-                | Q(sampling_location__icontains=query)
-                | Q(referred_by__icontains=query)
-            )
+            qs = search_index.filter_samples(qs, query)
 
         status_values = self.get_status_values()
         if status_values:
@@ -98,6 +107,13 @@ class SampleListView(RoleRequiredMixin, ListView):
             qs = qs.filter(collection_datetime__date=timezone.localdate())
         elif collected_scope == 'week':
             qs = qs.filter(collection_datetime__gte=timezone.now() - timedelta(days=7))
+
+        if self.get_limits_filter() == 'out':
+            # Served by the indexed TestResult.limit_status column.
+            qs = qs.filter(Exists(TestResult.objects.filter(
+                sample=OuterRef('pk'),
+                limit_status__in=OUT_OF_LIMIT_STATUSES,
+            )))
         return apply_user_scope(qs, self.request.user)
 
     def get_context_data(self, **kwargs):
@@ -111,6 +127,7 @@ class SampleListView(RoleRequiredMixin, ListView):
         context['search_query'] = self.get_search_query()
         context['status_filter'] = self.get_selected_status_key()
         context['collected_filter'] = self.get_collected_filter()
+        context['limits_filter'] = self.get_limits_filter()
         context['status_values'] = self.get_status_values()
         context['sample_status_choices'] = Sample.SAMPLE_STATUS_CHOICES
         context['status_group_choices'] = [
@@ -120,7 +137,10 @@ class SampleListView(RoleRequiredMixin, ListView):
             ('COMPLETED', 'Completed'),
         ]
         context['show_reset_filters'] = bool(
-            context['search_query'] or context['status_values'] or context['collected_filter']
+            context['search_query']
+            or context['status_values']
+            or context['collected_filter']
+            or context['limits_filter']
         )
 
         if page_obj:
@@ -193,7 +213,7 @@ class SampleDetailView(RoleRequiredMixin, DetailView):
                 result = entry['item']
                 status = result.get_limit_status()
                 entry['limit_status'] = status
-                entry['is_out_of_range'] = status in {'ABOVE_LIMIT', 'BELOW_LIMIT'}
+                entry['is_out_of_range'] = status in OUT_OF_LIMIT_STATUSES
 
         context['results_by_category'] = results_by_category
         lab_profile = LabProfile.get_active()
@@ -228,6 +248,56 @@ class SampleCreateView(AuditMixin, FrontDeskRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
+@frontdesk_required
+def bulk_sample_registration(request):
+    """Register a batch of bottles in one transaction, from the form or a CSV."""
+    form = BulkSampleRegistrationForm(
+        request.POST if request.method == 'POST' and request.POST.get('mode') != 'csv' else None,
+        initial={'collection_datetime': timezone.localtime().replace(second=0, microsecond=0)},
+    )
+    import_form = SampleRegistrationImportForm(
+        request.POST if request.POST.get('mode') == 'csv' else None,
+        request.FILES or None,
+    )
+    row_errors = []
+    batch = None
+    if request.method == 'POST':
+        if request.POST.get('mode') == 'csv':
+            if import_form.is_valid():
+                upload = import_form.cleaned_data['file']
+                stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace', newline='')
+                try:
+                    batch = parse_registration_csv(
+                        stream, customers=apply_user_scope(Customer.objects.all(), request.user),
+                    )
+                except RegistrationError as exc:
+                    import_form.add_error('file', str(exc))
+                else:
+                    row_errors = batch.errors
+        elif form.is_valid():
+            batch = batch_from_form(form.cleaned_data)
+
+    if batch is not None and row_errors:
+        messages.warning(request, f'{len(row_errors)} problems found; no samples were registered.')
+    elif batch is not None:
+        try:
+            samples = register_samples(batch, user=request.user, request=request)
+        except RegistrationError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(
+                request,
+                f'{len(samples)} samples registered: {samples[0].display_id} to {samples[-1].display_id}.',
+            )
+            return redirect('core:sample_list')
+
+    return render(request, 'core/sample_bulk_form.html', {
+        'form': form,
+        'import_form': import_form,
+        'row_errors': row_errors,
+    })
+
+
 class SampleUpdateView(AuditMixin, FrontDeskRequiredMixin, UpdateView):
     model = Sample
     form_class = SampleForm
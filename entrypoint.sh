@@ -4,6 +4,8 @@ set -e
 # Default values
 PORT=${PORT:-8000}
 WEB_CONCURRENCY=${WEB_CONCURRENCY:-3}
+# Threads let a worker keep serving pages while a PDF renders in the render pool.
+WEB_THREADS=${WEB_THREADS:-4}
 WEB_TIMEOUT=${WEB_TIMEOUT:-120}
 MAX_REQUESTS=${MAX_REQUESTS:-1000}
 MAX_REQUESTS_JITTER=${MAX_REQUESTS_JITTER:-100}
@@ -18,6 +20,12 @@ if [ "${COLLECTSTATIC_ON_START:-0}" = "1" ]; then
   python manage.py collectstatic --noinput
 fi
 
+# Report-sized variants of uploaded signatures/logos (idempotent; only missing ones are built)
+python manage.py optimize_report_images || true
+
+# Finish limit re-evaluations whose web worker was recycled mid-job
+python manage.py reevaluate_limits --resume || true
+
 # Ensure an admin user exists (idempotent management command)
 echo "Ensuring admin user exists (create_admin)..."
 python manage.py create_admin || true
@@ -26,6 +34,8 @@ echo "Starting gunicorn on port ${PORT} with ${WEB_CONCURRENCY} workers..."
 exec gunicorn waterlab.wsgi:application \
   --bind 0.0.0.0:${PORT} \
   --workers ${WEB_CONCURRENCY} \
+  --worker-class gthread \
+  --threads ${WEB_THREADS} \
   --timeout ${WEB_TIMEOUT} \
   --max-requests ${MAX_REQUESTS} \
   --max-requests-jitter ${MAX_REQUESTS_JITTER} \
@@ -16,6 +16,9 @@ const WaterLab = {
     config: {
         debug: true,
         defaultDebounceTime: 250,
+        searchSuggestDebounceTime: 180,
+        searchSuggestMinLength: 2,
+        searchSuggestCacheSize: 50,
     },
 
     log(...args) {
@@ -31,6 +34,7 @@ const WaterLab = {
         this.initAddressDropdowns();
         this.initFlashMessages();
         this.initSubmitLoading();
+        this.initSearchSuggestions();
     },
 
     initFlashMessages() {
@@ -133,6 +137,123 @@ const WaterLab = {
         });
     },
 
+    // Header search suggestions ---------------------------------------------
+    initSearchSuggestions() {
+        const form = document.querySelector('.app-global-search[data-suggest-url]');
+        const input = form ? form.querySelector('input[name="q"]') : null;
+        const menu = form ? form.querySelector('.app-global-search__menu') : null;
+        if (!input || !menu || typeof fetch === 'undefined') {
+            return;
+        }
+        const url = form.dataset.suggestUrl;
+        const answers = new Map();
+        let controller = null;
+        let active = -1;
+
+        const normalise = () => input.value.trim().replace(/\s+/g, ' ').toLowerCase();
+        const items = () => Array.from(menu.querySelectorAll('.app-global-search__item'));
+
+        const hide = () => {
+            menu.hidden = true;
+            menu.innerHTML = '';
+            active = -1;
+            input.setAttribute('aria-expanded', 'false');
+        };
+
+        const highlight = (index) => {
+            const options = items();
+            if (!options.length) return;
+            active = (index + options.length) % options.length;
+            options.forEach((option, position) => {
+                option.classList.toggle('is-active', position === active);
+                option.setAttribute('aria-selected', position === active ? 'true' : 'false');
+            });
+        };
+
+        const render = (results) => {
+            if (!results.length) {
+                hide();
+                return;
+            }
+            menu.innerHTML = '';
+            active = -1;
+            results.forEach((result) => {
+                const option = document.createElement('a');
+                option.className = 'app-global-search__item';
+                option.href = result.url;
+                option.setAttribute('role', 'option');
+                const icon = document.createElement('i');
+                icon.className = 'material-icons';
+                icon.setAttribute('aria-hidden', 'true');
+                icon.textContent = result.kind === 'sample' ? 'science' : 'person';
+                const text = document.createElement('span');
+                const label = document.createElement('strong');
+                label.textContent = result.label;
+                const detail = document.createElement('small');
+                detail.textContent = result.detail;
+                text.append(label, detail);
+                option.append(icon, text);
+                menu.appendChild(option);
+            });
+            menu.hidden = false;
+            input.setAttribute('aria-expanded', 'true');
+        };
+
+        const lookup = async () => {
+            const query = normalise();
+            if (query.length < this.config.searchSuggestMinLength) {
+                hide();
+                return;
+            }
+            if (answers.has(query)) {
+                render(answers.get(query));
+                return;
+            }
+            // Only the latest keystroke matters; drop the request still in flight.
+            if (controller) controller.abort();
+            controller = new AbortController();
+            try {
+                const response = await fetch(`${url}?q=${encodeURIComponent(query)}`, {
+                    signal: controller.signal,
+                    credentials: 'same-origin',
+                    headers: { Accept: 'application/json' },
+                });
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                const data = await response.json();
+                if (answers.size >= this.config.searchSuggestCacheSize) {
+                    answers.delete(answers.keys().next().value);
+                }
+                answers.set(query, data.results || []);
+                if (normalise() === query) {
+                    render(answers.get(query));
+                }
+            } catch (error) {
+                if (error.name !== 'AbortError') {
+                    this.log('Search suggestions failed', error);
+                }
+            }
+        };
+
+        input.addEventListener('input', this.debounce(lookup, this.config.searchSuggestDebounceTime));
+        input.addEventListener('keydown', (event) => {
+            if (menu.hidden) return;
+            if (event.key === 'ArrowDown' || event.key === 'ArrowUp') {
+                event.preventDefault();
+                highlight(active + (event.key === 'ArrowDown' ? 1 : -1));
+            } else if (event.key === 'Enter' && active >= 0) {
+                event.preventDefault();
+                window.location.href = items()[active].href;
+            } else if (event.key === 'Escape') {
+                hide();
+            }
+        });
+        document.addEventListener('click', (event) => {
+            if (!form.contains(event.target)) hide();
+        });
+    },
+
     // Address dropdown logic -------------------------------------------------
     _keralaAddressData: null,
 
@@ -118,6 +118,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AuditBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -266,6 +267,71 @@ OPENAI_REMARKS_MODEL = config('OPENAI_REMARKS_MODEL', default='gpt-5-mini')
 OPENAI_RESPONSES_URL = config('OPENAI_RESPONSES_URL', default='https://api.openai.com/v1/responses')
 OPENAI_REMARKS_TIMEOUT = config('OPENAI_REMARKS_TIMEOUT', default=180, cast=int)
 
+# Rendered report PDFs are persisted per sample revision and re-served from disk.
+# Keep this outside MEDIA_ROOT: nginx serves /media/ publicly.
+REPORT_ARTIFACTS_ROOT = config('REPORT_ARTIFACTS_ROOT', default=str(BASE_DIR / 'report_artifacts'))
+# Internal nginx location aliased to REPORT_ARTIFACTS_ROOT. When set, downloads are
+# handed to nginx via X-Accel-Redirect instead of being streamed by gunicorn.
+REPORT_ARTIFACTS_ACCEL_PREFIX = config('REPORT_ARTIFACTS_ACCEL_PREFIX', default='')
+
+# Report/invoice PDFs are rendered in a per-worker process pool (core/services/render_pool.py).
+# 0 renders inline in the web process, which is the simplest setup for development.
+REPORT_RENDER_WORKERS = config('REPORT_RENDER_WORKERS', default=0, cast=int)
+REPORT_RENDER_TIMEOUT = config('REPORT_RENDER_TIMEOUT', default=90, cast=int)
+# Renders allowed to wait per web worker before users get a "busy" message (0 = 2x workers).
+REPORT_RENDER_MAX_PENDING = config('REPORT_RENDER_MAX_PENDING', default=0, cast=int)
+
+# WeasyPrint Malayalam pages are cached on disk by content hash (LRU, capped; 0 disables).
+MALAYALAM_PAGE_CACHE_DIR = config('MALAYALAM_PAGE_CACHE_DIR', default=str(BASE_DIR / 'report_cache' / 'malayalam'))
+MALAYALAM_PAGE_CACHE_MAX_MB = config('MALAYALAM_PAGE_CACHE_MAX_MB', default=64, cast=int)
+# Report-sized variants of the letterhead, logos and signatures (core/services/report_images.py).
+REPORT_IMAGE_CACHE_DIR = config('REPORT_IMAGE_CACHE_DIR', default=str(BASE_DIR / 'report_cache' / 'images'))
+# Render cache misses in a warm, long-lived WeasyPrint process (core/services/weasyprint_renderer.py).
+MALAYALAM_RENDERER_ENABLED = config('MALAYALAM_RENDERER_ENABLED', default=False, cast=bool)
+# Default report engine: 'reportlab' (ReportLab + WeasyPrint Malayalam page) or 'html'
+# (single WeasyPrint pass). Downloads can override it with ?engine=.
+REPORT_ENGINE = config('REPORT_ENGINE', default='reportlab')
+# Cross-worker caps on concurrent PDF renders and AI drafts (core/services/concurrency.py).
+# Requests that cannot get a slot within CONCURRENCY_QUEUE_WAIT seconds get a 503 "busy" page.
+CONCURRENCY_LIMITS = {
+    'pdf': config('CONCURRENCY_PDF_SLOTS', default=4, cast=int),
+    'ai': config('CONCURRENCY_AI_SLOTS', default=2, cast=int),
+}
+CONCURRENCY_QUEUE_WAIT = config('CONCURRENCY_QUEUE_WAIT', default=5, cast=int)
+CONCURRENCY_RETRY_AFTER = config('CONCURRENCY_RETRY_AFTER', default=10, cast=int)
+CONCURRENCY_LEASE_SECONDS = config('CONCURRENCY_LEASE_SECONDS', default=300, cast=int)
+# 'auto' (cache unless LocMem), 'cache' or 'file' (flock under CONCURRENCY_LOCK_DIR).
+CONCURRENCY_BACKEND = config('CONCURRENCY_BACKEND', default='auto')
+CONCURRENCY_LOCK_DIR = config('CONCURRENCY_LOCK_DIR', default=str(BASE_DIR / 'report_cache' / 'locks'))
+# Seconds a worker trusts its compiled result status overrides before re-checking the table.
+RESULT_OVERRIDE_INDEX_TTL = config('RESULT_OVERRIDE_INDEX_TTL', default=5, cast=int)
+# Limit edits re-classify stored results inline up to this many rows, else in a background job.
+LIMIT_REEVALUATION_INLINE_MAX = config('LIMIT_REEVALUATION_INLINE_MAX', default=2000, cast=int)
+LIMIT_REEVALUATION_CHUNK_SIZE = config('LIMIT_REEVALUATION_CHUNK_SIZE', default=2000, cast=int)
+# CSV result import: rows per transaction, and extra column header -> parameter name aliases.
+RESULT_IMPORT_CHUNK_SIZE = config('RESULT_IMPORT_CHUNK_SIZE', default=500, cast=int)
+RESULT_IMPORT_PARAMETER_ALIASES = {}
+# Audit rows are written once per request ('request'), by a batching thread ('background') or immediately ('off').
+AUDIT_BUFFER_MODE = config('AUDIT_BUFFER_MODE', default='request')
+AUDIT_BUFFER_MAX_PENDING = config('AUDIT_BUFFER_MAX_PENDING', default=500, cast=int)
+AUDIT_BACKGROUND_BATCH_SIZE = config('AUDIT_BACKGROUND_BATCH_SIZE', default=500, cast=int)
+AUDIT_BACKGROUND_FLUSH_SECONDS = config('AUDIT_BACKGROUND_FLUSH_SECONDS', default=2.0, cast=float)
+# Audit rows older than AUDIT_HOT_DAYS are moved out by `manage.py archive_audit`: into PostgreSQL
+# partitions, or gzip JSONL files under AUDIT_ARCHIVE_DIR ('auto', 'partition' or 'file').
+AUDIT_HOT_DAYS = config('AUDIT_HOT_DAYS', default=365, cast=int)
+AUDIT_ARCHIVE_BACKEND = config('AUDIT_ARCHIVE_BACKEND', default='auto')
+AUDIT_ARCHIVE_DIR = config('AUDIT_ARCHIVE_DIR', default=str(BASE_DIR / 'audit_archive'))
+AUDIT_FILTER_CHOICES_TTL = config('AUDIT_FILTER_CHOICES_TTL', default=300, cast=int)
+# 'compact' stores only the changed fields of each audit row; 'full' also keeps
+# the complete old/new snapshots.
+AUDIT_PAYLOAD_MODE = config('AUDIT_PAYLOAD_MODE', default='compact')
+# Largest batch accepted by bulk sample registration (form or CSV).
+BULK_REGISTRATION_MAX_SAMPLES = config('BULK_REGISTRATION_MAX_SAMPLES', default=500, cast=int)
+# Seconds a header-search typeahead answer is reused for the same prefix (0 disables).
+TYPEAHEAD_CACHE_SECONDS = config('TYPEAHEAD_CACHE_SECONDS', default=15, cast=int)
+# Switches off the render pool, limiter, renderer process and caches for the test run.
+TEST_RUNNER = 'core.test_runner.WaterLabTestRunner'
+
 # Logging Configuration (Optional - Basic example)
 # For more advanced logging, refer to Django documentation.
 LOGGING = {
@@ -72,6 +72,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AuditBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -255,6 +256,58 @@ OPENAI_REMARKS_MODEL = os.environ.get('OPENAI_REMARKS_MODEL', 'gpt-5-mini')
 OPENAI_RESPONSES_URL = os.environ.get('OPENAI_RESPONSES_URL', 'https://api.openai.com/v1/responses')
 OPENAI_REMARKS_TIMEOUT = int(os.environ.get('OPENAI_REMARKS_TIMEOUT', '180'))
 
+# Persisted report PDFs (outside MEDIA_ROOT, which nginx serves publicly).
+REPORT_ARTIFACTS_ROOT = os.environ.get('REPORT_ARTIFACTS_ROOT', str(BASE_DIR / 'report_artifacts'))
+# Internal nginx location for X-Accel-Redirect downloads; see nginx.conf.
+REPORT_ARTIFACTS_ACCEL_PREFIX = os.environ.get('REPORT_ARTIFACTS_ACCEL_PREFIX', '')
+
+# PDF render pool, per gunicorn worker (see core/services/render_pool.py).
+REPORT_RENDER_WORKERS = int(os.environ.get('REPORT_RENDER_WORKERS', '2'))
+REPORT_RENDER_TIMEOUT = int(os.environ.get('REPORT_RENDER_TIMEOUT', '90'))
+REPORT_RENDER_MAX_PENDING = int(os.environ.get('REPORT_RENDER_MAX_PENDING', '0'))
+
+# Content-hash cache of WeasyPrint Malayalam pages (LRU by mtime; 0 disables).
+MALAYALAM_PAGE_CACHE_DIR = os.environ.get('MALAYALAM_PAGE_CACHE_DIR', str(BASE_DIR / 'report_cache' / 'malayalam'))
+MALAYALAM_PAGE_CACHE_MAX_MB = int(os.environ.get('MALAYALAM_PAGE_CACHE_MAX_MB', '64'))
+# Optimised report image variants (see `manage.py optimize_report_images`).
+REPORT_IMAGE_CACHE_DIR = os.environ.get('REPORT_IMAGE_CACHE_DIR', str(BASE_DIR / 'report_cache' / 'images'))
+# Warm WeasyPrint process for inline renders (render pool children render directly).
+MALAYALAM_RENDERER_ENABLED = os.environ.get('MALAYALAM_RENDERER_ENABLED', 'True').lower() == 'true'
+# 'reportlab' or 'html' (single-pass WeasyPrint); see core/services/report_html.py.
+REPORT_ENGINE = os.environ.get('REPORT_ENGINE', 'reportlab')
+# Concurrent PDF render / AI draft slots shared by all workers (core/services/concurrency.py).
+CONCURRENCY_LIMITS = {
+    'pdf': int(os.environ.get('CONCURRENCY_PDF_SLOTS', '4')),
+    'ai': int(os.environ.get('CONCURRENCY_AI_SLOTS', '2')),
+}
+CONCURRENCY_QUEUE_WAIT = int(os.environ.get('CONCURRENCY_QUEUE_WAIT', '5'))
+CONCURRENCY_RETRY_AFTER = int(os.environ.get('CONCURRENCY_RETRY_AFTER', '10'))
+CONCURRENCY_LEASE_SECONDS = int(os.environ.get('CONCURRENCY_LEASE_SECONDS', '300'))
+CONCURRENCY_BACKEND = os.environ.get('CONCURRENCY_BACKEND', 'auto')
+CONCURRENCY_LOCK_DIR = os.environ.get('CONCURRENCY_LOCK_DIR', str(BASE_DIR / 'report_cache' / 'locks'))
+# Seconds between checks for ResultStatusOverride changes made by other workers.
+RESULT_OVERRIDE_INDEX_TTL = int(os.environ.get('RESULT_OVERRIDE_INDEX_TTL', '5'))
+# Batch re-evaluation after limit edits (see `manage.py reevaluate_limits`).
+LIMIT_REEVALUATION_INLINE_MAX = int(os.environ.get('LIMIT_REEVALUATION_INLINE_MAX', '2000'))
+LIMIT_REEVALUATION_CHUNK_SIZE = int(os.environ.get('LIMIT_REEVALUATION_CHUNK_SIZE', '2000'))
+# CSV result import (see `manage.py import_results`).
+RESULT_IMPORT_CHUNK_SIZE = int(os.environ.get('RESULT_IMPORT_CHUNK_SIZE', '500'))
+RESULT_IMPORT_PARAMETER_ALIASES = {}
+# Buffered audit writes (see core/services/audit_buffer.py).
+AUDIT_BUFFER_MODE = os.environ.get('AUDIT_BUFFER_MODE', 'request')
+AUDIT_BUFFER_MAX_PENDING = int(os.environ.get('AUDIT_BUFFER_MAX_PENDING', '500'))
+AUDIT_BACKGROUND_BATCH_SIZE = int(os.environ.get('AUDIT_BACKGROUND_BATCH_SIZE', '500'))
+AUDIT_BACKGROUND_FLUSH_SECONDS = float(os.environ.get('AUDIT_BACKGROUND_FLUSH_SECONDS', '2'))
+# Audit archival (see `manage.py archive_audit`).
+AUDIT_HOT_DAYS = int(os.environ.get('AUDIT_HOT_DAYS', '365'))
+AUDIT_ARCHIVE_BACKEND = os.environ.get('AUDIT_ARCHIVE_BACKEND', 'auto')
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', str(BASE_DIR / 'audit_archive'))
+AUDIT_FILTER_CHOICES_TTL = int(os.environ.get('AUDIT_FILTER_CHOICES_TTL', '300'))
+AUDIT_PAYLOAD_MODE = os.environ.get('AUDIT_PAYLOAD_MODE', 'compact')
+BULK_REGISTRATION_MAX_SAMPLES = int(os.environ.get('BULK_REGISTRATION_MAX_SAMPLES', '500'))
+TYPEAHEAD_CACHE_SECONDS = int(os.environ.get('TYPEAHEAD_CACHE_SECONDS', '15'))
+TEST_RUNNER = 'core.test_runner.WaterLabTestRunner'
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 